@@ -0,0 +1,129 @@
+"""
+Benchmark de extracción/parsing de JSON en respuestas grandes del LLM.
+Compara el parsing anterior (hasta 3 intentos completos: texto crudo, sin markdown,
+primer '{' hasta último '}') con la extracción lineal + una única validación.
+
+El parsing anterior crece de forma superlineal con el tamaño de la respuesta
+(unos 3 s con 16 KB), por eso solo se mide hasta --legacy-max-kb.
+
+Uso:
+    python scripts/benchmark_json_extraction.py [--size-kb 4 16 512] [--repeat 20] [--legacy-max-kb 16]
+"""
+import sys
+import time
+import argparse
+from pathlib import Path
+
+# Añadir src al path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from pydantic import BaseModel
+from langchain_core.output_parsers import PydanticOutputParser
+from langchain_core.exceptions import OutputParserException
+from llm.output_parsers import RobustPydanticOutputParser, extract_first_json_object
+
+
+class BenchmarkModel(BaseModel):
+    aprobado: bool
+    puntuacion: int
+    aspectos_positivos: list[str]
+    aspectos_mejorar: list[str]
+    comentario_revision: str
+
+
+def build_response(size_kb: int) -> str:
+    """Respuesta realista: prosa + código con llaves + bloque ```json con strings largos"""
+    prose = "Análisis del código. Se revisan {placeholders} y funciones como if (x) { y(); }.\n"
+    code = "```ts\nexport function suma(a: number, b: number): number { return a + b; }\n```\n"
+    filler = (prose + code) * max(1, (size_kb * 1024) // (2 * len(prose + code)))
+    comentario = "Comentario con llaves {} y comillas \\\" escapadas. " * max(1, (size_kb * 1024) // 100)
+    payload = (
+        '{"aprobado": true, "puntuacion": 8, '
+        '"aspectos_positivos": ["legible", "tests completos"], '
+        '"aspectos_mejorar": [], '
+        f'"comentario_revision": "{comentario}"}}'
+    )
+    return f"{filler}\n```json\n{payload}\n```\nFin de la revisión."
+
+
+def _clean_markdown_blocks(text: str) -> str:
+    """Limpieza de bloques markdown del parser anterior"""
+    if "```json" in text:
+        start = text.find("```json") + 7
+        end = text.find("```", start)
+        if end != -1:
+            return text[start:end].strip()
+    if "```" in text:
+        start = text.find("```") + 3
+        end = text.find("```", start)
+        if end != -1:
+            return text[start:end].strip()
+    return text.strip()
+
+
+def _extract_json(text: str) -> str:
+    """Extracción del parser anterior: del primer '{' al último '}'"""
+    start = text.find("{")
+    end = text.rfind("}")
+    if start != -1 and end != -1 and start < end:
+        return text[start:end + 1]
+    return text
+
+
+def legacy_parse(parser: PydanticOutputParser, text: str):
+    """Reproduce el flujo anterior de 3 intentos completos"""
+    try:
+        return parser.parse(text)
+    except (OutputParserException, ValueError):
+        pass
+    cleaned = _clean_markdown_blocks(text)
+    try:
+        return parser.parse(cleaned)
+    except (OutputParserException, ValueError):
+        pass
+    return parser.parse(_extract_json(cleaned))
+
+
+def bench(label: str, fn, repeat: int) -> float:
+    fn()  # calentamiento
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"   {label:<40} {elapsed * 1000:10.2f} ms/iter")
+    return elapsed
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--size-kb", type=int, nargs="*", default=[4, 16, 512])
+    arg_parser.add_argument("--repeat", type=int, default=20)
+    arg_parser.add_argument("--legacy-max-kb", type=int, default=16)
+    arg_parser.add_argument("--legacy-repeat", type=int, default=2)
+    args = arg_parser.parse_args()
+
+    legacy = PydanticOutputParser(pydantic_object=BenchmarkModel)
+    robust = RobustPydanticOutputParser(pydantic_object=BenchmarkModel)
+
+    print("=" * 70)
+    print("📊 BENCHMARK: EXTRACCIÓN DE JSON EN RESPUESTAS DEL LLM")
+    print("=" * 70)
+    for size_kb in args.size_kb:
+        text = build_response(size_kb)
+        assert robust.parse(text).puntuacion == 8
+        print(f"\n📄 Respuesta de {len(text) / 1024:.0f} KB")
+        t_legacy = None
+        if size_kb <= args.legacy_max_kb:
+            assert legacy_parse(legacy, text).puntuacion == 8
+            t_legacy = bench("Anterior (3 intentos)", lambda: legacy_parse(legacy, text), args.legacy_repeat)
+        else:
+            print(f"   {'Anterior (3 intentos)':<40} {'omitido':>10}")
+        bench("Solo extracción lineal", lambda: extract_first_json_object(text), args.repeat)
+        t_new = bench("Extracción + model_validate_json", lambda: robust.parse(text), args.repeat)
+        if t_legacy is not None:
+            print(f"   {'Speedup':<40} {t_legacy / t_new:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
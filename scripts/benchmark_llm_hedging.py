@@ -0,0 +1,67 @@
+"""
+Simulación de peticiones con cobertura (hedging) frente a una latencia de cola pesada.
+Cada petición simulada tarda una latencia lognormal y, con cierta probabilidad, se
+queda atascada varias veces más. Compara el p50/p99 sin cobertura con el obtenido
+por HedgedCaller y cuenta cuántas peticiones extra se lanzaron.
+No hace peticiones a la API.
+
+Uso:
+    python scripts/benchmark_llm_hedging.py [--calls 400] [--stall-prob 0.03] [--scale 0.01]
+"""
+import sys
+import time
+import random
+import logging
+import argparse
+from pathlib import Path
+
+# Añadir src al path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from llm.hedging import HedgedCaller, percentile
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--calls", type=int, default=400)
+    arg_parser.add_argument("--stall-prob", type=float, default=0.03, help="Probabilidad de petición atascada")
+    arg_parser.add_argument("--stall-factor", type=float, default=8.0, help="Multiplicador de latencia atascada")
+    arg_parser.add_argument("--scale", type=float, default=0.01, help="Segundos por unidad de latencia simulada")
+    arg_parser.add_argument("--max-extra-ratio", type=float, default=0.1)
+    arg_parser.add_argument("--seed", type=int, default=42)
+    args = arg_parser.parse_args()
+
+    logging.getLogger("llm.hedging").setLevel(logging.WARNING)
+    rng = random.Random(args.seed)
+
+    def peticion():
+        latencia = rng.lognormvariate(0, 0.3)
+        if rng.random() < args.stall_prob:
+            latencia *= args.stall_factor
+        time.sleep(latencia * args.scale)
+        return latencia
+
+    caller = HedgedCaller(
+        percentile_umbral=95, min_samples=20, max_extra_ratio=args.max_extra_ratio,
+        history_size=100, min_delay=0.0
+    )
+    for _ in range(args.calls):
+        caller.call("simulado", peticion)
+    time.sleep(args.scale * args.stall_factor * 3)  # Esperar a las perdedoras para el p99 sin cobertura
+
+    stats = caller._stats["simulado"]
+    print("=" * 70)
+    print("📊 SIMULACIÓN: PETICIONES CON COBERTURA (HEDGING)")
+    print("=" * 70)
+    print(f"   Llamadas                      {stats.calls:10d}")
+    print(f"   Peticiones duplicadas         {stats.hedges:10d} ({stats.hedges / stats.calls:.1%})")
+    print(f"   Ganadas por la duplicada      {stats.hedge_wins:10d}")
+    for p in (50, 99):
+        sin = percentile(stats.primarias, p) * 1000
+        con = percentile(stats.efectivas, p) * 1000
+        print(f"   p{p:<3} sin / con cobertura     {sin:8.1f} / {con:8.1f} ms  ({sin / con:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark del pool de instancias LLM de LangChain.
+Mide el coste de preparar una petición completa con call_gemini_with_langchain (obtener
+el LLM, construir los mensajes, preparar la petición de google-genai y convertir la
+respuesta) creando un ChatGoogleGenerativeAI por llamada frente a reutilizarlo del pool
+(LLM_CLIENT_POOL_ENABLED). Solo se sustituye el envío HTTP por una respuesta fija, así
+que no hace peticiones a la API ni mide la latencia de red ni el handshake TLS que el
+pool también evita.
+
+Uso:
+    python scripts/benchmark_llm_pool.py [--repeat 50] [--context-chars 4000]
+"""
+import sys
+import time
+import logging
+import argparse
+from pathlib import Path
+from unittest.mock import patch
+
+# Añadir src al path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from google.genai import types
+from google.genai.models import Models
+
+from config.settings import settings
+from llm.langchain_gemini import call_gemini_with_langchain, clear_llm_pool
+
+RESPUESTA = types.GenerateContentResponse(
+    candidates=[types.Candidate(
+        content=types.Content(parts=[types.Part(text="ok")], role="model"),
+        finish_reason="STOP"
+    )]
+)
+
+
+def bench(label: str, fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"   {label:<40} {elapsed * 1000:10.3f} ms/llamada")
+    return elapsed
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--repeat", type=int, default=50)
+    arg_parser.add_argument("--context-chars", type=int, default=4000, help="Tamaño del contexto de cada petición")
+    args = arg_parser.parse_args()
+
+    # La construcción no valida la clave contra la API
+    settings.GEMINI_API_KEY = settings.GEMINI_API_KEY or "benchmark-key"
+    # Sin el log de inicialización de cada instancia
+    logging.getLogger("llm.langchain_gemini").setLevel(logging.WARNING)
+
+    contexto = ("Requisito: sumar un array de números. " * (args.context_chars // 38 + 1))[:args.context_chars]
+
+    def peticion():
+        return call_gemini_with_langchain("Eres un desarrollador.", contexto)
+
+    print("=" * 70)
+    print("📊 BENCHMARK: POOL DE INSTANCIAS LLM (LangChain, petición completa sin red)")
+    print("=" * 70)
+    with patch.object(Models, "generate_content", return_value=RESPUESTA) as envio:
+        settings.LLM_CLIENT_POOL_ENABLED = False
+        t_new = bench("Instancia nueva por llamada", peticion, args.repeat)
+
+        settings.LLM_CLIENT_POOL_ENABLED = True
+        clear_llm_pool()
+        peticion()  # primera construcción (una vez por configuración)
+        t_pool = bench("Instancia del pool", peticion, args.repeat)
+        assert envio.call_count == 2 * args.repeat + 1
+    print(f"   {'Speedup':<40} {t_new / t_pool:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Benchmark del validador de completitud de TypeScript.
+Compara la implementación anterior (recorrido carácter a carácter en Python para
+quitar strings/comentarios + tres recuentos sobre el resultado) con el tokenizador
+de una sola pasada basado en expresiones regulares compiladas.
+
+Uso:
+    python scripts/benchmark_ts_validator.py [--size-kb 16 128 1024] [--repeat 10]
+"""
+import sys
+import time
+import argparse
+from pathlib import Path
+
+# Añadir src al path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from utils.code_validator import _validate_typescript_code
+
+
+def legacy_strip(codigo: str) -> str:
+    """Copia de la implementación anterior de _strip_ts_strings_and_comments"""
+    resultado = []
+    i = 0
+    in_string = False
+    string_char = None
+    in_comment = False
+    in_multiline_comment = False
+
+    while i < len(codigo):
+        char = codigo[i]
+        if not in_string and not in_comment and i < len(codigo) - 1:
+            if codigo[i:i+2] == '/*':
+                in_multiline_comment = True
+                i += 2
+                continue
+        if in_multiline_comment:
+            if i < len(codigo) - 1 and codigo[i:i+2] == '*/':
+                in_multiline_comment = False
+                i += 2
+                continue
+            i += 1
+            continue
+        if not in_string and not in_comment and i < len(codigo) - 1:
+            if codigo[i:i+2] == '//':
+                in_comment = True
+                i += 2
+                continue
+        if in_comment:
+            if char == '\n':
+                in_comment = False
+                resultado.append(char)
+            i += 1
+            continue
+        if char in ('"', "'", '`') and (i == 0 or codigo[i-1] != '\\'):
+            if not in_string:
+                in_string = True
+                string_char = char
+            elif char == string_char:
+                in_string = False
+                string_char = None
+            i += 1
+            continue
+        if not in_string:
+            resultado.append(char)
+        i += 1
+    return ''.join(resultado)
+
+
+def legacy_validate(codigo: str) -> bool:
+    sin_strings = legacy_strip(codigo)
+    return all(sin_strings.count(a) == sin_strings.count(c) for a, c in (('{', '}'), ('(', ')'), ('[', ']')))
+
+
+BLOCK = '''
+/**
+ * Calcula el total del pedido {con descuentos}.
+ */
+export function calcularTotal__N__(items: Item[], descuento: number = 0): number {
+    // Validación de entrada (paréntesis en comentario: ( [
+    if (!Array.isArray(items)) {
+        throw new Error("items debe ser un array: \\"[]\\" esperado");
+    }
+    const resumen = `Total de ${items.length} items: ${items.map(i => `${i.nombre}`).join(', ')}`;
+    const patron = /[{(]\\d+[)}]/g;
+    return items.reduce((acc, item) => acc + item.precio * (1 - descuento), 0) / (resumen.length || 1);
+}
+'''
+
+
+def build_source(size_kb: int) -> str:
+    bloques = []
+    total = 0
+    i = 0
+    while total < size_kb * 1024:
+        bloque = BLOCK.replace('__N__', str(i))
+        bloques.append(bloque)
+        total += len(bloque)
+        i += 1
+    return ''.join(bloques)
+
+
+def bench(label: str, fn, repeat: int) -> float:
+    fn()  # calentamiento
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"   {label:<40} {elapsed * 1000:10.2f} ms/iter")
+    return elapsed
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--size-kb", type=int, nargs="*", default=[16, 128, 1024])
+    arg_parser.add_argument("--repeat", type=int, default=10)
+    args = arg_parser.parse_args()
+
+    print("=" * 70)
+    print("📊 BENCHMARK: VALIDADOR DE COMPLETITUD TYPESCRIPT")
+    print("=" * 70)
+    for size_kb in args.size_kb:
+        codigo = build_source(size_kb)
+        es_valido, mensaje = _validate_typescript_code(codigo, require_test_functions=False)
+        print(f"\n📄 Fichero de {len(codigo) / 1024:.0f} KB (nuevo: {'válido' if es_valido else mensaje}, "
+              f"anterior: {'válido' if legacy_validate(codigo) else 'desbalanceado'})")
+        t_legacy = bench("Anterior (carácter a carácter)", lambda: legacy_validate(codigo), args.repeat)
+        t_new = bench("Tokenizador de una pasada", lambda: _validate_typescript_code(codigo, False), args.repeat)
+        print(f"   {'Speedup':<40} {t_legacy / t_new:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
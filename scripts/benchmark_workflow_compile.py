@@ -0,0 +1,50 @@
+"""
+Benchmark de la preparación del flujo por ejecución.
+Compara compilar el StateGraph en cada llamada a run_development_workflow
+(create_workflow) con reutilizar el grafo compilado del proceso
+(get_compiled_workflow, COMPILED_WORKFLOW_CACHE_ENABLED).
+No ejecuta el flujo ni hace peticiones a la API.
+
+Uso:
+    python scripts/benchmark_workflow_compile.py [--repeat 50]
+"""
+import sys
+import time
+import argparse
+from pathlib import Path
+
+# Añadir src al path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from workflow.graph import create_workflow, get_compiled_workflow, clear_workflow_cache
+
+
+def bench(label: str, fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"   {label:<40} {elapsed * 1000:10.3f} ms/ejecución")
+    return elapsed
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--repeat", type=int, default=50)
+    args = arg_parser.parse_args()
+
+    print("=" * 70)
+    print("📊 BENCHMARK: GRAFO COMPILADO COMPARTIDO")
+    print("=" * 70)
+    t_compile = bench("Compilar en cada ejecución", create_workflow, args.repeat)
+    clear_workflow_cache()
+    start = time.perf_counter()
+    get_compiled_workflow()  # primera compilación (una vez por proceso y configuración)
+    print(f"   {'Primera compilación con caché':<40} {(time.perf_counter() - start) * 1000:10.3f} ms")
+    t_cache = bench("Grafo compilado en caché", get_compiled_workflow, args.repeat)
+    print(f"   {'Speedup':<40} {t_compile / t_cache:10.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Aprovisiona el toolchain de Node.js compartido (vitest + TypeScript) en NODE_TOOLCHAIN_DIR.
+Es el paso de instalación previo a ejecutar el flujo con NODE_TOOLCHAIN_ENABLED=true:
+el flujo solo comprueba que el toolchain está aprovisionado y no descarga nada.
+
+Uso:
+    python scripts/provision_node_toolchain.py           # instala si falta y verifica
+    python scripts/provision_node_toolchain.py --check   # solo comprueba, sin instalar
+"""
+import sys
+import argparse
+from pathlib import Path
+
+# Añadir src al path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from tools.node_toolchain import get_node_toolchain, ToolchainError
+
+
+def main() -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--check", action="store_true", help="Solo comprobar, sin instalar")
+    args = arg_parser.parse_args()
+
+    toolchain = get_node_toolchain()
+    print("=" * 70)
+    print(f"📦 Toolchain de Node.js: vitest {toolchain.vitest_version}, typescript {toolchain.typescript_version}")
+    print(f"   Directorio: {toolchain.directory}")
+    print("=" * 70)
+
+    if args.check:
+        if toolchain.is_provisioned() and toolchain.health_check():
+            print("✅ Toolchain aprovisionado y sano")
+            return 0
+        print("❌ Toolchain no aprovisionado o roto")
+        return 1
+
+    try:
+        toolchain.ensure_provisioned()
+    except ToolchainError as e:
+        print(f"❌ No se pudo aprovisionar el toolchain: {e}")
+        return 1
+    print("✅ Toolchain listo")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,14 +4,17 @@ Responsable de revisar el código generado en la PR y aprobarla si cumple los es
 """
 
 import time
-import json
+from langchain_core.exceptions import OutputParserException
 from models.state import AgentState
+from models.schemas import CodeReviewVerdict
 from config.settings import settings
 from config.prompt_templates import PromptTemplates
 from llm.gemini_client import call_gemini
-from tools.file_utils import guardar_fichero_texto
+from llm.model_router import get_model_router, valida_con_parser
+from llm.output_parsers import get_code_review_parser
+from tools.file_utils import guardar_artefacto
 from services.github_service import github_service
-from utils.logger import setup_logger, log_agent_execution, log_llm_call, log_file_operation
+from utils.logger import setup_logger, log_agent_execution, log_llm_call
 from utils.agent_decorators import agent_execution_context
 
 logger = setup_logger(__name__, level=settings.get_log_level(), agent_mode=True)
@@ -44,11 +47,7 @@ Motivo: GitHub no está habilitado
 La revisión de código fue omitida porque GitHub no está configurado.
 El código se considera aprobado automáticamente para continuar el flujo.
 """
-            guardar_fichero_texto(
-                nombre_archivo,
-                contenido_archivo,
-                directorio=settings.OUTPUT_DIR
-            )
+            guardar_artefacto(nombre_archivo, contenido_archivo, tipo="review")
             logger.info(f"💾 Archivo de revisión guardado: {nombre_archivo}")
             
             return state
@@ -104,30 +103,28 @@ IMPORTANTE: Sé constructivo pero exigente. Solo aprueba si el código es de cal
         # Llamar al LLM para revisión
         logger.info("🤖 Analizando código con LLM...")
         start_time = time.time()
-        respuesta_llm = call_gemini(prompt_revision, "")
+        respuesta_llm = get_model_router().call(
+            "reviewer",
+            prompt_revision,
+            call_gemini,
+            validate=valida_con_parser(get_code_review_parser()),
+            response_schema=CodeReviewVerdict
+        )
         duration = time.time() - start_time
         
         log_llm_call(logger, "revision_codigo", duration=duration)
         
-        # Parsear respuesta
+        # Parsear respuesta (salida estructurada validada contra CodeReviewVerdict)
         try:
-            # Limpiar respuesta de marcadores markdown
-            respuesta_limpia = respuesta_llm.strip()
-            if respuesta_limpia.startswith('```'):
-                respuesta_limpia = respuesta_limpia.split('\n', 1)[1]
-            if respuesta_limpia.endswith('```'):
-                respuesta_limpia = respuesta_limpia.rsplit('```', 1)[0]
-            respuesta_limpia = respuesta_limpia.strip()
-            
-            resultado = json.loads(respuesta_limpia)
+            veredicto = get_code_review_parser().parse(respuesta_llm)
             
-            aprobado = resultado.get('aprobado', False)
-            puntuacion = resultado.get('puntuacion', 0)
-            aspectos_positivos = resultado.get('aspectos_positivos', [])
-            aspectos_mejorar = resultado.get('aspectos_mejorar', [])
-            comentario = resultado.get('comentario_revision', '')
+            aprobado = veredicto.aprobado
+            puntuacion = veredicto.puntuacion
+            aspectos_positivos = veredicto.aspectos_positivos
+            aspectos_mejorar = veredicto.aspectos_mejorar
+            comentario = veredicto.comentario_revision
             
-        except (json.JSONDecodeError, KeyError) as e:
+        except OutputParserException as e:
             logger.warning(f"⚠️ Error al parsear respuesta del LLM: {e}")
             # Asumir aprobado si no se puede parsear
             aprobado = True
@@ -174,18 +171,7 @@ Respuesta LLM completa:
 {respuesta_llm}
 """
         
-        success = guardar_fichero_texto(
-            nombre_archivo,
-            contenido_archivo,
-            directorio=settings.OUTPUT_DIR
-        )
-        
-        log_file_operation(
-            logger,
-            "guardar",
-            f"{settings.OUTPUT_DIR}/{nombre_archivo}",
-            success=success
-        )
+        guardar_artefacto(nombre_archivo, contenido_archivo, tipo="review")
         
         # Incrementar contador de intentos si rechaza
         if not aprobado:
@@ -13,16 +13,91 @@ from models.state import AgentState
 from config.prompts import Prompts
 from config.prompt_templates import PromptTemplates
 from config.settings import settings
+from config.pipeline_profiles import github_enabled
 from llm.gemini_client import call_gemini
-from tools.file_utils import guardar_fichero_texto, detectar_lenguaje_y_extension, limpiar_codigo_markdown, extraer_nombre_archivo
+from llm.model_router import get_model_router
+from tools.file_utils import guardar_artefacto, limpiar_codigo_markdown
+from models.requirements_meta import obtener_requisitos_meta
+from llm.errors import comprobar_respuesta_llm
+from tools.candidate_selector import seleccionar_mejor_candidato
+from utils.ts_syntax_checker import check_typescript_syntax
+from utils.code_validator import validate_code_completeness
+from utils.convergence import (
+    PROGRESO, detectar_bucle, registrar_iteracion, en_recuperacion, marcar_recuperacion, agotar_bucle
+)
 from services.azure_devops_service import azure_service
 from services.github_service import github_service
-from utils.logger import setup_logger, log_agent_execution, log_llm_call, log_file_operation
+from utils.logger import setup_logger, log_agent_execution, log_llm_call
 from utils.agent_decorators import agent_execution_context
 
 logger = setup_logger(__name__, level=settings.get_log_level(), agent_mode=True)
 
 
+def _evaluar_convergencia(state: AgentState) -> tuple[str, dict]:
+    """
+    Registra la iteración en el monitor de convergencia y, si el bucle está estancado
+    o en ciclo, devuelve el contexto adicional y las opciones del LLM para escalar.
+    Si el bucle ya se había escalado y sigue igual, se deja un único intento más.
+
+    Returns:
+        (contexto_adicional, kwargs para call_gemini)
+    """
+    bucle, feedback = detectar_bucle(state)
+    if bucle is None or not state.get('codigo_generado'):
+        return "", {}
+
+    veredicto = registrar_iteracion(state, bucle, state['codigo_generado'], feedback)
+    if veredicto == PROGRESO:
+        return "", {}
+
+    if en_recuperacion(state, bucle):
+        logger.warning(f"🔁 Bucle '{bucle}' sigue sin converger tras escalar ({veredicto}): último intento")
+        agotar_bucle(state, bucle)
+    else:
+        logger.warning(f"🔁 Bucle '{bucle}' sin convergencia ({veredicto}): escalando contexto y modelo")
+        marcar_recuperacion(state, bucle)
+
+    contexto = (
+        f"\nATENCIÓN: los intentos de corrección anteriores no han convergido ({veredicto}): "
+        "el código y el error se repiten. No vuelvas a aplicar la misma solución; analiza la causa "
+        "raíz y reescribe la parte afectada con un enfoque distinto.\n"
+    )
+    if bucle == "revisor" and feedback:
+        contexto += f"\nComentario del revisor que se repite:\n{feedback}\n"
+
+    opciones = {"temperature": settings.CONVERGENCE_RECOVERY_TEMPERATURE}
+    if settings.CONVERGENCE_RECOVERY_MODEL:
+        opciones["model"] = settings.CONVERGENCE_RECOVERY_MODEL
+    return contexto, opciones
+
+
+def _generar_codigo(prompt: str, lenguaje: str, opciones_llm: dict) -> str:
+    """
+    Genera el código por la ruta 'developer' del router (con validación de completitud)
+    y, en TypeScript, lo regenera una vez si no pasa la comprobación de sintaxis.
+    En el modo multi-candidato se usa para cada candidata.
+    """
+    router = get_model_router()
+
+    def validar_codigo(respuesta: str) -> bool:
+        return validate_code_completeness(limpiar_codigo_markdown(respuesta), lenguaje)[0]
+
+    respuesta_llm = router.call("developer", prompt, call_gemini, validate=validar_codigo, **opciones_llm)
+    if lenguaje.lower() == 'typescript' and settings.TS_SYNTAX_CHECK_ENABLED:
+        sintaxis_ok, error_sintaxis = check_typescript_syntax(limpiar_codigo_markdown(respuesta_llm))
+        if not sintaxis_ok:
+            # Regenerar ya: el código no llegaría a compilar en vitest
+            logger.warning(f"⚠️ Código generado con errores de sintaxis, regenerando: {error_sintaxis}")
+            respuesta_llm = router.call(
+                "developer",
+                prompt + f"\n\nTu respuesta anterior tenía errores de sintaxis. Corrígelos:\n{error_sintaxis}",
+                call_gemini,
+                validate=validar_codigo,
+                **opciones_llm
+            )
+    return respuesta_llm
+
+
 def developer_code_node(state: AgentState) -> AgentState:
     """
     Nodo del Developer-Code.
@@ -55,6 +130,12 @@ def developer_code_node(state: AgentState) -> AgentState:
             contexto_adicional += f"\nCódigo anterior a corregir:\n{state['codigo_generado']}\n"
             logger.debug("Incluyendo código anterior para contexto de corrección")
 
+        # Monitor de convergencia: no gastar intentos repitiendo la misma corrección
+        opciones_llm = {}
+        if settings.CONVERGENCE_MONITOR_ENABLED:
+            contexto_recuperacion, opciones_llm = _evaluar_convergencia(state)
+            contexto_adicional += contexto_recuperacion
+
         # Usar ChatPromptTemplate
         logger.debug("🔗 Usando ChatPromptTemplate de LangChain")
         prompt_formateado = PromptTemplates.format_developer(
@@ -62,12 +143,42 @@ def developer_code_node(state: AgentState) -> AgentState:
             contexto_adicional=contexto_adicional
         )
 
+        meta = obtener_requisitos_meta(state)
+        lenguaje, extension = meta.lenguaje, meta.extension
+
+        def generar(prompt: str) -> str:
+            return _generar_codigo(prompt, lenguaje, opciones_llm)
+
         start_time = time.time()
-        respuesta_llm = call_gemini(prompt_formateado, "")
+        n_candidatos = max(1, int(settings.DEVELOPER_CANDIDATES))
+        mejor_candidato = None
+        if n_candidatos > 1:
+            # Modo multi-candidato: N implementaciones en paralelo, se conserva la mejor.
+            # En la primera pasada no hay tests todavía: la selección es solo por análisis
+            # estático; en las correcciones se ejecutan los tests previos (con el pool)
+            logger.info(f"🧬 Generando {n_candidatos} implementaciones candidatas en paralelo")
+            mejor_candidato = seleccionar_mejor_candidato(
+                prompt_formateado,
+                n_candidatos,
+                generar,
+                codigo_filename=meta.codigo_filename,
+                lenguaje=lenguaje,
+                tests=state.get('tests_unitarios_generados', ''),
+                test_filename=meta.test_filename
+            )
+        if mejor_candidato is not None:
+            respuesta_llm = mejor_candidato.respuesta_llm
+        else:
+            respuesta_llm = generar(prompt_formateado)
         duration = time.time() - start_time
         
         log_llm_call(logger, "codificacion", duration=duration)
 
+        if comprobar_respuesta_llm(state, "Developer-Code", respuesta_llm):
+            # No guardar el mensaje de error como código ni analizarlo con Sonar
+            logger.error(f"❌ Fallo del LLM al generar código: {respuesta_llm[:200]}")
+            return state
+
         # El código ya viene formateado desde el LLM
         state['codigo_generado'] = respuesta_llm
         state['traceback'] = ""
@@ -76,18 +187,12 @@ def developer_code_node(state: AgentState) -> AgentState:
         logger.debug(f"Código generado: {state['codigo_generado'][:200]}...")
 
         # Guardar output en archivo con extensión correcta
-        lenguaje, extension, patron_limpieza = detectar_lenguaje_y_extension(
-            state.get('requisitos_formales', '')
-        )
         codigo_limpio = limpiar_codigo_markdown(state['codigo_generado'])
         
         # Incluir intento de requisito, de debug y de sonarqube
         nombre_archivo = f"2_developer_req{state['attempt_count']}_debug{state['debug_attempt_count']}_sq{state['sonarqube_attempt_count']}{extension}"
-        resultado = guardar_fichero_texto(
-            nombre_archivo,
-            codigo_limpio,
-            directorio=settings.OUTPUT_DIR
-        )
+        # Con el almacén, el handle viaja en el estado: Sonar lee el código desde memoria, no desde disco
+        state['codigo_artifact'] = guardar_artefacto(nombre_archivo, codigo_limpio, tipo="code")
         
         # === INICIO: Crear Tasks en Azure DevOps (solo en primera generación) ===
         if (settings.AZURE_DEVOPS_ENABLED and state.get('azure_pbi_id') and 
@@ -113,8 +218,8 @@ def developer_code_node(state: AgentState) -> AgentState:
                 logger.debug(f"Stack trace: {e}", exc_info=True)
         # === FIN: Creación de Tasks en Azure DevOps ===
         
-        # === INICIO: Crear branch en GitHub  ===
-        if settings.GITHUB_ENABLED:
+        # === INICIO: Crear branch en GitHub (el perfil fast no tiene flujo de PR) ===
+        if github_enabled(state):
             import os
             
             # Solo crear branch si no existe uno previo o si es una corrección de Sonar
@@ -126,7 +231,7 @@ def developer_code_node(state: AgentState) -> AgentState:
                 
                 try:
                     # Generar nombre del branch
-                    nombre_base = extraer_nombre_archivo(state.get('requisitos_formales', ''))
+                    nombre_base = meta.nombre_base
                     # Sanitizar nombre_base para evitar caracteres inválidos en el branch
                     nombre_base_sanitizado = github_service.sanitize_branch_name(nombre_base)
                     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -177,7 +282,7 @@ def developer_code_node(state: AgentState) -> AgentState:
         log_agent_execution(logger, "Developer-Code", "completado", {
             "archivo": nombre_archivo,
             "lenguaje": lenguaje,
-            "guardado": resultado
+            "artefacto": state['codigo_artifact'] or "fichero"
         })
 
         return state
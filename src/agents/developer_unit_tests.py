@@ -17,12 +17,20 @@ from config.prompts import Prompts
 from config.prompt_templates import PromptTemplates
 from config.settings import settings
 from llm.gemini_client import call_gemini
-from tools.file_utils import guardar_fichero_texto, detectar_lenguaje_y_extension, extraer_nombre_archivo, limpiar_codigo_markdown
+from llm.model_router import get_model_router
+from tools.file_utils import guardar_fichero_texto, guardar_artefacto, limpiar_codigo_markdown
+from models.requirements_meta import obtener_requisitos_meta
+from llm.errors import comprobar_respuesta_llm
+from tools.test_executor_pool import get_test_executor_pool
+from tools.node_toolchain import get_node_toolchain
 from services.azure_devops_service import azure_service
 from services.github_service import github_service
 from utils.logger import setup_logger, log_agent_execution, log_llm_call, log_file_operation
 from utils.agent_decorators import agent_execution_context
-from utils.code_validator import validate_test_code_completeness
+from utils.code_validator import validate_test_code_completeness, check_ts_imports_exported
+from utils.ts_syntax_checker import check_typescript_syntax
+from utils.deadline import cap_timeout
+from config.pipeline_profiles import github_enabled
 
 logger = setup_logger(__name__, level=settings.get_log_level(), agent_mode=True)
 
@@ -96,11 +104,7 @@ El merge de la PR fue omitido porque:
 El flujo continúa normalmente hacia la validación del Stakeholder.
 ✅ Precondiciones cumplidas: tests pasados y código aprobado
 """
-            guardar_fichero_texto(
-                nombre_archivo,
-                contenido,
-                directorio=settings.OUTPUT_DIR
-            )
+            guardar_artefacto(nombre_archivo, contenido, tipo="merge")
             logger.info(f"💾 Archivo de merge guardado: {nombre_archivo}")
             
             return state
@@ -144,18 +148,7 @@ Branch: {state.get('github_branch_name', 'N/A')}
 ⚠️ No se pudo mergear la PR
 """
         
-        success = guardar_fichero_texto(
-            nombre_archivo,
-            contenido,
-            directorio=settings.OUTPUT_DIR
-        )
-        
-        log_file_operation(
-            logger,
-            "guardar",
-            f"{settings.OUTPUT_DIR}/{nombre_archivo}",
-            success=success
-        )
+        guardar_artefacto(nombre_archivo, contenido, tipo="merge")
 
         if merged:
             logger.info(f"✅ PR #{pr_number} mergeada (squash) por Developer-UnitTests")
@@ -164,62 +157,8 @@ Branch: {state.get('github_branch_name', 'N/A')}
             if branch_name:
                 github_service.delete_branch(branch_name)
 
-                repo_path = settings.GITHUB_REPO_PATH
                 try:
-                    sanitized_branch = github_service.sanitize_branch_name(branch_name)
-                    if sanitized_branch == settings.GITHUB_BASE_BRANCH:
-                        raise RuntimeError(f"Se omitió borrado de branch local base: {sanitized_branch}")
-
-                    git_dir = os.path.join(repo_path, ".git")
-                    if os.path.isdir(git_dir):
-                        logger.info(f"🔍 Verificando branch local en: {repo_path}")
-                        
-                        current_result = subprocess.run(
-                            ["git", "-C", repo_path, "rev-parse", "--abbrev-ref", "HEAD"],
-                            capture_output=True,
-                            text=True,
-                            check=False
-                        )
-                        current = current_result.stdout.strip()
-                        logger.info(f"📍 Branch actual: {current}")
-
-                        if current == sanitized_branch:
-                            logger.info(f"🔄 Cambiando a {settings.GITHUB_BASE_BRANCH} antes de borrar...")
-                            checkout_result = subprocess.run(
-                                ["git", "-C", repo_path, "checkout", settings.GITHUB_BASE_BRANCH],
-                                capture_output=True,
-                                text=True,
-                                check=False
-                            )
-                            if checkout_result.returncode != 0:
-                                logger.warning(f"⚠️ Checkout falló: {checkout_result.stderr}")
-
-                        # Verificar si el branch existe localmente antes de intentar borrarlo
-                        list_result = subprocess.run(
-                            ["git", "-C", repo_path, "branch", "--list", sanitized_branch],
-                            capture_output=True,
-                            text=True,
-                            check=False
-                        )
-                        
-                        if list_result.stdout.strip():
-                            # Branch existe localmente, proceder a eliminarlo
-                            logger.info(f"🗑️ Eliminando branch local: {sanitized_branch}")
-                            delete_result = subprocess.run(
-                                ["git", "-C", repo_path, "branch", "-D", sanitized_branch],
-                                capture_output=True,
-                                text=True,
-                                check=False
-                            )
-                            
-                            if delete_result.returncode == 0:
-                                logger.info(f"🧹 Branch local eliminado: {sanitized_branch}")
-                            else:
-                                logger.warning(f"⚠️ No se pudo eliminar branch local: {delete_result.stderr.strip()}")
-                        else:
-                            logger.debug(f"ℹ️ Branch local no existe, omitiendo borrado: {sanitized_branch}")
-                    else:
-                        logger.warning(f"⚠️ No es un repositorio git: {repo_path}")
+                    github_service.delete_local_branch(branch_name)
                 except Exception as e:
                     logger.warning(f"⚠️ No se pudo borrar el branch local '{branch_name}': {e}")
 
@@ -324,6 +263,32 @@ def _validar_codigo_tests_completo(codigo: str, lenguaje: str) -> tuple[bool, st
     return validate_test_code_completeness(codigo, lenguaje)
 
 
+def _validar_tests_generados(codigo: str, lenguaje: str, test_filename: str, codigo_produccion: str = None) -> tuple[bool, str]:
+    """
+    Valida los tests recién generados antes de ejecutarlos: completitud y, para
+    TypeScript con TS_SYNTAX_CHECK_ENABLED, sintaxis en proceso con la ubicación
+    exacta de cada error y que lo que importan del código bajo prueba esté exportado
+    (sin lanzar vitest).
+    """
+    valido, error = _validar_codigo_tests_completo(codigo, lenguaje)
+    if valido and lenguaje.lower() == 'typescript' and settings.TS_SYNTAX_CHECK_ENABLED:
+        valido, error = check_typescript_syntax(codigo, test_filename)
+        if valido and codigo_produccion:
+            modulo = test_filename.split('.spec.')[0]
+            valido, error = check_ts_imports_exported(codigo, codigo_produccion, modulo)
+    return valido, error
+
+
+def _validador_tests(lenguaje: str, test_filename: str, codigo_produccion: str = None):
+    """Validador de respuestas del LLM para la cascada de modelos (mismo post-procesado que el nodo)"""
+    def _validar(respuesta: str) -> bool:
+        tests = _limpiar_codigo_tests_llm(respuesta)
+        if lenguaje.lower() == 'typescript':
+            tests = _postprocesar_tests_typescript(tests)
+        return _validar_tests_generados(tests, lenguaje, test_filename, codigo_produccion)[0]
+    return _validar
+
+
 def developer_unit_tests_node(state: AgentState) -> AgentState:
     """
     Nodo de Developer-UnitTests - Genera y ejecuta tests unitarios.
@@ -362,9 +327,8 @@ def developer_unit_tests_node(state: AgentState) -> AgentState:
         # === FIN: Actualización de estado en Azure DevOps ===
         
         # Detectar lenguaje del código
-        lenguaje, extension, patron_limpieza = detectar_lenguaje_y_extension(
-            state.get('requisitos_formales', '')
-        )
+        meta = obtener_requisitos_meta(state)
+        lenguaje, extension = meta.lenguaje, meta.extension
         codigo_limpio = limpiar_codigo_markdown(state['codigo_generado'])
         
         logger.info(f"🔍 Lenguaje detectado: {lenguaje}")
@@ -374,8 +338,8 @@ def developer_unit_tests_node(state: AgentState) -> AgentState:
         sq_attempt = state['sonarqube_attempt_count']
         debug_attempt = state['debug_attempt_count']
         
-        # Extraer nombre descriptivo del archivo desde requisitos formales
-        nombre_base = extraer_nombre_archivo(state.get('requisitos_formales', ''))
+        # Nombre descriptivo del archivo precalculado desde los requisitos formales
+        nombre_base = meta.nombre_base
         
         if lenguaje.lower() == 'typescript':
             codigo_filename = f"{nombre_base}.ts"
@@ -425,17 +389,23 @@ def developer_unit_tests_node(state: AgentState) -> AgentState:
         # Llamar al LLM para generar los tests
         logger.info("🤖 Llamando a LLM para generar tests...")
         start_time = time.time()
-        tests_generados = call_gemini(prompt_formateado, "")
+        validar_tests = _validador_tests(lenguaje, test_filename, codigo_limpio)
+        tests_generados = get_model_router().call("test_generator", prompt_formateado, call_gemini, validate=validar_tests)
         duration = time.time() - start_time
         
         log_llm_call(logger, "generacion_tests", duration=duration)
         
+        if comprobar_respuesta_llm(state, "Developer-UnitTests", tests_generados):
+            # No ejecutar ni guardar el mensaje de error como tests
+            logger.error(f"❌ Fallo del LLM al generar tests: {tests_generados[:200]}")
+            return state
+        
         tests_generados = _limpiar_codigo_tests_llm(tests_generados)
         if lenguaje.lower() == 'typescript':
             tests_generados = _postprocesar_tests_typescript(tests_generados)
         
-        # Validar que el código de tests esté completo (no truncado)
-        codigo_valido, error_validacion = _validar_codigo_tests_completo(tests_generados, lenguaje)
+        # Validar que el código de tests esté completo (no truncado) y sea sintácticamente válido
+        codigo_valido, error_validacion = _validar_tests_generados(tests_generados, lenguaje, test_filename, codigo_limpio)
         if not codigo_valido:
             logger.warning(f"⚠️ Código de tests posiblemente incompleto: {error_validacion}")
             logger.info("🔄 Intentando regenerar tests con más tokens...")
@@ -447,14 +417,18 @@ def developer_unit_tests_node(state: AgentState) -> AgentState:
                   "Devuelve un archivo de tests MÁS CORTO (máximo 6 tests) y SIN describe anidados. "
                   "Evita tests innecesarios y elimina/evita casos repetidos o duplicados; cada test debe ser único y aportar cobertura nueva. "
                   "No incluyas explicaciones. La ÚLTIMA línea del archivo debe ser exactamente: `});`"
+                + f"\n\nProblema detectado:\n{error_validacion}"
             )
-            tests_generados = call_gemini(prompt_retry, "")
+            tests_generados = get_model_router().call("test_generator", prompt_retry, call_gemini, validate=validar_tests)
+            if comprobar_respuesta_llm(state, "Developer-UnitTests", tests_generados):
+                logger.error(f"❌ Fallo del LLM al regenerar tests: {tests_generados[:200]}")
+                return state
             tests_generados = _limpiar_codigo_tests_llm(tests_generados)
             if lenguaje.lower() == 'typescript':
                 tests_generados = _postprocesar_tests_typescript(tests_generados)
             
             # Validar de nuevo
-            codigo_valido2, error2 = _validar_codigo_tests_completo(tests_generados, lenguaje)
+            codigo_valido2, error2 = _validar_tests_generados(tests_generados, lenguaje, test_filename, codigo_limpio)
             if not codigo_valido2:
                 logger.error(f"❌ Tests siguen incompletos después de reintento: {error2}")
         
@@ -552,12 +526,7 @@ TESTS ORIGINALES (con problemas):
 {'='*60}
 {tests_generados}
 """
-                guardar_fichero_texto(
-                    nombre_error,
-                    contenido_error,
-                    directorio=settings.OUTPUT_DIR
-                )
-                log_file_operation(logger, "guardar", f"{settings.OUTPUT_DIR}/{nombre_error}", success=True)
+                guardar_artefacto(nombre_error, contenido_error, tipo="test_report")
 
                 prompt_fix = (
                     prompt_formateado
@@ -572,12 +541,33 @@ TESTS ORIGINALES (con problemas):
                       "\n\nSalida del runner (resumen):\n"
                     + fallo_ctx
                 )
-                tests_nuevos = call_gemini(prompt_fix, "")
+                validar_tests_fix = _validador_tests(lenguaje, test_filename, codigo_limpio)
+                tests_nuevos = get_model_router().call("test_generator", prompt_fix, call_gemini, validate=validar_tests_fix)
+                if comprobar_respuesta_llm(state, "Developer-UnitTests", tests_nuevos):
+                    # Conservar los tests en disco: el mensaje de error no sustituye al archivo
+                    logger.error(f"❌ Fallo del LLM al corregir tests: {tests_nuevos[:200]}")
+                    return state
                 tests_nuevos = _limpiar_codigo_tests_llm(tests_nuevos)
                 if lenguaje.lower() == 'typescript':
                     tests_nuevos = _postprocesar_tests_typescript(tests_nuevos)
 
-                codigo_valido_fix, error_fix = _validar_codigo_tests_completo(tests_nuevos, lenguaje)
+                codigo_valido_fix, error_fix = _validar_tests_generados(tests_nuevos, lenguaje, test_filename, codigo_limpio)
+                if not codigo_valido_fix and lenguaje.lower() == 'typescript' and settings.TS_SYNTAX_CHECK_ENABLED:
+                    # Regenerar ya, sin pagar una ejecución de vitest que fallaría al parsear
+                    logger.warning(f"⚠️ Tests regenerados con errores detectados localmente: {error_fix}")
+                    logger.info("🔄 Regenerando tests sin ejecutar vitest...")
+                    tests_nuevos = get_model_router().call(
+                        "test_generator",
+                        prompt_fix + f"\n\nEl archivo regenerado tenía errores:\n{error_fix}",
+                        call_gemini,
+                        validate=validar_tests_fix
+                    )
+                    if comprobar_respuesta_llm(state, "Developer-UnitTests", tests_nuevos):
+                        logger.error(f"❌ Fallo del LLM al corregir tests: {tests_nuevos[:200]}")
+                        return state
+                    tests_nuevos = _limpiar_codigo_tests_llm(tests_nuevos)
+                    tests_nuevos = _postprocesar_tests_typescript(tests_nuevos)
+                    codigo_valido_fix, error_fix = _validar_tests_generados(tests_nuevos, lenguaje, test_filename, codigo_limpio)
                 if not codigo_valido_fix:
                     logger.warning(f"⚠️ Tests regenerados posiblemente incompletos: {error_fix}")
 
@@ -629,13 +619,7 @@ TESTS ORIGINALES (con problemas):
                 
                 output_content = f"Status: PASSED{stats_summary}\n{'='*60}\n{clean_output}"
                 nombre_archivo = f"4_testing_req{attempt}_debug{debug_attempt}_PASSED.txt"
-                guardar_fichero_texto(
-                    nombre_archivo,
-                    output_content,
-                    directorio=settings.OUTPUT_DIR
-                )
-                
-                log_file_operation(logger, "guardar", f"{settings.OUTPUT_DIR}/{nombre_archivo}", success=True)
+                guardar_artefacto(nombre_archivo, output_content, tipo="test_report")
                 
                 # === AZURE DEVOPS: Solo agregar comentario con métricas (no adjuntar archivo) ===
                 if state.get('azure_pbi_id') and state.get('azure_testing_task_id'):
@@ -672,7 +656,7 @@ TESTS ORIGINALES (con problemas):
                 # === FIN: Comentario de tests en Azure DevOps ===
                 
                 # === GITHUB: Agregar tests al branch existente y crear PR ===
-                if settings.GITHUB_ENABLED:
+                if github_enabled(state):
                     try:
                         from datetime import datetime
                     
@@ -823,13 +807,7 @@ TESTS ORIGINALES (con problemas):
                 
                 output_content = f"Status: FAILED{stats_summary}\n{'='*60}\n\nTraceback:\n{clean_traceback}\n\n{'='*60}\n{clean_output}"
                 nombre_archivo = f"4_testing_req{attempt}_debug{debug_attempt}_FAILED.txt"
-                guardar_fichero_texto(
-                    nombre_archivo,
-                    output_content,
-                    directorio=settings.OUTPUT_DIR
-                )
-                
-                log_file_operation(logger, "guardar", f"{settings.OUTPUT_DIR}/{nombre_archivo}", success=True)
+                guardar_artefacto(nombre_archivo, output_content, tipo="test_report")
                 
                 # === AZURE DEVOPS: Agregar comentario de fallo ===
                 if settings.AZURE_DEVOPS_ENABLED and state.get('azure_testing_task_id'):
@@ -866,6 +844,87 @@ TESTS ORIGINALES (con problemas):
     return state
 
 
+def ejecutar_tests_en_pool(test_path: str, code_path: str, lenguaje: str) -> Dict[str, Any]:
+    """
+    Ejecuta los tests en el pool de sandbox (TEST_EXECUTOR_POOL_ENABLED y selector
+    de candidatas). Código y tests se copian a un directorio de trabajo aislado;
+    node_modules y package.json del toolchain (o de OUTPUT_DIR) se enlazan para vitest.
+    
+    Returns:
+        Dict con 'success', 'output', 'traceback', 'tests_run' y 'resources'
+    """
+    pool = get_test_executor_pool()
+    output_dir = os.path.abspath(settings.OUTPUT_DIR)
+    test_filename = os.path.basename(test_path)
+    
+    files = {}
+    for path in (code_path, test_path):
+        if path and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                files[os.path.basename(path)] = f.read()
+    
+    env = os.environ.copy()
+    env['LANG'] = 'en_US.UTF-8'
+    env['LC_ALL'] = 'en_US.UTF-8'
+    
+    if lenguaje.lower() == 'typescript':
+        if settings.NODE_TOOLCHAIN_ENABLED:
+            toolchain = get_node_toolchain()
+            toolchain.require_provisioned()
+            cmd = toolchain.vitest_command(test_filename)
+            node_root = toolchain.directory
+        else:
+            cmd = ['npx', 'vitest', 'run', test_filename, '--reporter=verbose']
+            node_root = output_dir
+        links = {
+            'node_modules': os.path.join(node_root, 'node_modules'),
+            'package.json': os.path.join(node_root, 'package.json')
+        }
+        parser = _parsear_resultados_vitest
+        herramienta = "vitest"
+    else:
+        cmd = ['pytest', test_filename, '-v', '--tb=short']
+        links = {}
+        parser = _parsear_resultados_pytest
+        herramienta = "pytest"
+    
+    # Timeout recortado al plazo restante de la ejecución
+    timeout = cap_timeout(settings.TEST_EXECUTION_TIMEOUT)
+    logger.info(f"▶️ Ejecutando {herramienta} en sandbox ({pool.pending} trabajo(s) en cola/ejecución)...")
+    job = pool.run(cmd, files=files, links=links, env=env, timeout=timeout)
+    
+    if job.get('launch_error') is not None:
+        return {
+            'success': False,
+            'output': f"No se pudo lanzar {herramienta} en el sandbox:\n{job['stderr']}",
+            'traceback': f"FileNotFoundError: {herramienta} command not found - {job['stderr']}",
+            'tests_run': {'total': 0, 'passed': 0, 'failed': 0},
+            'resources': job['resources']
+        }
+    
+    if job['timed_out']:
+        return {
+            'success': False,
+            'output': f"Timeout: Los tests tardaron más de {timeout:.0f} segundos",
+            'traceback': f"TimeoutError: Test execution exceeded {timeout:.0f} seconds",
+            'tests_run': {'total': 0, 'passed': 0, 'failed': 0},
+            'resources': job['resources']
+        }
+    
+    success = job['returncode'] == 0
+    output = job['stdout'] + "\n" + job['stderr']
+    resources = dict(job['resources'], duration_s=job['duration_s'], queued_s=job['queued_s'])
+    logger.debug(f"Recursos del trabajo de tests: {resources}")
+    
+    return {
+        'success': success,
+        'output': output,
+        'traceback': job['stderr'] if not success else "",
+        'tests_run': parser(output),
+        'resources': resources
+    }
+
+
 def _ejecutar_tests_typescript(test_path: str, code_path: str, state: AgentState) -> Dict[str, Any]:
     """
     Ejecuta tests TypeScript usando vitest.
@@ -878,8 +937,13 @@ def _ejecutar_tests_typescript(test_path: str, code_path: str, state: AgentState
     Returns:
         Dict con 'success', 'output', 'traceback', 'tests_run'
     """
+    if settings.TEST_EXECUTOR_POOL_ENABLED:
+        return ejecutar_tests_en_pool(test_path, code_path, 'typescript')
+    
     logger.info("▶️ Ejecutando vitest...")
     
+    # Timeout recortado al plazo restante de la ejecución
+    timeout = cap_timeout(settings.TEST_EXECUTION_TIMEOUT)
     original_dir = os.getcwd()
     output_dir = os.path.abspath(settings.OUTPUT_DIR)
     
@@ -889,7 +953,12 @@ def _ejecutar_tests_typescript(test_path: str, code_path: str, state: AgentState
         
         # Asegurar que existe package.json
         package_json_path = os.path.join(output_dir, 'package.json')
-        if not os.path.exists(package_json_path):
+        if settings.NODE_TOOLCHAIN_ENABLED:
+            # Toolchain compartido: node_modules enlazado y vitest lanzado con node, sin npx
+            toolchain = get_node_toolchain()
+            toolchain.require_provisioned()
+            toolchain.link_into(output_dir)
+        elif not os.path.exists(package_json_path):
             package_json_content = {
                 "name": "capstone-tests",
                 "version": "1.0.0",
@@ -907,14 +976,19 @@ def _ejecutar_tests_typescript(test_path: str, code_path: str, state: AgentState
         env['LANG'] = 'en_US.UTF-8'
         env['LC_ALL'] = 'en_US.UTF-8'
         
+        if settings.NODE_TOOLCHAIN_ENABLED:
+            cmd = toolchain.vitest_command(os.path.basename(test_path))
+        else:
+            cmd = ['npx', 'vitest', 'run', os.path.basename(test_path), '--reporter=verbose']
+        
         result = subprocess.run(
-            ['npx', 'vitest', 'run', os.path.basename(test_path), '--reporter=verbose'],
+            cmd,
             capture_output=True,
             text=True,
             encoding='utf-8',
             errors='replace',
-            timeout=settings.TEST_EXECUTION_TIMEOUT,
-            shell=True,
+            timeout=timeout,
+            shell=not settings.NODE_TOOLCHAIN_ENABLED,
             env=env
         )
         
@@ -937,8 +1011,8 @@ def _ejecutar_tests_typescript(test_path: str, code_path: str, state: AgentState
         os.chdir(original_dir)
         return {
             'success': False,
-            'output': f"Timeout: Los tests tardaron más de {settings.TEST_EXECUTION_TIMEOUT} segundos",
-            'traceback': f"TimeoutError: Test execution exceeded {settings.TEST_EXECUTION_TIMEOUT} seconds",
+            'output': f"Timeout: Los tests tardaron más de {timeout:.0f} segundos",
+            'traceback': f"TimeoutError: Test execution exceeded {timeout:.0f} seconds",
             'tests_run': {'total': 0, 'passed': 0, 'failed': 0}
         }
     except FileNotFoundError as e:
@@ -970,8 +1044,14 @@ def _ejecutar_tests_python(test_path: str, state: AgentState) -> Dict[str, Any]:
     Returns:
         Dict con 'success', 'output', 'traceback', 'tests_run'
     """
+    if settings.TEST_EXECUTOR_POOL_ENABLED:
+        code_path = test_path.replace('.spec.py', '.py')
+        return ejecutar_tests_en_pool(test_path, code_path, 'python')
+    
     logger.info("▶️ Ejecutando pytest...")
     
+    # Timeout recortado al plazo restante de la ejecución
+    timeout = cap_timeout(settings.TEST_EXECUTION_TIMEOUT)
     try:
         logger.debug(f"Test path: {test_path}")
         result = subprocess.run(
@@ -980,7 +1060,7 @@ def _ejecutar_tests_python(test_path: str, state: AgentState) -> Dict[str, Any]:
             text=True,
             encoding='utf-8',
             errors='replace',
-            timeout=settings.TEST_EXECUTION_TIMEOUT
+            timeout=timeout
         )
         
         success = result.returncode == 0
@@ -997,8 +1077,8 @@ def _ejecutar_tests_python(test_path: str, state: AgentState) -> Dict[str, Any]:
     except subprocess.TimeoutExpired:
         return {
             'success': False,
-            'output': "Timeout: Los tests tardaron más de 60 segundos",
-            'traceback': "TimeoutError: Test execution exceeded 60 seconds",
+            'output': f"Timeout: Los tests tardaron más de {timeout:.0f} segundos",
+            'traceback': f"TimeoutError: Test execution exceeded {timeout:.0f} seconds",
             'tests_run': {'total': 0, 'passed': 0, 'failed': 0}
         }
     except FileNotFoundError as e:
@@ -7,14 +7,17 @@ import time
 import json
 from models.state import AgentState
 from models.schemas import FormalRequirements, AzureDevOpsMetadata
+from models.requirements_meta import ParsedRequirements
 from config.prompts import Prompts
 from config.prompt_templates import PromptTemplates
 from config.settings import settings
 from llm.gemini_client import call_gemini
+from llm.model_router import get_model_router, valida_con_parser
+from llm.errors import comprobar_respuesta_llm
 from llm.output_parsers import get_formal_requirements_parser, validate_and_parse
-from tools.file_utils import guardar_fichero_texto
+from tools.file_utils import guardar_artefacto
 from services.azure_devops_service import azure_service
-from utils.logger import setup_logger, log_agent_execution, log_llm_call, log_file_operation
+from utils.logger import setup_logger, log_agent_execution, log_llm_call
 from utils.agent_decorators import agent_execution_context
 
 # Configurar logger para este agente
@@ -51,15 +54,21 @@ def product_owner_node(state: AgentState) -> AgentState:
 
         # Llamar al LLM con medición de tiempo y schema JSON
         start_time = time.time()
-        respuesta_llm = call_gemini(
+        respuesta_llm = get_model_router().call(
+            "product_owner",
             prompt_formateado,
-            "",  # Contexto vacío porque ya está en el prompt
+            call_gemini,
+            validate=valida_con_parser(get_formal_requirements_parser()),
             response_schema=FormalRequirements
         )
         duration = time.time() - start_time
         
         log_llm_call(logger, "PRODUCT_OWNER", duration=duration)
 
+        if comprobar_respuesta_llm(state, "ProductOwner", respuesta_llm):
+            logger.error(f"❌ Fallo del LLM al formalizar requisitos: {respuesta_llm[:200]}")
+            return state
+
         try:
             # Validar y almacenar la salida JSON del LLM usando PydanticOutputParser
             logger.debug("🔍 Parseando respuesta con PydanticOutputParser...")
@@ -98,6 +107,7 @@ def product_owner_node(state: AgentState) -> AgentState:
                 state['requisitos_formales'] = json.dumps(req_dict, indent=2)
             else:
                 state['requisitos_formales'] = req_data.model_dump_json(indent=2)
+            state['requisitos_meta'] = ParsedRequirements.from_dict(req_data.model_dump()).to_state()
             
             # Actualizar estado
             state['requisito_clarificado'] = req_data.objetivo_funcional  # Mantener retrocompatibilidad
@@ -105,6 +115,7 @@ def product_owner_node(state: AgentState) -> AgentState:
             state['attempt_count'] += 1
             state['debug_attempt_count'] = 0
             state['sonarqube_attempt_count'] = 0
+            state['convergencia'] = None
             
             # Limpiar variables de GitHub para crear nueva PR en cada ciclo
             state['github_pr_number'] = None
@@ -116,18 +127,7 @@ def product_owner_node(state: AgentState) -> AgentState:
             
             # Guardar output en archivo
             nombre_archivo = f"1_product_owner_intento_{state['attempt_count']}.json"
-            success = guardar_fichero_texto(
-                nombre_archivo,
-                state['requisitos_formales'],
-                directorio=settings.OUTPUT_DIR
-            )
-            
-            log_file_operation(
-                logger,
-                "guardar",
-                f"{settings.OUTPUT_DIR}/{nombre_archivo}",
-                success=success
-            )
+            guardar_artefacto(nombre_archivo, state['requisitos_formales'], tipo="requirements")
             
         except Exception as e:
             logger.error(f"❌ Error al validar o procesar requisitos: {e}")
@@ -140,11 +140,13 @@ def product_owner_node(state: AgentState) -> AgentState:
                 req_data = FormalRequirements.model_validate_json(respuesta_llm)
                 logger.info("✅ Fallback exitoso con parsing manual")
                 state['requisitos_formales'] = req_data.model_dump_json(indent=2)
+                state['requisitos_meta'] = ParsedRequirements.from_dict(req_data.model_dump()).to_state()
                 state['requisito_clarificado'] = req_data.objetivo_funcional
                 state['feedback_stakeholder'] = ""
                 state['attempt_count'] += 1
                 state['debug_attempt_count'] = 0
                 state['sonarqube_attempt_count'] = 0
+                state['convergencia'] = None
                 
                 # Limpiar variables de GitHub para crear nueva PR en cada ciclo
                 state['github_pr_number'] = None
@@ -156,6 +158,7 @@ def product_owner_node(state: AgentState) -> AgentState:
                     f"ERROR_PARSING: Fallo al validar JSON. {e}. "
                     f"LLM Output: {respuesta_llm[:100]}"
                 )
+                state['requisitos_meta'] = None
                 logger.error("Fallo de parsing en Requirements Manager")
 
     
@@ -10,11 +10,17 @@ from config.prompts import Prompts
 from config.prompt_templates import PromptTemplates
 from config.settings import settings
 from llm.gemini_client import call_gemini
-from tools.file_utils import detectar_lenguaje_y_extension, limpiar_codigo_markdown, guardar_fichero_texto
+from llm.model_router import get_model_router
+from tools.file_utils import limpiar_codigo_markdown, guardar_artefacto
+from models.requirements_meta import obtener_requisitos_meta
+from utils.artifact_store import get_artifact_store
 from tools.sonarqube_mcp import analizar_codigo_con_sonarqube, formatear_reporte_sonarqube, es_codigo_aceptable
+from tools.sonar_issue_index import SonarIssueIndex, formatear_reporte_delta
 from services.azure_devops_service import azure_service
-from utils.logger import setup_logger, log_agent_execution, log_llm_call, log_file_operation
+from utils.logger import setup_logger, log_agent_execution, log_llm_call
 from utils.agent_decorators import agent_execution_context
+from utils.deadline import remaining_seconds, cap_timeout
+from config.pipeline_profiles import sonarcloud_enabled
 
 logger = setup_logger(__name__, level=settings.get_log_level(), agent_mode=True)
 
@@ -68,35 +74,43 @@ def sonar_node(state: AgentState) -> AgentState:
         # === FIN: Actualización de estado en Azure DevOps ===
         
         # Obtener información del código
-        lenguaje, extension, patron_limpieza = detectar_lenguaje_y_extension(
-            state.get('requisitos_formales', '')
-        )
+        meta = obtener_requisitos_meta(state)
+        lenguaje, extension = meta.lenguaje, meta.extension
         
         # Construir nombre del archivo que YA FUE GUARDADO por developer_code
         # IMPORTANTE: Debe coincidir con el patrón usado en developer_code.py
         # Patrón: 2_developer_req{N}_debug{M}_sq{K}.{ext}
         nombre_archivo = f"2_developer_req{state['attempt_count']}_debug{state['debug_attempt_count']}_sq{state['sonarqube_attempt_count']}{extension}"
         
-        # Verificar que el archivo existe
         import os
-        ruta_archivo = os.path.join(settings.OUTPUT_DIR, nombre_archivo)
-        if not os.path.exists(ruta_archivo):
-            logger.error(f"❌ El archivo {nombre_archivo} no existe en {settings.OUTPUT_DIR}")
-            logger.error("   El agente developer-code debería haberlo guardado antes")
-            raise FileNotFoundError(f"Archivo no encontrado: {ruta_archivo}")
-        
-        logger.info(f"🔍 Analizando código con SonarQube - Validación #{state['sonarqube_attempt_count'] + 1}")
-        logger.info(f"📄 Archivo a analizar: {nombre_archivo}")
-        logger.info(f"📁 Ruta completa: {ruta_archivo}")
-        
-        # Leer el contenido del archivo para análisis
-        with open(ruta_archivo, 'r', encoding='utf-8') as f:
-            codigo_limpio = f.read()
+        codigo_artifact = state.get('codigo_artifact')
+        if codigo_artifact:
+            # Handle en memoria del almacén de artefactos: sin ida y vuelta por disco
+            codigo_limpio = get_artifact_store().get(codigo_artifact)
+            logger.info(f"🔍 Analizando código con SonarQube - Validación #{state['sonarqube_attempt_count'] + 1}")
+            logger.info(f"📦 Artefacto a analizar: {nombre_archivo} ({codigo_artifact[:19]})")
+        else:
+            # Verificar que el archivo existe
+            ruta_archivo = os.path.join(settings.OUTPUT_DIR, nombre_archivo)
+            if not os.path.exists(ruta_archivo):
+                logger.error(f"❌ El archivo {nombre_archivo} no existe en {settings.OUTPUT_DIR}")
+                logger.error("   El agente developer-code debería haberlo guardado antes")
+                raise FileNotFoundError(f"Archivo no encontrado: {ruta_archivo}")
+            
+            logger.info(f"🔍 Analizando código con SonarQube - Validación #{state['sonarqube_attempt_count'] + 1}")
+            logger.info(f"📄 Archivo a analizar: {nombre_archivo}")
+            logger.info(f"📁 Ruta completa: {ruta_archivo}")
+            
+            # Leer el contenido del archivo para análisis
+            with open(ruta_archivo, 'r', encoding='utf-8') as f:
+                codigo_limpio = f.read()
         
         # Obtener branch del estado (creado por el Desarrollador)
         branch_name = state.get('github_branch_name')
         
-        if branch_name and settings.SONARCLOUD_ENABLED:
+        # El perfil fast no espera a SonarCloud: análisis local
+        usar_sonarcloud = sonarcloud_enabled(state)
+        if branch_name and usar_sonarcloud:
             from services.sonarcloud_service import sonarcloud_service
             
             logger.info("=" * 60)
@@ -123,14 +137,21 @@ def sonar_node(state: AgentState) -> AgentState:
                 else:
                     logger.info(f"✅ Integración verificada - {integration_check.get('branches_count', 0)} branches disponibles")
             
+            # Con poco plazo restante no compensa esperar a SonarCloud
+            restante = remaining_seconds(state)
+            if branch_name and restante is not None and restante < settings.DEADLINE_SONARCLOUD_MIN_SECONDS:
+                logger.warning(f"⏰ Quedan {restante:.0f}s de plazo: análisis local en vez de esperar a SonarCloud")
+                branch_name = None
+            
             # Si aún tenemos branch después de verificación, esperar análisis
             if branch_name:
+                timeout_sonarcloud = cap_timeout(settings.SONARCLOUD_ANALYSIS_TIMEOUT, state)
                 logger.info("⏳ Esperando a que SonarCloud complete el análisis del branch...")
-                logger.info(f"   Timeout total: {settings.SONARCLOUD_ANALYSIS_TIMEOUT}s con polling adaptativo")
+                logger.info(f"   Timeout total: {timeout_sonarcloud:.0f}s con polling adaptativo")
                 
                 result = sonarcloud_service.wait_for_analysis(
                     branch_name=branch_name,
-                    timeout=settings.SONARCLOUD_ANALYSIS_TIMEOUT
+                    timeout=timeout_sonarcloud
                 )
                 
                 if result.get("success"):
@@ -146,7 +167,7 @@ def sonar_node(state: AgentState) -> AgentState:
                 # Sin branch o integración fallida
                 resultado_analisis = analizar_codigo_con_sonarqube(codigo_limpio, nombre_archivo, None)
                 
-        elif settings.SONARCLOUD_ENABLED:
+        elif usar_sonarcloud:
             logger.warning("⚠️ No hay branch de GitHub disponible para SonarCloud")
             logger.info("🔄 Usando análisis local...")
             resultado_analisis = analizar_codigo_con_sonarqube(codigo_limpio, nombre_archivo, None)
@@ -170,14 +191,12 @@ def sonar_node(state: AgentState) -> AgentState:
         
         # Guardar reporte SIEMPRE (tanto si pasa como si falla)
         nombre_reporte = f"3_sonar_report_req{state['attempt_count']}_sq{state['sonarqube_attempt_count']}.txt"
-        guardar_fichero_texto(
-            nombre_reporte,
-            reporte_formateado,
-            directorio=settings.OUTPUT_DIR
-        )
-        
         # Construir ruta completa del reporte para adjuntar
         ruta_reporte = os.path.join(settings.OUTPUT_DIR, nombre_reporte)
+        reporte_artifact = guardar_artefacto(nombre_reporte, reporte_formateado, tipo="report")
+        if reporte_artifact and settings.AZURE_DEVOPS_ENABLED and state.get('azure_implementation_task_id'):
+            # Azure DevOps necesita un fichero físico para el adjunto
+            get_artifact_store().materialize(reporte_artifact, ruta_reporte)
         
         # Determinar si el código pasa el análisis
         codigo_aceptable = es_codigo_aceptable(resultado_analisis)
@@ -198,6 +217,7 @@ def sonar_node(state: AgentState) -> AgentState:
             state['sonarqube_issues'] = ""
             # Resetear contador cuando pasa
             state['sonarqube_attempt_count'] = 0
+            state['sonar_issue_index'] = None
             
             # === INICIO: Agregar comentario y adjuntar reporte en Azure DevOps ===
             if settings.AZURE_DEVOPS_ENABLED and state.get('azure_implementation_task_id'):
@@ -244,22 +264,46 @@ def sonar_node(state: AgentState) -> AgentState:
             
             state['sonarqube_passed'] = False
             
+            # Delta respecto al intento anterior: el prompt solo lleva el detalle de lo nuevo
+            reporte_prompt = reporte_formateado
+            delta = None
+            if settings.SONAR_ISSUE_DELTA_ENABLED:
+                index = SonarIssueIndex.from_state(state.get('sonar_issue_index'))
+                delta = index.update(resultado_analisis.get('issues', []), codigo_limpio)
+                state['sonar_issue_index'] = index.to_state()
+                logger.info(f"🔁 {delta.resumen()}")
+                
+                if delta.oscilando:
+                    # Reintentar solo repetiría un estado ya visto: se agota el bucle de calidad
+                    logger.warning("🔁 El bucle de calidad oscila entre los mismos issues - deteniendo correcciones")
+                    state['sonarqube_issues'] = delta.resumen()
+                    state['sonarqube_attempt_count'] = state['max_sonarqube_attempts']
+                    log_agent_execution(logger, "SonarQube", "completado", {
+                        "resultado": "rechazado (oscilación)",
+                        "reporte": nombre_reporte
+                    })
+                    return state
+                
+                reporte_prompt = formatear_reporte_delta(resultado_analisis, delta)
+            
             # Generar instrucciones de corrección usando el LLM
             # Usar ChatPromptTemplate
             logger.debug("🔗 Usando ChatPromptTemplate de LangChain")
             prompt_formateado = PromptTemplates.format_sonarqube(
-                reporte_sonarqube=reporte_formateado,
+                reporte_sonarqube=reporte_prompt,
                 codigo_actual=state['codigo_generado']
             )
             
             logger.info("🤖 Generando instrucciones de corrección con LLM...")
             start_time = time.time()
-            instrucciones_correccion = call_gemini(prompt_formateado, "")
+            instrucciones_correccion = get_model_router().call("sonar", prompt_formateado, call_gemini)
             duration = time.time() - start_time
             
             log_llm_call(logger, "analisis_sonarqube", duration=duration)
             
-            state['sonarqube_issues'] = instrucciones_correccion
+            state['sonarqube_issues'] = (
+                f"{delta.resumen()}\n\n{instrucciones_correccion}" if delta else instrucciones_correccion
+            )
             
             # Incrementar contador después de generar instrucciones
             state['sonarqube_attempt_count'] += 1
@@ -267,11 +311,7 @@ def sonar_node(state: AgentState) -> AgentState:
             # Guardar instrucciones de corrección (usar el contador ANTES de incrementar)
             intento_actual = state['sonarqube_attempt_count'] - 1  # Ya fue incrementado en línea 243
             nombre_instrucciones = f"3_sonar_instrucciones_req{state['attempt_count']}_sq{intento_actual}.txt"
-            guardar_fichero_texto(
-                nombre_instrucciones,
-                instrucciones_correccion,
-                directorio=settings.OUTPUT_DIR
-            )
+            guardar_artefacto(nombre_instrucciones, instrucciones_correccion, tipo="report")
             
             logger.info(f"➡️ Instrucciones de corrección generadas - Intento {state['sonarqube_attempt_count']}/{state['max_sonarqube_attempts']}")
             
@@ -5,18 +5,57 @@ Responsable de validar que el código cumple la visión de negocio.
 
 import re
 import time
+from typing import Optional
 from models.state import AgentState
 from config.prompts import Prompts
 from config.prompt_templates import PromptTemplates
 from config.settings import settings
+from config.pipeline_profiles import profile_from_state
+from langchain_core.exceptions import OutputParserException
+from models.schemas import StakeholderVerdict
 from llm.gemini_client import call_gemini
-from tools.file_utils import guardar_fichero_texto
+from llm.model_router import get_model_router, valida_con_parser
+from llm.output_parsers import get_stakeholder_verdict_parser
+from tools.file_utils import guardar_artefacto
 from services.azure_devops_service import azure_service
 from utils.logger import setup_logger, log_agent_execution, log_llm_call
 from utils.agent_decorators import agent_execution_context
 
 logger = setup_logger(__name__, level=settings.get_log_level(), agent_mode=True)
 
+_ETIQUETA_VALIDACION_RE = re.compile(r'VALIDACI[OÓ]N FINAL:\s*(VALIDADO|RECHAZADO)\b', re.IGNORECASE)
+# Veredicto como primera palabra de la respuesta ("VALIDADO: ...", "RECHAZADO\nMotivo: ...")
+_VEREDICTO_INICIAL_RE = re.compile(r'^\s*(VALIDADO|RECHAZADO)\b')
+
+MOTIVO_NO_PARSEABLE = "Veredicto no parseable"
+
+
+def _interpretar_veredicto(respuesta_llm: str) -> Optional[tuple[bool, str]]:
+    """
+    Interpreta la respuesta del Stakeholder.
+    
+    Usa el veredicto estructurado (StakeholderVerdict) y, si la respuesta no es JSON
+    (modo mock o modelos sin salida estructurada), la etiqueta "VALIDACIÓN FINAL: ..."
+    o el veredicto como primera palabra, con el "Motivo: ..." opcional. No se busca
+    "VALIDADO" suelto en el texto: "NO VALIDADO" o un requisito citado lo invertirían.
+    
+    Returns:
+        (validado, motivo), con motivo "" si no se pudo extraer, o None si la respuesta
+        no contiene un veredicto reconocible
+    """
+    try:
+        veredicto = get_stakeholder_verdict_parser().parse(respuesta_llm)
+        return veredicto.validado, veredicto.motivo.strip()
+    except OutputParserException:
+        logger.debug("ℹ️ Respuesta del Stakeholder sin JSON válido, usando formato de texto")
+    
+    etiqueta = _ETIQUETA_VALIDACION_RE.search(respuesta_llm) or _VEREDICTO_INICIAL_RE.match(respuesta_llm)
+    if not etiqueta:
+        return None
+    
+    motivo_match = re.search(r'Motivo: (.*)', respuesta_llm, re.DOTALL)
+    return etiqueta.group(1).upper() == "VALIDADO", motivo_match.group(1).strip() if motivo_match else ""
+
 
 def stakeholder_node(state: AgentState) -> AgentState:
     """
@@ -45,31 +84,55 @@ def stakeholder_node(state: AgentState) -> AgentState:
         prompt_formateado = PromptTemplates.format_stakeholder(
             requisitos_formales=state['requisitos_formales'],
             codigo_generado=state['codigo_generado'],
-            resultado_tests=state.get('resultado_tests', '')
+            resultado_tests=state.get('resultado_tests', ''),
+            # Sin Developer2-Reviewer (perfil fast) el Stakeholder también revisa el código
+            revision_codigo=profile_from_state(state).stakeholder_review
         )
         
         logger.info(f"🔍 Validando código con stakeholder (Intento {state['attempt_count']}/{state['max_attempts']})...")
         start_time = time.time()
-        respuesta_llm = call_gemini(prompt_formateado, "")
+        validar_veredicto = valida_con_parser(get_stakeholder_verdict_parser())
+        respuesta_llm = get_model_router().call(
+            "stakeholder",
+            prompt_formateado,
+            call_gemini,
+            validate=validar_veredicto,
+            response_schema=StakeholderVerdict
+        )
         duration = time.time() - start_time
         
         log_llm_call(logger, "validacion_stakeholder", duration=duration)
         
         # DEBUG: Mostrar respuesta del LLM para diagnóstico
         logger.debug(f"📋 Respuesta del Stakeholder (primeros 200 chars): {respuesta_llm[:200]}")
-        logger.info(f"🔍 Buscando 'VALIDADO' en respuesta... Encontrado: {'VALIDADO' in respuesta_llm}")
+        veredicto = _interpretar_veredicto(respuesta_llm)
+        if veredicto is None:
+            # Sin veredicto reconocible: repetir la petición una vez en lugar de adivinarlo
+            logger.warning("⚠️ Respuesta del Stakeholder sin veredicto reconocible, repitiendo la petición")
+            respuesta_llm = get_model_router().call(
+                "stakeholder",
+                prompt_formateado + "\n\nTu respuesta anterior no contenía un veredicto válido. "
+                                    "Responde únicamente con el JSON {\"validado\": true|false, \"motivo\": \"...\"}.",
+                call_gemini,
+                validate=validar_veredicto,
+                response_schema=StakeholderVerdict
+            )
+            veredicto = _interpretar_veredicto(respuesta_llm)
+        if veredicto is None:
+            logger.error("❌ El Stakeholder no devolvió un veredicto parseable: se trata como rechazo")
+            veredicto = (False, f"{MOTIVO_NO_PARSEABLE}. Respuesta: {respuesta_llm[:200]}")
+        validado, motivo = veredicto
+        logger.info(f"🔍 Veredicto del Stakeholder: {'VALIDADO' if validado else 'RECHAZADO'}")
 
         # Lógica de transición de validación
-        if "VALIDADO" in respuesta_llm:
+        if validado:
             state['validado'] = True
             logger.info("Resultado: VALIDADO. Proyecto Terminado.")
             
             # Guardar validación exitosa
-            guardar_fichero_texto(
-                f"7_stakeholder_intento_{state['attempt_count']}_VALIDADO.txt",
-                f"Validación: APROBADO\n\nRespuesta:\n{respuesta_llm}",
-                directorio=settings.OUTPUT_DIR
-            )
+            nombre_archivo = f"7_stakeholder_intento_{state['attempt_count']}_VALIDADO.txt"
+            contenido_archivo = f"Validación: APROBADO\n\nRespuesta:\n{respuesta_llm}"
+            guardar_artefacto(nombre_archivo, contenido_archivo, tipo="validation")
             
             # === AZURE DEVOPS: Ya no se adjunta código - solo métricas y comentarios ===
             # El código está disponible en GitHub, no es necesario duplicarlo en Azure DevOps
@@ -96,21 +159,17 @@ def stakeholder_node(state: AgentState) -> AgentState:
             })
         else:
             state['validado'] = False
-            # Extraer el feedback de rechazo
-            feedback_match = re.search(r'Motivo: (.*)', respuesta_llm, re.DOTALL)
-            if feedback_match:
-                state['feedback_stakeholder'] = feedback_match.group(1).strip()
+            if motivo:
+                state['feedback_stakeholder'] = motivo
             
             logger.warning("❌ Resultado: RECHAZADO.")
             logger.info(f"📋 Motivo: {state['feedback_stakeholder']}")
             logger.info("➡️ Volviendo a Ingeniero de Requisitos.")
             
             # Guardar validación rechazada
-            guardar_fichero_texto(
-                f"7_stakeholder_intento_{state['attempt_count']}_RECHAZADO.txt",
-                f"Validación: RECHAZADO\n\nMotivo:\n{state['feedback_stakeholder']}\n\nRespuesta completa:\n{respuesta_llm}",
-                directorio=settings.OUTPUT_DIR
-            )
+            nombre_archivo = f"7_stakeholder_intento_{state['attempt_count']}_RECHAZADO.txt"
+            contenido_archivo = f"Validación: RECHAZADO\n\nMotivo:\n{state['feedback_stakeholder']}\n\nRespuesta completa:\n{respuesta_llm}"
+            guardar_artefacto(nombre_archivo, contenido_archivo, tipo="validation")
             
             log_agent_execution(logger, "Stakeholder", "completado", {
                 "resultado": "rechazado",
@@ -0,0 +1,132 @@
+"""
+Perfiles del pipeline: fast, standard y thorough.
+
+Cada perfil fija la topología del grafo y los presupuestos de reintentos de una
+ejecución (PIPELINE_PROFILE o run_development_workflow(profile=...)):
+
+- fast: solo análisis estático local (sin esperar a SonarCloud), una única pasada de
+  tests y sin flujo de PR: tras los tests, el Stakeholder hace de revisión y validación
+  a la vez (su prompt incluye los criterios de revisión de código). Para peticiones
+  sensibles a la latencia.
+- standard: el flujo completo con los límites de MAX_*_ATTEMPTS (comportamiento anterior).
+- thorough: el flujo completo (SonarCloud y PR si están habilitados) con más margen en
+  los bucles de calidad, depuración y revisión.
+
+El nombre del perfil viaja en state['pipeline_profile'] para que los nodos lo consulten.
+"""
+
+from typing import Any, Dict, Optional
+
+from config.settings import settings, RetryConfig
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__, level=settings.get_log_level())
+
+
+class PipelineProfile:
+    """Topología y presupuestos de un perfil (None = valor de Settings)"""
+
+    __slots__ = (
+        "name", "max_attempts", "max_debug_attempts", "max_sonarqube_attempts", "max_revisor_attempts",
+        "sonarcloud", "pr_flow", "stakeholder_review"
+    )
+
+    def __init__(
+        self,
+        name: str,
+        max_attempts: Optional[int] = None,
+        max_debug_attempts: Optional[int] = None,
+        max_sonarqube_attempts: Optional[int] = None,
+        max_revisor_attempts: Optional[int] = None,
+        sonarcloud: bool = True,
+        pr_flow: bool = True,
+        stakeholder_review: bool = False
+    ):
+        """
+        Args:
+            name: Nombre del perfil
+            max_attempts: Ciclos completos (Stakeholder)
+            max_debug_attempts: Intentos del bucle de depuración
+            max_sonarqube_attempts: Intentos del bucle de calidad
+            max_revisor_attempts: Intentos de revisión de código
+            sonarcloud: Esperar al análisis de SonarCloud (si está habilitado); si no, análisis local
+            pr_flow: Branch y PR en GitHub, Developer2-Reviewer y Developer-CompletePR
+            stakeholder_review: El Stakeholder aplica también los criterios de revisión de código
+        """
+        self.name = name
+        self.max_attempts = max_attempts
+        self.max_debug_attempts = max_debug_attempts
+        self.max_sonarqube_attempts = max_sonarqube_attempts
+        self.max_revisor_attempts = max_revisor_attempts
+        self.sonarcloud = sonarcloud
+        self.pr_flow = pr_flow
+        self.stakeholder_review = stakeholder_review
+
+    def to_retry_config(self) -> RetryConfig:
+        """Límites de reintentos del perfil (los no fijados, de Settings)"""
+        return RetryConfig(
+            max_attempts=self.max_attempts,
+            max_debug_attempts=self.max_debug_attempts,
+            max_sonarqube_attempts=self.max_sonarqube_attempts,
+            max_revisor_attempts=self.max_revisor_attempts
+        )
+
+    def __repr__(self) -> str:
+        return f"PipelineProfile(name={self.name!r}, sonarcloud={self.sonarcloud}, pr_flow={self.pr_flow})"
+
+
+DEFAULT_PROFILE = "standard"
+
+PROFILES: Dict[str, PipelineProfile] = {
+    "fast": PipelineProfile(
+        "fast",
+        max_attempts=1,
+        max_debug_attempts=1,
+        max_sonarqube_attempts=2,
+        max_revisor_attempts=0,
+        sonarcloud=False,
+        pr_flow=False,
+        stakeholder_review=True
+    ),
+    "standard": PipelineProfile("standard"),
+    "thorough": PipelineProfile(
+        "thorough",
+        max_attempts=3,
+        max_debug_attempts=5,
+        max_sonarqube_attempts=5,
+        max_revisor_attempts=3
+    ),
+}
+
+
+def get_profile(name: Optional[str] = None) -> PipelineProfile:
+    """
+    Obtiene un perfil por nombre.
+
+    Args:
+        name: fast | standard | thorough. Por defecto PIPELINE_PROFILE
+
+    Returns:
+        El perfil; si el nombre no existe, standard
+    """
+    name = (name or settings.PIPELINE_PROFILE or DEFAULT_PROFILE).strip().lower()
+    profile = PROFILES.get(name)
+    if profile is None:
+        logger.warning(f"⚠️ Perfil de pipeline desconocido '{name}', usando '{DEFAULT_PROFILE}' ({', '.join(PROFILES)})")
+        profile = PROFILES[DEFAULT_PROFILE]
+    return profile
+
+
+def profile_from_state(state: Dict[str, Any]) -> PipelineProfile:
+    """Perfil de la ejecución en curso (state['pipeline_profile'])"""
+    return PROFILES.get(state.get('pipeline_profile') or DEFAULT_PROFILE, PROFILES[DEFAULT_PROFILE])
+
+
+def github_enabled(state: Dict[str, Any]) -> bool:
+    """GitHub habilitado y el perfil incluye el flujo de PR"""
+    return settings.GITHUB_ENABLED and profile_from_state(state).pr_flow
+
+
+def sonarcloud_enabled(state: Dict[str, Any]) -> bool:
+    """SonarCloud habilitado y el perfil espera su análisis"""
+    return settings.SONARCLOUD_ENABLED and profile_from_state(state).sonarcloud
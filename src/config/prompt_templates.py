@@ -353,11 +353,9 @@ Resultado Binario:
         (ej., el código genera un resultado, pero con el formato incorrecto).
 
 Output Esperado (Obligatorio):
-Tu salida DEBE comenzar con la etiqueta "VALIDACIÓN FINAL" y seguir la estructura binaria.
-
-Output Esperado:
-    Si APROBADO: Un bloque de texto que contenga únicamente "VALIDACIÓN FINAL: VALIDADO".
-    Si RECHAZADO: Un bloque de texto que contenga "VALIDACIÓN FINAL: RECHAZADO" seguido de una línea que empiece con "Motivo:" y describa CLARAMENTE la desviación de los requisitos formales."""),
+Un objeto JSON con el veredicto binario:
+    "validado": true si VALIDADO, false si RECHAZADO.
+    "motivo": Justificación breve. Si RECHAZADO, describe CLARAMENTE la desviación de los requisitos formales."""),
         ("human", """Requisitos Formales:
 {requisitos_formales}
 
@@ -370,6 +368,17 @@ Resultado de Tests:
 Valida si el código cumple con los requisitos de negocio.""")
     ])
     
+    # Criterios de revisión de código que se añaden al Stakeholder cuando el perfil
+    # no tiene Developer2-Reviewer (perfil fast): revisa y valida en un solo paso
+    STAKEHOLDER_REVISION_CODIGO = """
+Revisión de código (no habrá revisión de PR posterior):
+Además de la intención de negocio, revisa el código como lo haría un developer reviewer senior:
+    1. Sigue las buenas prácticas del lenguaje, sin código muerto ni duplicado.
+    2. Es legible y mantenible (nombres claros, funciones acotadas).
+    3. Maneja las entradas inválidas y los casos límite de los requisitos.
+Devuelve RECHAZADO también si encuentras un defecto de calidad que un revisor no aprobaría,
+indicando en "motivo" qué hay que corregir."""
+    
     # ============================================================
     # RELEASE NOTE GENERATOR - Generador de Notas de Versión
     # ============================================================
@@ -504,7 +513,13 @@ Genera la Release Note en formato HTML.""")
         return cls._messages_to_string(messages)
     
     @classmethod
-    def format_stakeholder(cls, requisitos_formales: str, codigo_generado: str, resultado_tests: str) -> str:
+    def format_stakeholder(
+        cls,
+        requisitos_formales: str,
+        codigo_generado: str,
+        resultado_tests: str,
+        revision_codigo: bool = False
+    ) -> str:
         """
         Formatea el template del Stakeholder con las variables proporcionadas.
         
@@ -512,6 +527,7 @@ Genera la Release Note en formato HTML.""")
             requisitos_formales: Requisitos formales en JSON
             codigo_generado: Código generado final
             resultado_tests: Resultado de la ejecución de tests
+            revision_codigo: Añadir los criterios de revisión de código (STAKEHOLDER_REVISION_CODIGO)
             
         Returns:
             Prompt formateado como string
@@ -521,7 +537,10 @@ Genera la Release Note en formato HTML.""")
             codigo_generado=codigo_generado,
             resultado_tests=resultado_tests
         )
-        return cls._messages_to_string(messages)
+        prompt = cls._messages_to_string(messages)
+        if revision_codigo:
+            prompt += "\n" + cls.STAKEHOLDER_REVISION_CODIGO
+        return prompt
     
     @classmethod
     def format_release_note_generator(
@@ -49,6 +49,12 @@ class Settings:
     GITHUB_REPO: str = os.getenv("GITHUB_REPO", "")  # Nombre del repositorio
     GITHUB_BASE_BRANCH: str = os.getenv("GITHUB_BASE_BRANCH", "main")  # Branch base para PRs
     GITHUB_REPO_PATH: str = os.getenv("GITHUB_REPO_PATH", r"C:\ACADEMIA\IIA\Output\Multiagentes-Coding")  # Ruta física del repo local
+    GITHUB_HTTP_CACHE_ENABLED: bool = os.getenv("GITHUB_HTTP_CACHE_ENABLED", "false").lower() == "true"  # GET condicionales con ETag (304 no consumen cuota)
+    GITHUB_HTTP_CACHE_MAX_ENTRIES: int = int(os.getenv("GITHUB_HTTP_CACHE_MAX_ENTRIES", "512"))
+    GITHUB_RATE_LIMIT_WARN_THRESHOLD: int = int(os.getenv("GITHUB_RATE_LIMIT_WARN_THRESHOLD", "100"))  # Aviso cuando quedan menos peticiones
+    GITHUB_COMMIT_MODE: str = os.getenv("GITHUB_COMMIT_MODE", "api").lower()  # api (blobs/trees vía REST) | local (git plumbing + un push)
+    GITHUB_REMOTE_NAME: str = os.getenv("GITHUB_REMOTE_NAME", "origin")  # Remoto del repo local usado en modo local
+    GITHUB_MERGEABLE_POLL_TIMEOUT: float = float(os.getenv("GITHUB_MERGEABLE_POLL_TIMEOUT", "8"))  # Segundos máximos esperando a que GitHub calcule 'mergeable'
     
     # Configuración de SonarCloud (opcional - para análisis de calidad en la nube)
     SONARCLOUD_ENABLED: bool = os.getenv("SONARCLOUD_ENABLED", "false").lower() == "true"
@@ -60,20 +66,57 @@ class Settings:
     MODEL_NAME: str = os.getenv("MODEL_NAME", "gemini-2.5-flash")
     TEMPERATURE: float = float(os.getenv("TEMPERATURE", "0.1"))
     MAX_OUTPUT_TOKENS: int = int(os.getenv("MAX_OUTPUT_TOKENS", "8192"))
+    # Enrutado por agente: modelo(s) en cascada barato-primero, temperatura y tokens propios (ver llm/model_router.py)
+    MODEL_ROUTING_ENABLED: bool = os.getenv("MODEL_ROUTING_ENABLED", "false").lower() == "true"
+    MODEL_ROUTES: str = os.getenv("MODEL_ROUTES", "")  # JSON {"developer": {"models": [...], "temperature": 0.1, "max_output_tokens": 8192}}
+    MODEL_PRICES: str = os.getenv("MODEL_PRICES", "")  # JSON {"modelo": [usd_1M_entrada, usd_1M_salida]} para el informe de coste
+    # Estimador local de tokens autocalibrado con usage_metadata (ver llm/token_estimator.py)
+    LOCAL_TOKEN_ESTIMATOR_ENABLED: bool = os.getenv("LOCAL_TOKEN_ESTIMATOR_ENABLED", "false").lower() == "true"
+    TOKEN_ESTIMATOR_CACHE_SIZE: int = int(os.getenv("TOKEN_ESTIMATOR_CACHE_SIZE", "1024"))  # Textos distintos en la caché LRU
+    # Peticiones con cobertura: duplica la llamada si supera el percentil de latencia del agente (ver llm/hedging.py)
+    LLM_HEDGING_ENABLED: bool = os.getenv("LLM_HEDGING_ENABLED", "false").lower() == "true"
+    LLM_HEDGE_PERCENTILE: float = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))  # Percentil de latencia que dispara la duplicada
+    LLM_HEDGE_MIN_SAMPLES: int = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "10"))  # Latencias necesarias antes de duplicar
+    LLM_HEDGE_MAX_EXTRA_RATIO: float = float(os.getenv("LLM_HEDGE_MAX_EXTRA_RATIO", "0.1"))  # Máximo de peticiones extra por llamada (0.1 = 10%)
+    LLM_HEDGE_HISTORY_SIZE: int = int(os.getenv("LLM_HEDGE_HISTORY_SIZE", "50"))  # Latencias recientes por agente y modelo
+    LLM_HEDGE_MIN_DELAY_SECONDS: float = float(os.getenv("LLM_HEDGE_MIN_DELAY_SECONDS", "2.0"))  # Nunca duplicar antes de este tiempo
+    # Ruta de errores del LLM en el grafo: pausa y reintento o fin del flujo (ver workflow/error_route.py)
+    LLM_ERROR_ROUTE_ENABLED: bool = os.getenv("LLM_ERROR_ROUTE_ENABLED", "false").lower() == "true"
+    LLM_ERROR_MAX_RETRIES: int = int(os.getenv("LLM_ERROR_MAX_RETRIES", "2"))  # Reintentos seguidos del nodo que falló
+    LLM_ERROR_PAUSE_SECONDS: float = float(os.getenv("LLM_ERROR_PAUSE_SECONDS", "30"))  # Pausa base antes de reintentar (exponencial)
+    SINGLE_FLIGHT_ENABLED: bool = os.getenv("SINGLE_FLIGHT_ENABLED", "false").lower() == "true"  # Agrupa llamadas idénticas en curso (mismo modelo, config y prompt)
 
     MAX_TEST_FIX_ATTEMPTS: int = int(os.getenv("MAX_TEST_FIX_ATTEMPTS", "2"))
     TEST_EXECUTION_TIMEOUT: int = int(os.getenv("TEST_EXECUTION_TIMEOUT", "60"))  # Timeout en segundos para ejecución de tests
+    DEVELOPER_CANDIDATES: int = int(os.getenv("DEVELOPER_CANDIDATES", "1"))  # Implementaciones candidatas en paralelo (1 = desactivado)
+
+    # Pool de ejecución de tests en sandbox (directorio aislado por trabajo, rlimits, timeouts)
+    TEST_EXECUTOR_POOL_ENABLED: bool = os.getenv("TEST_EXECUTOR_POOL_ENABLED", "false").lower() == "true"
+    TEST_EXECUTOR_WORKERS: int = int(os.getenv("TEST_EXECUTOR_WORKERS", "0"))  # 0 = un worker por núcleo
+    TEST_SANDBOX_MEMORY_MB: int = int(os.getenv("TEST_SANDBOX_MEMORY_MB", "0"))  # RLIMIT_AS por trabajo (0 = sin límite)
+    TEST_SANDBOX_CPU_SECONDS: int = int(os.getenv("TEST_SANDBOX_CPU_SECONDS", "0"))  # RLIMIT_CPU por trabajo (0 = sin límite)
+    TEST_SANDBOX_NETWORK_OFF: bool = os.getenv("TEST_SANDBOX_NETWORK_OFF", "false").lower() == "true"  # unshare -rn
+
+    # Toolchain de Node.js compartido (vitest + TypeScript preinstalados fuera de output/)
+    NODE_TOOLCHAIN_ENABLED: bool = os.getenv("NODE_TOOLCHAIN_ENABLED", "false").lower() == "true"
+    NODE_TOOLCHAIN_DIR: str = os.getenv("NODE_TOOLCHAIN_DIR", os.path.join("~", ".cache", "capstone", "node-toolchain"))
+    VITEST_VERSION: str = os.getenv("VITEST_VERSION", "4.0.15")
+    TYPESCRIPT_VERSION: str = os.getenv("TYPESCRIPT_VERSION", "5.9.3")
+    NODE_TOOLCHAIN_INSTALL_TIMEOUT: int = int(os.getenv("NODE_TOOLCHAIN_INSTALL_TIMEOUT", "600"))  # Segundos para npm install
+    TS_SYNTAX_CHECK_ENABLED: bool = os.getenv("TS_SYNTAX_CHECK_ENABLED", "false").lower() == "true"  # Sintaxis e imports de los tests TS en proceso antes de vitest
     
     # SonarCloud Analysis Timing
     SONARCLOUD_ANALYSIS_TIMEOUT: int = int(os.getenv("SONARCLOUD_ANALYSIS_TIMEOUT", "300"))  # Timeout total en segundos (5 minutos)
     SONARCLOUD_ANALYSIS_MAX_ATTEMPTS: int = int(os.getenv("SONARCLOUD_ANALYSIS_MAX_ATTEMPTS", "10"))  # Número máximo de intentos
     SONARCLOUD_ANALYSIS_WAIT_SECONDS: int = int(os.getenv("SONARCLOUD_ANALYSIS_WAIT_SECONDS", "30"))  # Segundos entre intentos
+    SONAR_ISSUE_DELTA_ENABLED: bool = os.getenv("SONAR_ISSUE_DELTA_ENABLED", "false").lower() == "true"  # Prompt de corrección solo con issues nuevos + delta; corta oscilaciones
     
     # Modo Testing/Mock (evita llamadas reales al LLM)
     LLM_MOCK_MODE: bool = os.getenv("LLM_MOCK_MODE", "false").lower() == "true"
     
     # Usar wrapper de LangChain (proporciona callbacks, streaming, token counting)
     USE_LANGCHAIN_WRAPPER: bool = os.getenv("USE_LANGCHAIN_WRAPPER", "false").lower() == "true"
+    LLM_CLIENT_POOL_ENABLED: bool = os.getenv("LLM_CLIENT_POOL_ENABLED", "false").lower() == "true"  # Reutiliza una instancia LangChain (y su cliente HTTP) por configuración de modelo
     
     # Configuración de reintentos para errores 503
     MAX_API_RETRIES: int = 3  # Número de reintentos si el servicio está sobrecargado
@@ -85,12 +128,44 @@ class Settings:
     MAX_SONARQUBE_ATTEMPTS: int = int(os.getenv("MAX_SONARQUBE_ATTEMPTS", "3"))  # Máximo de intentos en el bucle de calidad (SonarQube-Desarrollador)
     MAX_REVISOR_ATTEMPTS: int = int(os.getenv("MAX_REVISOR_ATTEMPTS", "3"))  # Máximo de intentos de revisión de código antes de fallo
     
+    # Perfil del pipeline: topología y presupuestos (ver config/pipeline_profiles.py)
+    PIPELINE_PROFILE: str = os.getenv("PIPELINE_PROFILE", "standard")  # fast | standard | thorough
+    
+    # Plazo de una ejecución: los nodos se degradan al agotarse y el flujo termina con el resultado parcial
+    RUN_DEADLINE_SECONDS: float = float(os.getenv("RUN_DEADLINE_SECONDS", "0"))  # 0 = sin plazo
+    DEADLINE_RESERVE_SECONDS: float = float(os.getenv("DEADLINE_RESERVE_SECONDS", "5"))  # Margen que no consumen esperas y timeouts
+    DEADLINE_SONARCLOUD_MIN_SECONDS: float = float(os.getenv("DEADLINE_SONARCLOUD_MIN_SECONDS", "60"))  # Por debajo, análisis local en vez de esperar a SonarCloud
+    
+    # Monitor de convergencia de los bucles de corrección (detecta iteraciones estancadas o en ciclo)
+    CONVERGENCE_MONITOR_ENABLED: bool = os.getenv("CONVERGENCE_MONITOR_ENABLED", "false").lower() == "true"
+    CONVERGENCE_SIMILARITY_THRESHOLD: float = float(os.getenv("CONVERGENCE_SIMILARITY_THRESHOLD", "0.97"))  # Similitud de código a partir de la que se considera sin cambios
+    CONVERGENCE_RECOVERY_MODEL: str = os.getenv("CONVERGENCE_RECOVERY_MODEL", "")  # Modelo al escalar (vacío = MODEL_NAME)
+    CONVERGENCE_RECOVERY_TEMPERATURE: float = float(os.getenv("CONVERGENCE_RECOVERY_TEMPERATURE", "0.7"))  # Más diversidad al escalar
+    
     # Directorios
     OUTPUT_DIR: str = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "output")
     
+    # Almacén de artefactos direccionado por contenido (sustituye los ficheros por intento en output/)
+    ARTIFACT_STORE_ENABLED: bool = os.getenv("ARTIFACT_STORE_ENABLED", "false").lower() == "true"
+    ARTIFACT_STORE_COMPRESSION: str = os.getenv("ARTIFACT_STORE_COMPRESSION", "none")  # none | zstd
+    
+    # Grafo compilado compartido entre ejecuciones del mismo proceso
+    COMPILED_WORKFLOW_CACHE_ENABLED: bool = os.getenv("COMPILED_WORKFLOW_CACHE_ENABLED", "false").lower() == "true"  # Compilar el grafo una vez por proceso y configuración
+    
+    # Memoización de nodos por huella de sus entradas (Sonar, Developer-UnitTests, Stakeholder)
+    NODE_CACHE_ENABLED: bool = os.getenv("NODE_CACHE_ENABLED", "false").lower() == "true"
+    NODE_CACHE_NODES: str = os.getenv("NODE_CACHE_NODES", "Sonar,Developer-UnitTests,Stakeholder")  # Nodos con caché (separados por comas)
+    NODE_CACHE_MAX_ENTRIES: int = int(os.getenv("NODE_CACHE_MAX_ENTRIES", "32"))  # Resultados guardados por nodo
+    
+    # Visualización del grafo al inicio de cada ejecución
+    GRAPH_RENDER_MODE: str = os.getenv("GRAPH_RENDER_MODE", "png")  # png (API Mermaid remota / PYPPETEER) | mmd (solo fuente, sin red) | off
+    GRAPH_RENDER_CACHE_ENABLED: bool = os.getenv("GRAPH_RENDER_CACHE_ENABLED", "false").lower() == "true"  # Render una vez por estructura del grafo (output/graph_cache)
+    
     # Configuración de Logging
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")  # DEBUG, INFO, WARNING, ERROR, CRITICAL
     LOG_TO_FILE: bool = os.getenv("LOG_TO_FILE", "true").lower() == "true"
+    LOG_ASYNC: bool = os.getenv("LOG_ASYNC", "false").lower() == "true"  # QueueHandler + un único hilo escritor
+    LOG_JSON: bool = os.getenv("LOG_JSON", "false").lower() == "true"  # Fichero de log en formato JSON lines
     
     def get_log_level(self) -> int:
         """Convierte string de nivel a constante de logging"""
@@ -153,7 +228,8 @@ class RetryConfig:
         max_attempts: int | None = None,
         max_debug_attempts: int | None = None,
         max_sonarqube_attempts: int | None = None,
-        max_revisor_attempts: int | None = None
+        max_revisor_attempts: int | None = None,
+        deadline_seconds: float | None = None
     ):
         """
         Inicializa la configuración de reintentos.
@@ -163,20 +239,24 @@ class RetryConfig:
             max_debug_attempts: Máximo de intentos en el bucle de depuración (Testing-Desarrollador)
             max_sonarqube_attempts: Máximo de intentos en el bucle de calidad (SonarQube-Desarrollador)
             max_revisor_attempts: Máximo de intentos de revisión de código antes de fallo
+            deadline_seconds: Presupuesto de tiempo de la ejecución (0 = sin plazo)
         """
         self.max_attempts = max_attempts if max_attempts is not None else Settings.MAX_ATTEMPTS
         self.max_debug_attempts = max_debug_attempts if max_debug_attempts is not None else Settings.MAX_DEBUG_ATTEMPTS
         self.max_sonarqube_attempts = max_sonarqube_attempts if max_sonarqube_attempts is not None else Settings.MAX_SONARQUBE_ATTEMPTS
         self.max_revisor_attempts = max_revisor_attempts if max_revisor_attempts is not None else Settings.MAX_REVISOR_ATTEMPTS
+        self.deadline_seconds = deadline_seconds if deadline_seconds is not None else Settings.RUN_DEADLINE_SECONDS
     
     def to_state_dict(self) -> dict:
         """
         Convierte la configuración a un diccionario compatible con AgentState.
-        Incluye tanto los límites (max_*) como los contadores inicializados a 0.
+        Incluye tanto los límites (max_*) como los contadores inicializados a 0, y el
+        instante límite de la ejecución (deadline_at), que empieza a contar ahora.
         
         Returns:
             dict: Diccionario con límites y contadores para inicializar el estado
         """
+        from utils.deadline import deadline_from_budget  # Import local: utils.deadline importa settings
         return {
             # Límites
             "max_attempts": self.max_attempts,
@@ -187,7 +267,9 @@ class RetryConfig:
             "attempt_count": 0,
             "debug_attempt_count": 0,
             "sonarqube_attempt_count": 0,
-            "revisor_attempt_count": 0
+            "revisor_attempt_count": 0,
+            # Plazo (None = sin plazo)
+            "deadline_at": deadline_from_budget(self.deadline_seconds)
         }
     
     @classmethod
@@ -206,7 +288,8 @@ class RetryConfig:
             f"max_attempts={self.max_attempts}, "
             f"max_debug_attempts={self.max_debug_attempts}, "
             f"max_sonarqube_attempts={self.max_sonarqube_attempts}, "
-            f"max_revisor_attempts={self.max_revisor_attempts})"
+            f"max_revisor_attempts={self.max_revisor_attempts}, "
+            f"deadline_seconds={self.deadline_seconds})"
         )
 
 
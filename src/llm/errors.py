@@ -0,0 +1,147 @@
+"""
+Errores tipados de las llamadas al LLM.
+
+call_gemini devuelve los fallos como texto ('ERROR_API: ...', 'ERROR_503_MAX_RETRIES: ...',
+'ERROR_GENERAL: ...') en lugar del contenido pedido. Para no romper a quien ya compara
+ese texto, el resultado sigue siendo un str, pero de tipo LLMErrorResult: lleva el
+LLMError tipado (tipo, si es reintentable y el detalle) en `.error`.
+
+Con LLM_ERROR_ROUTE_ENABLED los nodos que generan contenido (Product Owner,
+Developer-Code, Developer-UnitTests) no guardan ese texto como requisitos, código o
+tests: comprobar_respuesta_llm registra el error en state['llm_error'] y el grafo lo
+desvía al nodo LLM-Error (ver workflow/error_route.py), que pausa y reintenta o aborta.
+
+Solo se reintentan los fallos transitorios: 503 persistente, 429 (cuota), otros 5xx y
+errores de red. Un 400/401/403 (petición inválida, API key, permisos) fallará igual
+tras la pausa, así que aborta.
+"""
+
+import re
+from typing import Any, Dict, Optional
+
+from config.settings import settings
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+# Tipos de error
+NOT_INITIALIZED = "NOT_INITIALIZED"  # Cliente sin API key / no inicializado
+UNAVAILABLE = "UNAVAILABLE"  # 503 persistente tras los reintentos
+API = "API"  # Otros errores de la API
+GENERAL = "GENERAL"  # Excepciones no previstas (red, SDK...)
+
+# Tipos que siempre tiene sentido reintentar tras una pausa. API y GENERAL dependen
+# del código HTTP o de la excepción (ver is_retryable_status e is_network_error)
+_REINTENTABLES = {UNAVAILABLE}
+
+# Prefijo de texto de cada tipo (formato histórico de call_gemini)
+_PREFIJOS = {
+    NOT_INITIALIZED: "ERROR",
+    UNAVAILABLE: "ERROR_503_MAX_RETRIES",
+    API: "ERROR_API",
+    GENERAL: "ERROR_GENERAL",
+}
+
+_ERROR_TEXTO_RE = re.compile(r'^\s*(ERROR(?:_[A-Z0-9_]+)?):\s?(.*)', re.DOTALL)
+
+
+class LLMError(Exception):
+    """Fallo de una llamada al LLM"""
+
+    def __init__(self, kind: str, detail: str = "", retryable: Optional[bool] = None):
+        self.kind = kind
+        self.detail = detail
+        self.retryable = kind in _REINTENTABLES if retryable is None else retryable
+        super().__init__(f"{kind}: {detail}")
+
+    def to_state(self, node: str) -> Dict[str, Any]:
+        """Forma serializable para state['llm_error']"""
+        return {"kind": self.kind, "detail": self.detail[:500], "retryable": self.retryable, "node": node}
+
+
+class LLMErrorResult(str):
+    """Texto de error devuelto por call_gemini, con el LLMError tipado en `.error`"""
+
+    error: LLMError
+
+    def __new__(cls, error: LLMError, texto: str):
+        instancia = super().__new__(cls, texto)
+        instancia.error = error
+        return instancia
+
+
+def is_retryable_status(code: Any) -> bool:
+    """True para los códigos HTTP transitorios: 429 y 5xx"""
+    return isinstance(code, int) and (code == 429 or 500 <= code <= 599)
+
+
+def is_network_error(exc: BaseException) -> bool:
+    """True si la excepción es un fallo de red (conexión, timeout, transporte HTTP)"""
+    if isinstance(exc, (ConnectionError, TimeoutError)):
+        return True
+    return HTTPX_AVAILABLE and isinstance(exc, httpx.TransportError)
+
+
+def llm_error_result(kind: str, detail: str, retryable: Optional[bool] = None) -> LLMErrorResult:
+    """
+    Crea el resultado de error con el texto histórico de call_gemini.
+
+    Args:
+        kind: Tipo de error
+        detail: Detalle del fallo
+        retryable: Si se puede reintentar. Por defecto, solo UNAVAILABLE
+    """
+    return LLMErrorResult(LLMError(kind, detail, retryable), f"{_PREFIJOS[kind]}: {detail}")
+
+
+def as_llm_error(respuesta: Any) -> Optional[LLMError]:
+    """
+    Devuelve el LLMError de una respuesta de call_gemini, o None si es contenido.
+
+    Reconoce también el texto de error sin tipar (p. ej. de mocks o de versiones
+    anteriores): 'ERROR_503...' se trata como no disponible, 'ERROR_API...' como API
+    y cualquier otro 'ERROR...' como general. Sin el código HTTP ni la excepción, solo
+    el 503 se considera reintentable.
+    """
+    if isinstance(respuesta, LLMErrorResult):
+        return respuesta.error
+    if not isinstance(respuesta, str):
+        return None
+    coincidencia = _ERROR_TEXTO_RE.match(respuesta)
+    if not coincidencia:
+        return None
+    prefijo, detalle = coincidencia.groups()
+    if prefijo.startswith("ERROR_503"):
+        return LLMError(UNAVAILABLE, detalle)
+    if prefijo == "ERROR_API":
+        return LLMError(API, detalle)
+    # ERROR_PARSING y similares los gestiona cada agente: no son fallos de la llamada
+    if prefijo in ("ERROR", "ERROR_GENERAL"):
+        return LLMError(GENERAL if prefijo == "ERROR_GENERAL" else NOT_INITIALIZED, detalle)
+    return None
+
+
+def comprobar_respuesta_llm(state: Dict[str, Any], node: str, respuesta: Any) -> bool:
+    """
+    Con LLM_ERROR_ROUTE_ENABLED, registra en el estado si la respuesta es un fallo del LLM.
+
+    Args:
+        state: Estado del grafo (se modifica)
+        node: Nombre del nodo en el grafo
+        respuesta: Respuesta de call_gemini
+
+    Returns:
+        True si la respuesta es un fallo: el nodo debe devolver el estado sin usarla
+    """
+    if not settings.LLM_ERROR_ROUTE_ENABLED:
+        return False
+    error = as_llm_error(respuesta)
+    if error is None:
+        state['llm_error'] = None
+        state['llm_error_retries'] = 0
+        return False
+    state['llm_error'] = error.to_state(node)
+    return True
@@ -6,6 +6,7 @@ Soporta wrapper de LangChain opcional para debugging avanzado.
 
 import os
 import time
+from functools import lru_cache
 from typing import Optional, Any, Union, List, Dict
 from pydantic import BaseModel
 from google import genai
@@ -14,6 +15,14 @@ from config.settings import settings
 from utils.logger import setup_logger
 from utils.logging_helpers import log_section
 from llm.mock_responses import get_mock_response
+from llm.token_estimator import get_token_estimator
+from llm.hedging import get_hedged_caller, current_hedge_key
+from llm.single_flight import get_single_flight, request_key
+from llm.model_router import record_usage
+from llm.errors import (
+    llm_error_result, is_retryable_status, is_network_error, NOT_INITIALIZED, UNAVAILABLE, API, GENERAL
+)
+from utils.deadline import fits_in_budget
 
 logger = setup_logger(__name__, level=settings.get_log_level())
 
@@ -160,6 +169,16 @@ else:
     client = None
 
 
+@lru_cache(maxsize=None)
+def _response_schema_json(response_schema: type) -> dict:
+    """
+    JSON Schema de un modelo Pydantic, calculado una sola vez por clase.
+    model_json_schema() recorre el modelo completo en cada llamada; los schemas
+    de los agentes son fijos, así que se reutiliza el resultado.
+    """
+    return response_schema.model_json_schema()
+
+
 def _log_warning_if_truncated(response, max_output_tokens: int) -> None:
     try:
         candidates = getattr(response, "candidates", None)
@@ -180,11 +199,27 @@ def _log_warning_if_truncated(response, max_output_tokens: int) -> None:
         return
 
 
+def _calibrar_estimador_tokens(full_prompt: str, text_response: str, response, response_schema) -> None:
+    """Calibra el estimador local con el usage_metadata real de la respuesta"""
+    if not settings.LOCAL_TOKEN_ESTIMATOR_ENABLED:
+        return
+    try:
+        # Con response_schema los tokens del prompt incluyen el schema, que no va en el texto
+        get_token_estimator().calibrate_from_response(
+            full_prompt, text_response, response, calibrar_prompt=response_schema is None
+        )
+    except Exception as e:
+        logger.debug(f"No se pudo calibrar el estimador de tokens: {e}")
+
+
 def call_gemini(
     role_prompt: str, 
     context: str = "", 
     response_schema: Optional[BaseModel] = None, 
-    allow_use_tool: bool = False
+    allow_use_tool: bool = False,
+    model: Optional[str] = None,
+    temperature: Optional[float] = None,
+    max_output_tokens: Optional[int] = None
 ) -> str:
     """
     Realiza una llamada a Gemini 2.5 Flash con el prompt formateado.
@@ -194,6 +229,9 @@ def call_gemini(
         context (str, optional): Contexto adicional (DEPRECATED - usar ChatPromptTemplate)
         response_schema (BaseModel, optional): Schema Pydantic para validación de respuesta JSON
         allow_use_tool (bool): Si se permite el uso de herramientas (tools)
+        model (str, optional): Modelo a usar en lugar de settings.MODEL_NAME
+        temperature (float, optional): Temperatura en lugar de settings.TEMPERATURE
+        max_output_tokens (int, optional): Límite de tokens de salida en lugar de settings.MAX_OUTPUT_TOKENS
     
     Returns:
         str: La respuesta del modelo LLM
@@ -210,7 +248,7 @@ def call_gemini(
     # MODO LANGCHAIN - Usar wrapper de LangChain si está habilitado
     # Nota: Solo para llamadas simples sin response_schema ni tools
     if settings.USE_LANGCHAIN_WRAPPER and _langchain_available:
-        if response_schema is None and not allow_use_tool:
+        if response_schema is None and not allow_use_tool and model is None and temperature is None and max_output_tokens is None:
             logger.debug("🔗 Usando wrapper de LangChain")
             try:
                 return call_gemini_with_langchain(role_prompt, context)
@@ -219,7 +257,7 @@ def call_gemini(
                 # Continuar con el cliente directo si falla
     
     if not client:
-        return "ERROR: Cliente Gemini no inicializado correctamente."
+        return llm_error_result(NOT_INITIALIZED, "Cliente Gemini no inicializado correctamente.")
 
     # Con ChatPromptTemplate, role_prompt ya contiene todo el prompt formateado
     # Solo añadir context si se proporciona (para compatibilidad con código antiguo)
@@ -234,15 +272,16 @@ def call_gemini(
         # Prompt ya está completo desde ChatPromptTemplate
         full_prompt = role_prompt
 
+    model_name = model or settings.MODEL_NAME
     config = {
-        "temperature": settings.TEMPERATURE,
-        "max_output_tokens": settings.MAX_OUTPUT_TOKENS
+        "temperature": settings.TEMPERATURE if temperature is None else temperature,
+        "max_output_tokens": max_output_tokens or settings.MAX_OUTPUT_TOKENS
     }
 
     if response_schema:
-        # Rama del Product Owner - salida JSON estructurada
+        # Salida JSON estructurada (decodificación restringida al schema)
         config["response_mime_type"] = "application/json"
-        config["response_schema"] = response_schema.model_json_schema()
+        config["response_schema"] = _response_schema_json(response_schema)
         full_prompt += (
             f"GENERA EL OUTPUT ÚNICAMENTE EN FORMATO JSON que se adhiera al siguiente "
             f"esquema Pydantic: {response_schema.__name__}. "
@@ -251,12 +290,29 @@ def call_gemini(
     else:
         full_prompt += "Genera únicamente el bloque de texto solicitado en tu Output Esperado. No añadas explicaciones."
 
-    try:
-        response = client.models.generate_content(
-            model=settings.MODEL_NAME,
+    emitida = []  # Vacía si single-flight reutilizó la respuesta de otra llamada
+
+    def _generate():
+        emitida.append(True)
+        if settings.LLM_HEDGING_ENABLED:
+            # Petición duplicada si esta llamada entra en la cola de latencia del agente
+            return get_hedged_caller().call(
+                current_hedge_key(model_name),
+                lambda: client.models.generate_content(model=model_name, contents=full_prompt, config=config)
+            )
+        return client.models.generate_content(
+            model=model_name,
             contents=full_prompt,
             config=config,
         )
+
+    try:
+        if settings.SINGLE_FLIGHT_ENABLED:
+            # Una petición idéntica ya en curso (otro hilo/flujo) se reutiliza en lugar de repetirla
+            response = get_single_flight().do(request_key(model_name, config, full_prompt), _generate)
+        else:
+            response = _generate()
+        record_usage(response if emitida else None)
         _log_warning_if_truncated(response, config.get("max_output_tokens", settings.MAX_OUTPUT_TOKENS))
         
         # Extraer texto de forma segura usando la nueva función compatible con Gemini 3
@@ -266,7 +322,7 @@ def call_gemini(
             logger.error("")
             log_section(logger, "❌ ERROR: EL LLM NO DEVOLVIÓ RESPUESTA VÁLIDA", level="error")
             logger.error(f"📋 Información de diagnóstico:")
-            logger.error(f"   • Modelo usado: {settings.MODEL_NAME}")
+            logger.error(f"   • Modelo usado: {model_name}")
             logger.error(f"   • Respuesta vacía: {not text_response}")
             logger.error(f"   • Valor extraído: {repr(text_response)}")
             logger.error(f"   • Tipo de response original: {type(response)}")
@@ -330,6 +386,7 @@ def call_gemini(
                 logger.error(f"   • Prompt feedback: {response.prompt_feedback}")
             logger.error("")
             raise APIError("El LLM devolvió None o respuesta vacía.")
+        _calibrar_estimador_tokens(full_prompt, text_response, response, response_schema)
         return text_response
     
     except APIError as e:
@@ -342,7 +399,7 @@ def call_gemini(
             log_section(logger, "❌ ERROR 404: MODELO NO ENCONTRADO", level="error")
             logger.error(f"❌ El modelo especificado no existe o no está disponible")
             logger.error(f"📊 Detalles: {e}")
-            logger.error(f"� Modelo solicitado: {settings.MODEL_NAME}")
+            logger.error(f"� Modelo solicitado: {model_name}")
             
             # Intentar listar modelos disponibles
             logger.error(f"\n🔍 Consultando modelos disponibles en tu API key...")
@@ -350,8 +407,8 @@ def call_gemini(
             
             if available_models:
                 logger.error(f"\n✅ Modelos disponibles con generateContent:")
-                for i, model in enumerate(available_models, 1):
-                    logger.error(f"   {i}. {model}")
+                for i, nombre_modelo in enumerate(available_models, 1):
+                    logger.error(f"   {i}. {nombre_modelo}")
             else:
                 logger.error(f"\n⚠️ No se pudo obtener la lista de modelos disponibles")
                 logger.error(f"   Modelos comunes: gemini-2.0-flash-exp, gemini-1.5-flash, gemini-1.5-pro")
@@ -377,19 +434,25 @@ def call_gemini(
             max_retries = settings.MAX_API_RETRIES
             for attempt in range(1, max_retries + 1):
                 wait_time = settings.RETRY_BASE_DELAY ** attempt  # 2, 4, 8 segundos
+                if not fits_in_budget(wait_time):
+                    logger.warning(f"⏰ El reintento {attempt}/{max_retries} no cabe en el plazo de la ejecución")
+                    return llm_error_result(UNAVAILABLE, f"Servicio no disponible; sin plazo para más reintentos. {e}")
                 logger.warning(f"🔄 Intento {attempt}/{max_retries} - Esperando {wait_time}s...")
                 time.sleep(wait_time)
                 
                 try:
                     response = client.models.generate_content(
-                        model=settings.MODEL_NAME,
+                        model=model_name,
                         contents=full_prompt,
                         config=config,
                     )
+                    record_usage(response)
                     _log_warning_if_truncated(response, config.get("max_output_tokens", settings.MAX_OUTPUT_TOKENS))
                     logger.info(f"✅ Reintento exitoso en intento {attempt}")
                     # Usar _safe_get_text también en reintentos para compatibilidad con Gemini 3
-                    return _safe_get_text(response)
+                    text_response = _safe_get_text(response)
+                    _calibrar_estimador_tokens(full_prompt, text_response, response, response_schema)
+                    return text_response
                 except APIError as retry_error:
                     if attempt == max_retries:
                         logger.error("")
@@ -404,13 +467,15 @@ def call_gemini(
                         logger.error("")
                         
                         # Retornar error estructurado en lugar de SystemExit
-                        return f"ERROR_503_MAX_RETRIES: Servicio no disponible después de {max_retries} intentos. {retry_error}"
+                        return llm_error_result(UNAVAILABLE, f"Servicio no disponible después de {max_retries} intentos. {retry_error}")
                     else:
                         logger.warning(f"   ❌ Intento {attempt} falló: {retry_error}")
                         continue
         
-        # Otros errores de API
-        return f"ERROR_API: No se pudo conectar con Gemini. {e}"
+        # Otros errores de API: solo 429 y 5xx son transitorios (400/401/403 fallarían igual)
+        return llm_error_result(
+            API, f"No se pudo conectar con Gemini. {e}", retryable=is_retryable_status(getattr(e, "code", None))
+        )
         
     except Exception as e:
-        return f"ERROR_GENERAL: {e}"
+        return llm_error_result(GENERAL, str(e), retryable=is_network_error(e))
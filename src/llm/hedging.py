@@ -0,0 +1,252 @@
+"""
+Peticiones con cobertura (hedged requests) para recortar la cola de latencia del LLM.
+
+Una sola llamada lenta a generate_content bloquea todo el pipeline, que es serie.
+Con LLM_HEDGING_ENABLED, si una llamada supera el percentil LLM_HEDGE_PERCENTILE de
+la latencia reciente de su agente y modelo, se lanza una segunda petición idéntica
+y se usa la primera respuesta que llegue.
+
+Si la llamada no puede duplicarse (sin historial suficiente o sin presupuesto), se
+ejecuta en el hilo del llamante. Si puede, la original y la duplicada se lanzan cada
+una en su propio hilo, sin pool compartido: activar la cobertura no limita las
+llamadas concurrentes al LLM (candidatos en paralelo, varias ejecuciones) ni añade
+tiempo de cola a la latencia medida.
+
+El cliente síncrono de google-genai no se puede interrumpir: la petición perdedora
+termina en segundo plano y su resultado se descarta. El gasto extra está acotado por
+LLM_HEDGE_MAX_EXTRA_RATIO (peticiones duplicadas / llamadas).
+
+La clave de latencia es el agente activo (ver hedge_scope, que fija ModelRouter)
+más el modelo.
+"""
+
+import contextvars
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from config.settings import settings
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__, level=settings.get_log_level())
+
+# Agente (ruta) de la llamada en curso
+_hedge_scope: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("hedge_scope", default=None)
+
+
+@contextmanager
+def hedge_scope(nombre: str):
+    """Asocia las llamadas al LLM del bloque a un agente (historial de latencia propio)"""
+    token = _hedge_scope.set(nombre)
+    try:
+        yield
+    finally:
+        _hedge_scope.reset(token)
+
+
+def current_hedge_key(model_name: str) -> str:
+    """Clave de latencia: agente activo + modelo"""
+    return f"{_hedge_scope.get() or 'default'}/{model_name}"
+
+
+def percentile(valores: List[float], p: float) -> float:
+    """Percentil por rango más cercano (0 si no hay valores)"""
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    indice = max(0, min(len(ordenados) - 1, math.ceil(p / 100 * len(ordenados)) - 1))
+    return ordenados[indice]
+
+
+class _HedgeStats:
+    """Historial y contadores de una clave"""
+
+    __slots__ = ("historial", "primarias", "efectivas", "calls", "hedges", "hedge_wins")
+
+    def __init__(self, size: int):
+        self.historial: Deque[float] = deque(maxlen=size)  # Latencia de la petición original (umbral)
+        self.primarias: List[float] = []  # Latencia que habría tenido cada llamada sin cobertura (solo éxitos)
+        self.efectivas: List[float] = []  # Latencia observada por el llamante
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0  # La petición duplicada respondió antes
+
+
+class HedgedCaller:
+    """
+    Ejecuta llamadas con cobertura según el historial de latencia de cada clave.
+
+    Uso:
+        >>> response = get_hedged_caller().call(current_hedge_key(model), lambda: client.models.generate_content(...))
+    """
+
+    def __init__(
+        self,
+        percentile_umbral: float = None,
+        min_samples: int = None,
+        max_extra_ratio: float = None,
+        history_size: int = None,
+        min_delay: float = None
+    ):
+        """
+        Args:
+            percentile_umbral: Percentil de latencia a partir del cual se duplica. Por defecto LLM_HEDGE_PERCENTILE
+            min_samples: Muestras necesarias antes de duplicar. Por defecto LLM_HEDGE_MIN_SAMPLES
+            max_extra_ratio: Máximo de peticiones duplicadas por llamada. Por defecto LLM_HEDGE_MAX_EXTRA_RATIO
+            history_size: Latencias recientes por clave. Por defecto LLM_HEDGE_HISTORY_SIZE
+            min_delay: Espera mínima (s) antes de duplicar. Por defecto LLM_HEDGE_MIN_DELAY_SECONDS
+        """
+        self.percentile = percentile_umbral if percentile_umbral is not None else settings.LLM_HEDGE_PERCENTILE
+        self.min_samples = min_samples if min_samples is not None else settings.LLM_HEDGE_MIN_SAMPLES
+        self.max_extra_ratio = max_extra_ratio if max_extra_ratio is not None else settings.LLM_HEDGE_MAX_EXTRA_RATIO
+        self.history_size = history_size if history_size is not None else settings.LLM_HEDGE_HISTORY_SIZE
+        self.min_delay = min_delay if min_delay is not None else settings.LLM_HEDGE_MIN_DELAY_SECONDS
+        self._stats: Dict[str, _HedgeStats] = {}
+        self._lock = threading.Lock()
+
+    def _get_stats(self, key: str) -> _HedgeStats:
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats.setdefault(key, _HedgeStats(self.history_size))
+        return stats
+
+    def threshold(self, key: str) -> Optional[float]:
+        """Segundos tras los que se duplica la petición (None si aún no hay historial suficiente)"""
+        with self._lock:
+            historial = list(self._get_stats(key).historial)
+        if len(historial) < self.min_samples:
+            return None
+        return max(self.min_delay, percentile(historial, self.percentile))
+
+    def _budget_allows(self, stats: _HedgeStats) -> bool:
+        return stats.hedges + 1 <= self.max_extra_ratio * stats.calls
+
+    @staticmethod
+    def _lanzar(fn: Callable[[], Any]) -> Future:
+        """Ejecuta fn en un hilo propio (sin cola) y devuelve su futuro"""
+        futuro: Future = Future()
+        futuro.set_running_or_notify_cancel()
+
+        def _ejecutar():
+            try:
+                futuro.set_result(fn())
+            except BaseException as e:
+                futuro.set_exception(e)
+
+        threading.Thread(target=_ejecutar, name="llm-hedge", daemon=True).start()
+        return futuro
+
+    def call(self, key: str, fn: Callable[[], Any]) -> Any:
+        """
+        Ejecuta fn con cobertura.
+
+        Args:
+            key: Clave de latencia (agente/modelo)
+            fn: Petición sin argumentos (idempotente)
+
+        Returns:
+            Resultado de la primera petición que termine sin error
+        """
+        umbral = self.threshold(key)
+        with self._lock:
+            stats = self._get_stats(key)
+            stats.calls += 1
+            puede_duplicar = umbral is not None and self._budget_allows(stats)
+
+        start = time.perf_counter()
+        if not puede_duplicar:
+            # Sin cobertura posible: en el hilo del llamante
+            resultado = fn()
+            self._record_primary(key, time.perf_counter() - start)
+            return self._finish(key, start, resultado)
+
+        primaria = self._lanzar(fn)
+        primaria.add_done_callback(
+            lambda f: f.exception() is None and self._record_primary(key, time.perf_counter() - start)
+        )
+
+        try:
+            return self._finish(key, start, primaria.result(timeout=umbral))
+        except FutureTimeoutError:
+            pass
+
+        with self._lock:
+            permitido = self._budget_allows(stats)
+            if permitido:
+                stats.hedges += 1
+        if not permitido:
+            return self._finish(key, start, primaria.result())
+
+        logger.info(f"⏱️ Llamada LLM '{key}' supera p{self.percentile:g} ({umbral:.1f}s): lanzando petición duplicada")
+        duplicada = self._lanzar(fn)
+        pendientes = {primaria, duplicada}
+        error: Optional[BaseException] = None
+        while pendientes:
+            hechas, pendientes = wait(pendientes, return_when=FIRST_COMPLETED)
+            for futuro in hechas:
+                if futuro.exception() is not None:
+                    error = error or futuro.exception()
+                    continue
+                if futuro is duplicada:
+                    with self._lock:
+                        stats.hedge_wins += 1
+                return self._finish(key, start, futuro.result())
+        raise error
+
+    def _record_primary(self, key: str, latencia: float) -> None:
+        """Registra la latencia de una petición original terminada sin error"""
+        with self._lock:
+            stats = self._get_stats(key)
+            stats.historial.append(latencia)
+            stats.primarias.append(latencia)
+
+    def _finish(self, key: str, start: float, resultado: Any) -> Any:
+        with self._lock:
+            self._get_stats(key).efectivas.append(time.perf_counter() - start)
+        return resultado
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        """Por clave: llamadas, duplicadas, victorias de la duplicada y p99 sin/con cobertura"""
+        with self._lock:
+            return {
+                key: {
+                    "calls": s.calls,
+                    "hedges": s.hedges,
+                    "hedge_rate": round(s.hedges / s.calls, 3) if s.calls else 0.0,
+                    "hedge_wins": s.hedge_wins,
+                    "p99_unhedged_s": round(percentile(s.primarias, 99), 3),
+                    "p99_effective_s": round(percentile(s.efectivas, 99), 3),
+                }
+                for key, s in sorted(self._stats.items())
+            }
+
+    def format_report(self) -> str:
+        """Tabla de texto con la frecuencia de cobertura y la mejora del p99"""
+        filas = self.report()
+        if not filas:
+            return ""
+        lineas = [f"{'Agente/modelo':<45} {'llamadas':>8} {'duplic.':>8} {'ganadas':>8} {'p99 sin':>9} {'p99 con':>9}"]
+        for clave, m in filas.items():
+            lineas.append(
+                f"{clave:<45} {m['calls']:>8} {m['hedges']:>8} {m['hedge_wins']:>8} "
+                f"{m['p99_unhedged_s']:>8.2f}s {m['p99_effective_s']:>8.2f}s"
+            )
+        return "\n".join(lineas)
+
+
+_hedged_caller: Optional[HedgedCaller] = None
+_hedged_caller_lock = threading.Lock()
+
+
+def get_hedged_caller() -> HedgedCaller:
+    """Obtiene la instancia global de peticiones con cobertura (lazy loading)."""
+    global _hedged_caller
+    with _hedged_caller_lock:
+        if _hedged_caller is None:
+            _hedged_caller = HedgedCaller()
+        return _hedged_caller
@@ -3,7 +3,8 @@ Wrapper de LangChain para Google Gemini.
 Proporciona integración con el ecosistema LangChain manteniendo compatibilidad con el cliente directo.
 """
 
-from typing import Optional, List, Dict, Any
+import threading
+from typing import Optional, List, Dict, Tuple
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import HumanMessage, SystemMessage
 from langchain_core.callbacks.streaming_stdout import StreamingStdOutCallbackHandler
@@ -18,7 +19,10 @@ logger = setup_logger(__name__, level=settings.get_log_level())
 
 def create_langchain_llm(
     streaming: bool = False,
-    callbacks: Optional[List] = None
+    callbacks: Optional[List] = None,
+    model: Optional[str] = None,
+    temperature: Optional[float] = None,
+    max_output_tokens: Optional[int] = None
 ) -> ChatGoogleGenerativeAI:
     """
     Crea una instancia del LLM de Gemini usando LangChain.
@@ -26,6 +30,9 @@ def create_langchain_llm(
     Args:
         streaming: Si se debe habilitar streaming de respuestas
         callbacks: Lista de callbacks personalizados
+        model: Modelo a usar. Por defecto MODEL_NAME
+        temperature: Temperatura. Por defecto TEMPERATURE
+        max_output_tokens: Límite de tokens de salida. Por defecto MAX_OUTPUT_TOKENS
     
     Returns:
         ChatGoogleGenerativeAI: Instancia del LLM configurada
@@ -38,20 +45,88 @@ def create_langchain_llm(
     if streaming and callbacks is None:
         callbacks = [StreamingStdOutCallbackHandler()]
     
+    model_name = model or settings.MODEL_NAME
     llm = ChatGoogleGenerativeAI(
-        model=settings.MODEL_NAME,
+        model=model_name,
         google_api_key=settings.GEMINI_API_KEY,
-        temperature=settings.TEMPERATURE,
-        max_output_tokens=settings.MAX_OUTPUT_TOKENS,
+        temperature=settings.TEMPERATURE if temperature is None else temperature,
+        max_output_tokens=max_output_tokens or settings.MAX_OUTPUT_TOKENS,
         streaming=streaming,
         callbacks=callbacks,
         convert_system_message_to_human=True  # Gemini requiere esto
     )
     
-    logger.info(f"✅ LangChain LLM inicializado: {settings.MODEL_NAME}")
+    logger.info(f"✅ LangChain LLM inicializado: {model_name}")
     return llm
 
 
+# Pool: clave (api_key, modelo, temperatura, max_tokens, streaming) -> instancia
+_llm_pool: Dict[Tuple, ChatGoogleGenerativeAI] = {}
+_llm_pool_lock = threading.Lock()
+
+
+def get_pooled_llm(
+    streaming: bool = False,
+    model: Optional[str] = None,
+    temperature: Optional[float] = None,
+    max_output_tokens: Optional[int] = None
+) -> ChatGoogleGenerativeAI:
+    """
+    Obtiene el LLM para una configuración, creándolo solo la primera vez.
+    
+    Hay un ChatGoogleGenerativeAI (con su cliente google-genai y su transporte HTTP)
+    por configuración. Las instancias no guardan estado por llamada, así que se pueden
+    usar desde varios hilos.
+    
+    Args:
+        streaming: Si se debe habilitar streaming de respuestas
+        model: Modelo a usar. Por defecto MODEL_NAME
+        temperature: Temperatura. Por defecto TEMPERATURE
+        max_output_tokens: Límite de tokens de salida. Por defecto MAX_OUTPUT_TOKENS
+    
+    Returns:
+        ChatGoogleGenerativeAI: La instancia compartida para esa configuración
+    """
+    api_key = settings.GEMINI_API_KEY
+    model_name = model or settings.MODEL_NAME
+    key = (
+        api_key,
+        model_name,
+        settings.TEMPERATURE if temperature is None else temperature,
+        max_output_tokens or settings.MAX_OUTPUT_TOKENS,
+        streaming
+    )
+    llm = _llm_pool.get(key)
+    if llm is not None:
+        return llm
+    
+    with _llm_pool_lock:
+        llm = _llm_pool.get(key)
+        if llm is None:
+            llm = create_langchain_llm(
+                streaming=streaming,
+                model=model_name,
+                temperature=key[2],
+                max_output_tokens=key[3]
+            )
+            _llm_pool[key] = llm
+            logger.debug(f"♻️ Pool LLM: nueva configuración {key[1:]} ({len(_llm_pool)} en total)")
+        return llm
+
+
+def clear_llm_pool() -> None:
+    """Vacía el pool de instancias (p. ej. tras cambiar la API key)"""
+    with _llm_pool_lock:
+        _llm_pool.clear()
+
+
+def _obtener_llm(streaming: bool = False, callbacks: Optional[List] = None) -> ChatGoogleGenerativeAI:
+    """Instancia del pool si está habilitado; los callbacks personalizados requieren una instancia propia"""
+    if settings.LLM_CLIENT_POOL_ENABLED and callbacks is None:
+        return get_pooled_llm(streaming=streaming)
+    return create_langchain_llm(streaming=streaming, callbacks=callbacks)
+
+
 def call_gemini_with_langchain(
     role_prompt: str,
     context: str,
@@ -71,7 +146,7 @@ def call_gemini_with_langchain(
         str: La respuesta del modelo LLM
     """
     try:
-        llm = create_langchain_llm(streaming=streaming, callbacks=callbacks)
+        llm = _obtener_llm(streaming=streaming, callbacks=callbacks)
         
         # Construir mensajes
         messages = [
@@ -105,14 +180,25 @@ def get_token_count(text: str) -> Dict[str, int]:
     """
     Obtiene el conteo de tokens para un texto usando el modelo de Gemini.
     
+    Con LOCAL_TOKEN_ESTIMATOR_ENABLED se usa el estimador local calibrado
+    (sin construir el LLM ni llamar a la API).
+    
     Args:
         text: Texto a analizar
     
     Returns:
         Dict con información de tokens
     """
+    if settings.LOCAL_TOKEN_ESTIMATOR_ENABLED:
+        from llm.token_estimator import get_token_estimator
+        return {
+            "total_tokens": get_token_estimator().estimate(text),
+            "model": settings.MODEL_NAME,
+            "estimated": True
+        }
+    
     try:
-        llm = create_langchain_llm()
+        llm = _obtener_llm()
         
         # LangChain proporciona método para contar tokens
         token_count = llm.get_num_tokens(text)
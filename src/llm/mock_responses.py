@@ -649,16 +649,10 @@ def get_mock_response(role_prompt: str, context: str = "") -> str:
         
     # STAKEHOLDER - Validación
     elif "stakeholder" in prompt_lower and ("validar" in prompt_lower or "validación" in prompt_lower or "requisitos_formales" in prompt_lower):     
-        return (
-            "VALIDACIÓN FINAL: VALIDADO\n\n"
-            "El código cumple con los requisitos funcionales especificados y la visión de negocio. "
-            "La implementación ahora soporta:\n"
-            "- Número variable de argumentos\n"
-            "- Validaciones exhaustivas\n"
-            "- Documentación completa\n"
-            "- Manejo robusto de casos edge\n\n"
-            "Aprobado para producción."
-        )
+        return """{
+  \"validado\": true,
+  \"motivo\": \"El código cumple con los requisitos funcionales especificados y la visión de negocio.\"
+}"""
 
     # RESPUESTA POR DEFECTO
     else:
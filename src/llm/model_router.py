@@ -0,0 +1,307 @@
+"""
+Enrutado de modelos por agente con cascada "barato primero".
+
+Cada agente tiene una ruta con su propia lista de modelos, temperatura y límite de
+tokens de salida (MAX_OUTPUT_TOKENS salvo que MODEL_ROUTES lo fije). Los modelos de la lista se prueban en orden: si la respuesta del
+primero (más rápido/barato) no supera la validación del agente, se escala al
+siguiente. Con MODEL_ROUTING_ENABLED=false todas las rutas usan MODEL_NAME,
+TEMPERATURE y MAX_OUTPUT_TOKENS y la llamada es idéntica a la anterior.
+
+Configuración (opcional, JSON):
+    MODEL_ROUTES='{"developer": {"models": ["gemini-2.5-flash-lite", "gemini-2.5-flash"],
+                                 "temperature": 0.2, "max_output_tokens": 8192}}'
+    MODEL_PRICES='{"gemini-2.5-flash": [0.30, 2.50]}'   # USD por 1M tokens (entrada, salida)
+
+Al final de la ejecución, format_report() resume latencia, escaladas y coste por ruta
+y modelo. Los tokens salen del usage_metadata de cada respuesta (call_gemini lo
+registra con record_usage); solo se estiman cuando la respuesta no lo trae (mocks,
+wrapper de LangChain, errores).
+"""
+
+import contextvars
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config.settings import settings
+from llm.token_estimator import get_token_estimator
+from llm.hedging import hedge_scope
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__, level=settings.get_log_level())
+
+# Temperatura por agente (los modelos, por defecto, MODEL_NAME; el límite de tokens, MAX_OUTPUT_TOKENS)
+DEFAULT_ROUTES: Dict[str, Dict[str, Any]] = {
+    "product_owner": {"temperature": 0.1},
+    "developer": {"temperature": 0.1},
+    "test_generator": {"temperature": 0.1},
+    "sonar": {"temperature": 0.1},
+    "reviewer": {"temperature": 0.0},
+    "stakeholder": {"temperature": 0.0},
+    "release_notes": {"temperature": 0.3},
+}
+
+# Precios aproximados (USD por 1M tokens: entrada, salida); se sobrescriben con MODEL_PRICES
+DEFAULT_PRICES: Dict[str, Tuple[float, float]] = {
+    "gemini-2.5-pro": (1.25, 10.00),
+    "gemini-2.5-flash": (0.30, 2.50),
+    "gemini-2.5-flash-lite": (0.10, 0.40),
+    "gemini-2.0-flash": (0.10, 0.40),
+}
+
+# Estimación de tokens sin tokenizador: ~4 caracteres por token
+_CHARS_POR_TOKEN = 4
+
+# Tokens reales de la llamada en curso del router ({"input": n, "output": m})
+_usage: contextvars.ContextVar[Optional[Dict[str, int]]] = contextvars.ContextVar("llm_usage", default=None)
+
+
+def _estimar_tokens(texto: str) -> int:
+    if settings.LOCAL_TOKEN_ESTIMATOR_ENABLED:
+        return get_token_estimator().estimate(texto)
+    return max(1, len(texto or "") // _CHARS_POR_TOKEN)
+
+
+def record_usage(response: Any = None) -> None:
+    """
+    Registra los tokens facturados de una respuesta de google-genai para la llamada en
+    curso del router (fuera del router no hace nada).
+
+    Args:
+        response: Respuesta con usage_metadata. None si la llamada reutilizó la respuesta
+            de otra idéntica en curso (single-flight): no se facturó nada
+    """
+    destino = _usage.get()
+    if destino is None:
+        return
+    if response is None:
+        destino.update(input=0, output=0)
+        return
+    usage = getattr(response, "usage_metadata", None)
+    entrada = getattr(usage, "prompt_token_count", None)
+    salida = getattr(usage, "candidates_token_count", None)
+    if not isinstance(entrada, int) or not isinstance(salida, int):
+        return
+    # Los tokens de razonamiento se facturan como salida
+    pensamiento = getattr(usage, "thoughts_token_count", None)
+    destino.update(input=entrada, output=salida + (pensamiento if isinstance(pensamiento, int) else 0))
+
+
+def respuesta_valida_por_defecto(respuesta: str) -> bool:
+    """Una respuesta vacía o un error de la API no es válida"""
+    return bool(respuesta and respuesta.strip()) and not respuesta.lstrip().upper().startswith("ERROR")
+
+
+def valida_con_parser(parser) -> Callable[[str], bool]:
+    """Validador que acepta la respuesta si el parser de salida estructurada la parsea"""
+    def _validar(respuesta: str) -> bool:
+        try:
+            parser.parse(respuesta)
+            return True
+        except Exception:
+            return False
+    return _validar
+
+
+class ModelRoute:
+    """Modelos (en orden de cascada), temperatura y límite de tokens de un agente"""
+
+    def __init__(self, name: str, models: List[str], temperature: float, max_output_tokens: int):
+        self.name = name
+        self.models = models
+        self.temperature = temperature
+        self.max_output_tokens = max_output_tokens
+
+
+class _RouteStats:
+    """Métricas acumuladas de una ruta y modelo"""
+
+    __slots__ = ("calls", "rejected", "estimated", "latency", "input_tokens", "output_tokens", "cost")
+
+    def __init__(self):
+        self.calls = 0
+        self.rejected = 0  # Respuestas que no pasaron la validación (provocan escalada)
+        self.estimated = 0  # Llamadas sin usage_metadata (tokens estimados)
+        self.latency = 0.0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cost = 0.0
+
+
+class ModelRouter:
+    """
+    Resuelve la ruta de cada agente y ejecuta la cascada de modelos.
+
+    Uso:
+        >>> respuesta = get_model_router().call("developer", prompt, call_gemini, validate=es_codigo_valido)
+    """
+
+    def __init__(self, routes: Optional[Dict[str, Any]] = None, prices: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            routes: Rutas por agente. Por defecto MODEL_ROUTES (JSON)
+            prices: Precios por modelo. Por defecto MODEL_PRICES (JSON)
+        """
+        self._overrides = routes if routes is not None else self._load_json(settings.MODEL_ROUTES, "MODEL_ROUTES")
+        self._prices = dict(DEFAULT_PRICES)
+        self._prices.update({
+            model: tuple(price)
+            for model, price in (prices if prices is not None else self._load_json(settings.MODEL_PRICES, "MODEL_PRICES")).items()
+        })
+        self._stats: Dict[Tuple[str, str], _RouteStats] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _load_json(raw: str, name: str) -> Dict[str, Any]:
+        if not raw:
+            return {}
+        try:
+            return json.loads(raw)
+        except ValueError as e:
+            logger.warning(f"⚠️ {name} no es JSON válido, se ignora: {e}")
+            return {}
+
+    def route(self, name: str) -> ModelRoute:
+        """Ruta efectiva de un agente (con enrutado deshabilitado: configuración global)"""
+        if not settings.MODEL_ROUTING_ENABLED:
+            return ModelRoute(name, [settings.MODEL_NAME], settings.TEMPERATURE, settings.MAX_OUTPUT_TOKENS)
+        config = {**DEFAULT_ROUTES.get(name, {}), **self._overrides.get(name, {})}
+        models = config.get("models") or [settings.MODEL_NAME]
+        return ModelRoute(
+            name,
+            list(models),
+            float(config.get("temperature", settings.TEMPERATURE)),
+            int(config.get("max_output_tokens", settings.MAX_OUTPUT_TOKENS))
+        )
+
+    def _record(
+        self, route: str, model: str, prompt: str, respuesta: str, latency: float, valida: bool, uso: Dict[str, int]
+    ) -> None:
+        estimado = not uso
+        input_tokens = _estimar_tokens(prompt) if estimado else uso["input"]
+        output_tokens = _estimar_tokens(respuesta) if estimado else uso["output"]
+        precio_entrada, precio_salida = self._prices.get(model, (0.0, 0.0))
+        with self._lock:
+            stats = self._stats.setdefault((route, model), _RouteStats())
+            stats.calls += 1
+            stats.rejected += 0 if valida else 1
+            stats.estimated += 1 if estimado else 0
+            stats.latency += latency
+            stats.input_tokens += input_tokens
+            stats.output_tokens += output_tokens
+            stats.cost += (input_tokens * precio_entrada + output_tokens * precio_salida) / 1_000_000
+
+    def call(
+        self,
+        route_name: str,
+        prompt: str,
+        call_fn: Callable[..., str],
+        validate: Optional[Callable[[str], bool]] = None,
+        response_schema: Any = None,
+        model: Optional[str] = None,
+        temperature: Optional[float] = None
+    ) -> str:
+        """
+        Llama al LLM por la ruta del agente, escalando de modelo si la validación falla.
+
+        Args:
+            route_name: Ruta ('developer', 'reviewer', ...)
+            prompt: Prompt completo
+            call_fn: Función de llamada (call_gemini del módulo del agente)
+            validate: Comprobación de la respuesta; False escala al siguiente modelo
+            response_schema: Schema Pydantic para salida estructurada
+            model: Fuerza un único modelo (sin cascada)
+            temperature: Fuerza la temperatura
+
+        Returns:
+            Respuesta del primer modelo válido o, si ninguno lo es, la del último
+        """
+        kwargs = {"response_schema": response_schema} if response_schema is not None else {}
+        if not settings.MODEL_ROUTING_ENABLED:
+            # Sin enrutado la llamada es idéntica a la original (salvo sobrescrituras explícitas)
+            if model is not None:
+                kwargs["model"] = model
+            if temperature is not None:
+                kwargs["temperature"] = temperature
+            with hedge_scope(route_name):
+                return call_fn(prompt, "", **kwargs)
+
+        route = self.route(route_name)
+        models = [model] if model else route.models
+        validate = validate or respuesta_valida_por_defecto
+        respuesta = ""
+        for i, model_name in enumerate(models):
+            uso: Dict[str, int] = {}
+            token = _usage.set(uso)
+            start = time.perf_counter()
+            try:
+                with hedge_scope(route_name):
+                    respuesta = call_fn(
+                        prompt, "",
+                        model=model_name,
+                        temperature=route.temperature if temperature is None else temperature,
+                        max_output_tokens=route.max_output_tokens,
+                        **kwargs
+                    )
+            finally:
+                _usage.reset(token)
+            latency = time.perf_counter() - start
+            try:
+                valida = respuesta_valida_por_defecto(respuesta) and validate(respuesta)
+            except Exception as e:
+                logger.debug(f"Validación de la ruta '{route_name}' lanzó excepción: {e}")
+                valida = False
+            self._record(route_name, model_name, prompt, respuesta, latency, valida, uso)
+            if valida:
+                break
+            if i + 1 < len(models):
+                logger.info(f"⬆️ Ruta '{route_name}': respuesta de {model_name} no válida, escalando a {models[i + 1]}")
+        return respuesta
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        """Métricas por 'ruta/modelo'"""
+        with self._lock:
+            return {
+                f"{route}/{model}": {
+                    "calls": s.calls,
+                    "rejected": s.rejected,
+                    "estimated_calls": s.estimated,
+                    "avg_latency_s": round(s.latency / s.calls, 3) if s.calls else 0.0,
+                    "input_tokens": s.input_tokens,
+                    "output_tokens": s.output_tokens,
+                    "cost_usd": round(s.cost, 6),
+                }
+                for (route, model), s in sorted(self._stats.items())
+            }
+
+    def format_report(self) -> str:
+        """Tabla de texto con latencia, escaladas y coste por ruta"""
+        filas = self.report()
+        if not filas:
+            return ""
+        lineas = [f"{'Ruta/modelo':<45} {'llamadas':>8} {'rechazos':>8} {'latencia':>9} {'coste USD':>10}"]
+        total = 0.0
+        estimadas = 0
+        for clave, m in filas.items():
+            total += m["cost_usd"]
+            estimadas += m["estimated_calls"]
+            lineas.append(
+                f"{clave:<45} {m['calls']:>8} {m['rejected']:>8} {m['avg_latency_s']:>8.2f}s {m['cost_usd']:>10.4f}"
+            )
+        etiqueta = f"Total ({estimadas} llamadas estimadas)" if estimadas else "Total"
+        lineas.append(f"{etiqueta:<45} {'':>8} {'':>8} {'':>9} {total:>10.4f}")
+        return "\n".join(lineas)
+
+
+_model_router: Optional[ModelRouter] = None
+_model_router_lock = threading.Lock()
+
+
+def get_model_router() -> ModelRouter:
+    """Obtiene la instancia global del router de modelos (lazy loading)."""
+    global _model_router
+    with _model_router_lock:
+        if _model_router is None:
+            _model_router = ModelRouter()
+        return _model_router
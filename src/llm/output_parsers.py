@@ -3,6 +3,8 @@ Output Parsers de LangChain para validación y parsing de respuestas del LLM.
 Proporciona parsers reutilizables para diferentes tipos de respuestas estructuradas.
 """
 
+import re
+from functools import lru_cache
 from typing import Type, Optional
 from pydantic import BaseModel, ValidationError
 from langchain_core.output_parsers import PydanticOutputParser, JsonOutputParser
@@ -12,6 +14,68 @@ from config.settings import settings
 
 logger = setup_logger(__name__, level=settings.get_log_level())
 
+# Tokens relevantes para localizar un objeto JSON: strings completos (el motor de regex
+# los consume en C, incluidas llaves y comillas escapadas), llaves/corchetes y fences.
+_JSON_TOKEN_RE = re.compile(r'"(?:[^"\\]|\\.)*"|[{}\[\]]|```', re.DOTALL)
+_JSON_FENCE_RE = re.compile(r'```json', re.IGNORECASE)
+# Un objeto JSON empieza por '{' seguido de una clave o de '}' (descarta código y placeholders)
+_JSON_OBJECT_START_RE = re.compile(r'\{\s*["}]')
+
+
+def extract_first_json_object(text: str) -> Optional[str]:
+    """
+    Localiza el primer objeto JSON balanceado del texto en una sola pasada (tiempo lineal).
+    
+    - Si hay un bloque ```json, la búsqueda empieza dentro de él.
+    - Las llaves dentro de strings JSON se ignoran.
+    - Solo se consideran inicios de la forma '{"' o '{}' (se saltan bloques de código
+      y placeholders como {nombre}).
+    - Un fence ``` que aparece antes de cerrar el objeto lo invalida (era código, no JSON)
+      y la búsqueda continúa a partir de ese punto, sin volver atrás.
+    
+    Args:
+        text: Respuesta del LLM
+        
+    Returns:
+        El texto del objeto JSON o None si no se encuentra ninguno balanceado
+    """
+    if not text:
+        return None
+    
+    fence = _JSON_FENCE_RE.search(text)
+    start = text.find('{', fence.end() if fence else 0)
+    
+    while start != -1:
+        if not _JSON_OBJECT_START_RE.match(text, start):
+            start = text.find('{', start + 1)
+            continue
+        depth = 0
+        resume_at = -1
+        for match in _JSON_TOKEN_RE.finditer(text, start):
+            token = match.group()
+            if token == '{' or token == '[':
+                depth += 1
+            elif token == '}' or token == ']':
+                depth -= 1
+                if depth == 0:
+                    return text[start:match.end()]
+                if depth < 0:
+                    resume_at = match.end()
+                    break
+            elif token == '```':
+                resume_at = match.end()
+                break
+        if resume_at == -1:
+            return None
+        start = text.find('{', resume_at)
+    
+    return None
+
+
+def _es_error_de_sintaxis_json(error: ValidationError) -> bool:
+    """Indica si la validación falló por JSON mal formado (no por el schema)"""
+    return any(err.get('type') == 'json_invalid' for err in error.errors())
+
 
 class RobustPydanticOutputParser(PydanticOutputParser):
     """
@@ -41,75 +105,27 @@ class RobustPydanticOutputParser(PydanticOutputParser):
                     f"El LLM devolvió un error de API en lugar de JSON: {text[:200]}"
                 )
         
+        # Extracción lineal + una única validación con Pydantic
+        json_text = extract_first_json_object(text) or (text or "").strip()
         try:
-            # Intento 1: Parsing directo
-            return super().parse(text)
-        except (ValidationError, OutputParserException, ValueError) as e:
-            logger.warning(f"⚠️ Primer intento de parsing falló: {e}")
-            
-            # Intento 2: Limpiar markdown code blocks
-            cleaned_text = self._clean_markdown_blocks(text)
-            try:
-                return super().parse(cleaned_text)
-            except (ValidationError, OutputParserException, ValueError) as e2:
-                logger.warning(f"⚠️ Segundo intento de parsing falló: {e2}")
-                
-                # Intento 3: Extraer JSON del texto
-                json_text = self._extract_json(cleaned_text)
-                try:
-                    return super().parse(json_text)
-                except (ValidationError, OutputParserException, ValueError) as e3:
-                    logger.error(f"❌ Todos los intentos de parsing fallaron")
-                    logger.error(f"   Texto original (primeros 200 chars): {text[:200]}")
-                    raise OutputParserException(
-                        f"No se pudo parsear la respuesta después de 3 intentos. "
-                        f"Último error: {e3}"
-                    )
-    
-    def _clean_markdown_blocks(self, text: str) -> str:
-        """
-        Limpia bloques de código markdown del texto.
-        
-        Args:
-            text: Texto con posibles bloques markdown
-            
-        Returns:
-            Texto limpio sin bloques markdown
-        """
-        # Remover ```json ... ```
-        if "```json" in text:
-            start = text.find("```json") + 7
-            end = text.find("```", start)
-            if end != -1:
-                return text[start:end].strip()
-        
-        # Remover ``` ... ```
-        if "```" in text:
-            start = text.find("```") + 3
-            end = text.find("```", start)
-            if end != -1:
-                return text[start:end].strip()
+            return self.pydantic_object.model_validate_json(json_text)
+        except ValidationError as e:
+            if not _es_error_de_sintaxis_json(e):
+                logger.error(f"❌ La respuesta no cumple el schema {self.pydantic_object.__name__}")
+                logger.error(f"   Texto original (primeros 200 chars): {text[:200]}")
+                raise OutputParserException(f"La respuesta no cumple el schema: {e}")
+            logger.warning(f"⚠️ JSON estricto inválido, usando parser tolerante: {e.errors()[0].get('msg', e)}")
         
-        return text.strip()
-    
-    def _extract_json(self, text: str) -> str:
-        """
-        Intenta extraer JSON válido del texto.
-        
-        Args:
-            text: Texto que contiene JSON
-            
-        Returns:
-            JSON extraído
-        """
-        # Buscar el primer { y el último }
-        start = text.find("{")
-        end = text.rfind("}")
-        
-        if start != -1 and end != -1 and start < end:
-            return text[start:end+1]
-        
-        return text
+        # JSON no estricto (comillas simples, comas finales...): parser tolerante de LangChain
+        try:
+            return super().parse(json_text)
+        except (ValidationError, OutputParserException, ValueError) as e2:
+            logger.error(f"❌ Todos los intentos de parsing fallaron")
+            logger.error(f"   Texto original (primeros 200 chars): {text[:200]}")
+            raise OutputParserException(
+                f"No se pudo parsear la respuesta. "
+                f"Último error: {e2}"
+            )
 
 
 def create_parser_for_schema(schema: Type[BaseModel]) -> RobustPydanticOutputParser:
@@ -210,6 +226,31 @@ def get_test_execution_parser() -> RobustPydanticOutputParser:
     return create_parser_for_schema(TestExecutionRequest)
 
 
+@lru_cache(maxsize=None)
+def get_code_review_parser() -> RobustPydanticOutputParser:
+    """
+    Obtiene el parser para CodeReviewVerdict (Developer2-Reviewer).
+    El parser no guarda estado entre llamadas, así que se crea una sola vez.
+    
+    Returns:
+        Parser configurado
+    """
+    from models.schemas import CodeReviewVerdict
+    return create_parser_for_schema(CodeReviewVerdict)
+
+
+@lru_cache(maxsize=None)
+def get_stakeholder_verdict_parser() -> RobustPydanticOutputParser:
+    """
+    Obtiene el parser para StakeholderVerdict (Stakeholder).
+    
+    Returns:
+        Parser configurado
+    """
+    from models.schemas import StakeholderVerdict
+    return create_parser_for_schema(StakeholderVerdict)
+
+
 # Función de utilidad para validación directa
 def validate_and_parse(text: str, schema: Type[BaseModel]) -> BaseModel:
     """
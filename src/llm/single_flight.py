@@ -0,0 +1,135 @@
+"""
+Coalescencia (single-flight) de peticiones idénticas al LLM que están en curso.
+
+Con varios flujos en paralelo sobre el mismo corpus de prompts, la misma llamada
+(típicamente la primera formalización del Product Owner) se lanza a la vez desde
+varios hilos. Con SINGLE_FLIGHT_ENABLED, la primera petición se ejecuta y las
+idénticas que llegan mientras está en curso se enganchan a su resultado (o a su
+excepción) en lugar de repetir la llamada a la API.
+
+No es una caché: en cuanto la petición termina, la siguiente llamada idéntica
+vuelve a ir a la API. El resultado compartido es el mismo objeto para todos los
+llamantes, que no deben modificarlo.
+
+Funciona entre hilos (do) y entre tareas asyncio (do_async): el punto de encuentro
+es un concurrent.futures.Future, que las tareas esperan con asyncio.wrap_future.
+"""
+
+import asyncio
+import hashlib
+import json
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from config.settings import settings
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__, level=settings.get_log_level())
+
+
+def request_key(model: str, config: Dict[str, Any], prompt: str) -> str:
+    """Huella de una petición: modelo, configuración (incluido el schema) y prompt"""
+    payload = json.dumps({"model": model, "config": config}, sort_keys=True, default=str)
+    digest = hashlib.sha256(payload.encode("utf-8"))
+    digest.update(b"\x00")
+    digest.update(prompt.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class SingleFlight:
+    """
+    Agrupa las peticiones con la misma clave mientras la primera está en curso.
+
+    Uso:
+        >>> response = get_single_flight().do(request_key(model, config, prompt), lambda: generate(...))
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.coalesced = 0  # Llamadas servidas por una petición ya en curso
+
+    def _join(self, key: str) -> Tuple[Future, bool]:
+        """Devuelve el futuro de la clave y si el llamante es quien debe ejecutar la petición"""
+        with self._lock:
+            self.calls += 1
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = Future()
+            self._inflight[key] = future
+            return future, True
+
+    def _complete(self, key: str, future: Future, result: Any = None, error: Optional[BaseException] = None) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """
+        Ejecuta fn o, si ya hay una petición idéntica en curso, espera su resultado.
+
+        Args:
+            key: Huella de la petición (request_key)
+            fn: Petición sin argumentos
+
+        Returns:
+            Resultado de la petición (compartido entre los llamantes agrupados)
+        """
+        future, leader = self._join(key)
+        if not leader:
+            logger.debug(f"🔗 Petición LLM idéntica en curso, esperando su resultado ({key[:12]})")
+            return future.result()
+        try:
+            result = fn()
+        except BaseException as e:
+            self._complete(key, future, error=e)
+            raise
+        self._complete(key, future, result)
+        return result
+
+    async def do_async(self, key: str, coro_fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Variante para tareas asyncio: agrupa con otras tareas y con hilos.
+
+        Args:
+            key: Huella de la petición (request_key)
+            coro_fn: Función que devuelve la corrutina de la petición
+
+        Returns:
+            Resultado de la petición (compartido entre los llamantes agrupados)
+        """
+        future, leader = self._join(key)
+        if not leader:
+            return await asyncio.wrap_future(future)
+        try:
+            result = await coro_fn()
+        except BaseException as e:
+            self._complete(key, future, error=e)
+            raise
+        self._complete(key, future, result)
+        return result
+
+    def stats(self) -> Dict[str, int]:
+        """Llamadas totales, agrupadas y peticiones en curso"""
+        with self._lock:
+            return {"calls": self.calls, "coalesced": self.coalesced, "inflight": len(self._inflight)}
+
+
+_single_flight: Optional[SingleFlight] = None
+_single_flight_lock = threading.Lock()
+
+
+def get_single_flight() -> SingleFlight:
+    """Obtiene la instancia global de single-flight (lazy loading)."""
+    global _single_flight
+    with _single_flight_lock:
+        if _single_flight is None:
+            _single_flight = SingleFlight()
+        return _single_flight
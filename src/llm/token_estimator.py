@@ -0,0 +1,141 @@
+"""
+Estimador local de tokens, sin llamadas a la API.
+
+get_token_count de LangChain construye un LLM y puede consultar la API en cada
+conteo. Este estimador segmenta el texto con una heurística cercana al tokenizador
+SentencePiece de Gemini (palabras cortas = 1 token, palabras largas en trozos,
+cada dígito y cada signo de puntuación por separado, saltos de línea e indentación
+como tokens propios) y corrige la escala con un factor que se autocalibra con el
+usage_metadata de las respuestas reales.
+
+El conteo base de cada texto se guarda en una caché LRU: los prompts se repiten
+entre intentos (mismo requisito, mismo código) y no se vuelven a segmentar.
+"""
+
+import re
+import threading
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from config.settings import settings
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__, level=settings.get_log_level())
+
+# Palabras, dígitos, signos y espacios (los espacios simples entre palabras no cuentan)
+_SEGMENTO_RE = re.compile(r'[^\W\d_]+|\d|[^\w\s]|_+|\s+')
+
+# Caracteres por trozo en palabras largas (el vocabulario cubre las palabras comunes enteras)
+_CHARS_POR_TROZO = 6
+
+# Límites y suavizado del factor de calibración
+_FACTOR_MIN, _FACTOR_MAX = 0.5, 2.0
+_ALFA_CALIBRACION = 0.2
+# Textos demasiado cortos dan ratios poco fiables
+_TOKENS_MIN_CALIBRACION = 20
+
+
+def _contar_base(texto: str) -> int:
+    """Conteo heurístico sin calibrar"""
+    tokens = 0
+    for segmento in _SEGMENTO_RE.findall(texto):
+        primero = segmento[0]
+        if primero.isspace():
+            # Un espacio simple va pegado a la palabra siguiente
+            if segmento != ' ':
+                tokens += 1
+        elif primero.isalpha():
+            tokens += -(-len(segmento) // _CHARS_POR_TROZO)
+        else:
+            tokens += 1
+    return tokens
+
+
+_contar_base_cacheado = lru_cache(maxsize=settings.TOKEN_ESTIMATOR_CACHE_SIZE)(_contar_base)
+
+
+class TokenEstimator:
+    """
+    Estimación local de tokens con factor de calibración.
+
+    Uso:
+        >>> estimador = get_token_estimator()
+        >>> estimador.estimate(prompt)
+        >>> estimador.calibrate(prompt, response.usage_metadata.prompt_token_count)
+    """
+
+    def __init__(self, factor: float = 1.0):
+        self.factor = factor
+        self.samples = 0
+        self._lock = threading.Lock()
+
+    def estimate(self, texto: str) -> int:
+        """Tokens estimados del texto (0 si está vacío)"""
+        if not texto:
+            return 0
+        return max(1, round(_contar_base_cacheado(texto) * self.factor))
+
+    def calibrate(self, texto: str, tokens_reales: Any) -> bool:
+        """
+        Ajusta el factor con un conteo real (media móvil exponencial).
+
+        Args:
+            texto: Texto cuyo conteo real se conoce
+            tokens_reales: Tokens reportados por la API
+
+        Returns:
+            True si la muestra se usó para calibrar
+        """
+        if not isinstance(tokens_reales, int) or isinstance(tokens_reales, bool) or tokens_reales < _TOKENS_MIN_CALIBRACION:
+            return False
+        base = _contar_base_cacheado(texto) if texto else 0
+        if base <= 0:
+            return False
+        ratio = min(_FACTOR_MAX, max(_FACTOR_MIN, tokens_reales / base))
+        with self._lock:
+            # La primera muestra sustituye al valor inicial; las siguientes se suavizan
+            self.factor = ratio if self.samples == 0 else self.factor + _ALFA_CALIBRACION * (ratio - self.factor)
+            self.samples += 1
+        logger.debug(f"📏 Calibración de tokens: real={tokens_reales}, base={base}, factor={self.factor:.3f}")
+        return True
+
+    def calibrate_from_response(self, prompt: str, respuesta: str, response: Any, calibrar_prompt: bool = True) -> None:
+        """
+        Calibra con el usage_metadata de una respuesta de google-genai.
+
+        Args:
+            prompt: Prompt enviado
+            respuesta: Texto extraído de la respuesta
+            response: Respuesta de generate_content
+            calibrar_prompt: False si el prompt real incluye contenido no enviado como texto (p. ej. schema)
+        """
+        usage = getattr(response, "usage_metadata", None)
+        if usage is None:
+            return
+        if calibrar_prompt:
+            self.calibrate(prompt, getattr(usage, "prompt_token_count", None))
+        self.calibrate(respuesta, getattr(usage, "candidates_token_count", None))
+
+    def stats(self) -> Dict[str, Any]:
+        """Factor actual, muestras y estado de la caché"""
+        info = _contar_base_cacheado.cache_info()
+        return {
+            "factor": round(self.factor, 4),
+            "samples": self.samples,
+            "cache_hits": info.hits,
+            "cache_misses": info.misses,
+            "cache_size": info.currsize,
+        }
+
+
+_token_estimator: Optional[TokenEstimator] = None
+_token_estimator_lock = threading.Lock()
+
+
+def get_token_estimator() -> TokenEstimator:
+    """Obtiene la instancia global del estimador de tokens (lazy loading)."""
+    global _token_estimator
+    with _token_estimator_lock:
+        if _token_estimator is None:
+            _token_estimator = TokenEstimator()
+        return _token_estimator
@@ -3,14 +3,25 @@ Punto de entrada principal del sistema multiagente de desarrollo ágil.
 Orquesta el flujo completo de generación de código.
 """
 
+import copy
 import os
 import re
 import shutil
 import time
+import uuid
 from config.settings import settings, RetryConfig
-from workflow.graph import create_workflow, visualize_graph
-from tools.file_utils import guardar_fichero_texto, detectar_lenguaje_y_extension, extraer_nombre_archivo, limpiar_codigo_markdown
+from config.pipeline_profiles import get_profile
+from workflow.graph import create_workflow, get_compiled_workflow, visualize_graph
+from tools.file_utils import guardar_fichero_texto, guardar_artefacto, limpiar_codigo_markdown
+from models.requirements_meta import obtener_requisitos_meta
 from utils.logger import setup_logger, log_agent_execution
+from utils.artifact_store import get_artifact_store
+from llm.model_router import get_model_router
+from llm.hedging import get_hedged_caller
+from workflow.error_route import get_error_route_stats
+from workflow.node_cache import discard_node_cache_run, get_node_cache
+from utils.deadline import deadline_scope, deadline_expired
+from tools.node_toolchain import get_node_toolchain, ToolchainError
 
 logger = setup_logger(__name__, level=settings.get_log_level())
 
@@ -23,7 +34,12 @@ def delete_output_folder() -> None:
     """
     if os.path.exists(settings.OUTPUT_DIR):
         # Archivos y directorios a preservar
-        preserve_items = ['package.json', 'package-lock.json', 'node_modules', 'logs']
+        # 'artifacts' se conserva para deduplicar objetos entre ejecuciones y 'graph_cache' para
+        # reutilizar el render del grafo.
+        # Con el toolchain compartido, node_modules/package.json son enlaces que se recrean
+        preserve_items = ['logs', 'artifacts', 'graph_cache']
+        if not settings.NODE_TOOLCHAIN_ENABLED:
+            preserve_items += ['package.json', 'package-lock.json', 'node_modules']
         
         for filename in os.listdir(settings.OUTPUT_DIR):
             if filename in preserve_items:
@@ -46,7 +62,10 @@ def delete_output_folder() -> None:
 def run_development_workflow(
     prompt_inicial: str, 
     max_attempts: int = None,
-    retry_config: RetryConfig = None
+    retry_config: RetryConfig = None,
+    visualize: bool = True,
+    deadline_seconds: float = None,
+    profile: str = None
 ) -> dict:
     """
     Ejecuta el flujo completo de desarrollo multiagente.
@@ -56,6 +75,12 @@ def run_development_workflow(
         max_attempts (int, optional): Máximo de ciclos completos. DEPRECATED - usar retry_config
         retry_config (RetryConfig, optional): Configuración consolidada de reintentos. 
                                               Por defecto usa RetryConfig.from_settings()
+        visualize (bool, optional): Guardar la visualización del grafo (según GRAPH_RENDER_MODE).
+                                    False en ejecuciones por lotes
+        deadline_seconds (float, optional): Presupuesto de tiempo de la ejecución. Sustituye al
+                                            de retry_config (RUN_DEADLINE_SECONDS por defecto)
+        profile (str, optional): Perfil del pipeline: fast | standard | thorough. Por defecto
+                                 PIPELINE_PROFILE. Sus límites se usan si no hay retry_config
     """
     # Validar configuración
     if not settings.validate():
@@ -64,6 +89,18 @@ def run_development_workflow(
 
     delete_output_folder()
 
+    if settings.ARTIFACT_STORE_ENABLED:
+        get_artifact_store().start_run()
+
+    if settings.NODE_TOOLCHAIN_ENABLED:
+        try:
+            toolchain = get_node_toolchain()
+            toolchain.require_provisioned()
+            toolchain.link_into(settings.OUTPUT_DIR)
+        except ToolchainError as e:
+            logger.error(f"❌ Toolchain de Node.js no disponible: {e}")
+            return None
+
     prompt_inicial_str = prompt_inicial
     if not isinstance(prompt_inicial_str, str):
         try:
@@ -74,19 +111,21 @@ def run_development_workflow(
         except Exception:
             prompt_inicial_str = str(prompt_inicial)
 
-    guardar_fichero_texto(
-        "0_petición_inicial.txt",
-        prompt_inicial_str,
-        directorio=settings.OUTPUT_DIR
-    )
+    guardar_artefacto("0_petición_inicial.txt", prompt_inicial_str, tipo="request")
 
+    perfil = get_profile(profile)
+    
     # Crear configuración de reintentos
     if retry_config is None:
         # Si se proporciona max_attempts (deprecated), usarlo
         if max_attempts is not None:
             retry_config = RetryConfig(max_attempts=max_attempts)
         else:
-            retry_config = RetryConfig.from_settings()
+            retry_config = perfil.to_retry_config()
+    if deadline_seconds is not None:
+        # Copia: el RetryConfig del llamador puede reutilizarse en otras ejecuciones
+        retry_config = copy.copy(retry_config)
+        retry_config.deadline_seconds = deadline_seconds
     
     # Estado inicial usando RetryConfig
     initial_state = {
@@ -97,10 +136,15 @@ def run_development_workflow(
         "traceback": "",
         "sonarqube_issues": "",
         "sonarqube_passed": False,
+        "sonar_issue_index": None,
+        "convergencia": None,
+        "llm_error": None,
+        "llm_error_retries": 0,
         "tests_unitarios_generados": "",
         "test_regeneration_needed": False,
         "requisito_clarificado": "",
         "requisitos_formales": "",
+        "requisitos_meta": None,
         "codigo_generado": "",
         "azure_pbi_id": None,
         "azure_implementation_task_id": None,
@@ -113,6 +157,12 @@ def run_development_workflow(
         "revision_comentario": "",
         "revision_puntuacion": None,
         "pr_aprobada": False,
+        # Almacén de artefactos
+        "codigo_artifact": None,
+        "deadline_exceeded": False,
+        "pipeline_profile": perfil.name,
+        # Ámbito de la caché de nodos: cada ejecución solo reutiliza sus propios resultados
+        "run_id": uuid.uuid4().hex,
     }
     
     # Agregar configuración de reintentos al estado
@@ -124,28 +174,74 @@ def run_development_workflow(
     logger.info("=" * 55)
     logger.info(f"Prompt Inicial: {prompt_inicial}")
     logger.info(f"Máximo de Intentos: {initial_state['max_attempts']}")
+    logger.info(f"Perfil del pipeline: {perfil.name}")
+    if initial_state['deadline_at']:
+        logger.info(f"Plazo de la ejecución: {retry_config.deadline_seconds:.0f}s")
     logger.info("=" * 55)
 
-    # Crear y compilar el workflow
-    app = create_workflow()
+    # Crear y compilar el workflow (o reutilizar el ya compilado en este proceso)
+    app = get_compiled_workflow(perfil) if settings.COMPILED_WORKFLOW_CACHE_ENABLED else create_workflow(perfil)
     
-    # Visualizar el grafo (si está disponible)
-    visualize_graph(app)
+    # Visualizar el grafo (si está disponible y no se ha deshabilitado)
+    if visualize:
+        visualize_graph(app)
 
     # Acumular el estado a medida que el grafo se ejecuta
     current_final_state = initial_state.copy()
     
     workflow_start = time.time()
 
-    for step, node_output_map in enumerate(app.stream(initial_state), 1):
-        logger.debug(f"===== CICLO DE TRABAJO, PASO {step} =====")
-        
-        # Actualizar el estado acumulado
-        for node_name, delta_dict in node_output_map.items():
-            current_final_state.update(delta_dict)
+    try:
+        with deadline_scope(initial_state['deadline_at']):
+            for step, node_output_map in enumerate(app.stream(initial_state), 1):
+                logger.debug(f"===== CICLO DE TRABAJO, PASO {step} =====")
+                
+                # Actualizar el estado acumulado
+                for node_name, delta_dict in node_output_map.items():
+                    current_final_state.update(delta_dict)
+                
+                # Plazo vencido: terminar con el resultado parcial en vez de seguir con el siguiente nodo
+                if deadline_expired(current_final_state):
+                    logger.warning(f"⏰ Plazo de la ejecución agotado tras el paso {step}: deteniendo el flujo con el resultado parcial")
+                    current_final_state['deadline_exceeded'] = True
+                    break
+    finally:
+        if settings.NODE_CACHE_ENABLED:
+            # Solo los resultados de esta ejecución: las concurrentes conservan los suyos
+            stats_cache = get_node_cache().stats(initial_state['run_id'])
+            discard_node_cache_run(initial_state['run_id'])
 
     workflow_duration = time.time() - workflow_start
 
+    if settings.ARTIFACT_STORE_ENABLED:
+        get_artifact_store().save_index()
+
+    if settings.MODEL_ROUTING_ENABLED:
+        informe_rutas = get_model_router().format_report()
+        if informe_rutas:
+            logger.info("📊 Latencia y coste por ruta de modelo:\n" + informe_rutas)
+
+    if settings.LLM_HEDGING_ENABLED:
+        informe_hedging = get_hedged_caller().format_report()
+        if informe_hedging:
+            logger.info("📊 Peticiones con cobertura (hedging) y p99 de latencia:\n" + informe_hedging)
+
+    if settings.LLM_ERROR_ROUTE_ENABLED:
+        stats_errores = get_error_route_stats()
+        if stats_errores["errores"]:
+            logger.info(
+                f"📊 Fallos del LLM desviados: {stats_errores['errores']} "
+                f"(reintentos: {stats_errores['reintentos']}, abortos: {stats_errores['abortos']}, "
+                f"ejecuciones de nodo evitadas (estimación): {stats_errores['nodos_evitados_estimados']})"
+            )
+
+    if settings.NODE_CACHE_ENABLED:
+        for nodo, stats_nodo in stats_cache.items():
+            logger.info(
+                f"📊 Caché de nodo {nodo}: {stats_nodo['hits']} reutilizados, "
+                f"{stats_nodo['misses']} ejecutados, {stats_nodo['stored']} guardados"
+            )
+
     # El estado final es el estado acumulado después de que el stream ha terminado
     final_state = current_final_state
 
@@ -162,8 +258,14 @@ def run_development_workflow(
     # Mostrar resultado
     validado = final_state.get('validado', False)
     debug_exceeded = final_state.get('debug_attempt_count', 0) >= final_state.get('max_debug_attempts', 5)
+    llm_error = final_state.get('llm_error')
     
-    if debug_exceeded:
+    if final_state.get('deadline_exceeded') and not validado:
+        logger.error("❌ Validación Final: FLUJO DETENIDO - PLAZO AGOTADO (resultado parcial)")
+    elif llm_error:
+        logger.error(f"❌ Validación Final: FLUJO DETENIDO - FALLO DEL LLM en {llm_error.get('node')} ({llm_error.get('kind')})")
+        logger.error(f"   Detalle: {llm_error.get('detail', '')}")
+    elif debug_exceeded:
         logger.error(f"❌ Validación Final: FALLÓ - LÍMITE DE DEPURACIÓN EXCEDIDO")
         logger.info("-" * 40)
         logger.info(f"Intentos de Depuración: {final_state.get('debug_attempt_count')}/{final_state.get('max_debug_attempts')}")
@@ -182,16 +284,11 @@ def run_development_workflow(
         logger.info(f"📝 Código Final Validado")
         logger.debug(f"Código: {final_state['codigo_generado'][:200]}...")
         
-        # Detectar el lenguaje y guardar con la extensión correcta
-        lenguaje, extension, patron_limpieza = detectar_lenguaje_y_extension(
-            final_state.get('requisitos_formales', '')
-        )
+        # Lenguaje y nombre descriptivo precalculados por el Product Owner
+        meta = obtener_requisitos_meta(final_state)
         
         codigo_limpio = limpiar_codigo_markdown(final_state['codigo_generado'])
-        
-        # Extraer nombre descriptivo del archivo desde requisitos formales
-        nombre_base = extraer_nombre_archivo(final_state.get('requisitos_formales', ''))
-        nombre_archivo = f"{nombre_base}{extension}"
+        nombre_archivo = meta.codigo_filename
         
         guardar_fichero_texto(
             nombre_archivo, 
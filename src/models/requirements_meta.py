@@ -0,0 +1,93 @@
+"""
+Metadatos derivados de los requisitos formales (lenguaje, nombres de fichero, framework de tests).
+
+El Product Owner los calcula una vez al generar los requisitos y los guarda en
+state['requisitos_meta']; Developer-Code, Sonar, Developer-UnitTests y main los leen
+del estado en lugar de volver a parsear el JSON de requisitos en cada iteración.
+"""
+
+import json
+from typing import Any, Dict, Optional
+
+from utils.file_manager import FileManager
+
+# Framework y sufijo de tests por lenguaje (el resto usa pytest)
+_TEST_FRAMEWORKS = {
+    "typescript": ("vitest", ".spec.ts"),
+}
+_TEST_FRAMEWORK_POR_DEFECTO = ("pytest", ".spec.py")
+
+
+class ParsedRequirements:
+    """
+    Requisitos formales ya interpretados.
+
+    Uso:
+        >>> meta = obtener_requisitos_meta(state)
+        >>> meta.lenguaje, meta.extension, meta.codigo_filename
+        ('typescript', '.ts', 'calcular_factorial.ts')
+    """
+
+    __slots__ = ("lenguaje", "extension", "nombre_base", "test_framework", "test_extension")
+
+    def __init__(
+        self,
+        lenguaje: str = "python",
+        extension: str = ".py",
+        nombre_base: str = "codigo_generado",
+        test_framework: Optional[str] = None,
+        test_extension: Optional[str] = None
+    ):
+        framework, sufijo = _TEST_FRAMEWORKS.get(lenguaje, _TEST_FRAMEWORK_POR_DEFECTO)
+        self.lenguaje = lenguaje
+        self.extension = extension
+        self.nombre_base = nombre_base
+        self.test_framework = test_framework or framework
+        self.test_extension = test_extension or sufijo
+
+    @classmethod
+    def from_dict(cls, requisitos: Dict[str, Any]) -> "ParsedRequirements":
+        """Construye los metadatos desde los requisitos ya parseados (p. ej. model_dump())"""
+        lenguaje, extension = FileManager.detect_language_from_dict(requisitos)
+        return cls(lenguaje, extension, FileManager.extract_filename_from_dict(requisitos))
+
+    @classmethod
+    def from_json(cls, requisitos_formales: str) -> "ParsedRequirements":
+        """Construye los metadatos desde el JSON de requisitos (valores por defecto si no es válido)"""
+        try:
+            requisitos = json.loads(requisitos_formales or '{}')
+        except json.JSONDecodeError:
+            requisitos = {}
+        return cls.from_dict(requisitos if isinstance(requisitos, dict) else {})
+
+    @classmethod
+    def from_state(cls, data: Dict[str, Any]) -> "ParsedRequirements":
+        """Reconstruye los metadatos guardados en el estado"""
+        return cls(**{campo: data[campo] for campo in cls.__slots__ if campo in data})
+
+    def to_state(self) -> Dict[str, Any]:
+        """Forma serializable para guardar en el estado"""
+        return {campo: getattr(self, campo) for campo in self.__slots__}
+
+    @property
+    def codigo_filename(self) -> str:
+        return f"{self.nombre_base}{self.extension}"
+
+    @property
+    def test_filename(self) -> str:
+        return f"{self.nombre_base}{self.test_extension}"
+
+
+def obtener_requisitos_meta(state: Dict[str, Any]) -> ParsedRequirements:
+    """
+    Metadatos de los requisitos del estado.
+
+    Si el estado no los tiene (p. ej. se reanudó desde un estado antiguo) se calculan
+    desde requisitos_formales y se guardan para las siguientes iteraciones.
+    """
+    data = state.get('requisitos_meta')
+    if data:
+        return ParsedRequirements.from_state(data)
+    meta = ParsedRequirements.from_json(state.get('requisitos_formales', ''))
+    state['requisitos_meta'] = meta.to_state()
+    return meta
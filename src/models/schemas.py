@@ -98,3 +98,34 @@ class FormalRequirementsWithAzure(FormalRequirements):
         default=None,
         description="Metadatos de integración con Azure DevOps"
     )
+
+
+class CodeReviewVerdict(BaseModel):
+    """Veredicto estructurado del Developer2-Reviewer sobre el código de la PR."""
+    
+    aprobado: bool = Field(
+        description="true si el código tiene calidad aceptable y la PR puede aprobarse."
+    )
+    puntuacion: int = Field(
+        description="Puntuación de calidad del 1 al 10."
+    )
+    aspectos_positivos: list[str] = Field(
+        description="Lista de puntos positivos del código y los tests."
+    )
+    aspectos_mejorar: list[str] = Field(
+        description="Lista de aspectos a mejorar (vacía si no hay ninguno)."
+    )
+    comentario_revision: str = Field(
+        description="Comentario general de la revisión para la PR."
+    )
+
+
+class StakeholderVerdict(BaseModel):
+    """Veredicto estructurado del Stakeholder sobre la validación de negocio."""
+    
+    validado: bool = Field(
+        description="true solo si el código cumple el 100% de los requisitos formales."
+    )
+    motivo: str = Field(
+        description="Justificación del veredicto. Si no está validado, la desviación concreta respecto a los requisitos formales."
+    )
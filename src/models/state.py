@@ -21,7 +21,9 @@ class AgentState(TypedDict):
     # Datos del proyecto
     requisito_clarificado: str
     requisitos_formales: str  # JSON de Pydantic
+    requisitos_meta: dict | None  # Lenguaje, nombres de fichero y framework de tests (ParsedRequirements)
     codigo_generado: str
+    codigo_artifact: str | None  # Handle del código en el almacén de artefactos (si está habilitado)
 
     # Azure DevOps Integration
     azure_pbi_id: int | None  # ID del PBI padre creado en Azure DevOps
@@ -37,6 +39,7 @@ class AgentState(TypedDict):
     sonarqube_passed: bool  # Si el análisis de calidad pasó
     sonarqube_attempt_count: int  # Contador de intentos de corrección de SonarQube
     max_sonarqube_attempts: int  # Máximo de intentos de corrección de calidad
+    sonar_issue_index: dict | None  # Huellas de issues por intento (SONAR_ISSUE_DELTA_ENABLED)
 
     # Unit Tests Generation
     tests_unitarios_generados: str  # Tests unitarios generados (vitest/pytest)
@@ -54,6 +57,15 @@ class AgentState(TypedDict):
     # Code Review Limits
     revisor_attempt_count: int  # Contador de intentos de revisión de código
     max_revisor_attempts: int  # Máximo de intentos de revisión antes de fallo
+    convergencia: dict | None  # Huellas por bucle de corrección (CONVERGENCE_MONITOR_ENABLED)
+
+    # Errores del LLM (LLM_ERROR_ROUTE_ENABLED)
+    llm_error: dict | None  # Fallo de la última llamada: tipo, detalle, nodo y acción (reintento/fin)
+    llm_error_retries: int  # Reintentos seguidos tras fallos del LLM
+    pipeline_profile: str  # Perfil del pipeline: fast | standard | thorough
+    deadline_at: float | None  # Instante límite de la ejecución (time.time()); None = sin plazo
+    deadline_exceeded: bool  # El flujo se detuvo al vencer el plazo (resultado parcial)
+    run_id: str  # Identificador de la ejecución (ámbito de la caché de nodos)
 
     # Validación
     validado: bool
@@ -10,7 +10,8 @@ from typing import Optional, Dict, Any, Tuple
 from models.state import AgentState
 from models.schemas import AzureDevOpsMetadata
 from tools.azure_devops_integration import AzureDevOpsClient, estimate_story_points, estimate_effort_hours
-from tools.file_utils import detectar_lenguaje_y_extension, extraer_nombre_archivo, limpiar_codigo_markdown
+from tools.file_utils import limpiar_codigo_markdown
+from models.requirements_meta import obtener_requisitos_meta
 from config.settings import settings
 from config.prompt_templates import PromptTemplates
 from utils.logger import setup_logger
@@ -631,14 +632,8 @@ class AzureDevOpsService:
             return False
         
         try:
-            # Detectar lenguaje y construir path
-            lenguaje, extension, patron_limpieza = detectar_lenguaje_y_extension(
-                state.get('requisitos_formales', '')
-            )
-            
-            # Extraer nombre descriptivo del archivo
-            nombre_base = extraer_nombre_archivo(state.get('requisitos_formales', ''))
-            nombre_archivo = f"{nombre_base}{extension}"
+            # Construir path con el nombre precalculado desde los requisitos
+            nombre_archivo = obtener_requisitos_meta(state).codigo_filename
             codigo_path = os.path.join(settings.OUTPUT_DIR, nombre_archivo)
             
             # Si el archivo no existe, crearlo desde el estado
@@ -870,6 +865,7 @@ class AzureDevOpsService:
         
         try:
             from llm.gemini_client import call_gemini
+            from llm.model_router import get_model_router
             from config.prompts import Prompts
             import json
             import time
@@ -904,7 +900,7 @@ class AzureDevOpsService:
             )
             
             # Llamar al LLM con el prompt formateado
-            release_note = call_gemini(prompt_formateado, "")
+            release_note = get_model_router().call("release_notes", prompt_formateado, call_gemini)
             
             duration = time.time() - start_time
             logger.info(f"⏱️  Release Note generado en {duration:.2f}s")
@@ -0,0 +1,162 @@
+"""
+Commits con comandos plumbing de git sobre el repositorio local (GITHUB_REPO_PATH).
+
+En lugar de crear blobs, trees, commits y refs con la API REST de GitHub (una
+petición por objeto), los objetos se escriben en el repositorio local con
+hash-object / write-tree / commit-tree y se publican con un único `git push`.
+Se usa un índice temporal (GIT_INDEX_FILE), así que ni el working tree ni el
+índice del usuario se modifican.
+"""
+
+import os
+import subprocess
+import tempfile
+from typing import Dict, List, Optional
+
+from utils.logger import setup_logger
+from config.settings import settings
+
+logger = setup_logger(__name__, level=settings.get_log_level())
+
+
+class GitPlumbingError(Exception):
+    """Error al ejecutar un comando git"""
+    pass
+
+
+class LocalGitRepository:
+    """
+    Repositorio git local sobre el que se construyen commits sin checkout.
+
+    Uso:
+        >>> repo = LocalGitRepository(settings.GITHUB_REPO_PATH)
+        >>> sha = repo.commit_files("feature/x", {"src/a.ts": "..."}, "feat: a", base_branch="main")
+        >>> repo.push_branch("feature/x")
+    """
+
+    def __init__(self, repo_path: str, remote: str = None, timeout: float = 120):
+        """
+        Args:
+            repo_path: Ruta del repositorio (working tree o repositorio bare)
+            remote: Remoto al que se hace push. Por defecto GITHUB_REMOTE_NAME
+            timeout: Segundos máximos por comando git
+        """
+        self.repo_path = repo_path
+        self.remote = remote or settings.GITHUB_REMOTE_NAME
+        self.timeout = timeout
+        self._fetched_base: set = set()
+
+    def _git(self, *args: str, input: Optional[str] = None, env: Optional[Dict[str, str]] = None) -> str:
+        """Ejecuta git en el repositorio y devuelve stdout; lanza GitPlumbingError si falla"""
+        try:
+            result = subprocess.run(
+                ["git", "-C", self.repo_path, *args],
+                # Bytes: en Windows el modo texto convertiría '\n' en '\r\n' dentro de los blobs
+                input=input.encode("utf-8") if input is not None else None,
+                capture_output=True,
+                env={**os.environ, **env} if env else None,
+                timeout=self.timeout,
+                check=False
+            )
+        except (OSError, subprocess.TimeoutExpired) as e:
+            raise GitPlumbingError(f"git {args[0]}: {e}") from e
+        if result.returncode != 0:
+            stderr = result.stderr.decode("utf-8", errors="replace").strip()
+            raise GitPlumbingError(f"git {' '.join(args)}: {stderr}")
+        return result.stdout.decode("utf-8", errors="replace")
+
+    def is_repository(self) -> bool:
+        """Indica si repo_path es un repositorio git"""
+        try:
+            self._git("rev-parse", "--git-dir")
+            return True
+        except GitPlumbingError:
+            return False
+
+    def resolve(self, ref: str) -> Optional[str]:
+        """SHA del commit al que apunta ref, o None si no existe"""
+        try:
+            return self._git("rev-parse", "--verify", "--quiet", f"{ref}^{{commit}}").strip() or None
+        except GitPlumbingError:
+            return None
+
+    def _base_sha(self, base_branch: str) -> str:
+        """
+        SHA del branch base en el remoto. Se hace fetch una sola vez por instancia;
+        si el remoto no responde se usa el branch local o el de seguimiento.
+        """
+        if base_branch not in self._fetched_base:
+            try:
+                self._git("fetch", "--quiet", self.remote, f"refs/heads/{base_branch}:refs/remotes/{self.remote}/{base_branch}")
+                self._fetched_base.add(base_branch)
+            except GitPlumbingError as e:
+                logger.warning(f"⚠️ No se pudo hacer fetch de '{base_branch}': {e}")
+
+        for ref in (f"refs/remotes/{self.remote}/{base_branch}", f"refs/heads/{base_branch}"):
+            sha = self.resolve(ref)
+            if sha:
+                return sha
+        raise GitPlumbingError(f"Branch base '{base_branch}' no encontrado en {self.repo_path}")
+
+    def commit_files(self, branch: str, files: Dict[str, str], message: str, base_branch: str = None) -> str:
+        """
+        Crea un commit con los ficheros indicados sobre el branch (o sobre el base si no existe).
+
+        Args:
+            branch: Branch destino (se crea si no existe)
+            files: {ruta_relativa: contenido}
+            message: Mensaje del commit
+            base_branch: Branch del que parte un branch nuevo. Por defecto GITHUB_BASE_BRANCH
+
+        Returns:
+            SHA del nuevo commit
+        """
+        base_branch = base_branch or settings.GITHUB_BASE_BRANCH
+        parent = self.resolve(f"refs/heads/{branch}") or self._base_sha(base_branch)
+
+        fd, index_path = tempfile.mkstemp(prefix="git-index-")
+        os.close(fd)
+        os.remove(index_path)  # git crea el índice; un fichero vacío no es un índice válido
+        env = {"GIT_INDEX_FILE": index_path}
+        try:
+            self._git("read-tree", parent, env=env)
+            entries: List[str] = []
+            for path, content in files.items():
+                blob = self._git("hash-object", "-w", "--stdin", f"--path={path}", input=content).strip()
+                entries.append(f"100644 {blob}\t{path.replace(os.sep, '/')}")
+            self._git("update-index", "--add", "--index-info", input="\n".join(entries) + "\n", env=env)
+            tree = self._git("write-tree", env=env).strip()
+        finally:
+            if os.path.exists(index_path):
+                os.remove(index_path)
+
+        commit = self._git("commit-tree", tree, "-p", parent, "-F", "-", input=message).strip()
+        self._git("update-ref", f"refs/heads/{branch}", commit)
+        logger.debug(f"📝 Commit local {commit[:7]} en '{branch}' ({len(files)} fichero(s))")
+        return commit
+
+    def push_branch(self, branch: str) -> None:
+        """Publica el branch en el remoto con un único push (forzado, como ref.edit(force=True))"""
+        self._git("push", "--quiet", self.remote, f"+refs/heads/{branch}:refs/heads/{branch}")
+        logger.info(f"⬆️ Push de '{branch}' a {self.remote}")
+
+    def delete_branch(self, branch: str, base_branch: str = None) -> bool:
+        """
+        Borra el branch local. Si es el branch actual del working tree, antes vuelve al base.
+
+        Returns:
+            True si el branch existía y se borró
+        """
+        base_branch = base_branch or settings.GITHUB_BASE_BRANCH
+        if branch == base_branch:
+            raise GitPlumbingError(f"Se omitió borrado de branch local base: {branch}")
+        if self.resolve(f"refs/heads/{branch}") is None:
+            return False
+        try:
+            current = self._git("symbolic-ref", "--quiet", "--short", "HEAD").strip()
+        except GitPlumbingError:
+            current = ""
+        if current == branch:
+            self._git("checkout", "--quiet", base_branch)
+        self._git("update-ref", "-d", f"refs/heads/{branch}")
+        return True
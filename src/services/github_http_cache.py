@@ -0,0 +1,151 @@
+"""
+Caché HTTP condicional (ETag / If-None-Match) para el cliente de PyGithub.
+
+Cada GET se guarda junto con su ETag. La siguiente petición a la misma URL envía
+If-None-Match y, si el recurso no ha cambiado, GitHub responde 304 sin cuerpo: la
+respuesta se sirve desde la caché y no consume cuota del rate limit primario.
+
+Además registra el rate limit restante que PyGithub lee de las cabeceras de cada
+respuesta, para poder frenar antes de llegar a los límites secundarios.
+"""
+
+import copy
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from config.settings import settings
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__, level=settings.get_log_level())
+
+
+class _CachedResponse:
+    """Respuesta GET almacenada con sus validadores"""
+
+    __slots__ = ("etag", "last_modified", "headers", "data")
+
+    def __init__(self, etag: Optional[str], last_modified: Optional[str], headers: Dict[str, Any], data: Any):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.headers = headers
+        self.data = data
+
+
+def _header(headers: Dict[str, Any], name: str) -> Optional[str]:
+    """Lee una cabecera sin distinguir mayúsculas (requests/PyGithub las normalizan distinto)"""
+    for key, value in (headers or {}).items():
+        if key.lower() == name:
+            return value
+    return None
+
+
+class GitHubConditionalCache:
+    """
+    Caché LRU de respuestas GET de la API de GitHub con revalidación por ETag.
+
+    Uso:
+        >>> cache = GitHubConditionalCache()
+        >>> cache.install(Github(token).requester)
+    """
+
+    def __init__(self, max_entries: int = None, warn_threshold: int = None):
+        """
+        Args:
+            max_entries: Respuestas máximas en memoria. Por defecto GITHUB_HTTP_CACHE_MAX_ENTRIES
+            warn_threshold: Aviso cuando quedan menos peticiones. Por defecto GITHUB_RATE_LIMIT_WARN_THRESHOLD
+        """
+        self.max_entries = max_entries if max_entries is not None else settings.GITHUB_HTTP_CACHE_MAX_ENTRIES
+        self.warn_threshold = warn_threshold if warn_threshold is not None else settings.GITHUB_RATE_LIMIT_WARN_THRESHOLD
+        self._entries: "OrderedDict[Tuple, _CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0  # 304 servidos desde la caché
+        self.misses = 0  # GET con cuerpo (nuevos o modificados)
+        self.rate_limit_remaining: Optional[int] = None
+        self.rate_limit_limit: Optional[int] = None
+        self._warned = False
+
+    @staticmethod
+    def _key(url: str, parameters: Optional[Dict[str, Any]], headers: Optional[Dict[str, str]]) -> Tuple:
+        params = tuple(sorted((parameters or {}).items()))
+        accept = _header(headers or {}, "accept") or ""
+        return (url, params, accept)
+
+    def _lookup(self, key: Tuple) -> Optional[_CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _store(self, key: Tuple, entry: _CachedResponse) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _track_rate_limit(self, requester) -> None:
+        """Actualiza el rate limit con lo que PyGithub leyó de la última respuesta (sin petición extra)"""
+        remaining, limit = getattr(requester, "rate_limiting", (-1, -1))
+        if remaining is None or remaining < 0:
+            return
+        self.rate_limit_remaining, self.rate_limit_limit = remaining, limit
+        if remaining < self.warn_threshold and not self._warned:
+            self._warned = True
+            logger.warning(f"⚠️ Rate limit de GitHub bajo: quedan {remaining}/{limit} peticiones")
+        elif remaining >= self.warn_threshold:
+            self._warned = False
+
+    def install(self, requester) -> None:
+        """Envuelve requestJsonAndCheck del requester para añadir la revalidación condicional"""
+        original = requester.requestJsonAndCheck
+
+        def request_json_and_check(verb, url, parameters=None, headers=None, input=None, **kwargs):
+            if verb != "GET" or input is not None:
+                try:
+                    return original(verb, url, parameters, headers, input, **kwargs)
+                finally:
+                    self._track_rate_limit(requester)
+
+            key = self._key(url, parameters, headers)
+            entry = self._lookup(key)
+            request_headers = dict(headers or {})
+            if entry is not None:
+                if entry.etag:
+                    request_headers["If-None-Match"] = entry.etag
+                if entry.last_modified:
+                    request_headers["If-Modified-Since"] = entry.last_modified
+
+            try:
+                response_headers, data = original(verb, url, parameters, request_headers, input, **kwargs)
+            finally:
+                self._track_rate_limit(requester)
+
+            # 304 Not Modified: PyGithub devuelve cuerpo vacío; se sirve la copia guardada
+            if entry is not None and data is None:
+                with self._lock:
+                    self.hits += 1
+                logger.debug(f"♻️ GitHub 304 (caché): {url}")
+                return entry.headers, copy.deepcopy(entry.data)
+
+            with self._lock:
+                self.misses += 1
+            etag = _header(response_headers, "etag")
+            last_modified = _header(response_headers, "last-modified")
+            if etag or last_modified:
+                self._store(key, _CachedResponse(etag, last_modified, response_headers, copy.deepcopy(data)))
+            return response_headers, data
+
+        requester.requestJsonAndCheck = request_json_and_check
+
+    def stats(self) -> Dict[str, Any]:
+        """Estadísticas de la caché y último rate limit conocido"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "rate_limit_remaining": self.rate_limit_remaining,
+                "rate_limit_limit": self.rate_limit_limit
+            }
@@ -9,8 +9,10 @@ import base64
 import time
 import re
 from datetime import datetime
-from typing import Optional, Dict, Any, Tuple
+from typing import Optional, Dict, Any, List, Tuple
 from config.settings import settings
+from services.github_http_cache import GitHubConditionalCache
+from services.git_plumbing import LocalGitRepository, GitPlumbingError
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__, level=settings.get_log_level())
@@ -23,6 +25,59 @@ except ImportError:
     GITHUB_AVAILABLE = False
     logger.warning("⚠️ PyGithub no está instalado. Ejecuta: pip install PyGithub")
 
+DIFF_MEDIA_TYPE = "application/vnd.github.v3.diff"
+
+
+def _parse_new_files_from_diff(diff_text: str) -> Tuple[Dict[str, str], List[str]]:
+    """
+    Reconstruye el contenido de los ficheros AÑADIDOS a partir del diff unificado de una PR.
+
+    En un fichero nuevo todas las líneas del hunk empiezan por '+', así que el diff
+    contiene el fichero completo. Para el resto (modificados, renombrados, binarios)
+    el diff no basta y se devuelven aparte para descargarlos individualmente.
+
+    Returns:
+        (ficheros_nuevos {ruta: contenido}, rutas_a_descargar)
+    """
+    nuevos: Dict[str, str] = {}
+    pendientes: List[str] = []
+
+    for bloque in re.split(r'^diff --git ', diff_text, flags=re.MULTILINE)[1:]:
+        lineas = bloque.split('\n')
+        destino = None
+        for linea in lineas[1:]:
+            if linea.startswith('+++ '):
+                destino = linea[4:]
+                break
+            if linea.startswith('@@') or linea.startswith('Binary files'):
+                break
+        if '\ndeleted file mode' in bloque or destino == '/dev/null':
+            continue
+        if destino is None:
+            # Sin hunks (renombrado puro, cambio de modo o binario): la ruta está en la cabecera
+            cabecera = re.match(r'a/.* b/(.*)$', lineas[0])
+            if cabecera:
+                pendientes.append(cabecera.group(1))
+            continue
+        ruta = destino[2:] if destino.startswith('b/') else destino
+        if '\nnew file mode' not in bloque:
+            pendientes.append(ruta)
+            continue
+
+        contenido: List[str] = []
+        sin_salto_final = False
+        en_hunk = False
+        for linea in lineas:
+            if linea.startswith('@@'):
+                en_hunk = True
+            elif en_hunk and linea.startswith('+'):
+                contenido.append(linea[1:])
+            elif en_hunk and linea.startswith('\\'):
+                sin_salto_final = True
+        nuevos[ruta] = '\n'.join(contenido) + ('' if sin_salto_final or not contenido else '\n')
+
+    return nuevos, pendientes
+
 
 class GitHubService:
     """
@@ -37,10 +92,14 @@ class GitHubService:
         self.repo = None
         self._reviewer_client = None
         self._reviewer_repo = None
+        self.http_cache = GitHubConditionalCache() if settings.GITHUB_HTTP_CACHE_ENABLED else None
+        self._local_git = None
         
         if self.enabled:
             try:
                 self.client = Github(settings.GITHUB_TOKEN)
+                if self.http_cache is not None:
+                    self.http_cache.install(self.client.requester)
                 self.repo = self.client.get_repo(f"{settings.GITHUB_OWNER}/{settings.GITHUB_REPO}")
                 logger.info(f"✅ GitHub Service inicializado para {settings.GITHUB_OWNER}/{settings.GITHUB_REPO}")
             except Exception as e:
@@ -57,7 +116,13 @@ class GitHubService:
 
         try:
             self._reviewer_client = Github(reviewer_token)
-            self._reviewer_repo = self._reviewer_client.get_repo(f"{settings.GITHUB_OWNER}/{settings.GITHUB_REPO}")
+            if settings.GITHUB_HTTP_CACHE_ENABLED:
+                # Caché propia: el reviewer puede ver el repo con otros permisos
+                GitHubConditionalCache().install(self._reviewer_client.requester)
+            # lazy=True: el repo ya se resolvió con el cliente principal, no hace falta otro GET
+            self._reviewer_repo = self._reviewer_client.get_repo(
+                f"{settings.GITHUB_OWNER}/{settings.GITHUB_REPO}", lazy=True
+            )
             logger.info("✅ GitHub Reviewer client inicializado (cuenta distinta)")
             return self._reviewer_repo
         except Exception as e:
@@ -86,6 +151,30 @@ class GitHubService:
 
     def sanitize_branch_name(self, branch_name: str) -> str:
         return self._sanitize_branch_name(branch_name)
+
+    @property
+    def local_git(self) -> LocalGitRepository:
+        """Repositorio local (GITHUB_REPO_PATH) usado para commits en modo local (lazy)"""
+        if self._local_git is None or self._local_git.repo_path != settings.GITHUB_REPO_PATH:
+            self._local_git = LocalGitRepository(settings.GITHUB_REPO_PATH)
+        return self._local_git
+
+    def delete_local_branch(self, branch_name: str) -> bool:
+        """
+        Borra el branch del repositorio local (GITHUB_REPO_PATH), si existe.
+        
+        Returns:
+            bool: True si se borró
+        """
+        sanitized = self._sanitize_branch_name(branch_name)
+        if not self.local_git.is_repository():
+            logger.warning(f"⚠️ No es un repositorio git: {settings.GITHUB_REPO_PATH}")
+            return False
+        if self.local_git.delete_branch(sanitized, settings.GITHUB_BASE_BRANCH):
+            logger.info(f"🧹 Branch local eliminado: {sanitized}")
+            return True
+        logger.debug(f"ℹ️ Branch local no existe, omitiendo borrado: {sanitized}")
+        return False
     
     def create_branch_and_commit(
         self,
@@ -113,6 +202,9 @@ class GitHubService:
         if branch_name != original_branch_name:
             logger.warning(f"⚠️ Nombre de branch inválido ajustado: '{original_branch_name}' -> '{branch_name}'")
         
+        if settings.GITHUB_COMMIT_MODE == "local":
+            return self._create_branch_and_commit_local(branch_name, files, commit_message)
+        
         try:
             # Obtener el SHA del branch base
             base_branch = self.repo.get_branch(settings.GITHUB_BASE_BRANCH)
@@ -193,6 +285,27 @@ class GitHubService:
             logger.error(f"❌ Error al crear branch y commit: {type(e).__name__}: {e}")
             return False, None
     
+    def _create_branch_and_commit_local(
+        self,
+        branch_name: str,
+        files: Dict[str, str],
+        commit_message: str
+    ) -> Tuple[bool, Optional[str]]:
+        """
+        Igual que create_branch_and_commit pero construyendo el commit con git plumbing
+        en el repositorio local y publicándolo con un único push (sin llamadas a la API).
+        """
+        try:
+            commit_sha = self.local_git.commit_files(
+                branch_name, files, commit_message, base_branch=settings.GITHUB_BASE_BRANCH
+            )
+            self.local_git.push_branch(branch_name)
+            logger.info(f"✅ Commit creado (git local): {commit_sha[:7]} - {commit_message}")
+            return True, commit_sha
+        except GitPlumbingError as e:
+            logger.error(f"❌ Error git al crear branch y commit: {e}")
+            return False, None
+    
     def create_pull_request(
         self,
         branch_name: str,
@@ -389,12 +502,14 @@ class GitHubService:
             target_repo = reviewer_repo or self.repo
             pr = target_repo.get_pull(pr_number)
 
-            # GitHub puede tardar en calcular mergeable (None). Reintentar brevemente.
-            for _ in range(5):
-                if pr.mergeable is not None:
-                    break
-                time.sleep(1)
-                pr = target_repo.get_pull(pr_number)
+            # GitHub puede tardar en calcular mergeable (None). Se revalida la PR con un GET
+            # condicional (ETag): mientras no cambie, GitHub responde 304 sin gastar cuota.
+            deadline = time.monotonic() + settings.GITHUB_MERGEABLE_POLL_TIMEOUT
+            delay = 0.5
+            while pr.mergeable is None and time.monotonic() < deadline:
+                time.sleep(min(delay, max(0.0, deadline - time.monotonic())))
+                pr.update()
+                delay = min(delay * 2, 4.0)
 
             if pr.mergeable is not True:
                 logger.warning(f"⚠️ PR #{pr_number} no es mergeable")
@@ -474,14 +589,21 @@ class GitHubService:
         
         try:
             pr = self.repo.get_pull(pr_number)
-            files = {}
             
-            for file in pr.get_files():
-                if file.status != "removed":
-                    # Obtener contenido del archivo
-                    content = self.repo.get_contents(file.filename, ref=pr.head.sha)
-                    if hasattr(content, 'decoded_content'):
-                        files[file.filename] = content.decoded_content.decode('utf-8')
+            # Una sola petición al diff de la PR: los ficheros nuevos salen completos de ahí
+            diff = self._get_pr_diff(pr)
+            if diff is not None:
+                files, pendientes = _parse_new_files_from_diff(diff)
+                logger.debug(f"📄 {len(files)} fichero(s) obtenidos del diff, {len(pendientes)} pendiente(s)")
+            else:
+                files = {}
+                pendientes = [file.filename for file in pr.get_files() if file.status != "removed"]
+            
+            for filename in pendientes:
+                # Obtener contenido del archivo
+                content = self.repo.get_contents(filename, ref=pr.head.sha)
+                if hasattr(content, 'decoded_content'):
+                    files[filename] = content.decoded_content.decode('utf-8')
             
             return files
             
@@ -489,6 +611,41 @@ class GitHubService:
             logger.error(f"❌ Error al obtener archivos de PR: {e}")
             return {}
 
+    
+    def _get_pr_diff(self, pr) -> Optional[str]:
+        """
+        Descarga el diff unificado de una PR (Accept: application/vnd.github.v3.diff).
+        
+        Returns:
+            Texto del diff o None si GitHub no lo devuelve (ej: diff demasiado grande)
+        """
+        try:
+            status, _, diff = self.client.requester.requestJson(
+                "GET", pr.url, headers={"Accept": DIFF_MEDIA_TYPE}
+            )
+        except Exception as e:
+            logger.debug(f"No se pudo obtener el diff de la PR: {e}")
+            return None
+        if status != 200 or not isinstance(diff, str):
+            logger.debug(f"Diff de la PR no disponible (HTTP {status}), se descargan los ficheros uno a uno")
+            return None
+        return diff
+    
+    def get_rate_limit_status(self) -> Dict[str, Any]:
+        """
+        Rate limit restante según las cabeceras de la última respuesta (no hace peticiones)
+        y estadísticas de la caché condicional si está habilitada.
+        """
+        if not self.enabled or self.client is None:
+            return {}
+        status: Dict[str, Any] = {}
+        if self.http_cache is not None:
+            status.update(self.http_cache.stats())
+        else:
+            remaining, limit = self.client.rate_limiting
+            status.update({"rate_limit_remaining": remaining, "rate_limit_limit": limit})
+        return status
+
 
 # Instancia global del servicio
 github_service = GitHubService()
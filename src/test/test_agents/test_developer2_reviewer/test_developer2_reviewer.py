@@ -152,7 +152,7 @@ class TestDeveloper2ReviewerNode:
                 "comentario_revision": "OK"
             })
             
-            with patch('agents.developer2_reviewer.guardar_fichero_texto') as mock_guardar:
+            with patch('agents.developer2_reviewer.guardar_artefacto') as mock_guardar:
                 with patch('agents.developer2_reviewer.github_service') as mock_github:
                     mock_github.approve_pull_request.return_value = True
                     
@@ -162,3 +162,25 @@ class TestDeveloper2ReviewerNode:
                     filename = mock_guardar.call_args[0][0]
                     assert 'req2' in filename
                     assert 'APROBADO' in filename
+    
+    def test_reviewer_pide_salida_estructurada(self, mock_state, mock_file_utils, monkeypatch):
+        """Verifica que la llamada al LLM usa el schema CodeReviewVerdict"""
+        from config.settings import settings
+        from models.schemas import CodeReviewVerdict
+        monkeypatch.setattr(settings, 'GITHUB_ENABLED', True)
+        
+        mock_state['github_pr_number'] = 123
+        
+        with patch('agents.developer2_reviewer.call_gemini') as mock_gemini:
+            mock_gemini.return_value = json.dumps({
+                "aprobado": True,
+                "puntuacion": 8,
+                "aspectos_positivos": [],
+                "aspectos_mejorar": [],
+                "comentario_revision": "OK"
+            })
+            
+            with patch('agents.developer2_reviewer.github_service'):
+                developer2_reviewer_node(mock_state)
+                
+                assert mock_gemini.call_args[1]['response_schema'] is CodeReviewVerdict
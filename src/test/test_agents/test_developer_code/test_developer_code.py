@@ -1,6 +1,7 @@
 import pytest
 from unittest.mock import Mock, patch, MagicMock
 from models.state import AgentState
+from models.requirements_meta import ParsedRequirements
 from agents.developer_code import developer_code_node
 
 
@@ -39,33 +40,81 @@ class TestDeveloperCodeNode:
             assert result['codigo_generado'] is not None
     
     def test_developer_code_detecta_lenguaje_correctamente(self, mock_state, mock_settings):
-        with patch('agents.developer_code.detectar_lenguaje_y_extension') as mock_detectar:
-            mock_detectar.return_value = ('typescript', '.ts', None)
-            with patch('agents.developer_code.guardar_fichero_texto', return_value=True):
-                with patch('agents.developer_code.limpiar_codigo_markdown', side_effect=lambda x: x):
-                    with patch('agents.developer_code.call_gemini') as mock_gemini:
-                        mock_gemini.return_value = 'function suma(a, b) { return a + b; }'
-                        
-                        result = developer_code_node(mock_state)
-                        
-                        mock_detectar.assert_called_once()
+        mock_state['requisitos_meta'] = ParsedRequirements('typescript', '.ts', 'suma').to_state()
+        
+        with patch('agents.developer_code.guardar_artefacto', return_value=None) as mock_guardar:
+            with patch('agents.developer_code.limpiar_codigo_markdown', side_effect=lambda x: x):
+                with patch('agents.developer_code.call_gemini') as mock_gemini:
+                    mock_gemini.return_value = 'function suma(a, b) { return a + b; }'
+                    
+                    developer_code_node(mock_state)
+                    
+                    assert mock_guardar.call_args[0][0].endswith('.ts')
+    
+    def test_developer_code_calcula_metadatos_si_faltan_en_estado(self, mock_state, mock_settings):
+        """Verifica que sin requisitos_meta se derivan una vez de requisitos_formales"""
+        mock_state['requisitos_formales'] = '{"lenguaje_version": "TypeScript 5", "nombre_funcion": "suma"}'
+        
+        with patch('agents.developer_code.guardar_artefacto', return_value=None):
+            with patch('agents.developer_code.limpiar_codigo_markdown', side_effect=lambda x: x):
+                with patch('agents.developer_code.call_gemini', return_value='function suma() {}'):
+                    result = developer_code_node(mock_state)
+        
+        assert result['requisitos_meta']['lenguaje'] == 'typescript'
+        assert result['requisitos_meta']['nombre_base'] == 'suma'
     
     def test_developer_code_guarda_archivo_con_nombre_correcto(self, mock_state, mock_settings):
         mock_state['attempt_count'] = 2
         mock_state['debug_attempt_count'] = 1
         mock_state['sonarqube_attempt_count'] = 3
         
-        with patch('agents.developer_code.guardar_fichero_texto') as mock_guardar:
-            with patch('agents.developer_code.detectar_lenguaje_y_extension', return_value=('python', '.py', None)):
-                with patch('agents.developer_code.limpiar_codigo_markdown', side_effect=lambda x: x):
-                    with patch('agents.developer_code.call_gemini') as mock_gemini:
-                        mock_gemini.return_value = 'def test(): pass'
-                        
-                        developer_code_node(mock_state)
-                        
-                        mock_guardar.assert_called()
-                        filename = mock_guardar.call_args[0][0]
-                        assert 'req2_debug1_sq3' in filename
+        with patch('agents.developer_code.guardar_artefacto') as mock_guardar:
+            with patch('agents.developer_code.limpiar_codigo_markdown', side_effect=lambda x: x):
+                with patch('agents.developer_code.call_gemini') as mock_gemini:
+                    mock_gemini.return_value = 'def test(): pass'
+                    
+                    developer_code_node(mock_state)
+                    
+                    mock_guardar.assert_called()
+                    filename = mock_guardar.call_args[0][0]
+                    assert 'req2_debug1_sq3' in filename
+                    assert filename.endswith('.py')
+    
+    def test_developer_code_multi_candidato_usa_mejor_candidata(self, mock_state, mock_file_utils, mock_settings, monkeypatch):
+        """Verifica que con DEVELOPER_CANDIDATES > 1 se usa la candidata seleccionada"""
+        monkeypatch.setattr(mock_settings, 'DEVELOPER_CANDIDATES', 3)
+        mejor = Mock()
+        mejor.respuesta_llm = 'def suma(a, b):\n    return a + b'
+        
+        with patch('agents.developer_code.seleccionar_mejor_candidato', return_value=mejor) as mock_selector:
+            with patch('agents.developer_code.call_gemini') as mock_gemini:
+                result = developer_code_node(mock_state)
+                
+                mock_gemini.assert_not_called()
+                assert mock_selector.call_args[0][1] == 3
+                assert result['codigo_generado'] == mejor.respuesta_llm
+    
+    def test_developer_code_candidatas_usan_la_generacion_del_agente(self, mock_state, mock_file_utils, mock_settings, monkeypatch):
+        """Verifica que cada candidata se genera por el router con las opciones de convergencia"""
+        monkeypatch.setattr(mock_settings, 'DEVELOPER_CANDIDATES', 2)
+        
+        def selector(prompt, n, generar, **kwargs):
+            mejor = Mock()
+            mejor.respuesta_llm = generar(prompt)
+            return mejor
+        
+        router = Mock()
+        router.call.return_value = 'def suma(a, b):\n    return a + b'
+        with patch('agents.developer_code.seleccionar_mejor_candidato', side_effect=selector), \
+             patch('agents.developer_code.get_model_router', return_value=router), \
+             patch('agents.developer_code._evaluar_convergencia', return_value=("", {"temperature": 0.9})):
+            monkeypatch.setattr(mock_settings, 'CONVERGENCE_MONITOR_ENABLED', True)
+            result = developer_code_node(mock_state)
+        
+        assert router.call.call_args[0][0] == "developer"
+        assert router.call.call_args[1]['temperature'] == 0.9
+        assert router.call.call_args[1]['validate'] is not None
+        assert result['codigo_generado'] == 'def suma(a, b):\n    return a + b'
     
     def test_developer_code_crea_tasks_azure_primera_generacion(self, mock_state, mock_file_utils, monkeypatch):
         from config.settings import settings
@@ -128,3 +177,32 @@ class TestDeveloperCodeNode:
                 
                 mock_template.assert_called_once()
                 assert mock_template.call_args[1]['requisitos_formales'] == mock_state['requisitos_formales']
+    
+    def test_developer_code_escala_cuando_el_bucle_no_converge(self, mock_state, mock_file_utils, monkeypatch):
+        """Verifica que repetir código y traceback escala el prompt/modelo y luego deja un solo intento"""
+        import agents.developer_code as developer_code_module
+        monkeypatch.setattr(developer_code_module.settings, 'CONVERGENCE_MONITOR_ENABLED', True)
+        monkeypatch.setattr(developer_code_module.settings, 'CONVERGENCE_RECOVERY_MODEL', 'modelo-grande')
+        monkeypatch.setattr(developer_code_module.settings, 'CONVERGENCE_RECOVERY_TEMPERATURE', 0.7)
+        monkeypatch.setattr(developer_code_module.settings, 'GITHUB_ENABLED', False)
+        monkeypatch.setattr(developer_code_module.settings, 'AZURE_DEVOPS_ENABLED', False)
+        mock_state['max_debug_attempts'] = 5
+        mock_state['debug_attempt_count'] = 1
+        
+        with patch('agents.developer_code.call_gemini', return_value='def f(): return x') as mock_gemini:
+            for _ in range(3):
+                mock_state['traceback'] = 'NameError: name "x" is not defined (line 1)'
+                developer_code_node(mock_state)
+        
+        primera, segunda, tercera = mock_gemini.call_args_list
+        assert 'model' not in segunda.kwargs
+        assert 'no han convergido' not in segunda.args[0]
+        assert tercera.kwargs == {'temperature': 0.7, 'model': 'modelo-grande'}
+        assert 'no han convergido' in tercera.args[0]
+        assert mock_state['debug_attempt_count'] == 1
+        
+        with patch('agents.developer_code.call_gemini', return_value='def f(): return x'):
+            mock_state['traceback'] = 'NameError: name "x" is not defined (line 1)'
+            developer_code_node(mock_state)
+        
+        assert mock_state['debug_attempt_count'] == 4
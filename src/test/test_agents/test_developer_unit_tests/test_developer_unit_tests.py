@@ -2,13 +2,17 @@ import pytest
 import os
 from unittest.mock import Mock, patch, MagicMock, mock_open
 from models.state import AgentState
+from models.requirements_meta import ParsedRequirements
 from agents.developer_unit_tests import (
     developer_unit_tests_node,
     developer_complete_pr_node,
     _limpiar_ansi,
     _postprocesar_tests_typescript,
-    _es_fallo_probablemente_de_tests
+    _es_fallo_probablemente_de_tests,
+    _ejecutar_tests_python,
+    _validar_tests_generados
 )
+from utils.ts_syntax_checker import TREE_SITTER_AVAILABLE
 
 
 class TestDeveloperUnitTestsNode:
@@ -33,26 +37,24 @@ class TestDeveloperUnitTestsNode:
                     assert result['pruebas_superadas'] is True
     
     def test_unit_tests_detecta_lenguaje_typescript(self, mock_state, mock_settings):
-        mock_state['requisitos_formales'] = '{"lenguaje_programacion": "typescript"}'
+        mock_state['requisitos_meta'] = ParsedRequirements('typescript', '.ts', 'test').to_state()
         
         with patch('agents.developer_unit_tests.call_gemini') as mock_gemini:
             mock_gemini.return_value = 'describe("test", () => { it("works", () => {}); });'
-            with patch('agents.developer_unit_tests.detectar_lenguaje_y_extension', return_value=('typescript', '.ts', None)):
-                with patch('agents.developer_unit_tests.guardar_fichero_texto', return_value=True):
-                    with patch('agents.developer_unit_tests.limpiar_codigo_markdown', side_effect=lambda x: x):
-                        with patch('agents.developer_unit_tests.extraer_nombre_archivo', return_value='test'):
-                            with patch('os.path.exists', return_value=True):
-                                with patch('agents.developer_unit_tests._ejecutar_tests_typescript') as mock_exec:
-                                    mock_exec.return_value = {
-                                        'success': True,
-                                        'output': 'Tests passed',
-                                        'traceback': '',
-                                        'tests_run': {'total': 1, 'passed': 1, 'failed': 0}
-                                    }
-                                    
-                                    result = developer_unit_tests_node(mock_state)
-                                    
-                                    mock_exec.assert_called_once()
+            with patch('agents.developer_unit_tests.guardar_fichero_texto', return_value=True):
+                with patch('agents.developer_unit_tests.limpiar_codigo_markdown', side_effect=lambda x: x):
+                    with patch('os.path.exists', return_value=True):
+                        with patch('agents.developer_unit_tests._ejecutar_tests_typescript') as mock_exec:
+                            mock_exec.return_value = {
+                                'success': True,
+                                'output': 'Tests passed',
+                                'traceback': '',
+                                'tests_run': {'total': 1, 'passed': 1, 'failed': 0}
+                            }
+                            
+                            result = developer_unit_tests_node(mock_state)
+                            
+                            mock_exec.assert_called_once()
     
     def test_unit_tests_actualiza_azure_task_in_progress(self, mock_state, mock_file_utils, monkeypatch):
         from config.settings import settings
@@ -143,6 +145,27 @@ class TestDeveloperUnitTestsNode:
                                 mock_github.create_pull_request.assert_called_once()
 
 
+    def test_unit_tests_no_guarda_error_del_llm_al_regenerar(self, mock_state, mock_file_utils, mock_settings, monkeypatch):
+        """Verifica que un fallo del LLM en el reintento se registra en el estado sin guardarse como tests"""
+        from llm.errors import llm_error_result, UNAVAILABLE
+        monkeypatch.setattr(mock_settings, 'LLM_ERROR_ROUTE_ENABLED', True)
+        mock_state['codigo_generado'] = 'def suma(a, b): return a + b'
+        
+        with patch('agents.developer_unit_tests.call_gemini') as mock_gemini:
+            mock_gemini.side_effect = [
+                'def test_suma(:\n    assert suma(1, 2) == 3',
+                llm_error_result(UNAVAILABLE, "503"),
+            ]
+            with patch('agents.developer_unit_tests.guardar_fichero_texto') as mock_guardar:
+                with patch('agents.developer_unit_tests._ejecutar_tests_python') as mock_exec:
+                    result = developer_unit_tests_node(mock_state)
+                    
+                    assert mock_gemini.call_count == 2
+                    assert result['llm_error']['node'] == "Developer-UnitTests"
+                    mock_guardar.assert_not_called()
+                    mock_exec.assert_not_called()
+
+
 class TestDeveloperCompletePRNode:
     
     def test_complete_pr_omite_merge_sin_github(self, mock_state, mock_file_utils, mock_settings):
@@ -246,3 +269,58 @@ class TestHelperFunctions:
         output = 'AssertionError: expected 3 received 4'
         is_test_fault, reason = _es_fallo_probablemente_de_tests('typescript', output, '', 'test.spec.ts')
         assert is_test_fault is False
+
+    
+    @pytest.mark.skipif(not TREE_SITTER_AVAILABLE, reason="tree-sitter no instalado")
+    def test_validar_tests_generados_comprueba_sintaxis_ts(self, monkeypatch):
+        """Verifica que con TS_SYNTAX_CHECK_ENABLED se detecta un error de sintaxis sin ejecutar vitest"""
+        from agents import developer_unit_tests
+        codigo = "describe('suma', () => {\n  it('a', () => {\n    expect(suma(1 2)).toBe(3);\n  });\n});\n"
+        monkeypatch.setattr(developer_unit_tests.settings, 'TS_SYNTAX_CHECK_ENABLED', False)
+        assert _validar_tests_generados(codigo, 'typescript', 'suma.spec.ts')[0] is True
+        
+        monkeypatch.setattr(developer_unit_tests.settings, 'TS_SYNTAX_CHECK_ENABLED', True)
+        es_valido, mensaje = _validar_tests_generados(codigo, 'typescript', 'suma.spec.ts')
+        assert es_valido is False
+        assert "suma.spec.ts:" in mensaje
+    
+    def test_validar_tests_generados_comprueba_imports_ts(self, monkeypatch):
+        """Verifica que con TS_SYNTAX_CHECK_ENABLED se detecta un import que el código no exporta"""
+        from agents import developer_unit_tests
+        monkeypatch.setattr(developer_unit_tests.settings, 'TS_SYNTAX_CHECK_ENABLED', True)
+        codigo = "export function suma(a: number, b: number): number { return a + b; }\n"
+        tests = (
+            "import { describe, it, expect } from 'vitest';\nimport { suma, resta } from './suma';\n"
+            "describe('suma', () => {\n  it('a', () => {\n    expect(suma(1, 2)).toBe(3);\n  });\n});\n"
+        )
+        
+        es_valido, mensaje = _validar_tests_generados(tests, 'typescript', 'suma.spec.ts', codigo)
+        
+        assert es_valido is False
+        assert "resta" in mensaje
+
+
+class TestEjecucionEnPool:
+    
+    def test_ejecutar_tests_python_usa_pool_si_habilitado(self, mock_state, monkeypatch, tmp_path):
+        """Verifica que con TEST_EXECUTOR_POOL_ENABLED los tests se ejecutan en el sandbox"""
+        from agents import developer_unit_tests
+        monkeypatch.setattr(developer_unit_tests.settings, 'TEST_EXECUTOR_POOL_ENABLED', True)
+        (tmp_path / "suma.py").write_text("def suma(a, b): return a + b")
+        (tmp_path / "suma.spec.py").write_text("def test_suma(): pass")
+        
+        mock_pool = Mock()
+        mock_pool.pending = 0
+        mock_pool.run.return_value = {
+            'returncode': 0, 'stdout': '1 passed', 'stderr': '', 'timed_out': False,
+            'duration_s': 0.5, 'queued_s': 0.0,
+            'resources': {'cpu_user_s': 0.2, 'cpu_system_s': 0.1, 'max_rss_kb': 1000}
+        }
+        with patch('agents.developer_unit_tests.get_test_executor_pool', return_value=mock_pool):
+            result = _ejecutar_tests_python(str(tmp_path / "suma.spec.py"), mock_state)
+        
+        assert result['success'] is True
+        assert result['tests_run']['passed'] == 1
+        assert result['resources']['cpu_user_s'] == 0.2
+        files = mock_pool.run.call_args[1]['files']
+        assert set(files) == {"suma.py", "suma.spec.py"}
@@ -36,7 +36,7 @@ class TestSonarNode:
                     
                     with patch('agents.sonar.formatear_reporte_sonarqube', return_value='Reporte OK'):
                         with patch('agents.sonar.es_codigo_aceptable', return_value=True):
-                            with patch('agents.sonar.guardar_fichero_texto'):
+                            with patch('agents.sonar.guardar_artefacto', return_value=None):
                                 result = sonar_node(mock_state)
                                 
                                 assert result['sonarqube_passed'] is True
@@ -67,7 +67,7 @@ class TestSonarNode:
                         
                         with patch('agents.sonar.formatear_reporte_sonarqube', return_value='Reporte con errores'):
                             with patch('agents.sonar.es_codigo_aceptable', return_value=False):
-                                with patch('agents.sonar.guardar_fichero_texto'):
+                                with patch('agents.sonar.guardar_artefacto', return_value=None):
                                     result = sonar_node(mock_state)
                                     
                                     assert result['sonarqube_passed'] is False
@@ -98,7 +98,7 @@ class TestSonarNode:
                         
                         with patch('agents.sonar.formatear_reporte_sonarqube', return_value='Reporte'):
                             with patch('agents.sonar.es_codigo_aceptable', return_value=False):
-                                with patch('agents.sonar.guardar_fichero_texto'):
+                                with patch('agents.sonar.guardar_artefacto', return_value=None):
                                     result = sonar_node(mock_state)
                                     
                                     assert result['sonarqube_attempt_count'] == 1
@@ -127,7 +127,7 @@ class TestSonarNode:
                     
                     with patch('agents.sonar.formatear_reporte_sonarqube', return_value='OK'):
                         with patch('agents.sonar.es_codigo_aceptable', return_value=True):
-                            with patch('agents.sonar.guardar_fichero_texto'):
+                            with patch('agents.sonar.guardar_artefacto', return_value=None):
                                 with patch('agents.sonar.azure_service') as mock_azure:
                                     mock_azure.update_implementation_task_to_in_progress.return_value = True
                                     
@@ -158,7 +158,7 @@ class TestSonarNode:
                     
                     with patch('agents.sonar.formatear_reporte_sonarqube', return_value='OK'):
                         with patch('agents.sonar.es_codigo_aceptable', return_value=True):
-                            with patch('agents.sonar.guardar_fichero_texto'):
+                            with patch('agents.sonar.guardar_artefacto', return_value=None):
                                 with patch('agents.sonar.azure_service') as mock_azure:
                                     sonar_node(mock_state)
                                     
@@ -186,7 +186,7 @@ class TestSonarNode:
                     
                     with patch('agents.sonar.formatear_reporte_sonarqube', return_value='OK'):
                         with patch('agents.sonar.es_codigo_aceptable', return_value=True):
-                            with patch('agents.sonar.guardar_fichero_texto'):
+                            with patch('agents.sonar.guardar_artefacto', return_value=None):
                                 result = sonar_node(mock_state)
                                 
                                 assert result['sonarqube_passed'] is True
@@ -211,7 +211,7 @@ class TestSonarNode:
                     
                     with patch('agents.sonar.formatear_reporte_sonarqube', return_value='OK'):
                         with patch('agents.sonar.es_codigo_aceptable', return_value=True):
-                            with patch('agents.sonar.guardar_fichero_texto'):
+                            with patch('agents.sonar.guardar_artefacto', return_value=None):
                                 result = sonar_node(mock_state)
                                 
                                 mock_analizar.assert_called_once()
@@ -237,9 +237,75 @@ class TestSonarNode:
                     
                     with patch('agents.sonar.formatear_reporte_sonarqube', return_value='Reporte'):
                         with patch('agents.sonar.es_codigo_aceptable', return_value=True):
-                            with patch('agents.sonar.guardar_fichero_texto') as mock_guardar:
+                            with patch('agents.sonar.guardar_artefacto', return_value=None) as mock_guardar:
                                 sonar_node(mock_state)
                                 
                                 assert mock_guardar.call_count >= 1
                                 filename = mock_guardar.call_args_list[0][0][0]
                                 assert 'sonar_report' in filename
+    
+    def test_sonar_delta_de_issues_y_corte_por_oscilacion(self, mock_state, mock_file_utils, monkeypatch):
+        """Verifica que el prompt solo detalla issues nuevos y que una oscilación agota el bucle"""
+        import agents.sonar as sonar_module
+        monkeypatch.setattr(sonar_module.settings, 'SONARSCANNER_ENABLED', True)
+        monkeypatch.setattr(sonar_module.settings, 'SONAR_ISSUE_DELTA_ENABLED', True)
+        monkeypatch.setattr(sonar_module.settings, 'ARTIFACT_STORE_ENABLED', False)
+        monkeypatch.setattr(sonar_module.settings, 'OUTPUT_DIR', '/tmp/test')
+        mock_state['max_sonarqube_attempts'] = 5
+        codigo = 'var a = 1;\nvar b = 2;\n'
+        
+        def resultado(*issues):
+            return {
+                'success': True,
+                'summary': {'total': len(issues), 'by_severity': {'BLOCKER': len(issues)}, 'by_type': {}},
+                'issues': [
+                    {'rule': rule, 'line': line, 'message': f'msg {rule}', 'severity': 'BLOCKER', 'type': 'BUG'}
+                    for rule, line in issues
+                ]
+            }
+        
+        analisis = [resultado(('S1', 1)), resultado(('S1', 1), ('S2', 2)), resultado(('S1', 1))]
+        with patch('agents.sonar.call_gemini', return_value='Instrucciones') as mock_gemini:
+            with patch('os.path.exists', return_value=True):
+                with patch('builtins.open', mock_open(read_data=codigo)):
+                    with patch('agents.sonar.analizar_codigo_con_sonarqube', side_effect=analisis):
+                        with patch('agents.sonar.guardar_artefacto', return_value=None):
+                            sonar_node(mock_state)
+                            result = sonar_node(mock_state)
+                            
+                            prompt = mock_gemini.call_args[0][0]
+                            assert 'msg S2' in prompt
+                            assert 'Mensaje: msg S1' not in prompt
+                            assert result['sonarqube_issues'].startswith('Delta Sonar: 1 nuevo(s), 1 sin resolver')
+                            
+                            result = sonar_node(mock_state)
+        
+        assert mock_gemini.call_count == 2
+        assert result['sonarqube_attempt_count'] == result['max_sonarqube_attempts']
+        assert 'OSCILACIÓN' in result['sonarqube_issues']
+    
+    def test_sonar_analisis_local_si_no_queda_plazo(self, mock_state, mock_file_utils, monkeypatch):
+        """Verifica que con poco plazo restante no se espera a SonarCloud"""
+        import time
+        from config.settings import settings
+        monkeypatch.setattr(settings, 'SONARCLOUD_ENABLED', True)
+        monkeypatch.setattr(settings, 'OUTPUT_DIR', '/tmp/test')
+        monkeypatch.setattr(settings, 'DEADLINE_SONARCLOUD_MIN_SECONDS', 60)
+        
+        mock_state['github_branch_name'] = 'test-branch'
+        mock_state['deadline_at'] = time.time() + 30
+        
+        with patch('services.sonarcloud_service.sonarcloud_service') as mock_sonarcloud:
+            mock_sonarcloud.verify_github_integration.return_value = {'success': True}
+            with patch('os.path.exists', return_value=True):
+                with patch('builtins.open', mock_open(read_data='code')):
+                    with patch('agents.sonar.analizar_codigo_con_sonarqube') as mock_analizar:
+                        mock_analizar.return_value = {'success': True, 'issues': []}
+                        with patch('agents.sonar.formatear_reporte_sonarqube', return_value='OK'):
+                            with patch('agents.sonar.es_codigo_aceptable', return_value=True):
+                                with patch('agents.sonar.guardar_artefacto', return_value=None):
+                                    result = sonar_node(mock_state)
+        
+        mock_sonarcloud.wait_for_analysis.assert_not_called()
+        mock_analizar.assert_called_once()
+        assert result['sonarqube_passed'] is True
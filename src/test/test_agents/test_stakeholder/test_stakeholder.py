@@ -23,7 +23,7 @@ class TestStakeholderNode:
         
         with patch('agents.stakeholder.call_gemini') as mock_gemini:
             mock_gemini.return_value = 'RECHAZADO\nMotivo: Falta validación de entrada'
-            with patch('agents.stakeholder.guardar_fichero_texto'):
+            with patch('agents.stakeholder.guardar_artefacto'):
                 result = stakeholder_node(mock_state)
                 
                 assert result['validado'] is False
@@ -33,7 +33,7 @@ class TestStakeholderNode:
         mock_state['attempt_count'] = 4
         mock_state['max_attempts'] = 3
         
-        with patch('agents.stakeholder.guardar_fichero_texto'):
+        with patch('agents.stakeholder.guardar_artefacto'):
             result = stakeholder_node(mock_state)
             
             assert result['validado'] is False
@@ -47,7 +47,7 @@ class TestStakeholderNode:
         
         with patch('agents.stakeholder.call_gemini') as mock_gemini:
             mock_gemini.return_value = 'VALIDADO: Perfecto'
-            with patch('agents.stakeholder.guardar_fichero_texto') as mock_guardar:
+            with patch('agents.stakeholder.guardar_artefacto') as mock_guardar:
                 stakeholder_node(mock_state)
                 
                 mock_guardar.assert_called()
@@ -64,7 +64,7 @@ class TestStakeholderNode:
         
         with patch('agents.stakeholder.call_gemini') as mock_gemini:
             mock_gemini.return_value = 'RECHAZADO\nMotivo: Necesita mejoras'
-            with patch('agents.stakeholder.guardar_fichero_texto') as mock_guardar:
+            with patch('agents.stakeholder.guardar_artefacto') as mock_guardar:
                 stakeholder_node(mock_state)
                 
                 mock_guardar.assert_called()
@@ -80,12 +80,25 @@ class TestStakeholderNode:
             mock_gemini.return_value = 'VALIDADO'
             with patch('agents.stakeholder.PromptTemplates.format_stakeholder') as mock_template:
                 mock_template.return_value = "Formatted prompt"
-                with patch('agents.stakeholder.guardar_fichero_texto'):
+                with patch('agents.stakeholder.guardar_artefacto'):
                     stakeholder_node(mock_state)
                     
                     mock_template.assert_called_once()
                     assert mock_template.call_args[1]['requisitos_formales'] == mock_state['requisitos_formales']
                     assert mock_template.call_args[1]['codigo_generado'] == mock_state['codigo_generado']
+                    assert mock_template.call_args[1]['revision_codigo'] is False
+    
+    def test_stakeholder_perfil_fast_incluye_revision_de_codigo(self, mock_state, mock_file_utils, mock_settings):
+        """Verifica que en el perfil fast (sin Developer2-Reviewer) el prompt incluye la revisión de código"""
+        mock_state['attempt_count'] = 1
+        mock_state['max_attempts'] = 3
+        mock_state['pipeline_profile'] = 'fast'
+        
+        with patch('agents.stakeholder.call_gemini', return_value='VALIDADO') as mock_gemini:
+            stakeholder_node(mock_state)
+        
+        from config.prompt_templates import PromptTemplates
+        assert PromptTemplates.STAKEHOLDER_REVISION_CODIGO in mock_gemini.call_args[0][0]
     
     def test_stakeholder_actualiza_azure_a_done_en_validacion(self, mock_state, mock_file_utils, monkeypatch):
         from config.settings import settings
@@ -96,7 +109,7 @@ class TestStakeholderNode:
         
         with patch('agents.stakeholder.call_gemini') as mock_gemini:
             mock_gemini.return_value = 'VALIDADO'
-            with patch('agents.stakeholder.guardar_fichero_texto'):
+            with patch('agents.stakeholder.guardar_artefacto'):
                 with patch('agents.stakeholder.azure_service') as mock_azure:
                     stakeholder_node(mock_state)
                     
@@ -112,7 +125,7 @@ class TestStakeholderNode:
         
         with patch('agents.stakeholder.call_gemini') as mock_gemini:
             mock_gemini.return_value = 'VALIDADO'
-            with patch('agents.stakeholder.guardar_fichero_texto'):
+            with patch('agents.stakeholder.guardar_artefacto'):
                 with patch('agents.stakeholder.azure_service') as mock_azure:
                     stakeholder_node(mock_state)
                     
@@ -127,7 +140,7 @@ class TestStakeholderNode:
         
         with patch('agents.stakeholder.call_gemini') as mock_gemini:
             mock_gemini.return_value = 'RECHAZADO\nMotivo: Problemas'
-            with patch('agents.stakeholder.guardar_fichero_texto'):
+            with patch('agents.stakeholder.guardar_artefacto'):
                 with patch('agents.stakeholder.azure_service') as mock_azure:
                     stakeholder_node(mock_state)
                     
@@ -142,7 +155,7 @@ class TestStakeholderNode:
             mock_gemini.return_value = '''RECHAZADO
 Motivo: El código no maneja excepciones correctamente.
 Además, falta documentación.'''
-            with patch('agents.stakeholder.guardar_fichero_texto'):
+            with patch('agents.stakeholder.guardar_artefacto'):
                 result = stakeholder_node(mock_state)
                 
                 assert result['validado'] is False
@@ -154,7 +167,7 @@ Además, falta documentación.'''
         
         with patch('agents.stakeholder.call_gemini') as mock_gemini:
             mock_gemini.return_value = 'VALIDADO: Excelente implementación'
-            with patch('agents.stakeholder.guardar_fichero_texto'):
+            with patch('agents.stakeholder.guardar_artefacto'):
                 result = stakeholder_node(mock_state)
                 
                 assert result['validado'] is True
@@ -166,8 +179,73 @@ Además, falta documentación.'''
         
         with patch('agents.stakeholder.call_gemini') as mock_gemini:
             mock_gemini.return_value = 'VALIDADO: Cumple requisitos'
-            with patch('agents.stakeholder.guardar_fichero_texto'):
+            with patch('agents.stakeholder.guardar_artefacto'):
                 result = stakeholder_node(mock_state)
                 
                 assert result['validado'] is True
                 assert result['attempt_count'] == 3
+
+    def test_stakeholder_pide_salida_estructurada(self, mock_state, mock_file_utils, mock_settings):
+        """Verifica que la llamada al LLM usa el schema StakeholderVerdict"""
+        from models.schemas import StakeholderVerdict
+        mock_state['attempt_count'] = 1
+        mock_state['max_attempts'] = 3
+        
+        with patch('agents.stakeholder.call_gemini') as mock_gemini:
+            mock_gemini.return_value = '{"validado": true, "motivo": "Cumple"}'
+            result = stakeholder_node(mock_state)
+            
+            assert mock_gemini.call_args[1]['response_schema'] is StakeholderVerdict
+            assert result['validado'] is True
+    
+    def test_stakeholder_rechazo_estructurado(self, mock_state, mock_file_utils, mock_settings):
+        """Verifica que el motivo del veredicto JSON pasa a feedback_stakeholder"""
+        mock_state['attempt_count'] = 1
+        mock_state['max_attempts'] = 3
+        
+        with patch('agents.stakeholder.call_gemini') as mock_gemini:
+            mock_gemini.return_value = '{"validado": false, "motivo": "La salida no es VALIDADO como string"}'
+            result = stakeholder_node(mock_state)
+            
+            assert result['validado'] is False
+            assert result['feedback_stakeholder'] == "La salida no es VALIDADO como string"
+    
+    def test_stakeholder_texto_rechazado_que_menciona_validado(self, mock_state, mock_file_utils, mock_settings):
+        """Verifica que un RECHAZADO explícito no se interpreta como VALIDADO por subcadena"""
+        mock_state['attempt_count'] = 1
+        mock_state['max_attempts'] = 3
+        
+        with patch('agents.stakeholder.call_gemini') as mock_gemini:
+            mock_gemini.return_value = 'VALIDACIÓN FINAL: RECHAZADO\nMotivo: No puede darse por VALIDADO sin validar entradas'
+            result = stakeholder_node(mock_state)
+            
+            assert result['validado'] is False
+            assert 'validar entradas' in result['feedback_stakeholder']
+    
+    def test_stakeholder_rechaza_veredicto_no_parseable(self, mock_state, mock_file_utils, mock_settings):
+        """Verifica que sin veredicto reconocible se repite la petición y, si persiste, se rechaza"""
+        mock_state['attempt_count'] = 1
+        mock_state['max_attempts'] = 3
+        
+        with patch('agents.stakeholder.call_gemini') as mock_gemini:
+            mock_gemini.return_value = 'NO VALIDADO, falta manejar la lista vacía'
+            result = stakeholder_node(mock_state)
+            
+            assert mock_gemini.call_count == 2
+            assert result['validado'] is False
+            assert 'Veredicto no parseable' in result['feedback_stakeholder']
+    
+    def test_stakeholder_reintenta_veredicto_no_parseable(self, mock_state, mock_file_utils, mock_settings):
+        """Verifica que la segunda respuesta se usa si trae un veredicto válido"""
+        mock_state['attempt_count'] = 1
+        mock_state['max_attempts'] = 3
+        
+        with patch('agents.stakeholder.call_gemini') as mock_gemini:
+            mock_gemini.side_effect = [
+                'Parece correcto en general',
+                '{"validado": true, "motivo": "Cumple"}',
+            ]
+            result = stakeholder_node(mock_state)
+            
+            assert mock_gemini.call_count == 2
+            assert result['validado'] is True
@@ -0,0 +1,84 @@
+import pytest
+
+from config import pipeline_profiles
+from config.pipeline_profiles import (
+    PROFILES, get_profile, profile_from_state, github_enabled, sonarcloud_enabled
+)
+from config.settings import Settings
+
+
+class TestGetProfile:
+    
+    def test_perfil_por_defecto(self, monkeypatch):
+        """Verifica que sin nombre se usa PIPELINE_PROFILE"""
+        monkeypatch.setattr(pipeline_profiles.settings, 'PIPELINE_PROFILE', 'thorough')
+        assert get_profile().name == 'thorough'
+    
+    def test_nombre_sin_distinguir_mayusculas(self):
+        """Verifica que el nombre admite mayúsculas y espacios"""
+        assert get_profile(' FAST ').name == 'fast'
+    
+    def test_perfil_desconocido_usa_standard(self):
+        """Verifica que un perfil desconocido no rompe la ejecución"""
+        assert get_profile('turbo').name == 'standard'
+    
+    def test_perfiles_disponibles(self):
+        """Verifica los perfiles definidos"""
+        assert set(PROFILES) == {'fast', 'standard', 'thorough'}
+
+
+class TestPipelineProfile:
+    
+    def test_standard_conserva_limites_de_settings(self):
+        """Verifica que el perfil standard mantiene los límites de MAX_*_ATTEMPTS"""
+        config = get_profile('standard').to_retry_config()
+        
+        assert config.max_attempts == Settings.MAX_ATTEMPTS
+        assert config.max_debug_attempts == Settings.MAX_DEBUG_ATTEMPTS
+        assert config.max_sonarqube_attempts == Settings.MAX_SONARQUBE_ATTEMPTS
+        assert config.max_revisor_attempts == Settings.MAX_REVISOR_ATTEMPTS
+    
+    def test_fast_una_pasada_de_tests_sin_pr(self):
+        """Verifica que el perfil fast tiene una única pasada de tests y ni SonarCloud ni PR"""
+        perfil = get_profile('fast')
+        config = perfil.to_retry_config()
+        
+        assert config.max_attempts == 1
+        assert config.max_debug_attempts == 1
+        assert perfil.sonarcloud is False
+        assert perfil.pr_flow is False
+        assert perfil.stakeholder_review is True
+    
+    def test_thorough_mas_intentos_que_fast(self):
+        """Verifica que thorough da más margen a los bucles de corrección"""
+        fast, thorough = get_profile('fast'), get_profile('thorough')
+        
+        assert thorough.max_debug_attempts > fast.max_debug_attempts
+        assert thorough.max_sonarqube_attempts > fast.max_sonarqube_attempts
+        assert thorough.pr_flow and thorough.sonarcloud
+
+
+class TestIntegracionesPorPerfil:
+    
+    @pytest.fixture
+    def integraciones(self, monkeypatch):
+        monkeypatch.setattr(pipeline_profiles.settings, 'GITHUB_ENABLED', True)
+        monkeypatch.setattr(pipeline_profiles.settings, 'SONARCLOUD_ENABLED', True)
+    
+    def test_fast_desactiva_github_y_sonarcloud(self, integraciones):
+        """Verifica que el perfil fast no usa GitHub ni espera a SonarCloud"""
+        state = {'pipeline_profile': 'fast'}
+        
+        assert github_enabled(state) is False
+        assert sonarcloud_enabled(state) is False
+    
+    def test_estado_sin_perfil_es_standard(self, integraciones):
+        """Verifica que un estado sin perfil mantiene el comportamiento anterior"""
+        assert profile_from_state({}).name == 'standard'
+        assert github_enabled({}) is True
+        assert sonarcloud_enabled({}) is True
+    
+    def test_integracion_deshabilitada(self, monkeypatch):
+        """Verifica que el perfil no habilita integraciones deshabilitadas"""
+        monkeypatch.setattr(pipeline_profiles.settings, 'GITHUB_ENABLED', False)
+        assert github_enabled({'pipeline_profile': 'thorough'}) is False
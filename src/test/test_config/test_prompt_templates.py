@@ -173,6 +173,14 @@ class TestPromptTemplates:
         assert isinstance(result, str)
         assert len(result) > 10
     
+    def test_format_stakeholder_con_revision_de_codigo(self):
+        """Verifica que los criterios de revisión solo se añaden si se piden"""
+        sin_revision = PromptTemplates.format_stakeholder("requisitos", "codigo", "tests")
+        con_revision = PromptTemplates.format_stakeholder("requisitos", "codigo", "tests", revision_codigo=True)
+        
+        assert PromptTemplates.STAKEHOLDER_REVISION_CODIGO not in sin_revision
+        assert con_revision.endswith(PromptTemplates.STAKEHOLDER_REVISION_CODIGO)
+    
     def test_format_stakeholder_retorna_string_no_vacio(self):
         """Verifica que format_stakeholder retorna string no vacío"""
         result = PromptTemplates.format_stakeholder("requisitos", "codigo", "tests")
@@ -230,3 +230,12 @@ class TestRetryConfig:
         assert config.max_debug_attempts == Settings.MAX_DEBUG_ATTEMPTS
         assert config.max_sonarqube_attempts == Settings.MAX_SONARQUBE_ATTEMPTS
         assert config.max_revisor_attempts == Settings.MAX_REVISOR_ATTEMPTS
+    
+    def test_retry_config_plazo_en_el_estado(self):
+        """Verifica que to_state_dict incluye el instante límite si hay plazo"""
+        import time
+        
+        assert RetryConfig(deadline_seconds=0).to_state_dict()['deadline_at'] is None
+        
+        deadline_at = RetryConfig(deadline_seconds=120).to_state_dict()['deadline_at']
+        assert 119 < deadline_at - time.time() <= 120
@@ -30,6 +30,18 @@ class TestFileUtils:
             assert result is True
             MockFileManager.assert_called_with(base_directory='/custom/path')
     
+    def test_guardar_fichero_texto_reutiliza_file_manager(self, tmp_path):
+        """Verifica que se crea un único FileManager por directorio"""
+        directorio = str(tmp_path / "reutilizado")
+        with patch('tools.file_utils.FileManager') as MockFileManager:
+            MockFileManager.return_value.save_file.return_value = (True, '')
+            
+            guardar_fichero_texto('a.txt', 'a', directorio=directorio)
+            guardar_fichero_texto('b.txt', 'b', directorio=directorio)
+            
+            MockFileManager.assert_called_once_with(base_directory=directorio)
+            assert MockFileManager.return_value.save_file.call_count == 2
+    
     def test_guardar_fichero_texto_falla(self):
         with patch('tools.file_utils._file_manager') as mock_file_manager:
             mock_file_manager.save_file.return_value = (False, None)
@@ -0,0 +1,97 @@
+import pytest
+from llm import errors
+from llm.errors import (
+    LLMError, LLMErrorResult, llm_error_result, as_llm_error, comprobar_respuesta_llm,
+    is_retryable_status, is_network_error, UNAVAILABLE, API, GENERAL, NOT_INITIALIZED
+)
+
+
+class TestLLMErrorResult:
+    
+    def test_resultado_conserva_texto_historico(self):
+        """Verifica que el resultado tipado sigue siendo el texto de error de siempre"""
+        resultado = llm_error_result(API, "timeout")
+        
+        assert isinstance(resultado, str)
+        assert resultado == "ERROR_API: timeout"
+        assert resultado.startswith("ERROR")
+        assert resultado.error.kind == API
+    
+    def test_no_inicializado_no_es_reintentable(self):
+        """Verifica que un cliente sin inicializar no se reintenta"""
+        assert llm_error_result(NOT_INITIALIZED, "sin API key").error.retryable is False
+    
+    def test_reintentable_por_tipo_y_explicito(self):
+        """Verifica que solo UNAVAILABLE es reintentable por defecto y que se puede indicar"""
+        assert llm_error_result(UNAVAILABLE, "503").error.retryable is True
+        assert llm_error_result(API, "400").error.retryable is False
+        assert llm_error_result(API, "429", retryable=True).error.retryable is True
+
+
+class TestReintentable:
+    
+    @pytest.mark.parametrize("code", [429, 500, 502, 503, 504])
+    def test_codigos_transitorios(self, code):
+        """Verifica que 429 y 5xx se reintentan"""
+        assert is_retryable_status(code) is True
+    
+    @pytest.mark.parametrize("code", [400, 401, 403, 404, None, "500"])
+    def test_codigos_definitivos(self, code):
+        """Verifica que los errores del cliente (y los códigos desconocidos) no se reintentan"""
+        assert is_retryable_status(code) is False
+    
+    def test_errores_de_red(self):
+        """Verifica que los fallos de conexión y timeouts se reintentan y el resto no"""
+        import httpx
+        assert is_network_error(ConnectionResetError("reset")) is True
+        assert is_network_error(TimeoutError("timeout")) is True
+        assert is_network_error(httpx.ConnectTimeout("timeout")) is True
+        assert is_network_error(ValueError("respuesta inválida")) is False
+
+
+class TestAsLLMError:
+    
+    def test_resultado_tipado(self):
+        """Verifica que se devuelve el error del resultado tipado"""
+        resultado = llm_error_result(UNAVAILABLE, "503")
+        assert as_llm_error(resultado) is resultado.error
+    
+    @pytest.mark.parametrize("texto,kind", [
+        ("ERROR_503_MAX_RETRIES: caído", UNAVAILABLE),
+        ("ERROR_503: sobrecargado", UNAVAILABLE),
+        ("ERROR_API: fallo", API),
+        ("ERROR_GENERAL: boom", GENERAL),
+        ("ERROR: Cliente Gemini no inicializado correctamente.", NOT_INITIALIZED),
+    ])
+    def test_texto_sin_tipar(self, texto, kind):
+        """Verifica que el texto de error sin tipar (mocks, versiones anteriores) se reconoce"""
+        assert as_llm_error(texto).kind == kind
+    
+    @pytest.mark.parametrize("texto", ["def suma(a, b): return a + b", "ERROR_PARSING: json", "", None])
+    def test_contenido_no_es_error(self, texto):
+        """Verifica que el contenido y los errores propios de los agentes no son fallos del LLM"""
+        assert as_llm_error(texto) is None
+
+
+class TestComprobarRespuestaLLM:
+    
+    def test_deshabilitado_no_toca_el_estado(self, monkeypatch):
+        """Verifica que sin LLM_ERROR_ROUTE_ENABLED no se registra nada"""
+        monkeypatch.setattr(errors.settings, 'LLM_ERROR_ROUTE_ENABLED', False)
+        state = {}
+        
+        assert comprobar_respuesta_llm(state, "Developer-Code", "ERROR_API: x") is False
+        assert state == {}
+    
+    def test_registra_error_y_limpia_tras_exito(self, monkeypatch):
+        """Verifica que un fallo se registra y una respuesta válida lo limpia"""
+        monkeypatch.setattr(errors.settings, 'LLM_ERROR_ROUTE_ENABLED', True)
+        state = {'llm_error_retries': 1}
+        
+        assert comprobar_respuesta_llm(state, "Developer-Code", llm_error_result(API, "x")) is True
+        assert state['llm_error']['node'] == "Developer-Code"
+        assert state['llm_error']['kind'] == API
+        
+        assert comprobar_respuesta_llm(state, "Developer-Code", "codigo") is False
+        assert state['llm_error'] is None
+        assert state['llm_error_retries'] == 0
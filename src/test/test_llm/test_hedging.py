@@ -0,0 +1,164 @@
+import threading
+import time
+import pytest
+from unittest.mock import Mock
+from llm.hedging import HedgedCaller, hedge_scope, current_hedge_key, percentile
+
+
+def _caller(**kwargs):
+    opciones = dict(percentile_umbral=95, min_samples=3, max_extra_ratio=1.0, history_size=10, min_delay=0.0)
+    opciones.update(kwargs)
+    return HedgedCaller(**opciones)
+
+
+def _calentar(caller, key, n=3):
+    """Registra n llamadas rápidas para tener historial"""
+    for _ in range(n):
+        caller.call(key, lambda: "rapida")
+
+
+class TestPercentile:
+    
+    def test_percentil_rango_mas_cercano(self):
+        """Verifica el percentil por rango más cercano"""
+        valores = list(range(1, 101))
+        
+        assert percentile(valores, 50) == 50
+        assert percentile(valores, 99) == 99
+        assert percentile([], 99) == 0.0
+
+
+class TestHedgeScope:
+    
+    def test_clave_por_agente_y_modelo(self):
+        """Verifica que el agente activo forma parte de la clave"""
+        assert current_hedge_key("m") == "default/m"
+        with hedge_scope("developer"):
+            assert current_hedge_key("m") == "developer/m"
+        assert current_hedge_key("m") == "default/m"
+
+
+class TestHedgedCaller:
+    
+    def test_sin_historial_no_duplica(self):
+        """Verifica que sin muestras suficientes no se lanza la petición duplicada"""
+        caller = _caller()
+        fn = Mock(return_value="ok")
+        
+        assert caller.call("k", fn) == "ok"
+        
+        fn.assert_called_once()
+        assert caller.report()["k"]["hedges"] == 0
+    
+    def test_llamada_lenta_se_duplica_y_gana_la_rapida(self):
+        """Verifica que una llamada en la cola de latencia se duplica y gana la primera respuesta"""
+        caller = _caller()
+        _calentar(caller, "k")
+        liberar = threading.Event()
+        llamadas = []
+        
+        def fn():
+            llamadas.append(1)
+            if len(llamadas) == 1:
+                liberar.wait(2)  # La original se queda colgada
+                return "lenta"
+            return "duplicada"
+        
+        inicio = time.perf_counter()
+        resultado = caller.call("k", fn)
+        duracion = time.perf_counter() - inicio
+        liberar.set()
+        
+        assert resultado == "duplicada"
+        assert duracion < 1
+        informe = caller.report()["k"]
+        assert informe["hedges"] == 1
+        assert informe["hedge_wins"] == 1
+    
+    def test_presupuesto_limita_duplicadas(self):
+        """Verifica que sin presupuesto de gasto extra se espera a la original"""
+        caller = _caller(max_extra_ratio=0.0)
+        _calentar(caller, "k")
+        fn = Mock(side_effect=lambda: time.sleep(0.1) or "original")
+        
+        assert caller.call("k", fn) == "original"
+        
+        fn.assert_called_once()
+        assert caller.report()["k"]["hedges"] == 0
+    
+    def test_error_en_una_usa_la_otra(self):
+        """Verifica que si la original falla se devuelve la duplicada"""
+        caller = _caller()
+        _calentar(caller, "k")
+        llamadas = []
+        
+        def fn():
+            llamadas.append(1)
+            if len(llamadas) == 1:
+                time.sleep(0.1)
+                raise RuntimeError("503")
+            time.sleep(0.2)
+            return "ok"
+        
+        assert caller.call("k", fn) == "ok"
+    
+    def test_error_en_ambas_se_propaga(self):
+        """Verifica que si ambas peticiones fallan se propaga el error"""
+        caller = _caller()
+        _calentar(caller, "k")
+        
+        def fn():
+            time.sleep(0.05)
+            raise RuntimeError("fallo")
+        
+        with pytest.raises(RuntimeError, match="fallo"):
+            caller.call("k", fn)
+    
+    def test_sin_cobertura_se_ejecuta_en_el_hilo_del_llamante(self):
+        """Verifica que, si no se puede duplicar, la petición no pasa por otro hilo"""
+        caller = _caller()
+        hilos = []
+        
+        caller.call("k", lambda: hilos.append(threading.current_thread()))
+        
+        assert hilos == [threading.current_thread()]
+    
+    def test_llamadas_fallidas_no_se_registran(self):
+        """Verifica que la latencia de una llamada con error no entra en el historial"""
+        caller = _caller()
+        
+        def fn():
+            raise RuntimeError("400")
+        
+        with pytest.raises(RuntimeError):
+            caller.call("k", fn)
+        
+        assert caller.threshold("k") is None
+        assert caller.report()["k"]["calls"] == 1
+        assert len(caller._get_stats("k").historial) == 0
+    
+    def test_llamadas_concurrentes_no_se_encolan(self):
+        """Verifica que más de 4 llamadas cubiertas simultáneas se ejecutan a la vez"""
+        caller = _caller(min_delay=10.0)
+        _calentar(caller, "k")
+        barrera = threading.Barrier(8, timeout=2)
+        resultados = []
+        
+        def llamar():
+            resultados.append(caller.call("k", lambda: barrera.wait() >= 0))
+        
+        hilos = [threading.Thread(target=llamar) for _ in range(8)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join(timeout=5)
+        
+        assert resultados == [True] * 8
+    
+    def test_informe_formateado(self):
+        """Verifica que el informe incluye la clave y el p99"""
+        caller = _caller()
+        _calentar(caller, "reviewer/m")
+        
+        assert "reviewer/m" in caller.format_report()
+        assert caller.report()["reviewer/m"]["calls"] == 3
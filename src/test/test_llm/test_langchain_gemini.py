@@ -4,7 +4,9 @@ from llm.langchain_gemini import (
     create_langchain_llm,
     call_gemini_with_langchain,
     get_token_count,
-    get_llm_instance
+    get_llm_instance,
+    get_pooled_llm,
+    clear_llm_pool
 )
 
 
@@ -138,6 +140,93 @@ class TestCallGeminiWithLangchain:
                 assert result == 'Gemini 3 response'
 
 
+class TestLLMPool:
+    
+    @pytest.fixture(autouse=True)
+    def pool_vacio(self, monkeypatch):
+        """Pool vacío y API key de prueba en cada test"""
+        import llm.langchain_gemini as langchain_gemini
+        monkeypatch.setattr(langchain_gemini.settings, 'GEMINI_API_KEY', 'test_key')
+        clear_llm_pool()
+        yield langchain_gemini
+        clear_llm_pool()
+    
+    def test_reutiliza_instancia_por_configuracion(self):
+        """Verifica que la misma configuración devuelve la misma instancia sin volver a crearla"""
+        with patch('llm.langchain_gemini.ChatGoogleGenerativeAI') as MockLLM:
+            MockLLM.side_effect = lambda **kwargs: Mock()
+            
+            primera = get_pooled_llm()
+            segunda = get_pooled_llm()
+            
+            assert primera is segunda
+            assert MockLLM.call_count == 1
+    
+    def test_otra_temperatura_crea_instancia_propia(self):
+        """Verifica que otra temperatura o límite de tokens tiene su propia instancia en el pool"""
+        with patch('llm.langchain_gemini.ChatGoogleGenerativeAI') as MockLLM:
+            MockLLM.side_effect = lambda **kwargs: Mock()
+            
+            base = get_pooled_llm()
+            otra = get_pooled_llm(temperature=0.7, max_output_tokens=1024)
+            
+            assert base is not otra
+            assert MockLLM.call_count == 2
+            assert MockLLM.call_args.kwargs['temperature'] == 0.7
+            assert MockLLM.call_args.kwargs['max_output_tokens'] == 1024
+            assert get_pooled_llm(temperature=0.7, max_output_tokens=1024) is otra
+    
+    def test_otro_modelo_o_streaming_crea_instancia(self):
+        """Verifica una instancia propia por modelo y streaming"""
+        with patch('llm.langchain_gemini.ChatGoogleGenerativeAI') as MockLLM:
+            MockLLM.side_effect = lambda **kwargs: Mock()
+            
+            base = get_pooled_llm()
+            otra = get_pooled_llm(model='gemini-2.5-pro', streaming=True)
+            
+            assert base is not otra
+            assert MockLLM.call_count == 2
+            assert MockLLM.call_args.kwargs['model'] == 'gemini-2.5-pro'
+            assert MockLLM.call_args.kwargs['streaming'] is True
+    
+    def test_pool_seguro_entre_hilos(self):
+        """Verifica que llamadas concurrentes crean una sola instancia"""
+        from concurrent.futures import ThreadPoolExecutor
+        
+        with patch('llm.langchain_gemini.ChatGoogleGenerativeAI') as MockLLM:
+            MockLLM.side_effect = lambda **kwargs: Mock()
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                instancias = list(executor.map(lambda _: get_pooled_llm(), range(32)))
+            
+            assert len({id(i) for i in instancias}) == 1
+            assert MockLLM.call_count == 1
+    
+    def test_call_gemini_with_langchain_usa_pool_si_habilitado(self, pool_vacio, monkeypatch):
+        """Verifica que con LLM_CLIENT_POOL_ENABLED las llamadas no crean instancias nuevas"""
+        monkeypatch.setattr(pool_vacio.settings, 'LLM_CLIENT_POOL_ENABLED', True)
+        
+        with patch('llm.langchain_gemini.ChatGoogleGenerativeAI') as MockLLM:
+            MockLLM.return_value.invoke.return_value = Mock(content="ok")
+            
+            call_gemini_with_langchain("role", "context")
+            call_gemini_with_langchain("role", "context")
+            get_token_count("texto")
+            
+            assert MockLLM.call_count == 1
+    
+    def test_callbacks_personalizados_no_usan_pool(self, pool_vacio, monkeypatch):
+        """Verifica que los callbacks personalizados obtienen una instancia propia"""
+        monkeypatch.setattr(pool_vacio.settings, 'LLM_CLIENT_POOL_ENABLED', True)
+        
+        with patch('llm.langchain_gemini.create_langchain_llm') as mock_create:
+            mock_create.return_value.invoke.return_value = Mock(content="ok")
+            callback = Mock()
+            
+            call_gemini_with_langchain("role", "context", callbacks=[callback])
+            
+            mock_create.assert_called_once_with(streaming=False, callbacks=[callback])
+
+
 class TestGetTokenCount:
     
     def test_get_token_count_exitoso(self, monkeypatch):
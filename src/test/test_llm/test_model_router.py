@@ -0,0 +1,146 @@
+import pytest
+from unittest.mock import Mock
+from llm import model_router
+from llm.model_router import ModelRouter, valida_con_parser, record_usage
+
+
+class TestModelRouter:
+    
+    @pytest.fixture
+    def routing(self, monkeypatch):
+        """Habilita el enrutado con un modelo global conocido"""
+        monkeypatch.setattr(model_router.settings, 'MODEL_ROUTING_ENABLED', True)
+        monkeypatch.setattr(model_router.settings, 'MODEL_NAME', 'modelo-base')
+        return model_router.settings
+    
+    def test_sin_enrutado_la_llamada_no_cambia(self, monkeypatch):
+        """Verifica que con el enrutado deshabilitado se llama igual que antes"""
+        monkeypatch.setattr(model_router.settings, 'MODEL_ROUTING_ENABLED', False)
+        call_fn = Mock(return_value="respuesta")
+        
+        resultado = ModelRouter(routes={}, prices={}).call("developer", "prompt", call_fn, validate=lambda r: False)
+        
+        assert resultado == "respuesta"
+        call_fn.assert_called_once_with("prompt", "")
+    
+    def test_ruta_por_defecto_del_agente(self, routing, monkeypatch):
+        """Verifica que cada agente tiene su temperatura y, salvo configuración, MAX_OUTPUT_TOKENS"""
+        monkeypatch.setattr(model_router.settings, 'MAX_OUTPUT_TOKENS', 3000)
+        route = ModelRouter(routes={}, prices={}).route("reviewer")
+        
+        assert route.models == ['modelo-base']
+        assert route.temperature == 0.0
+        assert route.max_output_tokens == 3000
+        
+        route = ModelRouter(routes={"reviewer": {"max_output_tokens": 2048}}, prices={}).route("reviewer")
+        assert route.max_output_tokens == 2048
+    
+    def test_ruta_configurada_sobrescribe_valores(self, routing):
+        """Verifica que MODEL_ROUTES sobrescribe modelos y parámetros"""
+        router = ModelRouter(routes={"developer": {"models": ["barato", "caro"], "temperature": 0.3}}, prices={})
+        route = router.route("developer")
+        
+        assert route.models == ["barato", "caro"]
+        assert route.temperature == 0.3
+        assert route.max_output_tokens == 8192
+    
+    def test_cascada_escala_solo_si_la_validacion_falla(self, routing):
+        """Verifica que se prueba el modelo barato primero y se escala al fallar la validación"""
+        router = ModelRouter(routes={"developer": {"models": ["barato", "caro"]}}, prices={})
+        call_fn = Mock(side_effect=["incompleto", "codigo completo"])
+        
+        resultado = router.call("developer", "prompt", call_fn, validate=lambda r: r == "codigo completo")
+        
+        assert resultado == "codigo completo"
+        modelos = [c.kwargs["model"] for c in call_fn.call_args_list]
+        assert modelos == ["barato", "caro"]
+        assert call_fn.call_args.kwargs["max_output_tokens"] == 8192
+        assert router.report()["developer/barato"]["rejected"] == 1
+    
+    def test_cascada_no_escala_con_respuesta_valida(self, routing):
+        """Verifica que una respuesta válida del primer modelo no escala"""
+        router = ModelRouter(routes={"reviewer": {"models": ["barato", "caro"]}}, prices={})
+        call_fn = Mock(return_value='{"ok": true}')
+        
+        router.call("reviewer", "prompt", call_fn)
+        
+        call_fn.assert_called_once()
+    
+    def test_error_de_api_escala(self, routing):
+        """Verifica que un error de la API cuenta como respuesta no válida"""
+        router = ModelRouter(routes={"sonar": {"models": ["barato", "caro"]}}, prices={})
+        call_fn = Mock(side_effect=["ERROR_503: sobrecargado", "instrucciones"])
+        
+        assert router.call("sonar", "prompt", call_fn) == "instrucciones"
+    
+    def test_modelo_forzado_desactiva_la_cascada(self, routing):
+        """Verifica que un modelo explícito (recuperación) sustituye a la cascada"""
+        router = ModelRouter(routes={"developer": {"models": ["barato", "caro"]}}, prices={})
+        call_fn = Mock(return_value="x")
+        
+        router.call("developer", "prompt", call_fn, validate=lambda r: False, model="grande", temperature=0.7)
+        
+        call_fn.assert_called_once()
+        assert call_fn.call_args.kwargs["model"] == "grande"
+        assert call_fn.call_args.kwargs["temperature"] == 0.7
+    
+    def test_informe_de_coste_estimado_sin_usage(self, routing):
+        """Verifica que sin usage_metadata el coste se estima con los precios configurados"""
+        router = ModelRouter(routes={}, prices={"modelo-base": [1.0, 2.0]})
+        router.call("stakeholder", "a" * 4000, Mock(return_value="b" * 4000))
+        
+        informe = router.report()["stakeholder/modelo-base"]
+        assert informe["calls"] == 1
+        assert informe["estimated_calls"] == 1
+        assert informe["cost_usd"] == pytest.approx((1000 * 1.0 + 1000 * 2.0) / 1_000_000)
+        assert "stakeholder/modelo-base" in router.format_report()
+        assert "1 llamadas estimadas" in router.format_report()
+    
+    def test_informe_de_coste_con_usage_real(self, routing):
+        """Verifica que el coste usa el usage_metadata de la respuesta (razonamiento incluido)"""
+        router = ModelRouter(routes={}, prices={"modelo-base": [1.0, 2.0]})
+        usage = Mock(prompt_token_count=300, candidates_token_count=50, thoughts_token_count=150)
+        
+        def call_fn(prompt, context, **kwargs):
+            record_usage(Mock(usage_metadata=usage))
+            return "b" * 4000
+        
+        router.call("stakeholder", "a" * 4000, call_fn)
+        
+        informe = router.report()["stakeholder/modelo-base"]
+        assert informe["estimated_calls"] == 0
+        assert (informe["input_tokens"], informe["output_tokens"]) == (300, 200)
+        assert informe["cost_usd"] == pytest.approx((300 * 1.0 + 200 * 2.0) / 1_000_000)
+    
+    def test_respuesta_compartida_no_tiene_coste(self, routing):
+        """Verifica que una respuesta reutilizada (single-flight) no suma tokens"""
+        router = ModelRouter(routes={}, prices={"modelo-base": [1.0, 2.0]})
+        
+        def call_fn(prompt, context, **kwargs):
+            record_usage(None)
+            return "respuesta"
+        
+        router.call("stakeholder", "prompt", call_fn)
+        
+        assert router.report()["stakeholder/modelo-base"]["cost_usd"] == 0
+    
+    def test_record_usage_fuera_del_router_no_hace_nada(self):
+        """Verifica que registrar uso sin una llamada del router en curso se ignora"""
+        record_usage(Mock(usage_metadata=Mock(prompt_token_count=1, candidates_token_count=1)))
+    
+    def test_json_invalido_se_ignora(self, routing):
+        """Verifica que una configuración JSON inválida no rompe el router"""
+        routing.MODEL_ROUTES = "{no es json"
+        assert ModelRouter(prices={}).route("developer").models == ['modelo-base']
+
+
+class TestValidaConParser:
+    
+    def test_acepta_solo_respuestas_parseables(self):
+        """Verifica el validador basado en el parser de salida estructurada"""
+        parser = Mock()
+        parser.parse.side_effect = [None, ValueError("no")]
+        validar = valida_con_parser(parser)
+        
+        assert validar("ok") is True
+        assert validar("mal") is False
@@ -2,7 +2,7 @@ import pytest
 from unittest.mock import Mock, patch
 from pydantic import BaseModel
 from langchain_core.exceptions import OutputParserException
-from llm.output_parsers import RobustPydanticOutputParser
+from llm.output_parsers import RobustPydanticOutputParser, extract_first_json_object
 
 
 class TestModel(BaseModel):
@@ -105,45 +105,34 @@ That's all!'''
         with pytest.raises(OutputParserException):
             parser.parse(invalid_json)
     
-    def test_clean_markdown_blocks_con_json_block(self, parser):
-        """Verifica que _clean_markdown_blocks limpia bloques json"""
+    def test_extraccion_con_bloque_json(self):
+        """Verifica que se extrae el JSON de un bloque ```json"""
         text = '```json\n{"test": "value"}\n```'
-        result = parser._clean_markdown_blocks(text)
-        
-        assert '```' not in result
-        assert '{"test": "value"}' in result
+        assert extract_first_json_object(text) == '{"test": "value"}'
     
-    def test_clean_markdown_blocks_con_block_simple(self, parser):
-        """Verifica que _clean_markdown_blocks limpia bloques simples"""
+    def test_extraccion_con_bloque_simple(self):
+        """Verifica que se extrae el JSON de un bloque ``` sin lenguaje"""
         text = '```\n{"test": "value"}\n```'
-        result = parser._clean_markdown_blocks(text)
-        
-        assert '```' not in result
-        assert '{"test": "value"}' in result
+        assert extract_first_json_object(text) == '{"test": "value"}'
     
-    def test_clean_markdown_blocks_sin_bloques(self, parser):
-        """Verifica que _clean_markdown_blocks retorna texto sin cambios"""
-        text = '{"test": "value"}'
-        result = parser._clean_markdown_blocks(text)
-        
-        assert result == '{"test": "value"}'
+    def test_extraccion_sin_bloques(self):
+        """Verifica que un JSON sin bloques se devuelve sin cambios"""
+        assert extract_first_json_object('{"test": "value"}') == '{"test": "value"}'
     
-    def test_extract_json_encuentra_json_en_texto(self, parser):
-        """Verifica que _extract_json extrae JSON del texto"""
+    def test_extraccion_encuentra_json_en_texto(self):
+        """Verifica que se extrae el JSON rodeado de texto"""
         text = 'Some text before\n{"name": "test", "value": 42}\nSome text after'
-        result = parser._extract_json(text)
-        
-        assert '{"name": "test", "value": 42}' in result
+        assert extract_first_json_object(text) == '{"name": "test", "value": 42}'
     
-    def test_extract_json_con_json_multilinea(self, parser):
-        """Verifica que _extract_json extrae JSON multilínea"""
+    def test_extraccion_con_json_multilinea(self):
+        """Verifica que se extrae JSON multilínea"""
         text = '''Some text
 {
     "name": "test",
     "value": 42
 }
 More text'''
-        result = parser._extract_json(text)
+        result = extract_first_json_object(text)
         
         assert '"name"' in result
         assert '"value"' in result
@@ -178,3 +167,70 @@ Hope this helps!'''
         assert isinstance(result, TestModel)
         assert result.name == "test"
         assert result.value == 42
+
+
+class TestExtractFirstJsonObject:
+    
+    def test_extrae_objeto_de_fence_json(self):
+        """Verifica que la búsqueda empieza dentro del bloque ```json"""
+        text = 'Código: ```ts\nfunction f() { return {"x": 1}; }\n```\n```json\n{"name": "a", "value": 1}\n```'
+        assert extract_first_json_object(text) == '{"name": "a", "value": 1}'
+    
+    def test_ignora_llaves_dentro_de_strings(self):
+        """Verifica que las llaves y comillas escapadas en strings no rompen el balanceo"""
+        text = 'Respuesta: {"name": "a } b { \\" c", "value": 2} fin'
+        assert extract_first_json_object(text) == '{"name": "a } b { \\" c", "value": 2}'
+    
+    def test_salta_placeholders_y_codigo(self):
+        """Verifica que {placeholder} o bloques de código no se toman como JSON"""
+        text = 'Usa {nombre} o if (x) { y(); } y después {"name": "a", "value": 3}'
+        assert extract_first_json_object(text) == '{"name": "a", "value": 3}'
+    
+    def test_objeto_anidado(self):
+        """Verifica que devuelve el objeto completo con anidamiento"""
+        text = '{"a": {"b": [1, {"c": 2}]}, "d": "x"} resto {"e": 1}'
+        assert extract_first_json_object(text) == '{"a": {"b": [1, {"c": 2}]}, "d": "x"}'
+    
+    def test_sin_objeto_devuelve_none(self):
+        """Verifica que devuelve None si no hay objeto balanceado"""
+        assert extract_first_json_object('sin json') is None
+        assert extract_first_json_object('{"a": 1') is None
+        assert extract_first_json_object('') is None
+
+
+class TestParseUnaSolaValidacion:
+    
+    @pytest.fixture
+    def parser(self):
+        """Fixture que retorna un parser configurado"""
+        return RobustPydanticOutputParser(pydantic_object=TestModel)
+    
+    def test_error_de_schema_no_reintenta(self, parser):
+        """Verifica que un JSON válido que no cumple el schema falla sin reintentos"""
+        with patch('langchain_core.output_parsers.PydanticOutputParser.parse') as mock_super:
+            with pytest.raises(OutputParserException, match="schema"):
+                parser.parse('{"name": "test", "value": "no es int"}')
+            mock_super.assert_not_called()
+    
+    def test_json_valido_no_usa_parser_tolerante(self, parser):
+        """Verifica que el JSON estricto se valida una sola vez con model_validate_json"""
+        with patch('langchain_core.output_parsers.PydanticOutputParser.parse') as mock_super:
+            result = parser.parse('Texto previo ```json\n{"name": "t", "value": 1}\n``` texto posterior')
+            mock_super.assert_not_called()
+        assert result.value == 1
+
+
+class TestParsersDeVeredicto:
+    
+    def test_parsers_se_reutilizan(self):
+        """Verifica que los parsers de veredicto se crean una sola vez"""
+        from llm.output_parsers import get_code_review_parser, get_stakeholder_verdict_parser
+        assert get_code_review_parser() is get_code_review_parser()
+        assert get_stakeholder_verdict_parser() is get_stakeholder_verdict_parser()
+    
+    def test_stakeholder_verdict_parsea_json(self):
+        """Verifica el parsing del veredicto del Stakeholder"""
+        from llm.output_parsers import get_stakeholder_verdict_parser
+        veredicto = get_stakeholder_verdict_parser().parse('{"validado": false, "motivo": "Formato incorrecto"}')
+        assert veredicto.validado is False
+        assert veredicto.motivo == "Formato incorrecto"
@@ -0,0 +1,119 @@
+import asyncio
+import threading
+import time
+import pytest
+from unittest.mock import Mock
+from concurrent.futures import ThreadPoolExecutor
+from llm.single_flight import SingleFlight, request_key
+
+
+def _esperar_agrupadas(sf, n, timeout=2.0):
+    """Espera a que n llamadas se hayan enganchado a la petición en curso"""
+    limite = time.monotonic() + timeout
+    while sf.stats()["coalesced"] < n and time.monotonic() < limite:
+        time.sleep(0.001)
+
+
+class TestRequestKey:
+    
+    def test_misma_peticion_misma_clave(self):
+        """Verifica que modelo, configuración y prompt determinan la clave"""
+        config = {"temperature": 0.1, "max_output_tokens": 100}
+        
+        assert request_key("m", config, "p") == request_key("m", dict(config), "p")
+        assert request_key("m", config, "p") != request_key("m", config, "otro")
+        assert request_key("m", config, "p") != request_key("m2", config, "p")
+        assert request_key("m", config, "p") != request_key("m", {**config, "temperature": 0.7}, "p")
+
+
+class TestSingleFlight:
+    
+    def test_hilos_con_peticion_identica_comparten_llamada(self):
+        """Verifica que llamadas idénticas concurrentes ejecutan la petición una sola vez"""
+        sf = SingleFlight()
+        liberar = threading.Event()
+        fn = Mock(side_effect=lambda: liberar.wait(2) and "respuesta")
+        
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            futuros = [executor.submit(sf.do, "k", fn) for _ in range(5)]
+            _esperar_agrupadas(sf, 4)
+            liberar.set()
+            resultados = [f.result() for f in futuros]
+        
+        assert resultados == ["respuesta"] * 5
+        fn.assert_called_once()
+        assert sf.stats() == {"calls": 5, "coalesced": 4, "inflight": 0}
+    
+    def test_no_es_cache(self):
+        """Verifica que una llamada posterior a la finalización vuelve a ejecutarse"""
+        sf = SingleFlight()
+        fn = Mock(return_value="ok")
+        
+        sf.do("k", fn)
+        sf.do("k", fn)
+        
+        assert fn.call_count == 2
+    
+    def test_excepcion_se_propaga_a_los_agrupados(self):
+        """Verifica que el error de la petición compartida llega a todos los llamantes"""
+        sf = SingleFlight()
+        liberar = threading.Event()
+        
+        def fn():
+            liberar.wait(2)
+            raise RuntimeError("503")
+        
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futuros = [executor.submit(sf.do, "k", fn) for _ in range(3)]
+            _esperar_agrupadas(sf, 2)
+            liberar.set()
+            for futuro in futuros:
+                with pytest.raises(RuntimeError, match="503"):
+                    futuro.result()
+        
+        assert sf.stats()["inflight"] == 0
+    
+    def test_tareas_asyncio_comparten_llamada(self):
+        """Verifica la agrupación entre tareas asyncio"""
+        sf = SingleFlight()
+        llamadas = []
+        
+        async def peticion():
+            llamadas.append(1)
+            await asyncio.sleep(0.05)
+            return "ok"
+        
+        async def lanzar():
+            return await asyncio.gather(*(sf.do_async("k", peticion) for _ in range(4)))
+        
+        assert asyncio.run(lanzar()) == ["ok"] * 4
+        assert len(llamadas) == 1
+
+
+class TestCallGeminiSingleFlight:
+    
+    def test_call_gemini_agrupa_llamadas_identicas(self, monkeypatch):
+        """Verifica que call_gemini no repite una petición idéntica en curso"""
+        import llm.gemini_client as gemini_client
+        monkeypatch.setattr(gemini_client.settings, 'SINGLE_FLIGHT_ENABLED', True)
+        monkeypatch.setattr(gemini_client.settings, 'LLM_MOCK_MODE', False)
+        monkeypatch.setattr(gemini_client.settings, 'USE_LANGCHAIN_WRAPPER', False)
+        monkeypatch.setattr(gemini_client.settings, 'LLM_HEDGING_ENABLED', False)
+        sf = SingleFlight()
+        monkeypatch.setattr(gemini_client, 'get_single_flight', lambda: sf)
+        
+        liberar = threading.Event()
+        response = Mock()
+        response.text = "requisitos"
+        fake_client = Mock()
+        fake_client.models.generate_content.side_effect = lambda **kwargs: liberar.wait(2) and response
+        monkeypatch.setattr(gemini_client, 'client', fake_client)
+        
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futuros = [executor.submit(gemini_client.call_gemini, "mismo prompt") for _ in range(3)]
+            _esperar_agrupadas(sf, 2)
+            liberar.set()
+            resultados = [f.result() for f in futuros]
+        
+        assert resultados == ["requisitos"] * 3
+        assert fake_client.models.generate_content.call_count == 1
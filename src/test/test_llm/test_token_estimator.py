@@ -0,0 +1,131 @@
+import pytest
+from unittest.mock import Mock, patch
+from llm import token_estimator
+from llm.token_estimator import TokenEstimator, _contar_base
+
+
+class TestContarBase:
+    
+    def test_texto_vacio(self):
+        """Verifica que un texto vacío no tiene tokens"""
+        assert _contar_base("") == 0
+        assert TokenEstimator().estimate("") == 0
+    
+    def test_palabras_cortas_un_token(self):
+        """Verifica que cada palabra corta cuenta como un token"""
+        assert _contar_base("hola que tal") == 3
+    
+    def test_palabras_largas_en_trozos(self):
+        """Verifica que las palabras largas se dividen en varios tokens"""
+        assert _contar_base("internacionalizacion") == 4
+    
+    def test_digitos_y_signos_por_separado(self):
+        """Verifica que cada dígito y cada signo es un token"""
+        assert _contar_base("x=123;") == 6
+    
+    def test_indentacion_y_saltos_de_linea(self):
+        """Verifica que saltos de línea e indentación cuentan, pero no el espacio simple"""
+        assert _contar_base("a b\n    c") == 4
+
+
+class TestTokenEstimator:
+    
+    def test_calibracion_ajusta_factor(self):
+        """Verifica que la primera muestra fija el factor y las siguientes lo suavizan"""
+        estimador = TokenEstimator()
+        texto = "casa " * 100
+        
+        assert estimador.calibrate(texto, 150) is True
+        assert estimador.factor == pytest.approx(1.5)
+        assert estimador.estimate(texto) == 150
+        
+        estimador.calibrate(texto, 100)
+        assert estimador.factor == pytest.approx(1.5 + 0.2 * (1.0 - 1.5))
+    
+    def test_calibracion_ignora_muestras_no_validas(self):
+        """Verifica que conteos ausentes, no enteros o muy pequeños no calibran"""
+        estimador = TokenEstimator()
+        
+        assert estimador.calibrate("casa " * 100, None) is False
+        assert estimador.calibrate("casa " * 100, Mock()) is False
+        assert estimador.calibrate("hola", 5) is False
+        assert estimador.factor == 1.0
+    
+    def test_factor_acotado(self):
+        """Verifica que un conteo real anómalo no dispara el factor"""
+        estimador = TokenEstimator()
+        estimador.calibrate("casa " * 100, 100000)
+        
+        assert estimador.factor == 2.0
+    
+    def test_calibrate_from_response(self):
+        """Verifica la calibración con usage_metadata de google-genai"""
+        estimador = TokenEstimator()
+        response = Mock()
+        response.usage_metadata.prompt_token_count = 200
+        response.usage_metadata.candidates_token_count = None
+        
+        estimador.calibrate_from_response("casa " * 100, "ok", response)
+        
+        assert estimador.factor == pytest.approx(2.0)
+        assert estimador.samples == 1
+    
+    def test_calibrate_from_response_sin_prompt(self):
+        """Verifica que con calibrar_prompt=False solo se usa la salida"""
+        estimador = TokenEstimator()
+        response = Mock()
+        response.usage_metadata.prompt_token_count = 200
+        response.usage_metadata.candidates_token_count = 50
+        
+        estimador.calibrate_from_response("casa " * 100, "casa " * 50, response, calibrar_prompt=False)
+        
+        assert estimador.factor == pytest.approx(1.0)
+        assert estimador.samples == 1
+    
+    def test_cache_lru_para_textos_repetidos(self):
+        """Verifica que un texto repetido se sirve desde la caché"""
+        estimador = TokenEstimator()
+        texto = "texto repetido único para la caché " * 10
+        
+        estimador.estimate(texto)
+        hits = estimador.stats()["cache_hits"]
+        estimador.estimate(texto)
+        
+        assert estimador.stats()["cache_hits"] == hits + 1
+
+
+class TestIntegracionEstimador:
+    
+    def test_get_token_count_no_construye_llm(self, monkeypatch):
+        """Verifica que get_token_count usa el estimador local si está habilitado"""
+        import llm.langchain_gemini as langchain_gemini
+        monkeypatch.setattr(langchain_gemini.settings, 'LOCAL_TOKEN_ESTIMATOR_ENABLED', True)
+        
+        with patch('llm.langchain_gemini.create_langchain_llm') as mock_create:
+            resultado = langchain_gemini.get_token_count("hola que tal")
+        
+        mock_create.assert_not_called()
+        assert resultado["estimated"] is True
+        assert resultado["total_tokens"] > 0
+    
+    def test_call_gemini_calibra_con_usage_metadata(self, monkeypatch):
+        """Verifica que call_gemini calibra el estimador con la respuesta real"""
+        import llm.gemini_client as gemini_client
+        monkeypatch.setattr(gemini_client.settings, 'LOCAL_TOKEN_ESTIMATOR_ENABLED', True)
+        monkeypatch.setattr(gemini_client.settings, 'LLM_MOCK_MODE', False)
+        monkeypatch.setattr(gemini_client.settings, 'USE_LANGCHAIN_WRAPPER', False)
+        estimador = TokenEstimator()
+        monkeypatch.setattr(gemini_client, 'get_token_estimator', lambda: estimador)
+        
+        response = Mock()
+        response.text = "casa " * 50
+        response.usage_metadata.prompt_token_count = 10
+        response.usage_metadata.candidates_token_count = 100
+        fake_client = Mock()
+        fake_client.models.generate_content.return_value = response
+        monkeypatch.setattr(gemini_client, 'client', fake_client)
+        
+        gemini_client.call_gemini("prompt")
+        
+        assert estimador.samples == 1
+        assert estimador.factor == pytest.approx(2.0)
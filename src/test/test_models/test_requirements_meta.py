@@ -0,0 +1,58 @@
+import json
+from models.requirements_meta import ParsedRequirements, obtener_requisitos_meta
+
+
+class TestParsedRequirements:
+    
+    def test_from_dict_typescript(self):
+        """Verifica lenguaje, nombres de fichero y framework para TypeScript"""
+        meta = ParsedRequirements.from_dict({"lenguaje_version": "TypeScript 5.0", "nombre_funcion": "CalcularFactorial"})
+        
+        assert meta.lenguaje == "typescript"
+        assert meta.extension == ".ts"
+        assert meta.nombre_base == "calcular_factorial"
+        assert meta.test_framework == "vitest"
+        assert meta.codigo_filename == "calcular_factorial.ts"
+        assert meta.test_filename == "calcular_factorial.spec.ts"
+    
+    def test_from_dict_python_por_defecto(self):
+        """Verifica los valores por defecto con requisitos vacíos"""
+        meta = ParsedRequirements.from_dict({})
+        
+        assert (meta.lenguaje, meta.extension, meta.nombre_base) == ("python", ".py", "codigo_generado")
+        assert meta.test_framework == "pytest"
+        assert meta.test_filename == "codigo_generado.spec.py"
+    
+    def test_from_json_invalido_usa_valores_por_defecto(self):
+        """Verifica que un JSON inválido (p. ej. ERROR_PARSING) no lanza excepción"""
+        meta = ParsedRequirements.from_json("ERROR_PARSING: fallo")
+        
+        assert meta.lenguaje == "python"
+    
+    def test_ida_y_vuelta_por_estado(self):
+        """Verifica que to_state es serializable y from_state lo reconstruye"""
+        meta = ParsedRequirements("typescript", ".ts", "suma")
+        data = json.loads(json.dumps(meta.to_state()))
+        
+        assert ParsedRequirements.from_state(data).to_state() == meta.to_state()
+
+
+class TestObtenerRequisitosMeta:
+    
+    def test_usa_metadatos_del_estado_sin_parsear(self):
+        """Verifica que se leen los metadatos precalculados en lugar del JSON"""
+        state = {
+            'requisitos_formales': '{"lenguaje_version": "Python 3.11"}',
+            'requisitos_meta': ParsedRequirements("typescript", ".ts", "suma").to_state()
+        }
+        
+        assert obtener_requisitos_meta(state).lenguaje == "typescript"
+    
+    def test_calcula_y_guarda_si_faltan(self):
+        """Verifica el cálculo desde requisitos_formales cuando el estado no tiene metadatos"""
+        state = {'requisitos_formales': '{"lenguaje_version": "TypeScript", "titulo": "Suma"}'}
+        
+        meta = obtener_requisitos_meta(state)
+        
+        assert meta.codigo_filename == "suma.ts"
+        assert state['requisitos_meta']['nombre_base'] == "suma"
@@ -0,0 +1,118 @@
+import shutil
+import subprocess
+import pytest
+from unittest.mock import Mock, patch
+from services.git_plumbing import LocalGitRepository, GitPlumbingError
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git no está instalado")
+
+
+def _git(*args, cwd):
+    return subprocess.run(["git", *args], cwd=cwd, capture_output=True, text=True, check=True).stdout.strip()
+
+
+@pytest.fixture
+def repos(tmp_path):
+    """Repositorio bare (remoto) y un clon local con un commit inicial en main"""
+    remote = tmp_path / "remote.git"
+    work = tmp_path / "work"
+    _git("init", "--quiet", "--bare", "--initial-branch=main", str(remote), cwd=tmp_path)
+    _git("clone", "--quiet", str(remote), str(work), cwd=tmp_path)
+    _git("config", "user.email", "test@example.com", cwd=work)
+    _git("config", "user.name", "Test", cwd=work)
+    _git("checkout", "--quiet", "-b", "main", cwd=work)
+    (work / "README.md").write_text("hola\n", encoding="utf-8")
+    _git("add", "README.md", cwd=work)
+    _git("commit", "--quiet", "-m", "inicial", cwd=work)
+    _git("push", "--quiet", "origin", "main", cwd=work)
+    return remote, work
+
+
+class TestLocalGitRepository:
+    
+    def test_commit_y_push_llegan_al_remoto(self, repos):
+        """Verifica que el commit se construye localmente y se publica con un push"""
+        remote, work = repos
+        repo = LocalGitRepository(str(work), remote="origin")
+        
+        sha = repo.commit_files("feature/suma", {"src/suma.ts": "export const a = 1;\n"}, "feat: suma", base_branch="main")
+        repo.push_branch("feature/suma")
+        
+        assert _git("rev-parse", "feature/suma", cwd=remote) == sha
+        assert _git("show", "feature/suma:src/suma.ts", cwd=remote) == "export const a = 1;"
+        assert _git("show", "feature/suma:README.md", cwd=remote) == "hola"
+        assert _git("log", "-1", "--format=%s", "feature/suma", cwd=remote) == "feat: suma"
+    
+    def test_no_modifica_working_tree_ni_indice(self, repos):
+        """Verifica que el commit no toca el checkout del usuario"""
+        _, work = repos
+        repo = LocalGitRepository(str(work), remote="origin")
+        
+        repo.commit_files("feature/x", {"src/x.ts": "x\n"}, "feat: x", base_branch="main")
+        
+        assert _git("status", "--porcelain", cwd=work) == ""
+        assert _git("symbolic-ref", "--short", "HEAD", cwd=work) == "main"
+        assert not (work / "src" / "x.ts").exists()
+    
+    def test_segundo_commit_se_apila_sobre_el_branch_existente(self, repos):
+        """Verifica que un branch existente se usa como parent"""
+        _, work = repos
+        repo = LocalGitRepository(str(work), remote="origin")
+        
+        primero = repo.commit_files("feature/x", {"src/x.ts": "v1\n"}, "v1", base_branch="main")
+        segundo = repo.commit_files("feature/x", {"test/x.spec.ts": "t\n"}, "v2", base_branch="main")
+        
+        assert _git("rev-parse", f"{segundo}^", cwd=work) == primero
+        assert _git("show", f"{segundo}:src/x.ts", cwd=work) == "v1"
+    
+    def test_branch_base_inexistente_lanza_error(self, repos):
+        """Verifica que se lanza GitPlumbingError si no existe el branch base"""
+        _, work = repos
+        repo = LocalGitRepository(str(work), remote="origin")
+        
+        with pytest.raises(GitPlumbingError):
+            repo.commit_files("feature/x", {"a.ts": "a"}, "a", base_branch="no-existe")
+    
+    def test_delete_branch(self, repos):
+        """Verifica que se borra el branch local y se protege el base"""
+        _, work = repos
+        repo = LocalGitRepository(str(work), remote="origin")
+        repo.commit_files("feature/x", {"a.ts": "a"}, "a", base_branch="main")
+        
+        assert repo.delete_branch("feature/x", "main") is True
+        assert repo.resolve("refs/heads/feature/x") is None
+        assert repo.delete_branch("feature/x", "main") is False
+        with pytest.raises(GitPlumbingError):
+            repo.delete_branch("main", "main")
+
+
+class TestGitHubServiceLocalCommitMode:
+    
+    def test_create_branch_and_commit_en_modo_local_no_usa_la_api(self, repos, monkeypatch):
+        """Verifica que GITHUB_COMMIT_MODE=local hace commit y push sin blobs/trees de la API"""
+        from services import github_service as github_service_module
+        remote, work = repos
+        settings = github_service_module.settings
+        monkeypatch.setattr(settings, 'GITHUB_ENABLED', True)
+        monkeypatch.setattr(settings, 'GITHUB_TOKEN', 'test_token')
+        monkeypatch.setattr(settings, 'GITHUB_COMMIT_MODE', 'local')
+        monkeypatch.setattr(settings, 'GITHUB_REPO_PATH', str(work))
+        monkeypatch.setattr(settings, 'GITHUB_BASE_BRANCH', 'main')
+        monkeypatch.setattr(settings, 'GITHUB_REMOTE_NAME', 'origin')
+        
+        with patch('services.github_service.GITHUB_AVAILABLE', True):
+            with patch('services.github_service.Github'):
+                service = github_service_module.GitHubService()
+                service.enabled = True
+                service.repo = Mock()
+                
+                success, sha = service.create_branch_and_commit(
+                    "AI_Generated_suma", {"src/suma.ts": "export const a = 1;\n"}, "feat: suma"
+                )
+        
+        assert success is True
+        assert _git("rev-parse", "AI_Generated_suma", cwd=remote) == sha
+        service.repo.create_git_blob.assert_not_called()
+        service.repo.create_git_ref.assert_not_called()
+        
+        assert service.delete_local_branch("AI_Generated_suma") is True
@@ -0,0 +1,94 @@
+import pytest
+from services.github_http_cache import GitHubConditionalCache
+
+
+class FakeRequester:
+    """Requester mínimo que simula respuestas de GitHub con ETag"""
+    
+    def __init__(self):
+        self.calls = []
+        self.responses = {}
+        self.rate_limiting = (5000, 5000)
+    
+    def requestJsonAndCheck(self, verb, url, parameters=None, headers=None, input=None):
+        self.calls.append((verb, url, dict(headers or {})))
+        etag, data = self.responses[url]
+        if verb == "GET" and (headers or {}).get("If-None-Match") == etag:
+            return {"etag": etag}, None
+        return {"ETag": etag}, data
+
+
+class TestGitHubConditionalCache:
+    
+    @pytest.fixture
+    def requester(self):
+        requester = FakeRequester()
+        requester.responses["/repos/o/r"] = ('"abc"', {"name": "r"})
+        return requester
+    
+    def test_segundo_get_envia_if_none_match_y_usa_cache(self, requester):
+        """Verifica que un 304 se sirve desde la caché"""
+        cache = GitHubConditionalCache(max_entries=10, warn_threshold=10)
+        cache.install(requester)
+        
+        _, primero = requester.requestJsonAndCheck("GET", "/repos/o/r")
+        _, segundo = requester.requestJsonAndCheck("GET", "/repos/o/r")
+        
+        assert primero == segundo == {"name": "r"}
+        assert "If-None-Match" not in requester.calls[0][2]
+        assert requester.calls[1][2]["If-None-Match"] == '"abc"'
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+    
+    def test_respuesta_cacheada_no_se_comparte_por_referencia(self, requester):
+        """Verifica que modificar la respuesta devuelta no altera la caché"""
+        cache = GitHubConditionalCache(max_entries=10, warn_threshold=10)
+        cache.install(requester)
+        
+        _, primero = requester.requestJsonAndCheck("GET", "/repos/o/r")
+        primero["name"] = "modificado"
+        _, segundo = requester.requestJsonAndCheck("GET", "/repos/o/r")
+        
+        assert segundo == {"name": "r"}
+    
+    def test_peticiones_no_get_no_se_cachean(self, requester):
+        """Verifica que POST/PATCH pasan directamente sin cabeceras condicionales"""
+        cache = GitHubConditionalCache(max_entries=10, warn_threshold=10)
+        cache.install(requester)
+        
+        requester.requestJsonAndCheck("POST", "/repos/o/r", input={"x": 1})
+        requester.requestJsonAndCheck("POST", "/repos/o/r", input={"x": 1})
+        
+        assert all("If-None-Match" not in call[2] for call in requester.calls)
+        assert cache.stats()["entries"] == 0
+    
+    def test_lru_expulsa_la_entrada_mas_antigua(self, requester):
+        """Verifica que se respeta el máximo de entradas"""
+        requester.responses["/a"] = ('"1"', {"a": 1})
+        requester.responses["/b"] = ('"2"', {"b": 2})
+        cache = GitHubConditionalCache(max_entries=2, warn_threshold=10)
+        cache.install(requester)
+        
+        requester.requestJsonAndCheck("GET", "/repos/o/r")
+        requester.requestJsonAndCheck("GET", "/a")
+        requester.requestJsonAndCheck("GET", "/b")
+        requester.requestJsonAndCheck("GET", "/repos/o/r")
+        
+        assert cache.stats()["entries"] == 2
+        assert "If-None-Match" not in requester.calls[-1][2]
+    
+    def test_registra_rate_limit_y_avisa_por_debajo_del_umbral(self, requester):
+        """Verifica que se guarda el rate limit de las cabeceras y se avisa una sola vez"""
+        cache = GitHubConditionalCache(max_entries=10, warn_threshold=100)
+        cache.install(requester)
+        requester.rate_limiting = (42, 5000)
+        
+        with pytest.MonkeyPatch.context() as mp:
+            avisos = []
+            mp.setattr("services.github_http_cache.logger.warning", lambda msg: avisos.append(msg))
+            requester.requestJsonAndCheck("GET", "/repos/o/r")
+            requester.requestJsonAndCheck("GET", "/repos/o/r")
+        
+        assert cache.stats()["rate_limit_remaining"] == 42
+        assert cache.stats()["rate_limit_limit"] == 5000
+        assert len(avisos) == 1
@@ -304,3 +304,135 @@ class TestGitHubService:
                 success = service.merge_pull_request(123, 'Merge commit')
                 
                 assert success is False
+
+
+class TestParseNewFilesFromDiff:
+    
+    DIFF = (
+        "diff --git a/src/suma.ts b/src/suma.ts\n"
+        "new file mode 100644\n"
+        "index 0000000..e69de29\n"
+        "--- /dev/null\n"
+        "+++ b/src/suma.ts\n"
+        "@@ -0,0 +1,3 @@\n"
+        "+export function suma(a: number, b: number): number {\n"
+        "+  return a + b;\n"
+        "+}\n"
+        "diff --git a/README.md b/README.md\n"
+        "index 1111111..2222222 100644\n"
+        "--- a/README.md\n"
+        "+++ b/README.md\n"
+        "@@ -1 +1,2 @@\n"
+        " hola\n"
+        "+adios\n"
+        "diff --git a/viejo.txt b/viejo.txt\n"
+        "deleted file mode 100644\n"
+        "--- a/viejo.txt\n"
+        "+++ /dev/null\n"
+        "@@ -1 +0,0 @@\n"
+        "-x\n"
+        "diff --git a/nota.txt b/nota.txt\n"
+        "new file mode 100644\n"
+        "--- /dev/null\n"
+        "+++ b/nota.txt\n"
+        "@@ -0,0 +1 @@\n"
+        "+sin salto final\n"
+        "\\ No newline at end of file\n"
+    )
+    
+    def test_reconstruye_ficheros_nuevos(self):
+        """Verifica que los ficheros añadidos se reconstruyen desde el diff"""
+        from services.github_service import _parse_new_files_from_diff
+        nuevos, pendientes = _parse_new_files_from_diff(self.DIFF)
+        
+        assert nuevos["src/suma.ts"] == (
+            "export function suma(a: number, b: number): number {\n  return a + b;\n}\n"
+        )
+        assert nuevos["nota.txt"] == "sin salto final"
+    
+    def test_modificados_pendientes_y_borrados_ignorados(self):
+        """Verifica que los modificados se descargan aparte y los borrados se omiten"""
+        from services.github_service import _parse_new_files_from_diff
+        nuevos, pendientes = _parse_new_files_from_diff(self.DIFF)
+        
+        assert pendientes == ["README.md"]
+        assert "viejo.txt" not in nuevos
+    
+    def test_get_pr_files_usa_el_diff_y_descarga_solo_pendientes(self, monkeypatch):
+        """Verifica que get_pr_files hace una petición de diff y get_contents solo para modificados"""
+        from services import github_service
+        settings = github_service.settings
+        monkeypatch.setattr(settings, 'GITHUB_ENABLED', True)
+        monkeypatch.setattr(settings, 'GITHUB_TOKEN', 'test_token')
+        with patch('services.github_service.GITHUB_AVAILABLE', True):
+            with patch('services.github_service.Github') as MockGithub:
+                service = GitHubService()
+                service.enabled = True
+                service.repo = Mock()
+                service.repo.get_pull.return_value = Mock(url="/pulls/1", head=Mock(sha="abc"))
+                service.repo.get_contents.return_value = Mock(decoded_content=b"hola\nadios\n")
+                MockGithub.return_value.requester.requestJson.return_value = (200, {}, self.DIFF)
+                
+                files = service.get_pr_files(1)
+        
+        assert set(files) == {"src/suma.ts", "nota.txt", "README.md"}
+        service.repo.get_contents.assert_called_once_with("README.md", ref="abc")
+        service.repo.get_pull.return_value.get_files.assert_not_called()
+    
+    def test_get_pr_files_fallback_si_el_diff_falla(self, monkeypatch):
+        """Verifica que si GitHub no devuelve el diff se descarga fichero a fichero"""
+        from services import github_service
+        settings = github_service.settings
+        monkeypatch.setattr(settings, 'GITHUB_ENABLED', True)
+        monkeypatch.setattr(settings, 'GITHUB_TOKEN', 'test_token')
+        with patch('services.github_service.GITHUB_AVAILABLE', True):
+            with patch('services.github_service.Github') as MockGithub:
+                service = GitHubService()
+                service.enabled = True
+                service.repo = Mock()
+                pr = Mock(url="/pulls/1", head=Mock(sha="abc"))
+                pr.get_files.return_value = [
+                    Mock(filename="a.ts", status="added"),
+                    Mock(filename="b.ts", status="removed")
+                ]
+                service.repo.get_pull.return_value = pr
+                service.repo.get_contents.return_value = Mock(decoded_content=b"x")
+                MockGithub.return_value.requester.requestJson.return_value = (406, {}, "too large")
+                
+                files = service.get_pr_files(1)
+        
+        assert files == {"a.ts": "x"}
+
+
+class TestMergeablePolling:
+    
+    def test_revalida_la_pr_con_update_hasta_que_mergeable_se_conoce(self, monkeypatch):
+        """Verifica que se usa pr.update() (GET condicional) con backoff en lugar de get_pull repetido"""
+        from services import github_service
+        settings = github_service.settings
+        monkeypatch.setattr(settings, 'GITHUB_ENABLED', True)
+        monkeypatch.setattr(settings, 'GITHUB_TOKEN', 'test_token')
+        monkeypatch.setattr(settings, 'GITHUB_MERGEABLE_POLL_TIMEOUT', 8.0)
+        with patch('services.github_service.GITHUB_AVAILABLE', True):
+            with patch('services.github_service.Github'):
+                service = GitHubService()
+                service.enabled = True
+                service.repo = Mock()
+                pr = Mock(mergeable=None, mergeable_state='clean', state='open', merged=False)
+                pr.merge.return_value = Mock(merged=True)
+                
+                def update():
+                    if pr.update.call_count >= 2:
+                        pr.mergeable = True
+                    return True
+                pr.update.side_effect = update
+                service.repo.get_pull.return_value = pr
+                
+                with patch('services.github_service.time.sleep') as mock_sleep:
+                    with patch.object(service, '_get_reviewer_repo', return_value=None):
+                        success = service.merge_pull_request(1, 'msg')
+        
+        assert success is True
+        assert pr.update.call_count == 2
+        service.repo.get_pull.assert_called_once_with(1)
+        assert [c.args[0] for c in mock_sleep.call_args_list] == [0.5, 1.0]
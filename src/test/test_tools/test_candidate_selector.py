@@ -0,0 +1,137 @@
+import pytest
+import os
+from unittest.mock import patch
+from llm.hedging import hedge_scope, current_hedge_key
+from tools.candidate_selector import (
+    CandidateResult,
+    generar_candidatos,
+    seleccionar_mejor_candidato
+)
+
+
+def _respuesta_por_prompt(prompt):
+    """Devuelve una implementación distinta según la variante del prompt"""
+    if "alternativa #2" in prompt:
+        return "def suma(a, b):\n    return a + b  # v2"
+    if "alternativa #3" in prompt:
+        return "ERROR_API: fallo"
+    return "def suma(a, b):\n    return a + b  # v1"
+
+
+class TestCandidateResult:
+
+    def test_prefiere_candidata_con_tests_pasados(self):
+        """Verifica que una candidata con tests en verde gana aunque tenga más issues"""
+        verde = CandidateResult(1, "", "")
+        verde.tests_success, verde.tests_run, verde.static_penalty = True, {'passed': 3, 'failed': 0}, 50
+        rojo = CandidateResult(0, "", "")
+        rojo.tests_success, rojo.tests_run, rojo.static_penalty = False, {'passed': 2, 'failed': 1}, 0
+
+        assert min([rojo, verde], key=lambda r: r.sort_key()) is verde
+
+    def test_sin_tests_decide_el_analisis_estatico(self):
+        """Verifica que sin tests se elige la candidata con menor penalización"""
+        a = CandidateResult(0, "", "")
+        a.static_penalty = 10
+        b = CandidateResult(1, "", "")
+        b.static_penalty = 2
+
+        assert min([a, b], key=lambda r: r.sort_key()) is b
+
+
+class TestGenerarCandidatos:
+
+    def test_descarta_respuestas_con_error_y_conserva_el_indice(self):
+        """Verifica que los errores del LLM se descartan sin desplazar el índice de variante"""
+        def respuesta(prompt):
+            if "alternativa #2" in prompt:
+                return "ERROR_API: fallo"
+            return "v3" if "alternativa #3" in prompt else "v1"
+
+        respuestas = generar_candidatos("prompt", 3, respuesta)
+
+        assert respuestas == [(0, "v1"), (2, "v3")]
+
+    def test_propaga_el_contexto_del_llamante(self):
+        """Verifica que cada candidata ve los contextvars del hilo que la lanza (plazo, agente)"""
+        with hedge_scope("developer"):
+            respuestas = generar_candidatos("prompt", 2, lambda prompt: current_hedge_key("m"))
+
+        assert [r for _, r in respuestas] == ["developer/m", "developer/m"]
+
+
+class TestSeleccionarMejorCandidato:
+
+    def test_selecciona_candidata_con_menos_issues(self):
+        """Verifica que se conserva la candidata mejor puntuada y se limpian los directorios"""
+        directorios = []
+
+        def issues_por_fichero(path):
+            directorios.append(os.path.dirname(os.path.dirname(path)))
+            with open(path, encoding='utf-8') as f:
+                codigo = f.read()
+            return [] if "v2" in codigo else [{"severity": "MAJOR", "message": "x"}]
+
+        with patch('tools.candidate_selector.analizar_archivo_local', side_effect=issues_por_fichero):
+            mejor = seleccionar_mejor_candidato("prompt", 2, _respuesta_por_prompt, "suma.py", "python")
+
+        assert mejor is not None
+        assert "v2" in mejor.codigo
+        assert mejor.index == 1
+        assert directorios and not any(os.path.exists(d) for d in directorios)
+
+    def test_indice_de_variante_tras_descartar_errores(self):
+        """Verifica que la candidata ganadora conserva su índice aunque otra anterior fallara"""
+        def respuesta(prompt):
+            return "def f(): return 2" if "alternativa #2" in prompt else "ERROR_API: fallo"
+
+        with patch('tools.candidate_selector.analizar_archivo_local', return_value=[]):
+            mejor = seleccionar_mejor_candidato("prompt", 2, respuesta, "f.py", "python")
+
+        assert mejor.index == 1
+        assert mejor.respuesta_llm == "def f(): return 2"
+
+    def test_candidatas_identicas_se_evaluan_una_vez(self):
+        """Verifica que las candidatas duplicadas no se vuelven a evaluar"""
+        with patch('tools.candidate_selector.analizar_archivo_local', return_value=[]) as mock_analisis:
+            mejor = seleccionar_mejor_candidato("prompt", 3, lambda p: "def f(): pass", "f.py", "python")
+
+        assert mejor.index == 0
+        assert mock_analisis.call_count == 1
+
+    def test_ejecuta_tests_existentes_por_candidata(self, monkeypatch):
+        """Verifica que los tests previos se ejecutan en el pool con el código de cada candidata"""
+        monkeypatch.setattr('tools.candidate_selector.settings.TEST_EXECUTOR_POOL_ENABLED', True)
+        def tests_en_pool(test_path, code_path, lenguaje):
+            with open(code_path, encoding='utf-8') as f:
+                ok = "v1" in f.read()
+            assert os.path.dirname(test_path) == os.path.dirname(code_path)
+            assert os.path.basename(test_path) == "suma.spec.py"
+            return {'success': ok, 'tests_run': {'total': 1, 'passed': 1 if ok else 0, 'failed': 0 if ok else 1}}
+
+        with patch('tools.candidate_selector.analizar_archivo_local', return_value=[]), \
+             patch('agents.developer_unit_tests.ejecutar_tests_en_pool', side_effect=tests_en_pool):
+            mejor = seleccionar_mejor_candidato(
+                "prompt", 2, _respuesta_por_prompt, "suma.py", "python",
+                tests="def test_suma(): pass", test_filename="suma.spec.py"
+            )
+
+        assert "v1" in mejor.codigo
+        assert mejor.tests_success is True
+
+    def test_sin_pool_no_ejecuta_tests(self, monkeypatch):
+        """Verifica que sin TEST_EXECUTOR_POOL_ENABLED la selección es solo por análisis estático"""
+        monkeypatch.setattr('tools.candidate_selector.settings.TEST_EXECUTOR_POOL_ENABLED', False)
+        with patch('tools.candidate_selector.analizar_archivo_local', return_value=[]), \
+             patch('tools.candidate_selector._ejecutar_tests_candidato') as mock_tests:
+            mejor = seleccionar_mejor_candidato(
+                "prompt", 2, _respuesta_por_prompt, "suma.py", "python",
+                tests="def test_suma(): pass", test_filename="suma.spec.py"
+            )
+
+        mock_tests.assert_not_called()
+        assert mejor.tests_run is None
+
+    def test_devuelve_none_si_no_hay_candidatas_validas(self):
+        """Verifica que devuelve None si todas las llamadas al LLM fallan"""
+        assert seleccionar_mejor_candidato("prompt", 2, lambda p: "ERROR_API: fallo", "f.py", "python") is None
@@ -0,0 +1,133 @@
+import pytest
+import os
+import json
+from unittest.mock import Mock, patch
+from tools.node_toolchain import NodeToolchain, ToolchainError, MARKER_FILENAME
+
+
+def _instalar_falso(toolchain):
+    """Simula una instalación de npm creando los paquetes y el marcador"""
+    for package, bin_field in (("vitest", {"vitest": "./vitest.mjs"}), ("typescript", {"tsc": "./bin/tsc"})):
+        package_dir = os.path.join(toolchain.node_modules, package)
+        os.makedirs(package_dir, exist_ok=True)
+        with open(os.path.join(package_dir, "package.json"), "w", encoding="utf-8") as f:
+            json.dump({"name": package, "bin": bin_field}, f)
+    with open(os.path.join(toolchain.directory, "package.json"), "w", encoding="utf-8") as f:
+        json.dump(toolchain._package_json(), f)
+    with open(os.path.join(toolchain.directory, MARKER_FILENAME), "w", encoding="utf-8") as f:
+        json.dump({"vitest": toolchain.vitest_version, "typescript": toolchain.typescript_version}, f)
+
+
+@pytest.fixture
+def toolchain(tmp_path):
+    """Fixture que crea un toolchain en un directorio temporal"""
+    return NodeToolchain(base_directory=str(tmp_path), vitest_version="4.0.15", typescript_version="5.9.3")
+
+
+class TestNodeToolchain:
+
+    def test_directorio_versionado(self, toolchain, tmp_path):
+        """Verifica que el directorio incluye las versiones fijadas"""
+        assert toolchain.directory == os.path.join(str(tmp_path), "vitest-4.0.15_typescript-5.9.3")
+
+    def test_is_provisioned_requiere_marcador_con_versiones(self, toolchain):
+        """Verifica que el marcador debe coincidir con las versiones pedidas"""
+        assert toolchain.is_provisioned() is False
+        _instalar_falso(toolchain)
+        assert toolchain.is_provisioned() is True
+
+        otra = NodeToolchain(base_directory=toolchain.base_directory, vitest_version="4.0.15", typescript_version="5.9.3")
+        otra.typescript_version = "5.0.0"
+        assert otra.is_provisioned() is False
+
+    def test_ensure_provisioned_no_reinstala_si_esta_en_cache(self, toolchain):
+        """Verifica que con caché sana no se lanza npm install"""
+        _instalar_falso(toolchain)
+        with patch.object(toolchain, 'health_check', return_value=True), \
+             patch.object(toolchain, '_install') as mock_install:
+            toolchain.ensure_provisioned()
+            toolchain.ensure_provisioned()
+
+        mock_install.assert_not_called()
+
+    def test_ensure_provisioned_instala_si_falta(self, toolchain):
+        """Verifica que sin caché se instala y se verifica"""
+        with patch.object(toolchain, 'health_check', return_value=True), \
+             patch.object(toolchain, '_install') as mock_install:
+            toolchain.ensure_provisioned()
+
+        mock_install.assert_called_once()
+
+    def test_ensure_provisioned_falla_si_health_check_falla(self, toolchain):
+        """Verifica que un toolchain roto tras instalar lanza ToolchainError"""
+        with patch.object(toolchain, 'health_check', return_value=False), \
+             patch.object(toolchain, '_install'):
+            with pytest.raises(ToolchainError):
+                toolchain.ensure_provisioned()
+
+    def test_require_provisioned_no_instala(self, toolchain):
+        """Verifica que el camino caliente falla sin instalar si falta el toolchain"""
+        with patch.object(toolchain, '_install') as mock_install, \
+             patch.object(toolchain, 'health_check') as mock_health:
+            with pytest.raises(ToolchainError, match="provision_node_toolchain"):
+                toolchain.require_provisioned()
+            _instalar_falso(toolchain)
+            assert toolchain.require_provisioned() == toolchain.directory
+
+        mock_install.assert_not_called()
+        mock_health.assert_not_called()
+
+    def test_install_lanza_error_si_npm_falla(self, toolchain):
+        """Verifica que un npm install fallido no deja la caché a medias"""
+        with patch('tools.node_toolchain.subprocess.run') as mock_run:
+            mock_run.return_value = Mock(returncode=1, stderr="E404")
+            with pytest.raises(ToolchainError):
+                toolchain._install()
+
+        assert not os.path.exists(toolchain.directory)
+        assert os.listdir(toolchain.base_directory) == []
+
+    def test_vitest_command_usa_node_sin_npx(self, toolchain):
+        """Verifica que vitest se lanza con node y el entry del paquete"""
+        _instalar_falso(toolchain)
+        cmd = toolchain.vitest_command("suma.spec.ts")
+
+        assert cmd[0] == "node"
+        assert cmd[1] == os.path.join(toolchain.node_modules, "vitest", "./vitest.mjs")
+        assert cmd[2:4] == ["run", "suma.spec.ts"]
+
+    def test_link_into_enlaza_node_modules(self, toolchain, tmp_path):
+        """Verifica que el directorio de ejecución apunta al node_modules del toolchain"""
+        _instalar_falso(toolchain)
+        run_dir = tmp_path / "output"
+        (run_dir / "node_modules").mkdir(parents=True)
+
+        toolchain.link_into(str(run_dir))
+        toolchain.link_into(str(run_dir))
+
+        assert os.path.islink(run_dir / "node_modules")
+        assert os.path.realpath(run_dir / "node_modules") == os.path.realpath(toolchain.node_modules)
+        assert os.path.islink(run_dir / "package.json")
+
+    def test_link_into_error_de_enlace_es_toolchain_error(self, toolchain, tmp_path):
+        """Verifica que un OSError al enlazar se envuelve en ToolchainError"""
+        _instalar_falso(toolchain)
+
+        with patch('tools.node_toolchain.os.symlink', side_effect=OSError("sin permisos")):
+            with pytest.raises(ToolchainError, match="sin permisos"):
+                toolchain.link_into(str(tmp_path / "output"))
+
+    def test_link_into_sin_privilegios_en_windows_usa_union_y_copia(self, toolchain, tmp_path):
+        """Verifica la alternativa de Windows: unión para node_modules y copia de package.json"""
+        _instalar_falso(toolchain)
+        run_dir = tmp_path / "output"
+
+        with patch('tools.node_toolchain.os.symlink', side_effect=OSError(1314, "privilegio no disponible")), \
+             patch('tools.node_toolchain.os.name', 'nt'), \
+             patch('tools.node_toolchain.subprocess.run') as mock_run:
+            toolchain.link_into(str(run_dir))
+
+        assert mock_run.call_args[0][0] == [
+            "cmd", "/c", "mklink", "/J", str(run_dir / "node_modules"), toolchain.node_modules
+        ]
+        assert (run_dir / "package.json").read_text(encoding="utf-8") == json.dumps(toolchain._package_json())
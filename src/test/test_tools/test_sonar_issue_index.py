@@ -0,0 +1,89 @@
+import pytest
+from tools.sonar_issue_index import SonarIssueIndex, fingerprint_issue, formatear_reporte_delta
+
+
+def _issue(rule, line, message="msg", severity="MAJOR"):
+    return {"rule": rule, "line": line, "message": message, "severity": severity, "type": "CODE_SMELL"}
+
+
+class TestFingerprintIssue:
+    
+    def test_huella_no_depende_del_numero_de_linea_ni_de_la_indentacion(self):
+        """Verifica que mover o reindentar el código no cambia la huella"""
+        v1 = ["const a = 1;", "var x = foo( 1 );"]
+        v2 = ["// cabecera", "", "const a = 1;", "    var x = foo( 1 );"]
+        
+        assert fingerprint_issue(_issue("S3504", 2), v1) == fingerprint_issue(_issue("S3504", 4), v2)
+    
+    def test_reglas_distintas_dan_huellas_distintas(self):
+        """Verifica que la regla forma parte de la huella"""
+        codigo = ["var x = 1;"]
+        assert fingerprint_issue(_issue("S3504", 1), codigo) != fingerprint_issue(_issue("S1481", 1), codigo)
+    
+    def test_sin_linea_usa_el_mensaje(self):
+        """Verifica que los issues sin línea se identifican por el mensaje"""
+        assert fingerprint_issue(_issue("S1", 0, "a"), []) != fingerprint_issue(_issue("S1", 0, "b"), [])
+
+
+class TestSonarIssueIndex:
+    
+    CODIGO = "var a = 1;\nvar b = 2;\nvar c = 3;\n"
+    
+    def test_delta_entre_intentos(self):
+        """Verifica la clasificación en nuevos, persistentes y resueltos"""
+        index = SonarIssueIndex()
+        primero = index.update([_issue("S1", 1), _issue("S2", 2)], self.CODIGO)
+        segundo = index.update([_issue("S2", 2), _issue("S3", 3)], self.CODIGO)
+        
+        assert len(primero.nuevos) == 2
+        assert [i["rule"] for i in segundo.nuevos] == ["S3"]
+        assert [i["rule"] for i in segundo.persistentes] == ["S2"]
+        assert [i["rule"] for i in segundo.resueltos] == ["S1"]
+        assert segundo.oscilando is False
+    
+    def test_detecta_reaparicion_y_oscilacion(self):
+        """Verifica que A -> B -> A se marca como oscilación"""
+        index = SonarIssueIndex()
+        index.update([_issue("S1", 1)], self.CODIGO)
+        index.update([_issue("S2", 2)], self.CODIGO)
+        tercero = index.update([_issue("S1", 1)], self.CODIGO)
+        
+        assert [i["rule"] for i in tercero.reaparecidos] == ["S1"]
+        assert tercero.oscilando is True
+    
+    def test_mismo_conjunto_consecutivo_no_es_oscilacion(self):
+        """Verifica que repetir el intento inmediatamente anterior no cuenta como ciclo"""
+        index = SonarIssueIndex()
+        index.update([_issue("S1", 1)], self.CODIGO)
+        segundo = index.update([_issue("S1", 1)], self.CODIGO)
+        
+        assert segundo.oscilando is False
+        assert len(segundo.persistentes) == 1
+    
+    def test_serializacion_en_el_estado(self):
+        """Verifica que el índice sobrevive a to_state/from_state"""
+        index = SonarIssueIndex()
+        index.update([_issue("S1", 1)], self.CODIGO)
+        
+        restaurado = SonarIssueIndex.from_state(index.to_state())
+        delta = restaurado.update([_issue("S1", 1)], self.CODIGO)
+        
+        assert len(delta.persistentes) == 1
+        assert SonarIssueIndex.from_state(None).history == []
+    
+    def test_reporte_delta_solo_detalla_los_nuevos(self):
+        """Verifica que los persistentes aparecen como una línea y no en el detalle"""
+        index = SonarIssueIndex()
+        index.update([_issue("S1", 1, "persistente")], self.CODIGO)
+        delta = index.update([_issue("S1", 1, "persistente"), _issue("S9", 2, "nuevo")], self.CODIGO)
+        resultado = {
+            "success": True,
+            "summary": {"total": 2, "by_severity": {"MAJOR": 2}, "by_type": {"CODE_SMELL": 2}},
+            "issues": [_issue("S1", 1, "persistente"), _issue("S9", 2, "nuevo")]
+        }
+        
+        reporte = formatear_reporte_delta(resultado, delta)
+        
+        assert "Issue #1:" in reporte and "Issue #2:" not in reporte
+        assert "1 nuevo(s), 1 sin resolver" in reporte
+        assert "S1 (línea 1): persistente" in reporte
@@ -0,0 +1,120 @@
+import pytest
+import os
+import subprocess
+import sys
+import time
+from unittest.mock import patch
+from tools.test_executor_pool import TestExecutorPool, SANDBOX_EXEC_AVAILABLE
+
+
+@pytest.fixture
+def pool():
+    """Fixture que crea un pool pequeño sin límites ni aislamiento de red"""
+    pool = TestExecutorPool(max_workers=2, memory_mb=0, cpu_seconds=0, network_off=False)
+    yield pool
+    pool.shutdown()
+
+
+class TestTestExecutorPool:
+
+    def test_ejecuta_trabajo_en_directorio_aislado(self, pool):
+        """Verifica que los ficheros del trabajo se crean en un directorio propio"""
+        result = pool.run(
+            [sys.executable, "-c", "import os; print(open('dato.txt').read()); print(os.getcwd())"],
+            files={"dato.txt": "hola sandbox"}
+        )
+
+        assert result['returncode'] == 0
+        assert "hola sandbox" in result['stdout']
+        workdir = result['stdout'].strip().splitlines()[-1]
+        assert os.path.basename(workdir).startswith("capstone_test_")
+        assert not os.path.exists(workdir)
+
+    def test_timeout_mata_el_proceso(self, pool):
+        """Verifica que un trabajo que excede el timeout se marca y termina"""
+        start = time.monotonic()
+        result = pool.run([sys.executable, "-c", "import time; time.sleep(30)"], timeout=1)
+
+        assert result['timed_out'] is True
+        assert time.monotonic() - start < 10
+
+    @pytest.mark.skipif(not SANDBOX_EXEC_AVAILABLE, reason="lanzador de sandbox solo en POSIX")
+    def test_incluye_contabilidad_de_recursos(self, pool):
+        """Verifica que el resultado incluye CPU y memoria del proceso hijo"""
+        result = pool.run([sys.executable, "-c", "sum(i * i for i in range(200000))"])
+
+        resources = result['resources']
+        assert resources['cpu_user_s'] is not None
+        assert resources['max_rss_kb'] > 0
+        assert result['queued_s'] >= 0
+
+    @pytest.mark.skipif(not SANDBOX_EXEC_AVAILABLE, reason="lanzador de sandbox solo en POSIX")
+    def test_aplica_limite_de_memoria(self):
+        """Verifica que RLIMIT_AS impide reservar más memoria de la permitida"""
+        pool = TestExecutorPool(max_workers=1, memory_mb=256, cpu_seconds=0, network_off=False)
+        try:
+            result = pool.run([sys.executable, "-c", "x = bytearray(512 * 1024 * 1024)"])
+        finally:
+            pool.shutdown()
+
+        assert result['returncode'] != 0
+        assert "MemoryError" in result['stderr']
+
+    @pytest.mark.skipif(not SANDBOX_EXEC_AVAILABLE, reason="lanzador de sandbox solo en POSIX")
+    def test_limites_sin_preexec_fn(self):
+        """Verifica que los límites se aplican a través del lanzador, sin preexec_fn"""
+        pool = TestExecutorPool(max_workers=1, memory_mb=256, cpu_seconds=5, network_off=False)
+        popen = subprocess.Popen
+        llamadas = []
+
+        def _popen(*args, **kwargs):
+            llamadas.append(kwargs)
+            return popen(*args, **kwargs)
+
+        try:
+            with patch('tools.test_executor_pool.subprocess.Popen', side_effect=_popen):
+                result = pool.run([sys.executable, "-c", "import resource; print(resource.getrlimit(resource.RLIMIT_CPU)[0])"])
+        finally:
+            pool.shutdown()
+
+        assert result['stdout'].strip() == "5"
+        assert llamadas[0].get('preexec_fn') is None
+
+    @pytest.mark.skipif(not SANDBOX_EXEC_AVAILABLE, reason="lanzador de sandbox solo en POSIX")
+    def test_propaga_codigo_de_salida_y_senal(self, pool):
+        """Verifica que el lanzador devuelve el código de salida o la señal del comando"""
+        salida = pool.run([sys.executable, "-c", "raise SystemExit(3)"])
+        senal = pool.run([sys.executable, "-c", "import os, signal; os.kill(os.getpid(), signal.SIGTERM)"])
+
+        assert salida['returncode'] == 3
+        assert senal['returncode'] == -15
+
+    def test_encola_trabajos_concurrentes(self, pool):
+        """Verifica que se pueden encolar más trabajos que workers"""
+        futures = [pool.submit([sys.executable, "-c", f"print({i})"]) for i in range(5)]
+        results = [f.result() for f in futures]
+
+        assert [r['stdout'].strip() for r in results] == [str(i) for i in range(5)]
+        assert pool.pending == 0
+        assert pool.jobs_completed == 5
+
+    def test_comando_inexistente_devuelve_error_de_lanzamiento(self, pool):
+        """Verifica que un comando inexistente no rompe el pool"""
+        result = pool.run(["comando_que_no_existe_xyz"])
+
+        assert result['returncode'] is None
+        assert result['launch_error'] is not None
+
+    def test_enlaza_recursos_compartidos(self, pool, tmp_path):
+        """Verifica que los enlaces simbólicos (ej: node_modules) se crean en el workdir"""
+        shared = tmp_path / "node_modules"
+        shared.mkdir()
+        (shared / "marker").write_text("ok")
+
+        result = pool.run(
+            [sys.executable, "-c", "print(open('node_modules/marker').read())"],
+            links={"node_modules": str(shared)}
+        )
+
+        assert result['stdout'].strip() == "ok"
+        assert shared.exists()
@@ -0,0 +1,158 @@
+import pytest
+import os
+import json
+import tempfile
+from unittest.mock import patch
+from utils.artifact_store import ArtifactStore, ZSTD_AVAILABLE
+
+
+class TestArtifactStore:
+
+    @pytest.fixture
+    def temp_dir(self):
+        """Fixture que crea un directorio temporal"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            yield tmpdir
+
+    @pytest.fixture
+    def store(self, temp_dir):
+        """Fixture que retorna un ArtifactStore sin compresión en directorio temporal"""
+        store = ArtifactStore(base_directory=temp_dir, compression="none")
+        store.start_run("run_test")
+        return store
+
+    def test_put_devuelve_handle_sha256(self, store):
+        """Verifica que put devuelve un handle direccionado por contenido"""
+        handle = store.put("2_developer_req1_debug0_sq0.ts", "export const a = 1;", kind="code")
+
+        assert handle.startswith("sha256:")
+        assert handle == ArtifactStore.compute_handle("export const a = 1;")
+
+    def test_get_devuelve_contenido(self, store):
+        """Verifica que get recupera el contenido registrado"""
+        handle = store.put("reporte.txt", "contenido del reporte")
+
+        assert store.get(handle) == "contenido del reporte"
+
+    def test_contenido_identico_se_deduplica(self, store, temp_dir):
+        """Verifica que dos intentos con el mismo contenido comparten objeto en disco"""
+        h1 = store.put("2_developer_req1_debug0_sq0.ts", "codigo")
+        h2 = store.put("2_developer_req1_debug1_sq0.ts", "codigo")
+
+        assert h1 == h2
+        assert store.dedup_hits == 1
+        objetos = [f for _, _, files in os.walk(os.path.join(temp_dir, "objects")) for f in files]
+        assert len(objetos) == 1
+        assert len(store.list_artifacts()) == 2
+
+    def test_get_lee_desde_disco_en_nueva_ejecucion(self, store, temp_dir):
+        """Verifica que un handle sigue siendo legible tras reiniciar la caché en memoria"""
+        handle = store.put("reporte.txt", "persistente")
+
+        otro = ArtifactStore(base_directory=temp_dir, compression="none")
+        otro.start_run("run_2")
+
+        assert otro.get(handle) == "persistente"
+
+    def test_get_handle_inexistente_lanza_keyerror(self, store):
+        """Verifica que un handle desconocido lanza KeyError"""
+        with pytest.raises(KeyError):
+            store.get("sha256:" + "0" * 64)
+
+    @pytest.mark.skipif(not ZSTD_AVAILABLE, reason="zstandard no instalado")
+    def test_compresion_zstd(self, temp_dir):
+        """Verifica que los objetos se comprimen con zstd y se leen correctamente"""
+        store = ArtifactStore(base_directory=temp_dir, compression="zstd")
+        store.start_run("run_zstd")
+        contenido = "línea repetida\n" * 500
+        handle = store.put("4_testing_req1_debug0_PASSED.txt", contenido)
+
+        entrada = store.list_artifacts()[0]
+        assert entrada["stored_size"] < entrada["size"]
+
+        otro = ArtifactStore(base_directory=temp_dir, compression="zstd")
+        assert otro.get(handle) == contenido
+
+    def test_zstd_no_disponible_desactiva_compresion(self, temp_dir):
+        """Verifica que sin zstandard se usa almacenamiento sin comprimir"""
+        with patch('utils.artifact_store.ZSTD_AVAILABLE', False):
+            store = ArtifactStore(base_directory=temp_dir, compression="zstd")
+
+        assert store.compression == "none"
+
+    def test_materialize_escribe_fichero(self, store, temp_dir):
+        """Verifica que materialize escribe el contenido en la ruta indicada"""
+        handle = store.put("3_sonar_report_req1_sq0.txt", "reporte")
+        ruta = os.path.join(temp_dir, "salida", "reporte.txt")
+
+        store.materialize(handle, ruta)
+
+        with open(ruta, 'r', encoding='utf-8') as f:
+            assert f.read() == "reporte"
+
+    def test_latest_y_filtrado_por_tipo(self, store):
+        """Verifica latest() y list_artifacts() filtrado por tipo"""
+        store.put("codigo.ts", "v1", kind="code")
+        h2 = store.put("codigo.ts", "v2", kind="code")
+        store.put("reporte.txt", "r", kind="report")
+
+        assert store.latest("codigo.ts") == h2
+        assert store.latest("no_existe") is None
+        assert len(store.list_artifacts(kind="code")) == 2
+
+    def test_save_index_persiste_indice(self, store, temp_dir):
+        """Verifica que save_index escribe el índice de la ejecución"""
+        store.put("a.txt", "a")
+        store.put("b.txt", "a")
+
+        ruta = store.save_index()
+
+        assert ruta == os.path.join(temp_dir, "index_run_test.json")
+        with open(ruta, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        assert index["run_id"] == "run_test"
+        assert index["dedup_hits"] == 1
+        assert [a["name"] for a in index["artifacts"]] == ["a.txt", "b.txt"]
+
+
+class TestGuardarArtefacto:
+
+    def test_guardar_artefacto_usa_almacen_si_habilitado(self, monkeypatch):
+        """Verifica que guardar_artefacto registra en el almacén cuando está habilitado"""
+        from tools import file_utils
+        monkeypatch.setattr(file_utils.settings, 'ARTIFACT_STORE_ENABLED', True)
+
+        with patch('tools.file_utils.get_artifact_store') as mock_store, \
+             patch('tools.file_utils.guardar_fichero_texto') as mock_guardar:
+            mock_store.return_value.put.return_value = "sha256:abc"
+
+            handle = file_utils.guardar_artefacto("reporte.txt", "contenido", tipo="report")
+
+            assert handle == "sha256:abc"
+            mock_store.return_value.put.assert_called_once_with("reporte.txt", "contenido", kind="report")
+            mock_guardar.assert_not_called()
+
+    def test_guardar_artefacto_escribe_fichero_si_deshabilitado(self, monkeypatch):
+        """Verifica que guardar_artefacto escribe en OUTPUT_DIR cuando el almacén está deshabilitado"""
+        from tools import file_utils
+        monkeypatch.setattr(file_utils.settings, 'ARTIFACT_STORE_ENABLED', False)
+
+        with patch('tools.file_utils.guardar_fichero_texto') as mock_guardar:
+            handle = file_utils.guardar_artefacto("reporte.txt", "contenido")
+
+            assert handle is None
+            mock_guardar.assert_called_once_with("reporte.txt", "contenido", directorio=file_utils.settings.OUTPUT_DIR)
+
+    def test_guardar_artefacto_registra_el_almacen_no_output_dir(self, monkeypatch):
+        """Verifica que el registro de la operación indica el almacén y no una ruta de OUTPUT_DIR"""
+        from tools import file_utils
+        monkeypatch.setattr(file_utils.settings, 'ARTIFACT_STORE_ENABLED', True)
+
+        with patch('tools.file_utils.get_artifact_store') as mock_store, \
+             patch('tools.file_utils.log_file_operation') as mock_log:
+            mock_store.return_value.put.return_value = "sha256:abc"
+            file_utils.guardar_artefacto("reporte.txt", "contenido")
+
+        ruta = mock_log.call_args[0][2]
+        assert "artifact store" in ruta
+        assert file_utils.settings.OUTPUT_DIR not in ruta
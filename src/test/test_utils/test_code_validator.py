@@ -5,7 +5,9 @@ from utils.code_validator import (
     _validate_typescript_code,
     _validate_python_code,
     _validate_generic_code,
-    _strip_ts_strings_and_comments
+    _strip_ts_strings_and_comments,
+    scan_typescript,
+    check_ts_imports_exported
 )
 
 
@@ -274,6 +276,85 @@ function suma(a, b) {
         assert "}" in resultado
         assert "function" in resultado
 
+    def test_comilla_tras_barra_escapada_cierra_string(self):
+        """Verifica que una comilla precedida de una barra escapada cierra el string"""
+        codigo = 'const s = "a\\\\"; if (x) { y(); }'
+        resultado = _strip_ts_strings_and_comments(codigo)
+        assert resultado == 'const s = ; if (x) { y(); }'
+    
+    def test_conserva_codigo_de_sustituciones_template(self):
+        """Verifica que el código de ${...} se conserva y el texto del template no"""
+        codigo = 'const t = `total: ${items.map(i => { return i; })} fin`;'
+        resultado = _strip_ts_strings_and_comments(codigo)
+        assert "total" not in resultado
+        assert "items.map(i => { return i; })" in resultado
+
+
+class TestScanTypescript:
+    
+    def test_template_anidado_no_desbalancea(self):
+        """Verifica que llaves dentro de templates anidados no afectan al balance"""
+        codigo = 'const a = `x ${ `y ${ {k: 1}.k } {` } }`;\nfunction f() { return a; }'
+        scan = scan_typescript(codigo)
+        assert scan.abiertos['{'] == scan.cerrados['}'] == 2
+        assert scan.error_anidamiento is None
+        assert scan.sin_cerrar is None
+    
+    def test_ignora_llaves_en_literales_regex(self):
+        """Verifica que los literales regex no cuentan como llaves o corchetes"""
+        scan = scan_typescript('const re = /[{(]\\}/g; const d = a / b / c;')
+        assert scan.abiertos == {'{': 0, '(': 0, '[': 0}
+        assert scan.cerrados == {'}': 0, ')': 0, ']': 0}
+    
+    def test_detecta_exports_de_nivel_superior(self):
+        """Verifica que solo se recogen los exports de nivel superior"""
+        codigo = """
+export function suma(a: number, b: number): number { return a + b; }
+export const PI = 3.14;
+export { resta as restar, dividir };
+namespace N { export const interno = 1; }
+export default class Calculadora {}
+"""
+        scan = scan_typescript(codigo)
+        assert scan.exports == ['suma', 'PI', 'restar', 'dividir', 'Calculadora']
+    
+    def test_imports_de_los_tests_exportados(self):
+        """Verifica que los nombres importados del módulo bajo prueba deben estar exportados"""
+        codigo = "export function suma(a, b) { return a + b; }\nfunction interna() {}\nexport default class C {}"
+        tests = "import { describe, it } from 'vitest';\nimport C, { suma, interna as i } from './calc.js';"
+        
+        es_valido, mensaje = check_ts_imports_exported(tests, codigo, 'calc')
+        
+        assert es_valido is False
+        assert mensaje.endswith("no exporta: interna")
+        assert check_ts_imports_exported("import C, { suma } from './calc';", codigo, 'calc') == (True, "")
+        assert check_ts_imports_exported("import { x } from './otro';", codigo, 'calc') == (True, "")
+    
+    def test_imports_ignora_strings_y_comentarios_del_codigo(self):
+        """Verifica que 'module.exports' o 'export default' en comentarios o strings no desactivan la comprobación"""
+        codigo = (
+            "// Antes: module.exports = { suma };\n"
+            "const ayuda = 'usa export * o export default';\n"
+            "export function suma(a, b) { return a + b; }"
+        )
+        
+        es_valido, mensaje = check_ts_imports_exported("import calc, { suma } from './calc';", codigo, 'calc')
+        
+        assert es_valido is False
+        assert mensaje.endswith("no exporta: default")
+    
+    def test_detecta_anidamiento_incorrecto(self):
+        """Verifica que se detecta un cierre en orden incorrecto con balance correcto"""
+        es_valido, mensaje = _validate_typescript_code("function f() {\n  g(a};\n)\n", False)
+        assert es_valido is False
+        assert "línea 2" in mensaje
+    
+    def test_detecta_template_truncado(self):
+        """Verifica que un template literal sin cerrar se reporta como truncado"""
+        es_valido, mensaje = _validate_typescript_code("const msg = `Hola ${nombre}, tu pedido", False)
+        assert es_valido is False
+        assert "template" in mensaje.lower()
+
 
 class TestValidateTestCodeCompleteness:
     
@@ -0,0 +1,69 @@
+import pytest
+from utils import convergence
+from utils.convergence import (
+    PROGRESO, ESTANCADO, CICLO,
+    normalizar_codigo, normalizar_feedback, detectar_bucle, registrar_iteracion, agotar_bucle
+)
+
+
+class TestNormalizacion:
+    
+    def test_codigo_ignora_indentacion_y_fences(self):
+        """Verifica que reindentar o envolver en markdown no cambia el código normalizado"""
+        a = "```ts\nfunction f() {\n    return 1;\n}\n```"
+        b = "function f() {\n  return   1;\n}\n"
+        assert normalizar_codigo(a) == normalizar_codigo(b)
+    
+    def test_feedback_ignora_numeros_volatiles(self):
+        """Verifica que líneas, tiempos y direcciones no cambian el feedback normalizado"""
+        a = "Error at suma.ts:12:5 (took 34ms) 0xdeadbeef"
+        b = "Error at suma.ts:40:9 (took 102ms) 0x1234"
+        assert normalizar_feedback(a) == normalizar_feedback(b)
+
+
+class TestRegistrarIteracion:
+    
+    @pytest.fixture(autouse=True)
+    def umbral(self, monkeypatch):
+        monkeypatch.setattr(convergence.settings, 'CONVERGENCE_SIMILARITY_THRESHOLD', 0.9)
+    
+    def test_progreso_cuando_cambia_el_error(self):
+        """Verifica que un feedback distinto cuenta como progreso"""
+        state = {}
+        assert registrar_iteracion(state, "debug", "a\nb", "Error 1") == PROGRESO
+        assert registrar_iteracion(state, "debug", "a\nb", "Otro error") == PROGRESO
+    
+    def test_estancado_con_mismo_codigo_y_error(self):
+        """Verifica que repetir código y error se detecta como estancado"""
+        state = {}
+        registrar_iteracion(state, "debug", "linea1\nlinea2", "TypeError at 3")
+        assert registrar_iteracion(state, "debug", "linea1\n  linea2", "TypeError at 7") == ESTANCADO
+    
+    def test_ciclo_a_b_a(self):
+        """Verifica que volver a un estado anterior no consecutivo se detecta como ciclo"""
+        state = {}
+        registrar_iteracion(state, "sonar", "codigo A", "issue A")
+        registrar_iteracion(state, "sonar", "codigo B", "issue B")
+        assert registrar_iteracion(state, "sonar", "codigo A", "issue A") == CICLO
+    
+    def test_bucles_independientes(self):
+        """Verifica que cada bucle tiene su propio historial"""
+        state = {}
+        registrar_iteracion(state, "debug", "x", "e")
+        assert registrar_iteracion(state, "sonar", "x", "e") == PROGRESO
+
+
+class TestDetectarBucleYAgotar:
+    
+    def test_detecta_bucle_por_feedback(self):
+        """Verifica qué bucle originó la corrección"""
+        assert detectar_bucle({'traceback': 'tb', 'sonarqube_issues': 'x'}) == ("debug", "tb")
+        assert detectar_bucle({'traceback': '', 'sonarqube_issues': 'x'}) == ("sonar", "x")
+        assert detectar_bucle({'revisor_attempt_count': 1, 'codigo_revisado': False, 'revision_comentario': 'c'}) == ("revisor", "c")
+        assert detectar_bucle({'traceback': ''}) == (None, "")
+    
+    def test_agotar_bucle_deja_un_intento(self):
+        """Verifica que el contador queda a un fallo del máximo"""
+        state = {'debug_attempt_count': 0, 'max_debug_attempts': 5}
+        agotar_bucle(state, "debug")
+        assert state['debug_attempt_count'] == 4
@@ -0,0 +1,52 @@
+import time
+import pytest
+
+from utils import deadline
+from utils.deadline import (
+    deadline_from_budget, deadline_scope, remaining_seconds, deadline_expired, fits_in_budget, cap_timeout
+)
+
+
+@pytest.fixture(autouse=True)
+def margen(monkeypatch):
+    monkeypatch.setattr(deadline.settings, 'DEADLINE_RESERVE_SECONDS', 5)
+
+
+class TestDeadline:
+    
+    def test_sin_plazo_no_cambia_nada(self):
+        """Verifica que sin plazo se conservan timeouts y esperas"""
+        assert deadline_from_budget(0) is None
+        assert remaining_seconds({}) is None
+        assert deadline_expired({}) is False
+        assert fits_in_budget(1000, {}) is True
+        assert cap_timeout(60, {}) == 60
+    
+    def test_plazo_desde_el_estado(self):
+        """Verifica el tiempo restante a partir de state['deadline_at']"""
+        state = {'deadline_at': time.time() + 30}
+        
+        assert 29 < remaining_seconds(state) <= 30
+        assert fits_in_budget(20, state) is True
+        assert fits_in_budget(26, state) is False
+    
+    def test_plazo_desde_el_contexto(self):
+        """Verifica que el código sin estado lee el plazo de deadline_scope"""
+        with deadline_scope(time.time() + 20):
+            assert 19 < remaining_seconds() <= 20
+        assert remaining_seconds() is None
+    
+    def test_cap_timeout_recorta_al_plazo(self):
+        """Verifica que el timeout se recorta al tiempo restante menos el margen"""
+        state = {'deadline_at': time.time() + 30}
+        
+        assert 24 < cap_timeout(60, state) <= 25
+        assert cap_timeout(10, state) == 10
+    
+    def test_plazo_vencido(self):
+        """Verifica que un plazo vencido deja un timeout mínimo y se marca como expirado"""
+        state = {'deadline_at': time.time() - 1}
+        
+        assert remaining_seconds(state) == 0
+        assert deadline_expired(state) is True
+        assert cap_timeout(60, state) == 1.0
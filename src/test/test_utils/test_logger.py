@@ -1,4 +1,5 @@
 import pytest
+import json
 import logging
 import tempfile
 from pathlib import Path
@@ -10,7 +11,11 @@ from utils.logger import (
     log_file_operation,
     ColoredFormatter,
     AgentFormatter,
-    get_session_log_file
+    JsonLinesFormatter,
+    ModeAwareConsoleFormatter,
+    DeferredQueueHandler,
+    get_session_log_file,
+    shutdown_logging
 )
 
 
@@ -200,3 +205,114 @@ class TestGetSessionLogFile:
         """Verifica que el nombre incluye timestamp"""
         log_file = get_session_log_file()
         assert "workflow_" in log_file.name
+
+
+class TestJsonLinesFormatter:
+    
+    def test_json_formatter_emite_json_valido(self):
+        """Verifica que cada registro se emite como un objeto JSON"""
+        formatter = JsonLinesFormatter()
+        record = logging.LogRecord(
+            name="agents.sonar", level=logging.INFO, pathname="", lineno=42,
+            msg="Issues: %d", args=(3,), exc_info=None
+        )
+        record.agent_context = "Sonar"
+        entry = json.loads(formatter.format(record))
+        assert entry['level'] == "INFO"
+        assert entry['logger'] == "agents.sonar"
+        assert entry['msg'] == "Issues: 3"
+        assert entry['agent'] == "Sonar"
+        assert entry['line'] == 42
+    
+    def test_json_formatter_nivel_sin_colores(self):
+        """Verifica que el formato de consola con colores no altera el nivel del fichero"""
+        record = logging.LogRecord(
+            name="agents.sonar", level=logging.WARNING, pathname="", lineno=1,
+            msg="Aviso", args=(), exc_info=None
+        )
+        with patch('sys.stdout.isatty', return_value=True):
+            consola = ColoredFormatter('%(levelname)s | %(message)s').format(record)
+            AgentFormatter('%(levelname)s | %(message)s').format(record)
+        entry = json.loads(JsonLinesFormatter().format(record))
+        
+        assert "\033[" in consola
+        assert entry['level'] == "WARNING"
+        assert record.levelname == "WARNING"
+        assert record.msg == "Aviso"
+
+
+class TestModeAwareConsoleFormatter:
+    
+    def test_usa_formato_agente_segun_registro(self):
+        """Verifica que elige el formato de agente cuando el registro lo indica"""
+        formatter = ModeAwareConsoleFormatter()
+        record = logging.LogRecord(
+            name="agents.desarrollador", level=logging.INFO, pathname="", lineno=0,
+            msg="Test", args=(), exc_info=None
+        )
+        record.log_agent_mode = False
+        assert "agents.desarrollador" in formatter.format(record)
+
+
+class TestDeferredQueueHandler:
+    
+    def test_prepare_no_formatea_en_el_hilo_del_agente(self):
+        """Verifica que prepare() no invoca al formatter"""
+        handler = DeferredQueueHandler(Mock())
+        handler.format = Mock()
+        record = logging.LogRecord(
+            name="test", level=logging.INFO, pathname="", lineno=0,
+            msg="Valor %s", args=("x",), exc_info=None
+        )
+        prepared = handler.prepare(record)
+        handler.format.assert_not_called()
+        assert prepared.msg == "Valor x"
+        assert prepared.args is None
+        assert record.args == ("x",)
+
+
+class TestAsyncLogging:
+    
+    @pytest.fixture
+    def async_settings(self, monkeypatch):
+        """Activa LOG_ASYNC y redirige el fichero de log a un directorio temporal"""
+        from config.settings import settings
+        monkeypatch.setattr(settings, 'LOG_ASYNC', True)
+        monkeypatch.setattr(settings, 'LOG_JSON', True)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            log_file = Path(tmpdir) / "workflow_test.jsonl"
+            with patch('utils.logger.get_session_log_file', return_value=log_file):
+                yield log_file
+            shutdown_logging()
+    
+    def test_logger_asincrono_solo_tiene_queue_handler(self, async_settings):
+        """Verifica que en modo asíncrono el logger solo encola registros"""
+        logger = setup_logger("test_async_handlers")
+        assert len(logger.handlers) == 1
+        assert isinstance(logger.handlers[0], DeferredQueueHandler)
+    
+    def test_logger_asincrono_escribe_json_lines(self, async_settings):
+        """Verifica que el hilo escritor vuelca los registros como JSON lines"""
+        logger = setup_logger("test_async_write", level=logging.INFO)
+        logger.info("mensaje asíncrono")
+        logger.debug("descartado por nivel")
+        shutdown_logging()
+        
+        lines = async_settings.read_text(encoding='utf-8').splitlines()
+        entries = [json.loads(line) for line in lines]
+        assert [e['msg'] for e in entries] == ["mensaje asíncrono"]
+    
+    def test_logger_asincrono_respeta_log_to_file(self, async_settings):
+        """Verifica que un logger con log_to_file=False no escribe en el fichero compartido"""
+        setup_logger("test_async_con_fichero").info("al fichero")
+        setup_logger("test_async_sin_fichero", log_to_file=False).info("solo consola")
+        shutdown_logging()
+        
+        lines = async_settings.read_text(encoding='utf-8').splitlines()
+        assert [json.loads(line)['msg'] for line in lines] == ["al fichero"]
+    
+    def test_setup_logger_asincrono_es_idempotente(self, async_settings):
+        """Verifica que reconfigurar un logger no duplica handlers"""
+        setup_logger("test_async_idem")
+        logger = setup_logger("test_async_idem", agent_mode=True)
+        assert len(logger.handlers) == 1
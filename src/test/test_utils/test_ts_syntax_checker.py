@@ -0,0 +1,71 @@
+import pytest
+from utils import ts_syntax_checker
+from utils.ts_syntax_checker import (
+    check_typescript_syntax,
+    find_typescript_syntax_errors,
+    format_syntax_errors
+)
+
+TESTS_TRUNCADOS = """import { describe, it, expect } from 'vitest';
+describe('suma', () => {
+  it('suma dos números', () => {
+    expect(suma(1, 2)).toBe(3);
+  });
+"""
+
+TESTS_VALIDOS = TESTS_TRUNCADOS + "});\n"
+
+
+@pytest.fixture
+def sin_tree_sitter(monkeypatch):
+    """Fuerza el uso del tokenizador como si tree-sitter no estuviera instalado"""
+    monkeypatch.setattr(ts_syntax_checker, 'TREE_SITTER_AVAILABLE', False)
+
+
+@pytest.mark.skipif(not ts_syntax_checker.TREE_SITTER_AVAILABLE, reason="tree-sitter no instalado")
+class TestConTreeSitter:
+    
+    def test_codigo_valido(self):
+        """Verifica que código TypeScript con genéricos y templates es válido"""
+        codigo = "export class Pila<T> {\n  private items: T[] = [];\n  texto(): string { return `n=${this.items.length}`; }\n}\n"
+        assert check_typescript_syntax(codigo, "pila.ts") == (True, "")
+    
+    def test_ubica_bloque_sin_cerrar(self):
+        """Verifica que un describe truncado se reporta en la llave que quedó abierta"""
+        errores = find_typescript_syntax_errors(TESTS_TRUNCADOS, "suma.spec.ts")
+        assert errores[0] == {"line": 2, "column": 24, "message": "'{' sin cerrar"}
+    
+    def test_ubica_token_que_falta(self):
+        """Verifica que se reporta línea y columna de una expresión incompleta"""
+        es_valido, mensaje = check_typescript_syntax("const a = 1;\nfunction f(x: number) { return x + ; }\n", "f.ts")
+        assert es_valido is False
+        assert "f.ts:2:" in mensaje
+
+
+class TestSinTreeSitter:
+    
+    def test_codigo_valido(self, sin_tree_sitter):
+        """Verifica que el tokenizador acepta tests bien cerrados"""
+        assert check_typescript_syntax(TESTS_VALIDOS, "suma.spec.ts") == (True, "")
+    
+    def test_reporta_desbalance(self, sin_tree_sitter):
+        """Verifica que el tokenizador reporta llaves y paréntesis sin cerrar"""
+        es_valido, mensaje = check_typescript_syntax(TESTS_TRUNCADOS, "suma.spec.ts")
+        assert es_valido is False
+        assert "Llaves desbalanceadas" in mensaje
+    
+    def test_reporta_linea_de_anidamiento_incorrecto(self, sin_tree_sitter):
+        """Verifica que un cierre en orden incorrecto incluye su línea"""
+        errores = find_typescript_syntax_errors("function f() {\n  g(a};\n)\n")
+        assert errores[0]["line"] == 2
+
+
+class TestFormatSyntaxErrors:
+    
+    def test_formato_con_y_sin_posicion(self):
+        """Verifica el formato fichero:línea:columna: mensaje"""
+        texto = format_syntax_errors([
+            {"line": 3, "column": 7, "message": "Falta ';'"},
+            {"line": None, "column": None, "message": "Template literal sin cerrar al final del fichero"}
+        ], "a.ts")
+        assert texto.splitlines() == ["a.ts:3:7: Falta ';'", "a.ts: Template literal sin cerrar al final del fichero"]
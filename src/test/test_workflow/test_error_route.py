@@ -0,0 +1,153 @@
+import pytest
+from langgraph.graph import END
+
+from workflow import error_route, graph
+from workflow.error_route import (
+    LLM_ERROR_NODE, ABORT, llm_error_node, ruta_tras_error, siguiente_o_error,
+    get_error_route_stats, reset_error_route_stats
+)
+from llm.errors import llm_error_result, comprobar_respuesta_llm, API, UNAVAILABLE, NOT_INITIALIZED
+
+
+@pytest.fixture
+def ruta_errores(monkeypatch):
+    """Habilita la ruta de errores sin pausas reales"""
+    monkeypatch.setattr(error_route.settings, 'LLM_ERROR_ROUTE_ENABLED', True)
+    monkeypatch.setattr(error_route.settings, 'LLM_ERROR_MAX_RETRIES', 2)
+    monkeypatch.setattr(error_route.settings, 'LLM_ERROR_PAUSE_SECONDS', 10)
+    pausas = []
+    monkeypatch.setattr(error_route.time, 'sleep', pausas.append)
+    reset_error_route_stats()
+    yield pausas
+    reset_error_route_stats()
+
+
+def _estado_con_error(nodo="Developer-Code", kind=UNAVAILABLE, retries=0):
+    state = {'llm_error_retries': retries}
+    comprobar_respuesta_llm(state, nodo, llm_error_result(kind, "fallo"))
+    return state
+
+
+class TestLLMErrorNode:
+    
+    def test_reintenta_con_espera_exponencial(self, ruta_errores):
+        """Verifica que un error reintentable vuelve al nodo que falló tras una pausa creciente"""
+        state = llm_error_node(_estado_con_error())
+        assert ruta_tras_error(state) == "Developer-Code"
+        
+        state = llm_error_node(_estado_con_error(retries=state['llm_error_retries']))
+        assert ruta_tras_error(state) == "Developer-Code"
+        
+        assert ruta_errores == [10, 20]
+        assert get_error_route_stats()["reintentos"] == 2
+    
+    def test_aborta_al_agotar_reintentos(self, ruta_errores):
+        """Verifica que se aborta cuando se superan LLM_ERROR_MAX_RETRIES"""
+        state = llm_error_node(_estado_con_error(retries=2))
+        
+        assert ruta_tras_error(state) == ABORT
+        assert ruta_errores == []
+        assert get_error_route_stats()["abortos"] == 1
+    
+    def test_aborta_si_no_es_reintentable(self, ruta_errores):
+        """Verifica que un cliente sin inicializar aborta sin pausar"""
+        state = llm_error_node(_estado_con_error(nodo="ProductOwner", kind=NOT_INITIALIZED))
+        
+        assert ruta_tras_error(state) == ABORT
+        assert ruta_errores == []
+    
+    def test_aborta_si_la_peticion_es_invalida(self, ruta_errores):
+        """Verifica que un error de API no transitorio (p. ej. 401) aborta sin pausar"""
+        state = {'llm_error_retries': 0}
+        comprobar_respuesta_llm(state, "Developer-Code", llm_error_result(API, "401", retryable=False))
+        
+        state = llm_error_node(state)
+        
+        assert ruta_tras_error(state) == ABORT
+        assert ruta_errores == []
+    
+    def test_cuenta_ejecuciones_evitadas(self, ruta_errores):
+        """Verifica la estimación de ejecuciones de nodo evitadas"""
+        llm_error_node(_estado_con_error(nodo="ProductOwner"))
+        llm_error_node(_estado_con_error(nodo="Developer-UnitTests"))
+        
+        stats = get_error_route_stats()
+        assert stats["errores"] == 2
+        assert stats["nodos_evitados_estimados"] == 3
+    
+    def test_aborta_si_la_pausa_no_cabe_en_el_plazo(self, ruta_errores):
+        """Verifica que no se pausa para reintentar si el plazo de la ejecución no lo permite"""
+        import time
+        state = _estado_con_error()
+        state['deadline_at'] = time.time() + 5
+        
+        state = llm_error_node(state)
+        
+        assert ruta_tras_error(state) == ABORT
+        assert ruta_errores == []
+    
+    def test_siguiente_o_error(self):
+        """Verifica la ruta lineal con y sin error registrado"""
+        ruta = siguiente_o_error("Sonar")
+        assert ruta({'llm_error': None}) == "Sonar"
+        assert ruta({'llm_error': {'node': 'Developer-Code'}}) == LLM_ERROR_NODE
+
+
+class TestGrafoConRutaDeErrores:
+    
+    def test_grafo_incluye_nodo_de_error(self, ruta_errores, monkeypatch):
+        """Verifica que el grafo solo incluye LLM-Error con la ruta habilitada"""
+        monkeypatch.setattr(graph.settings, 'LLM_ERROR_ROUTE_ENABLED', True)
+        assert LLM_ERROR_NODE in graph.create_workflow().get_graph().nodes
+        
+        monkeypatch.setattr(graph.settings, 'LLM_ERROR_ROUTE_ENABLED', False)
+        assert LLM_ERROR_NODE not in graph.create_workflow().get_graph().nodes
+    
+    def _grafo_simulado(self, monkeypatch, respuestas_codigo):
+        """Grafo con agentes simulados: Developer-Code consume respuestas_codigo en orden"""
+        monkeypatch.setattr(graph.settings, 'LLM_ERROR_ROUTE_ENABLED', True)
+        ejecuciones = []
+        
+        def product_owner(state):
+            ejecuciones.append("ProductOwner")
+            comprobar_respuesta_llm(state, "ProductOwner", "requisitos")
+            return state
+        
+        def developer_code(state):
+            ejecuciones.append("Developer-Code")
+            respuesta = respuestas_codigo.pop(0)
+            if comprobar_respuesta_llm(state, "Developer-Code", respuesta):
+                return state
+            state['codigo_generado'] = respuesta
+            return state
+        
+        def sonar(state):
+            ejecuciones.append("Sonar")
+            state['sonarqube_passed'] = False
+            state['sonarqube_attempt_count'] = state['max_sonarqube_attempts']
+            return state
+        
+        monkeypatch.setattr(graph, 'product_owner_node', product_owner)
+        monkeypatch.setattr(graph, 'developer_code_node', developer_code)
+        monkeypatch.setattr(graph, 'sonar_node', sonar)
+        return graph.create_workflow(), ejecuciones
+    
+    def test_reintento_recupera_el_flujo(self, ruta_errores, monkeypatch):
+        """Verifica que tras un fallo transitorio el flujo continúa sin pasar el error a Sonar"""
+        app, ejecuciones = self._grafo_simulado(monkeypatch, [llm_error_result(UNAVAILABLE, "503"), "def f(): pass"])
+        
+        final = app.invoke({'sonarqube_attempt_count': 0, 'max_sonarqube_attempts': 1, 'llm_error_retries': 0})
+        
+        assert ejecuciones == ["ProductOwner", "Developer-Code", "Developer-Code", "Sonar"]
+        assert final['codigo_generado'] == "def f(): pass"
+        assert final['llm_error'] is None
+    
+    def test_fallo_persistente_aborta(self, ruta_errores, monkeypatch):
+        """Verifica que un fallo persistente termina el flujo sin ejecutar Sonar"""
+        app, ejecuciones = self._grafo_simulado(monkeypatch, [llm_error_result(UNAVAILABLE, "caído")] * 3)
+        
+        final = app.invoke({'sonarqube_attempt_count': 0, 'max_sonarqube_attempts': 1, 'llm_error_retries': 0})
+        
+        assert ejecuciones == ["ProductOwner"] + ["Developer-Code"] * 3
+        assert final['llm_error']['action'] == ABORT
+        assert "Sonar" not in ejecuciones
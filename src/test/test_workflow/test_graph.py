@@ -69,3 +69,154 @@ class TestWorkflowGraph:
         assert workflow is not None
         assert callable(getattr(workflow, 'invoke', None))
         assert callable(getattr(workflow, 'get_graph', None))
+
+
+class TestVisualizeGraph:
+    
+    @pytest.fixture
+    def app(self):
+        """Grafo compilado simulado con fuente Mermaid fija"""
+        app = MagicMock()
+        app.get_graph.return_value.draw_mermaid.return_value = "graph TD; A-->B"
+        app.get_graph.return_value.draw_mermaid_png.return_value = b"PNG"
+        return app
+    
+    @pytest.fixture
+    def output_dir(self, tmp_path, monkeypatch):
+        from workflow import graph
+        monkeypatch.setattr(graph.settings, 'OUTPUT_DIR', str(tmp_path))
+        monkeypatch.setattr(graph.settings, 'GRAPH_RENDER_CACHE_ENABLED', False)
+        return tmp_path
+    
+    def test_modo_off_no_renderiza(self, app, output_dir):
+        """Verifica que con el modo off no se genera nada"""
+        from workflow.graph import visualize_graph
+        visualize_graph(app, mode="off")
+        
+        app.get_graph.assert_not_called()
+        assert list(output_dir.iterdir()) == []
+    
+    def test_modo_mmd_no_usa_la_red(self, app, output_dir):
+        """Verifica que el modo mmd guarda solo la fuente sin render PNG"""
+        from workflow.graph import visualize_graph
+        visualize_graph(app, mode="mmd")
+        
+        app.get_graph.return_value.draw_mermaid_png.assert_not_called()
+        assert (output_dir / "workflow_graph.mmd").read_text(encoding="utf-8") == "graph TD; A-->B"
+    
+    def test_cache_reutiliza_el_png(self, app, output_dir, monkeypatch):
+        """Verifica que el PNG se renderiza una sola vez por estructura del grafo"""
+        from workflow import graph
+        monkeypatch.setattr(graph.settings, 'GRAPH_RENDER_CACHE_ENABLED', True)
+        
+        graph.visualize_graph(app, mode="png")
+        (output_dir / "workflow_graph.png").unlink()  # Limpieza de output/ entre ejecuciones
+        graph.visualize_graph(app, mode="png")
+        
+        assert app.get_graph.return_value.draw_mermaid_png.call_count == 1
+        assert (output_dir / "workflow_graph.png").read_bytes() == b"PNG"
+    
+    def test_cache_no_reintenta_render_fallido(self, app, output_dir, monkeypatch):
+        """Verifica que tras un fallo del render se reutiliza la fuente sin volver a la red"""
+        from workflow import graph
+        monkeypatch.setattr(graph.settings, 'GRAPH_RENDER_CACHE_ENABLED', True)
+        render = MagicMock(return_value=None)
+        monkeypatch.setattr(graph, '_render_png', render)
+        
+        graph.visualize_graph(app, mode="png")
+        graph.visualize_graph(app, mode="png")
+        
+        assert render.call_count == 1
+        assert (output_dir / "workflow_graph.mmd").exists()
+    
+    def test_cambio_de_estructura_invalida_la_cache(self, app, output_dir, monkeypatch):
+        """Verifica que un grafo distinto se vuelve a renderizar"""
+        from workflow import graph
+        monkeypatch.setattr(graph.settings, 'GRAPH_RENDER_CACHE_ENABLED', True)
+        
+        graph.visualize_graph(app, mode="png")
+        app.get_graph.return_value.draw_mermaid.return_value = "graph TD; A-->C"
+        graph.visualize_graph(app, mode="png")
+        
+        assert app.get_graph.return_value.draw_mermaid_png.call_count == 2
+
+
+class TestCompiledWorkflowCache:
+    
+    @pytest.fixture(autouse=True)
+    def cache_limpia(self):
+        from workflow.graph import clear_workflow_cache
+        clear_workflow_cache()
+        yield
+        clear_workflow_cache()
+    
+    def test_reutiliza_el_grafo_compilado(self):
+        """Verifica que las ejecuciones del proceso comparten el grafo compilado"""
+        from workflow import graph
+        with patch.object(graph, 'create_workflow', wraps=graph.create_workflow) as create:
+            primero = graph.get_compiled_workflow()
+            segundo = graph.get_compiled_workflow()
+        
+        assert primero is segundo
+        assert create.call_count == 1
+    
+    def test_configuracion_del_grafo_invalida_la_cache(self, monkeypatch):
+        """Verifica que cambiar una opción que altera el grafo lo recompila"""
+        from workflow import graph
+        monkeypatch.setattr(graph.settings, 'LLM_ERROR_ROUTE_ENABLED', False)
+        sin_ruta = graph.get_compiled_workflow()
+        monkeypatch.setattr(graph.settings, 'LLM_ERROR_ROUTE_ENABLED', True)
+        con_ruta = graph.get_compiled_workflow()
+        
+        assert sin_ruta is not con_ruta
+        assert "LLM-Error" in con_ruta.get_graph().nodes
+    
+    def test_compilacion_concurrente_unica(self):
+        """Verifica que varios hilos obtienen el mismo grafo compilado una sola vez"""
+        from concurrent.futures import ThreadPoolExecutor
+        from workflow import graph
+        with patch.object(graph, 'create_workflow', wraps=graph.create_workflow) as create:
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                apps = list(pool.map(lambda _: graph.get_compiled_workflow(), range(16)))
+        
+        assert create.call_count == 1
+        assert all(app is apps[0] for app in apps)
+
+
+class TestPipelineProfilesGraph:
+    
+    def test_fast_sin_revision_ni_pr(self):
+        """Verifica que el perfil fast no incluye Developer2-Reviewer ni Developer-CompletePR"""
+        from config.pipeline_profiles import get_profile
+        nodes = create_workflow(get_profile('fast')).get_graph().nodes
+        
+        assert "Developer2-Reviewer" not in nodes
+        assert "Developer-CompletePR" not in nodes
+        assert "Stakeholder" in nodes
+    
+    def test_fast_tests_superados_van_al_stakeholder(self):
+        """Verifica que en el perfil fast los tests superados pasan directamente al Stakeholder"""
+        from config.pipeline_profiles import get_profile
+        graph = create_workflow(get_profile('fast')).get_graph()
+        
+        destinos = {edge.target for edge in graph.edges if edge.source == "Developer-UnitTests"}
+        assert "Stakeholder" in destinos
+    
+    def test_thorough_flujo_completo(self):
+        """Verifica que el perfil thorough mantiene el flujo de PR"""
+        from config.pipeline_profiles import get_profile
+        nodes = create_workflow(get_profile('thorough')).get_graph().nodes
+        
+        assert "Developer2-Reviewer" in nodes
+        assert "Developer-CompletePR" in nodes
+    
+    def test_cache_compila_por_topologia(self):
+        """Verifica que fast y standard no comparten grafo compilado"""
+        from config.pipeline_profiles import get_profile
+        from workflow.graph import get_compiled_workflow, clear_workflow_cache
+        clear_workflow_cache()
+        try:
+            assert get_compiled_workflow(get_profile('fast')) is not get_compiled_workflow(get_profile('standard'))
+            assert get_compiled_workflow(get_profile('standard')) is get_compiled_workflow(get_profile('thorough'))
+        finally:
+            clear_workflow_cache()
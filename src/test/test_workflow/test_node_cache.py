@@ -0,0 +1,172 @@
+import pytest
+from unittest.mock import MagicMock
+
+from workflow import node_cache
+from workflow.node_cache import NodeCache, NodeCacheSpec, NODE_CACHE_SPECS, fingerprint, memoize_node
+
+
+def _sonar_simulado(aprobado=True):
+    """Nodo Sonar simulado que cuenta sus ejecuciones"""
+    def sonar(state):
+        sonar.llamadas += 1
+        state['sonarqube_passed'] = aprobado
+        state['sonarqube_issues'] = "" if aprobado else "issues"
+        state['sonarqube_attempt_count'] = 0 if aprobado else state['sonarqube_attempt_count'] + 1
+        return state
+    sonar.llamadas = 0
+    return sonar
+
+
+class TestFingerprint:
+    
+    def test_solo_depende_de_los_campos_leidos(self):
+        """Verifica que la huella ignora los campos que el nodo no lee"""
+        a = {'codigo_generado': 'x', 'attempt_count': 1}
+        b = {'codigo_generado': 'x', 'attempt_count': 5}
+        c = {'codigo_generado': 'y', 'attempt_count': 1}
+        
+        assert fingerprint(a, ('codigo_generado',)) == fingerprint(b, ('codigo_generado',))
+        assert fingerprint(a, ('codigo_generado',)) != fingerprint(c, ('codigo_generado',))
+
+
+class TestNodeCache:
+    
+    def test_reproduce_resultado_con_entradas_iguales(self):
+        """Verifica que el segundo análisis del mismo código no ejecuta el nodo"""
+        sonar = _sonar_simulado()
+        nodo = NodeCache().wrap("Sonar", sonar)
+        
+        nodo({'codigo_generado': 'def f(): pass', 'sonarqube_attempt_count': 0})
+        state = nodo({'codigo_generado': 'def f(): pass', 'sonarqube_attempt_count': 0, 'sonarqube_passed': False})
+        
+        assert sonar.llamadas == 1
+        assert state['sonarqube_passed'] is True
+    
+    def test_codigo_distinto_ejecuta_el_nodo(self):
+        """Verifica que un cambio en las entradas invalida la caché"""
+        sonar = _sonar_simulado()
+        nodo = NodeCache().wrap("Sonar", sonar)
+        
+        nodo({'codigo_generado': 'a', 'sonarqube_attempt_count': 0})
+        nodo({'codigo_generado': 'b', 'sonarqube_attempt_count': 0})
+        
+        assert sonar.llamadas == 2
+    
+    def test_resultado_no_estable_no_se_guarda(self):
+        """Verifica que un análisis con issues no se guarda (el contador de intentos debe avanzar)"""
+        sonar = _sonar_simulado(aprobado=False)
+        cache = NodeCache()
+        nodo = cache.wrap("Sonar", sonar)
+        
+        state = nodo({'codigo_generado': 'a', 'sonarqube_attempt_count': 0})
+        state = nodo(state)
+        
+        assert sonar.llamadas == 2
+        assert state['sonarqube_attempt_count'] == 2
+        assert cache.stats()["Sonar"]["stored"] == 0
+    
+    def test_fallo_del_llm_no_se_guarda(self):
+        """Verifica que un resultado con llm_error registrado no se guarda"""
+        def tests(state):
+            state['pruebas_superadas'] = True
+            state['llm_error'] = {'kind': 'API'}
+            return state
+        cache = NodeCache()
+        
+        cache.wrap("Developer-UnitTests", tests)({'codigo_generado': 'a'})
+        
+        assert cache.stats()["Developer-UnitTests"]["stored"] == 0
+    
+    def test_branch_nuevo_vuelve_a_ejecutar_los_tests(self):
+        """Verifica que con otro branch de GitHub los tests se ejecutan (y se publican) de nuevo"""
+        tests = MagicMock(side_effect=lambda s: {**s, 'pruebas_superadas': True, 'github_pr_number': s['github_branch_name']})
+        nodo = NodeCache().wrap("Developer-UnitTests", tests)
+        
+        nodo({'codigo_generado': 'a', 'github_branch_name': 'feature-1'})
+        state = nodo({'codigo_generado': 'a', 'github_branch_name': 'feature-2'})
+        
+        assert tests.call_count == 2
+        assert state['github_pr_number'] == 'feature-2'
+    
+    def test_resultados_aislados_por_ejecucion(self):
+        """Verifica que una ejecución no reutiliza ni descarta los resultados de otra"""
+        sonar = _sonar_simulado()
+        cache = NodeCache()
+        nodo = cache.wrap("Sonar", sonar)
+        
+        nodo({'run_id': 'r1', 'codigo_generado': 'a', 'sonarqube_attempt_count': 0})
+        nodo({'run_id': 'r2', 'codigo_generado': 'a', 'sonarqube_attempt_count': 0})
+        assert sonar.llamadas == 2
+        
+        cache.discard_run('r2')
+        nodo({'run_id': 'r1', 'codigo_generado': 'a', 'sonarqube_attempt_count': 0})
+        
+        assert sonar.llamadas == 2
+        assert cache.stats('r1')["Sonar"] == {"hits": 1, "misses": 1, "stored": 1}
+        assert cache.stats('r2') == {}
+    
+    def test_skip_ejecuta_siempre(self):
+        """Verifica que el Stakeholder se ejecuta siempre al superar el límite de intentos"""
+        stakeholder = MagicMock(side_effect=lambda s: {**s, 'validado': True})
+        nodo = NodeCache().wrap("Stakeholder", stakeholder)
+        state = {'codigo_generado': 'a', 'attempt_count': 4, 'max_attempts': 3}
+        
+        nodo(dict(state))
+        nodo(dict(state))
+        
+        assert stakeholder.call_count == 2
+    
+    def test_rechazo_sin_motivo_nuevo_no_se_guarda(self):
+        """Verifica que un rechazo del Stakeholder sin motivo nuevo no se reutiliza"""
+        stakeholder = MagicMock(side_effect=lambda s: {**s, 'validado': False})
+        nodo = NodeCache().wrap("Stakeholder", stakeholder)
+        state = {'codigo_generado': 'a', 'attempt_count': 1, 'max_attempts': 3, 'feedback_stakeholder': 'previo'}
+        
+        nodo(dict(state))
+        nodo(dict(state))
+        
+        assert stakeholder.call_count == 2
+    
+    def test_resultado_reproducido_es_una_copia(self):
+        """Verifica que modificar el estado no altera el resultado guardado"""
+        spec = NodeCacheSpec(reads=('x',), writes=('datos',), cacheable=lambda antes, despues: True)
+        nodo = NodeCache().wrap("Nodo", lambda s: {**s, 'datos': {'n': 1}}, spec)
+        
+        nodo({'x': 1})['datos']['n'] = 99
+        
+        assert nodo({'x': 1})['datos'] == {'n': 1}
+    
+    def test_lru_por_nodo(self):
+        """Verifica que se descartan los resultados menos recientes"""
+        sonar = _sonar_simulado()
+        nodo = NodeCache(max_entries=1).wrap("Sonar", sonar)
+        
+        nodo({'codigo_generado': 'a', 'sonarqube_attempt_count': 0})
+        nodo({'codigo_generado': 'b', 'sonarqube_attempt_count': 0})
+        nodo({'codigo_generado': 'a', 'sonarqube_attempt_count': 0})
+        
+        assert sonar.llamadas == 3
+
+
+class TestMemoizeNode:
+    
+    def test_deshabilitado_devuelve_el_nodo_original(self, monkeypatch):
+        """Verifica que sin NODE_CACHE_ENABLED el nodo no se envuelve"""
+        monkeypatch.setattr(node_cache.settings, 'NODE_CACHE_ENABLED', False)
+        sonar = _sonar_simulado()
+        
+        assert memoize_node("Sonar", sonar) is sonar
+    
+    def test_opt_in_por_nodo(self, monkeypatch):
+        """Verifica que solo se envuelven los nodos de NODE_CACHE_NODES"""
+        monkeypatch.setattr(node_cache.settings, 'NODE_CACHE_ENABLED', True)
+        monkeypatch.setattr(node_cache.settings, 'NODE_CACHE_NODES', "Sonar, Desconocido")
+        sonar = _sonar_simulado()
+        stakeholder = MagicMock()
+        
+        assert memoize_node("Sonar", sonar) is not sonar
+        assert memoize_node("Stakeholder", stakeholder) is stakeholder
+    
+    def test_especificaciones_de_los_nodos(self):
+        """Verifica los nodos memoizables"""
+        assert set(NODE_CACHE_SPECS) == {"Sonar", "Developer-UnitTests", "Stakeholder"}
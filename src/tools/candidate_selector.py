@@ -0,0 +1,221 @@
+"""
+Generación de implementaciones candidatas en paralelo y selección basada en tests.
+
+En lugar de pedir una única implementación al LLM (y pagar un ciclo completo
+Developer-Code → Sonar → UnitTests por cada defecto), se generan N candidatas
+concurrentemente, se puntúan en paralelo con el análisis estático local y con los
+tests unitarios ya generados (si existen), y se conserva la mejor.
+
+En la primera pasada de Developer-Code aún no hay tests, y sin TEST_EXECUTOR_POOL_ENABLED
+no se ejecutan: en ambos casos la selección es solo por análisis estático.
+
+Cada candidata se genera con la misma función que el camino de una sola respuesta
+(router de modelos, validación de completitud, comprobación de sintaxis y opciones
+de convergencia), se evalúa en un directorio temporal propio de la llamada y sus
+tests se ejecutan en el pool de sandbox (tools/test_executor_pool.py).
+"""
+
+import contextvars
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Any, Optional, Tuple
+
+from config.settings import settings
+from llm.errors import as_llm_error
+from tools.file_utils import limpiar_codigo_markdown
+from tools.sonarqube_mcp import analizar_archivo_local
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__, level=settings.get_log_level())
+
+# Penalización por severidad de issue del análisis estático
+SEVERITY_PENALTY = {
+    "BLOCKER": 100,
+    "CRITICAL": 50,
+    "MAJOR": 10,
+    "MINOR": 2,
+    "INFO": 0
+}
+
+
+class CandidateResult:
+    """Resultado de la evaluación de una implementación candidata"""
+    
+    def __init__(self, index: int, respuesta_llm: str, codigo: str):
+        self.index = index
+        self.respuesta_llm = respuesta_llm
+        self.codigo = codigo
+        self.issues: List[Dict[str, Any]] = []
+        self.static_penalty = 0
+        self.tests_run: Optional[Dict[str, int]] = None  # None si no había tests o no se pudieron ejecutar
+        self.tests_success: Optional[bool] = None
+
+    def sort_key(self) -> tuple:
+        """Clave de ordenación: menor es mejor"""
+        if self.tests_run is None:
+            tests_key = (1, 0, 0)
+        else:
+            tests_key = (
+                0 if self.tests_success else 1,
+                self.tests_run.get('failed', 0),
+                -self.tests_run.get('passed', 0)
+            )
+        return tests_key + (self.static_penalty, self.index)
+
+
+def _prompt_variante(prompt: str, index: int) -> str:
+    """Añade una indicación de variante para diversificar las candidatas"""
+    if index == 0:
+        return prompt
+    return (
+        prompt
+        + f"\n\nNOTA: Esta es la propuesta alternativa #{index + 1}. "
+        "Implementa la misma funcionalidad con un enfoque razonablemente distinto, "
+        "manteniendo exactamente la misma firma pública y los mismos nombres exportados."
+    )
+
+
+def _en_paralelo(fn: Callable, argumentos: List[Any], prefijo: str) -> List[Any]:
+    """
+    Ejecuta fn sobre cada argumento en hilos, cada uno con una copia del contexto
+    del llamante (plazo de la ejecución, agente activo para la cobertura de latencia).
+    """
+    with ThreadPoolExecutor(max_workers=len(argumentos), thread_name_prefix=prefijo) as executor:
+        futuros = [executor.submit(contextvars.copy_context().run, fn, arg) for arg in argumentos]
+        return [f.result() for f in futuros]
+
+
+def generar_candidatos(prompt: str, n: int, generar: Callable[[str], str]) -> List[Tuple[int, str]]:
+    """
+    Genera N respuestas del LLM en paralelo.
+
+    Args:
+        prompt: Prompt del Developer-Code ya formateado
+        n: Número de candidatas
+        generar: prompt -> respuesta (la misma generación que el camino de una sola respuesta)
+
+    Returns:
+        Lista de (índice de variante, respuesta) sin errores del LLM, en orden de índice
+    """
+    respuestas = _en_paralelo(generar, [_prompt_variante(prompt, i) for i in range(n)], "candidate")
+
+    validas = [(i, r) for i, r in enumerate(respuestas) if r and as_llm_error(r) is None]
+    if len(validas) < n:
+        logger.warning(f"⚠️ {n - len(validas)} candidata(s) descartada(s) por error del LLM")
+    return validas
+
+
+def _ejecutar_tests_candidato(
+    code_path: str,
+    test_path: str,
+    lenguaje: str
+) -> tuple[Optional[bool], Optional[Dict[str, int]]]:
+    """
+    Ejecuta los tests de la candidata en el pool de sandbox.
+
+    Returns:
+        (éxito, estadísticas)
+    """
+    # Importación diferida y solo con el pool habilitado: la ejecución vive en el agente de tests
+    from agents.developer_unit_tests import ejecutar_tests_en_pool
+
+    resultado = ejecutar_tests_en_pool(test_path, code_path, lenguaje)
+    return resultado['success'], resultado['tests_run']
+
+
+def evaluar_candidato(
+    index: int,
+    respuesta_llm: str,
+    candidates_root: str,
+    codigo_filename: str,
+    lenguaje: str,
+    tests: str = "",
+    test_filename: str = ""
+) -> CandidateResult:
+    """
+    Puntúa una candidata: análisis estático local + tests unitarios existentes.
+    Cada candidata se escribe en su propio directorio candidates_root/c<index>.
+    """
+    codigo = limpiar_codigo_markdown(respuesta_llm)
+    resultado = CandidateResult(index=index, respuesta_llm=respuesta_llm, codigo=codigo)
+
+    candidate_dir = os.path.join(candidates_root, f"c{index}")
+    os.makedirs(candidate_dir, exist_ok=True)
+    code_path = os.path.join(candidate_dir, codigo_filename)
+    with open(code_path, 'w', encoding='utf-8') as f:
+        f.write(codigo)
+
+    resultado.issues = analizar_archivo_local(code_path)
+    resultado.static_penalty = sum(SEVERITY_PENALTY.get(i.get('severity', 'INFO'), 0) for i in resultado.issues)
+
+    if tests and test_filename and settings.TEST_EXECUTOR_POOL_ENABLED:
+        test_path = os.path.join(candidate_dir, test_filename)
+        with open(test_path, 'w', encoding='utf-8') as f:
+            f.write(tests)
+        resultado.tests_success, resultado.tests_run = _ejecutar_tests_candidato(code_path, test_path, lenguaje)
+
+    logger.debug(
+        f"Candidata #{index + 1}: penalización estática={resultado.static_penalty}, "
+        f"tests={resultado.tests_run}"
+    )
+    return resultado
+
+
+def seleccionar_mejor_candidato(
+    prompt: str,
+    n: int,
+    generar: Callable[[str], str],
+    codigo_filename: str,
+    lenguaje: str,
+    tests: str = "",
+    test_filename: str = ""
+) -> Optional[CandidateResult]:
+    """
+    Genera N candidatas en paralelo, las puntúa en paralelo y devuelve la mejor.
+
+    Args:
+        prompt: Prompt del Developer-Code ya formateado
+        n: Número de candidatas
+        generar: prompt -> respuesta del LLM (router, validación y opciones del agente)
+        codigo_filename: Nombre con el que los tests importan el código (ej: "suma.ts")
+        lenguaje: 'typescript' o 'python'
+        tests: Tests unitarios generados en una iteración anterior (opcional; solo se
+            ejecutan con TEST_EXECUTOR_POOL_ENABLED)
+        test_filename: Nombre del fichero de tests (ej: "suma.spec.ts")
+
+    Returns:
+        La mejor candidata o None si el LLM no devolvió ninguna válida
+    """
+    respuestas = generar_candidatos(prompt, n, generar)
+    if not respuestas:
+        return None
+
+    if not (tests and test_filename):
+        logger.info("ℹ️ Sin tests previos (primera pasada): candidatas puntuadas solo con análisis estático")
+    elif not settings.TEST_EXECUTOR_POOL_ENABLED:
+        logger.info("ℹ️ TEST_EXECUTOR_POOL_ENABLED=false: candidatas puntuadas solo con análisis estático")
+
+    # Candidatas idénticas no aportan nada: se evalúa solo la primera aparición
+    unicas: Dict[str, Tuple[int, str]] = {}
+    for index, respuesta in respuestas:
+        unicas.setdefault(limpiar_codigo_markdown(respuesta), (index, respuesta))
+    if len(unicas) < len(respuestas):
+        logger.info(f"♻️ {len(respuestas) - len(unicas)} candidata(s) duplicada(s) omitida(s)")
+
+    # Directorio propio de la llamada: varias ejecuciones pueden seleccionar a la vez
+    with tempfile.TemporaryDirectory(prefix="capstone_candidates_") as candidates_root:
+        resultados = _en_paralelo(
+            lambda candidata: evaluar_candidato(
+                candidata[0], candidata[1], candidates_root, codigo_filename, lenguaje, tests, test_filename
+            ),
+            list(unicas.values()),
+            "candidate-eval"
+        )
+
+    mejor = min(resultados, key=lambda r: r.sort_key())
+    logger.info(f"🏆 Candidata seleccionada: #{mejor.index + 1} de {n}")
+    for r in sorted(resultados, key=lambda r: r.sort_key()):
+        tests_info = "sin tests" if r.tests_run is None else f"{r.tests_run.get('passed', 0)}/{r.tests_run.get('total', 0)} tests"
+        logger.info(f"   #{r.index + 1}: {tests_info}, {len(r.issues)} issues (penalización {r.static_penalty})")
+    return mejor
@@ -6,15 +6,32 @@ Este módulo mantiene compatibilidad hacia atrás con código existente.
 
 import json
 import os
+import threading
+from typing import Dict, Optional
 from utils.logger import setup_logger, log_file_operation
 from config.settings import settings
 from utils.file_manager import FileManager
+from utils.artifact_store import get_artifact_store
 
 logger = setup_logger(__name__, level=settings.get_log_level())
 
 # Instancia global para compatibilidad
 _file_manager = FileManager()
 
+# Un FileManager por directorio, reutilizado entre llamadas
+_file_managers: Dict[str, FileManager] = {}
+_file_managers_lock = threading.Lock()
+
+
+def _get_file_manager(directorio: str) -> FileManager:
+    """Obtiene (o crea una sola vez) el FileManager de un directorio"""
+    clave = os.path.abspath(directorio)
+    with _file_managers_lock:
+        fm = _file_managers.get(clave)
+        if fm is None:
+            fm = _file_managers[clave] = FileManager(base_directory=directorio)
+        return fm
+
 
 def guardar_fichero_texto(nombre_fichero: str, contenido: str, directorio: str = None) -> bool:
     """
@@ -32,16 +49,42 @@ def guardar_fichero_texto(nombre_fichero: str, contenido: str, directorio: str =
     Returns:
         bool: True si la operación fue exitosa, False en caso contrario.
     """
-    # Delegar al FileManager
+    # Delegar al FileManager (uno por directorio, reutilizado entre llamadas)
     if directorio:
-        fm = FileManager(base_directory=directorio)
-        success, _ = fm.save_file(nombre_fichero, contenido)
+        success, _ = _get_file_manager(directorio).save_file(nombre_fichero, contenido)
     else:
         success, _ = _file_manager.save_file(nombre_fichero, contenido)
     
     return success
 
 
+def guardar_artefacto(nombre_fichero: str, contenido: str, tipo: str = "report") -> Optional[str]:
+    """
+    Guarda un artefacto por intento (código, reportes, revisiones, validaciones).
+
+    Con ARTIFACT_STORE_ENABLED=true se registra en el almacén direccionado por contenido
+    (deduplicado y opcionalmente comprimido) y se devuelve su handle para pasarlo en memoria.
+    En caso contrario se escribe como fichero en OUTPUT_DIR, igual que antes. Los agentes
+    llaman siempre a esta función: el registro de la operación indica dónde quedó el artefacto.
+
+    Args:
+        nombre_fichero (str): Nombre lógico del artefacto (ej: "3_sonar_report_req1_sq0.txt").
+        contenido (str): Contenido textual del artefacto.
+        tipo (str): Tipo de artefacto ("code", "tests", "report", ...).
+
+    Returns:
+        Optional[str]: Handle del artefacto si se usó el almacén, None si se escribió como fichero.
+    """
+    if settings.ARTIFACT_STORE_ENABLED:
+        handle = get_artifact_store().put(nombre_fichero, contenido, kind=tipo)
+        log_file_operation(logger, "guardar", f"{nombre_fichero} (artifact store, {handle[:19]})")
+        return handle
+
+    # FileManager.save_file registra la ruta real (o el error)
+    guardar_fichero_texto(nombre_fichero, contenido, directorio=settings.OUTPUT_DIR)
+    return None
+
+
 def detectar_lenguaje_y_extension(requisitos_formales: str) -> tuple[str, str, str]:
     """
     Detecta el lenguaje de programación y determina la extensión y patrón de limpieza.
@@ -0,0 +1,291 @@
+"""
+Caché gestionada y versionada del toolchain de Node.js (vitest + TypeScript).
+
+En lugar de escribir un package.json en output/ y dejar que `npx` resuelva (y
+potencialmente descargue) vitest en cada ejecución, se instala una única vez un
+toolchain fijado por versión fuera del directorio de ejecución:
+
+    <NODE_TOOLCHAIN_DIR>/vitest-<v>_typescript-<v>/
+        package.json
+        node_modules/
+        .provisioned      (marcador con versiones y fecha de instalación)
+
+Cada ejecución enlaza ese node_modules y lanza vitest con `node <entry>` directamente,
+sin pasar por npx ni por la red.
+
+La instalación es un paso explícito previo (scripts/provision_node_toolchain.py); durante
+el flujo solo se comprueba el marcador con require_provisioned().
+"""
+
+import os
+import json
+import shutil
+import subprocess
+import tempfile
+import threading
+from datetime import datetime
+from typing import List, Optional
+
+from config.settings import settings
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__, level=settings.get_log_level())
+
+MARKER_FILENAME = ".provisioned"
+
+
+class ToolchainError(Exception):
+    """Error al aprovisionar o verificar el toolchain de Node.js"""
+    pass
+
+
+class NodeToolchain:
+    """
+    Toolchain de Node.js compartido entre ejecuciones.
+    """
+
+    def __init__(
+        self,
+        base_directory: str = None,
+        vitest_version: str = None,
+        typescript_version: str = None
+    ):
+        """
+        Args:
+            base_directory: Directorio raíz de la caché. Por defecto NODE_TOOLCHAIN_DIR
+            vitest_version: Versión exacta de vitest. Por defecto VITEST_VERSION
+            typescript_version: Versión exacta de TypeScript. Por defecto TYPESCRIPT_VERSION
+        """
+        self.base_directory = os.path.abspath(os.path.expanduser(base_directory or settings.NODE_TOOLCHAIN_DIR))
+        self.vitest_version = vitest_version or settings.VITEST_VERSION
+        self.typescript_version = typescript_version or settings.TYPESCRIPT_VERSION
+        self._lock = threading.Lock()
+        self._healthy = False
+
+    @property
+    def directory(self) -> str:
+        """Directorio de esta versión concreta del toolchain"""
+        return os.path.join(
+            self.base_directory,
+            f"vitest-{self.vitest_version}_typescript-{self.typescript_version}"
+        )
+
+    @property
+    def node_modules(self) -> str:
+        return os.path.join(self.directory, "node_modules")
+
+    def _package_json(self) -> dict:
+        return {
+            "name": "capstone-toolchain",
+            "version": "1.0.0",
+            "private": True,
+            "type": "module",
+            "devDependencies": {
+                "vitest": self.vitest_version,
+                "typescript": self.typescript_version
+            }
+        }
+
+    def _bin_entry(self, package: str, bin_name: str) -> str:
+        """Resuelve el script ejecutable de un paquete leyendo su campo 'bin'"""
+        package_dir = os.path.join(self.node_modules, package)
+        with open(os.path.join(package_dir, "package.json"), "r", encoding="utf-8") as f:
+            bin_field = json.load(f).get("bin", {})
+        entry = bin_field if isinstance(bin_field, str) else bin_field.get(bin_name)
+        if not entry:
+            raise ToolchainError(f"El paquete {package} no declara el binario '{bin_name}'")
+        return os.path.join(package_dir, entry)
+
+    def vitest_entry(self) -> str:
+        return self._bin_entry("vitest", "vitest")
+
+    def tsc_entry(self) -> str:
+        return self._bin_entry("typescript", "tsc")
+
+    def is_provisioned(self) -> bool:
+        """Indica si el marcador de instalación existe y coincide con las versiones pedidas"""
+        marker = os.path.join(self.directory, MARKER_FILENAME)
+        if not os.path.exists(marker):
+            return False
+        try:
+            with open(marker, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        return data.get("vitest") == self.vitest_version and data.get("typescript") == self.typescript_version
+
+    def health_check(self) -> bool:
+        """Verifica que node puede ejecutar vitest y tsc desde la caché"""
+        try:
+            for entry in (self.vitest_entry(), self.tsc_entry()):
+                result = subprocess.run(
+                    ["node", entry, "--version"],
+                    capture_output=True,
+                    text=True,
+                    timeout=30
+                )
+                if result.returncode != 0:
+                    logger.warning(f"⚠️ Health check del toolchain falló: {entry}: {result.stderr.strip()[:200]}")
+                    return False
+        except (OSError, subprocess.TimeoutExpired, ToolchainError, ValueError) as e:
+            logger.warning(f"⚠️ Health check del toolchain falló: {e}")
+            return False
+        return True
+
+    def _install(self) -> None:
+        """Instala el toolchain en un directorio temporal y lo mueve a su sitio de forma atómica"""
+        os.makedirs(self.base_directory, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix=".staging_", dir=self.base_directory)
+        try:
+            with open(os.path.join(staging, "package.json"), "w", encoding="utf-8") as f:
+                json.dump(self._package_json(), f, indent=2)
+
+            logger.info(f"📦 Instalando toolchain de Node.js (vitest {self.vitest_version}, typescript {self.typescript_version})...")
+            result = subprocess.run(
+                ["npm", "install", "--no-audit", "--no-fund", "--save-exact"],
+                cwd=staging,
+                capture_output=True,
+                text=True,
+                encoding="utf-8",
+                errors="replace",
+                timeout=settings.NODE_TOOLCHAIN_INSTALL_TIMEOUT,
+                shell=os.name == "nt"  # npm es un .cmd en Windows
+            )
+            if result.returncode != 0:
+                raise ToolchainError(f"npm install falló:\n{result.stderr.strip()[-2000:]}")
+
+            with open(os.path.join(staging, MARKER_FILENAME), "w", encoding="utf-8") as f:
+                json.dump({
+                    "vitest": self.vitest_version,
+                    "typescript": self.typescript_version,
+                    "node": shutil.which("node"),
+                    "installed_at": datetime.now().isoformat(timespec="seconds")
+                }, f, indent=2)
+
+            shutil.rmtree(self.directory, ignore_errors=True)
+            os.replace(staging, self.directory)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            raise ToolchainError(f"No se pudo instalar el toolchain: {e}") from e
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    def ensure_provisioned(self) -> str:
+        """
+        Garantiza que el toolchain está instalado y sano. Solo descarga la primera vez
+        (o si la caché está corrupta); las siguientes llamadas son casi gratuitas.
+
+        Returns:
+            Directorio del toolchain
+
+        Raises:
+            ToolchainError: Si no se puede instalar o no pasa el health check
+        """
+        with self._lock:
+            if self._healthy:
+                return self.directory
+
+            if self.is_provisioned() and self.health_check():
+                logger.info(f"✅ Toolchain de Node.js en caché: {self.directory}")
+            else:
+                self._install()
+                if not self.health_check():
+                    raise ToolchainError(f"El toolchain instalado en {self.directory} no pasa el health check")
+                logger.info(f"✅ Toolchain de Node.js aprovisionado: {self.directory}")
+
+            self._healthy = True
+            return self.directory
+
+    def require_provisioned(self) -> str:
+        """
+        Comprobación barata para el camino caliente: solo lee el marcador, sin npm ni
+        health check.
+
+        Returns:
+            Directorio del toolchain
+
+        Raises:
+            ToolchainError: Si el toolchain no está aprovisionado
+        """
+        if not self.is_provisioned():
+            raise ToolchainError(
+                f"Toolchain de Node.js no aprovisionado en {self.directory}. "
+                "Ejecuta antes: python scripts/provision_node_toolchain.py"
+            )
+        return self.directory
+
+    def link_into(self, run_directory: str) -> None:
+        """
+        Enlaza node_modules y package.json del toolchain en un directorio de ejecución.
+        Sustituye cualquier node_modules/package.json previo del directorio.
+
+        En Windows sin privilegios para enlaces simbólicos, node_modules se enlaza con
+        una unión de directorio (mklink /J) y package.json se copia.
+
+        Raises:
+            ToolchainError: Si no se puede crear el enlace ni la alternativa
+        """
+        try:
+            os.makedirs(run_directory, exist_ok=True)
+            for name, is_dir in (("node_modules", True), ("package.json", False)):
+                link_path = os.path.join(run_directory, name)
+                target = os.path.join(self.directory, name)
+                if _es_enlace(link_path):
+                    if os.path.realpath(link_path) == os.path.realpath(target):
+                        continue
+                    if os.path.islink(link_path):
+                        os.unlink(link_path)
+                    else:
+                        # rmdir elimina una unión sin tocar su destino
+                        os.rmdir(link_path)
+                elif os.path.isdir(link_path):
+                    shutil.rmtree(link_path)
+                elif os.path.exists(link_path):
+                    os.unlink(link_path)
+                _enlazar(target, link_path, is_dir)
+        except (OSError, subprocess.SubprocessError) as e:
+            raise ToolchainError(f"No se pudo enlazar el toolchain en {run_directory}: {e}") from e
+
+    def vitest_command(self, test_file: str) -> List[str]:
+        """Comando para ejecutar vitest directamente con node (sin npx)"""
+        return ["node", self.vitest_entry(), "run", test_file, "--reporter=verbose"]
+
+
+def _es_enlace(path: str) -> bool:
+    """True si path es un enlace simbólico o una unión de directorio (Windows)"""
+    if os.path.islink(path):
+        return True
+    if os.name != 'nt' or not os.path.isdir(path):
+        return False
+    real_parent = os.path.realpath(os.path.dirname(path))
+    return os.path.normcase(os.path.realpath(path)) != os.path.normcase(os.path.join(real_parent, os.path.basename(path)))
+
+
+def _enlazar(target: str, link_path: str, is_dir: bool) -> None:
+    """Crea un enlace simbólico; en Windows sin privilegios, una unión (directorios) o una copia"""
+    try:
+        os.symlink(target, link_path, target_is_directory=is_dir)
+        return
+    except OSError:
+        if os.name != 'nt':
+            raise
+    if is_dir:
+        subprocess.run(
+            ["cmd", "/c", "mklink", "/J", link_path, target],
+            check=True, capture_output=True, text=True
+        )
+    else:
+        shutil.copy2(target, link_path)
+    logger.debug(f"Enlace simbólico no permitido: {'unión' if is_dir else 'copia'} de {target}")
+
+
+_node_toolchain: Optional[NodeToolchain] = None
+_node_toolchain_lock = threading.Lock()
+
+
+def get_node_toolchain() -> NodeToolchain:
+    """Obtiene la instancia global del toolchain de Node.js (lazy loading)."""
+    global _node_toolchain
+    with _node_toolchain_lock:
+        if _node_toolchain is None:
+            _node_toolchain = NodeToolchain()
+        return _node_toolchain
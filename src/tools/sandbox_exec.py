@@ -0,0 +1,72 @@
+"""
+Lanzador intermedio de los trabajos del pool de tests en sandbox (solo POSIX).
+
+    python sandbox_exec.py --memory-mb 512 --cpu-seconds 60 --rusage-file r.json -- pytest tests.py
+
+El pool (tools/test_executor_pool.py) lanza los trabajos desde los hilos de un
+ThreadPoolExecutor, donde preexec_fn no es seguro. Este proceso tiene un único hilo:
+hace fork, aplica los rlimits en el hijo y hace exec del comando. Después recoge al
+hijo con os.wait4, escribe su consumo de CPU/memoria en --rusage-file y termina con
+el mismo código de salida (o la misma señal).
+
+Solo usa la biblioteca estándar: se ejecuta por ruta, sin el resto del proyecto.
+"""
+
+import argparse
+import json
+import os
+import resource
+import signal
+import sys
+
+
+def _aplicar_limites(memory_mb: int, cpu_seconds: int) -> None:
+    """Aplica los rlimits al proceso actual (el hijo, antes del exec)"""
+    if memory_mb > 0:
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    if cpu_seconds > 0:
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+    # Sin core dumps en el directorio de trabajo
+    resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Ejecuta un comando con rlimits y registra su rusage")
+    parser.add_argument("--memory-mb", type=int, default=0, help="RLIMIT_AS en MB (0 = sin límite)")
+    parser.add_argument("--cpu-seconds", type=int, default=0, help="RLIMIT_CPU en segundos (0 = sin límite)")
+    parser.add_argument("--rusage-file", default=None, help="Fichero JSON donde escribir el consumo del comando")
+    parser.add_argument("cmd", nargs=argparse.REMAINDER, help="Comando a ejecutar (tras --)")
+    args = parser.parse_args(argv)
+    cmd = args.cmd[1:] if args.cmd[:1] == ["--"] else args.cmd
+    if not cmd:
+        parser.error("falta el comando")
+
+    pid = os.fork()
+    if pid == 0:
+        try:
+            _aplicar_limites(args.memory_mb, args.cpu_seconds)
+            os.execvp(cmd[0], cmd)
+        except OSError as e:
+            print(f"{type(e).__name__}: {e}", file=sys.stderr)
+        os._exit(127)
+
+    _, status, rusage = os.wait4(pid, 0)
+    if args.rusage_file:
+        with open(args.rusage_file, "w", encoding="utf-8") as f:
+            json.dump({
+                "ru_utime": rusage.ru_utime,
+                "ru_stime": rusage.ru_stime,
+                "ru_maxrss": rusage.ru_maxrss
+            }, f)
+
+    code = os.waitstatus_to_exitcode(status)
+    if code < 0:
+        # Propagar la señal para que el pool vea el mismo returncode negativo
+        signal.signal(-code, signal.SIG_DFL)
+        os.kill(os.getpid(), -code)
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
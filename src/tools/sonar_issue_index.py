@@ -0,0 +1,180 @@
+"""
+Índice de huellas (fingerprints) de issues de Sonar durante una ejecución.
+
+Cada issue se identifica por su regla y el fragmento de código normalizado de su
+línea (no por el número de línea, que cambia en cuanto el desarrollador añade o
+quita código). Entre intentos del bucle Sonar -> Developer-Code el índice permite:
+
+- Enviar al LLM solo el detalle de los issues nuevos y un resumen compacto de los
+  que siguen pendientes, en lugar del reporte completo en cada intento.
+- Detectar oscilaciones: el mismo conjunto de issues vuelve a aparecer tras un
+  intento intermedio distinto (A -> B -> A), señal de que el bucle no converge.
+
+El índice se guarda en el estado (state['sonar_issue_index']) como dict serializable.
+"""
+
+import hashlib
+import re
+from typing import Any, Dict, List, Optional
+
+from tools.sonarqube_mcp import formatear_reporte_sonarqube
+
+_ESPACIOS_RE = re.compile(r'\s+')
+
+# Longitud del hash (hex) usado como huella
+_LONGITUD_HUELLA = 16
+
+
+def _normalizar_fragmento(texto: str) -> str:
+    """Colapsa espacios para que la reindentación no cambie la huella"""
+    return _ESPACIOS_RE.sub(' ', texto or '').strip()
+
+
+def fingerprint_issue(issue: Dict[str, Any], lineas_codigo: List[str]) -> str:
+    """
+    Calcula la huella de un issue: regla + fragmento normalizado de su línea.
+
+    Si la línea no existe (issues globales o de línea 0) se usa el mensaje.
+
+    Args:
+        issue: Issue con 'rule', 'line' y 'message'
+        lineas_codigo: Código analizado, ya dividido en líneas
+
+    Returns:
+        Huella hexadecimal
+    """
+    regla = issue.get('rule') or 'UNKNOWN'
+    linea = issue.get('line') or 0
+    if isinstance(linea, int) and 0 < linea <= len(lineas_codigo):
+        fragmento = _normalizar_fragmento(lineas_codigo[linea - 1])
+    else:
+        fragmento = ''
+    if not fragmento:
+        fragmento = _normalizar_fragmento(issue.get('message', ''))
+    return hashlib.sha1(f"{regla}\x00{fragmento}".encode('utf-8')).hexdigest()[:_LONGITUD_HUELLA]
+
+
+class SonarIssueDelta:
+    """Diferencia entre el análisis actual y el anterior"""
+
+    def __init__(self):
+        self.nuevos: List[Dict[str, Any]] = []  # Nunca vistos en esta ejecución
+        self.reaparecidos: List[Dict[str, Any]] = []  # Resueltos en algún intento y de vuelta
+        self.persistentes: List[Dict[str, Any]] = []  # Presentes también en el intento anterior
+        self.resueltos: List[Dict[str, Any]] = []  # Presentes en el intento anterior y ya no
+        self.oscilando: bool = False  # El conjunto actual repite el de un intento previo no consecutivo
+
+    @property
+    def pendientes(self) -> List[Dict[str, Any]]:
+        """Issues que requieren el detalle completo en el prompt (nuevos y reaparecidos)"""
+        return self.nuevos + self.reaparecidos
+
+    def resumen(self) -> str:
+        """Resumen compacto de una línea para prompts y logs"""
+        texto = (
+            f"Delta Sonar: {len(self.nuevos)} nuevo(s), {len(self.persistentes)} sin resolver, "
+            f"{len(self.resueltos)} resuelto(s), {len(self.reaparecidos)} reaparecido(s)"
+        )
+        if self.oscilando:
+            texto += " - OSCILACIÓN detectada (se repite un conjunto de issues anterior)"
+        return texto
+
+
+class SonarIssueIndex:
+    """
+    Índice de issues por huella a lo largo de los intentos de corrección de calidad.
+
+    Uso:
+        >>> index = SonarIssueIndex.from_state(state.get('sonar_issue_index'))
+        >>> delta = index.update(resultado_analisis['issues'], codigo)
+        >>> state['sonar_issue_index'] = index.to_state()
+    """
+
+    def __init__(self, issues: Optional[Dict[str, Dict[str, Any]]] = None, history: Optional[List[List[str]]] = None):
+        self.issues: Dict[str, Dict[str, Any]] = issues or {}  # huella -> último issue visto
+        self.history: List[List[str]] = history or []  # huellas de cada intento, en orden
+
+    @classmethod
+    def from_state(cls, data: Optional[Dict[str, Any]]) -> "SonarIssueIndex":
+        """Reconstruye el índice guardado en el estado (None -> índice vacío)"""
+        if not data:
+            return cls()
+        return cls(dict(data.get('issues', {})), [list(h) for h in data.get('history', [])])
+
+    def to_state(self) -> Dict[str, Any]:
+        """Forma serializable para guardar en el estado"""
+        return {'issues': self.issues, 'history': self.history}
+
+    def update(self, issues: List[Dict[str, Any]], codigo: str) -> SonarIssueDelta:
+        """
+        Registra el análisis actual y calcula el delta respecto al anterior.
+
+        Args:
+            issues: Lista de issues del análisis (formato de analizar_codigo_con_sonarqube)
+            codigo: Código analizado (para obtener el fragmento de cada issue)
+
+        Returns:
+            SonarIssueDelta
+        """
+        lineas = (codigo or '').splitlines()
+        anterior = set(self.history[-1]) if self.history else set()
+        vistos_antes = set().union(*self.history) if self.history else set()
+
+        actuales: Dict[str, Dict[str, Any]] = {}
+        for issue in issues:
+            actuales.setdefault(fingerprint_issue(issue, lineas), issue)
+
+        delta = SonarIssueDelta()
+        for huella, issue in actuales.items():
+            if huella in anterior:
+                delta.persistentes.append(issue)
+            elif huella in vistos_antes:
+                delta.reaparecidos.append(issue)
+            else:
+                delta.nuevos.append(issue)
+        delta.resueltos = [self.issues[h] for h in self.history[-1] if h not in actuales] if self.history else []
+
+        conjunto_actual = sorted(actuales)
+        # A -> B -> A: el conjunto actual coincide con uno anterior al intento inmediatamente previo
+        delta.oscilando = bool(conjunto_actual) and any(
+            sorted(previo) == conjunto_actual for previo in self.history[:-1]
+        )
+
+        self.issues.update({h: _issue_compacto(i) for h, i in actuales.items()})
+        self.history.append(conjunto_actual)
+        return delta
+
+
+def _issue_compacto(issue: Dict[str, Any]) -> Dict[str, Any]:
+    """Campos del issue que se conservan en el índice (para los resúmenes)"""
+    return {k: issue.get(k) for k in ('rule', 'severity', 'type', 'line', 'message')}
+
+
+def _linea_issue(issue: Dict[str, Any]) -> str:
+    return (
+        f"   - [{issue.get('severity', 'N/A')}] {issue.get('rule', 'N/A')} "
+        f"(línea {issue.get('line', 'N/A')}): {issue.get('message', '')}"
+    )
+
+
+def formatear_reporte_delta(resultado: Dict[str, Any], delta: SonarIssueDelta) -> str:
+    """
+    Reporte para el prompt de corrección: detalle completo solo de los issues nuevos
+    o reaparecidos y una línea por cada issue que sigue sin resolver.
+
+    Args:
+        resultado: Resultado del análisis (se conservan el resumen y los criterios)
+        delta: Delta calculado por SonarIssueIndex.update
+
+    Returns:
+        Reporte formateado
+    """
+    reporte = [formatear_reporte_sonarqube({**resultado, 'issues': delta.pendientes})]
+    reporte.append(f"\n🔁 {delta.resumen()}")
+    if delta.persistentes:
+        reporte.append("\n⏳ Issues de intentos anteriores que siguen sin resolver:")
+        reporte.extend(_linea_issue(issue) for issue in delta.persistentes)
+    if delta.resueltos:
+        reporte.append("\n✅ Resueltos en el último intento (no volver a introducirlos):")
+        reporte.extend(_linea_issue(issue) for issue in delta.resueltos)
+    return "\n".join(reporte)
@@ -452,6 +452,21 @@ def _parsear_output_sonarscanner(output: str) -> List[Dict[str, Any]]:
     return issues
 
 
+def analizar_archivo_local(file_path: str) -> List[Dict[str, Any]]:
+    """
+    Análisis estático local de un fichero ya escrito en disco (sin SonarCloud ni
+    SonarScanner). Lo usa el selector de candidatas, que analiza cada candidata en
+    su propio directorio.
+    
+    Args:
+        file_path: Ruta al archivo a analizar (la extensión determina el lenguaje)
+        
+    Returns:
+        Lista de issues encontrados
+    """
+    return _analizar_archivo_sonarqube(file_path)
+
+
 def _analizar_archivo_sonarqube(file_path: str) -> List[Dict[str, Any]]:
     """
     Analiza un archivo con SonarQube y retorna los issues encontrados.
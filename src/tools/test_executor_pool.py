@@ -0,0 +1,279 @@
+"""
+Pool de ejecución de tests en sandbox para el código generado.
+
+Cada trabajo se ejecuta en su propio directorio de trabajo aislado (en tmpfs cuando
+está disponible), con límites de recursos (rlimits), red opcionalmente desactivada
+(unshare -rn) y timeout propio. Los trabajos se encolan en un pool con
+tantos workers como núcleos, de modo que varios flujos concurrentes pueden ejecutar
+sus tests en paralelo sin compartir OUTPUT_DIR ni cambiar el directorio del proceso.
+
+En POSIX el comando se lanza a través de tools/sandbox_exec.py, que aplica los rlimits
+y recoge al hijo con os.wait4: sin preexec_fn (no es seguro desde los hilos del pool).
+El diccionario de resultado incluye la contabilidad de CPU/memoria del comando, el
+tiempo de espera en cola y la duración.
+"""
+
+import errno
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Dict, List, Any, Optional
+
+from config.settings import settings
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__, level=settings.get_log_level())
+
+# Límites de recursos (solo POSIX)
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    resource = None
+    RESOURCE_AVAILABLE = False
+
+WAIT4_AVAILABLE = hasattr(os, "wait4")
+TMPFS_DIR = "/dev/shm"
+
+# Lanzador intermedio (rlimits + rusage) para POSIX
+SANDBOX_EXEC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sandbox_exec.py")
+SANDBOX_EXEC_AVAILABLE = os.name == 'posix' and RESOURCE_AVAILABLE and WAIT4_AVAILABLE
+
+
+def _tmpfs_disponible() -> bool:
+    return os.path.isdir(TMPFS_DIR) and os.access(TMPFS_DIR, os.W_OK)
+
+
+def _empty_resources() -> Dict[str, Any]:
+    return {'cpu_user_s': None, 'cpu_system_s': None, 'max_rss_kb': None}
+
+
+def _read_resources(rusage_file: str) -> Dict[str, Any]:
+    """Lee el consumo que escribió sandbox_exec.py (vacío si el lanzador no terminó)"""
+    try:
+        with open(rusage_file, 'r', encoding='utf-8') as f:
+            rusage = json.load(f)
+    except (OSError, ValueError):
+        return _empty_resources()
+    return {
+        'cpu_user_s': round(rusage['ru_utime'], 3),
+        'cpu_system_s': round(rusage['ru_stime'], 3),
+        'max_rss_kb': rusage['ru_maxrss']
+    }
+
+
+class TestExecutorPool:
+    """
+    Pool de ejecución de trabajos de test aislados.
+
+    Uso:
+        >>> pool = get_test_executor_pool()
+        >>> result = pool.run(['pytest', 'suma.spec.py'], files={'suma.py': codigo, 'suma.spec.py': tests})
+    """
+
+    __test__ = False  # Evitar que pytest intente recolectar esta clase
+
+    def __init__(
+        self,
+        max_workers: int = None,
+        memory_mb: int = None,
+        cpu_seconds: int = None,
+        network_off: bool = None,
+        use_tmpfs: bool = True
+    ):
+        """
+        Inicializa el pool.
+
+        Args:
+            max_workers: Trabajos simultáneos. Por defecto TEST_EXECUTOR_WORKERS o nº de núcleos
+            memory_mb: Límite de memoria virtual por trabajo (0 = sin límite)
+            cpu_seconds: Límite de tiempo de CPU por trabajo (0 = sin límite)
+            network_off: Ejecutar sin red (unshare -rn) si está disponible
+            use_tmpfs: Crear los directorios de trabajo en /dev/shm si existe
+        """
+        workers = max_workers if max_workers is not None else settings.TEST_EXECUTOR_WORKERS
+        self.max_workers = workers if workers and workers > 0 else (os.cpu_count() or 1)
+        self.memory_mb = memory_mb if memory_mb is not None else settings.TEST_SANDBOX_MEMORY_MB
+        self.cpu_seconds = cpu_seconds if cpu_seconds is not None else settings.TEST_SANDBOX_CPU_SECONDS
+        network_off = network_off if network_off is not None else settings.TEST_SANDBOX_NETWORK_OFF
+
+        self.unshare_path = shutil.which("unshare") if network_off else None
+        if network_off and not self.unshare_path:
+            logger.warning("⚠️ 'unshare' no disponible: los tests se ejecutarán con red")
+
+        self.work_root = TMPFS_DIR if use_tmpfs and _tmpfs_disponible() else None
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="test-exec")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.jobs_completed = 0
+
+    @property
+    def pending(self) -> int:
+        """Trabajos encolados o en ejecución"""
+        with self._lock:
+            return self._pending
+
+    def submit(
+        self,
+        cmd: List[str],
+        files: Optional[Dict[str, str]] = None,
+        links: Optional[Dict[str, str]] = None,
+        timeout: Optional[int] = None,
+        env: Optional[Dict[str, str]] = None
+    ) -> Future:
+        """
+        Encola un trabajo de test.
+
+        Args:
+            cmd: Comando a ejecutar dentro del directorio de trabajo
+            files: Ficheros a crear en el directorio de trabajo (nombre -> contenido)
+            links: Enlaces simbólicos a crear (nombre -> ruta existente), ej: node_modules
+            timeout: Timeout en segundos. Por defecto TEST_EXECUTION_TIMEOUT
+            env: Entorno del proceso. Por defecto una copia de os.environ
+
+        Returns:
+            Future cuyo resultado es el diccionario descrito en run()
+        """
+        with self._lock:
+            self._pending += 1
+        enqueued_at = time.monotonic()
+        return self._executor.submit(self._run_job, cmd, files or {}, links or {}, timeout, env, enqueued_at)
+
+    def run(self, cmd: List[str], **kwargs) -> Dict[str, Any]:
+        """
+        Ejecuta un trabajo y espera a su resultado.
+
+        Returns:
+            Dict con 'returncode', 'stdout', 'stderr', 'timed_out', 'duration_s',
+            'queued_s' y 'resources' ('cpu_user_s', 'cpu_system_s', 'max_rss_kb')
+        """
+        return self.submit(cmd, **kwargs).result()
+
+    def _run_job(
+        self,
+        cmd: List[str],
+        files: Dict[str, str],
+        links: Dict[str, str],
+        timeout: Optional[int],
+        env: Optional[Dict[str, str]],
+        enqueued_at: float
+    ) -> Dict[str, Any]:
+        queued_s = time.monotonic() - enqueued_at
+        timeout = timeout or settings.TEST_EXECUTION_TIMEOUT
+        workdir = tempfile.mkdtemp(prefix="capstone_test_", dir=self.work_root)
+        rusage_file = workdir + ".rusage.json"
+        start = time.monotonic()
+        try:
+            for name, content in files.items():
+                path = os.path.join(workdir, name)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, 'w', encoding='utf-8') as f:
+                    f.write(content)
+            for name, target in links.items():
+                if os.path.exists(target):
+                    os.symlink(os.path.abspath(target), os.path.join(workdir, name))
+
+            env = env if env is not None else os.environ.copy()
+            full_cmd = list(cmd)
+            if SANDBOX_EXEC_AVAILABLE:
+                # El exec lo hace el lanzador: comprobar aquí que el comando existe
+                if not shutil.which(full_cmd[0], path=env.get('PATH')):
+                    raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), full_cmd[0])
+                full_cmd = [
+                    sys.executable, SANDBOX_EXEC,
+                    "--memory-mb", str(self.memory_mb),
+                    "--cpu-seconds", str(self.cpu_seconds),
+                    "--rusage-file", rusage_file,
+                    "--"
+                ] + full_cmd
+            if self.unshare_path:
+                full_cmd = [self.unshare_path, "-rn"] + full_cmd
+
+            posix = os.name == 'posix'
+            proc = subprocess.Popen(
+                full_cmd,
+                cwd=workdir,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                encoding='utf-8',
+                errors='replace',
+                env=env,
+                start_new_session=posix,
+                shell=os.name == 'nt'  # npx es un .cmd en Windows
+            )
+
+            timed_out = False
+            try:
+                stdout, stderr = proc.communicate(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                timed_out = True
+                # Matar todo el grupo de procesos (vitest lanza workers hijos)
+                if posix:
+                    try:
+                        os.killpg(proc.pid, signal.SIGKILL)
+                    except ProcessLookupError:
+                        pass
+                else:
+                    proc.kill()
+                stdout, stderr = proc.communicate()
+
+            resources = _read_resources(rusage_file) if SANDBOX_EXEC_AVAILABLE else _empty_resources()
+
+            return {
+                'returncode': proc.returncode,
+                'stdout': stdout or "",
+                'stderr': stderr or "",
+                'timed_out': timed_out,
+                'duration_s': round(time.monotonic() - start, 3),
+                'queued_s': round(queued_s, 3),
+                'resources': resources
+            }
+        except OSError as e:
+            # Comando inexistente u otro fallo al lanzar el proceso
+            return {
+                'returncode': None,
+                'stdout': "",
+                'stderr': f"{type(e).__name__}: {e}",
+                'timed_out': False,
+                'duration_s': round(time.monotonic() - start, 3),
+                'queued_s': round(queued_s, 3),
+                'resources': _empty_resources(),
+                'launch_error': e
+            }
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+            if os.path.exists(rusage_file):
+                os.remove(rusage_file)
+            with self._lock:
+                self._pending -= 1
+                self.jobs_completed += 1
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Detiene el pool (espera a los trabajos en curso por defecto)"""
+        self._executor.shutdown(wait=wait)
+
+
+_test_executor_pool: Optional[TestExecutorPool] = None
+_test_executor_pool_lock = threading.Lock()
+
+
+def get_test_executor_pool() -> TestExecutorPool:
+    """Obtiene la instancia global del pool de ejecución de tests (lazy loading)."""
+    global _test_executor_pool
+    with _test_executor_pool_lock:
+        if _test_executor_pool is None:
+            _test_executor_pool = TestExecutorPool()
+            logger.info(
+                f"🧰 Pool de ejecución de tests: {_test_executor_pool.max_workers} workers, "
+                f"workdir={'tmpfs' if _test_executor_pool.work_root else 'tmp'}, "
+                f"red={'off' if _test_executor_pool.unshare_path else 'on'}"
+            )
+        return _test_executor_pool
@@ -0,0 +1,258 @@
+"""
+Almacén de artefactos direccionado por contenido.
+Sustituye la proliferación de ficheros por intento en output/ (2_developer_req…, 4_testing_req…,
+5_reviewer_…, 7_stakeholder_…) por objetos deduplicados y un índice por ejecución.
+Los agentes se pasan handles en memoria en lugar de releer los ficheros desde disco.
+"""
+
+import os
+import json
+import hashlib
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Any
+
+from config.settings import settings
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__, level=settings.get_log_level())
+
+# Compresión zstd opcional (zstandard ya es dependencia transitiva de langchain)
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstandard = None
+    ZSTD_AVAILABLE = False
+
+HANDLE_PREFIX = "sha256:"
+
+
+class ArtifactStore:
+    """
+    Almacén de artefactos direccionado por contenido (SHA-256).
+
+    - Los contenidos idénticos se guardan una sola vez (deduplicación entre intentos).
+    - Los objetos pueden comprimirse con zstd si está disponible.
+    - Cada ejecución mantiene un índice con los artefactos registrados (nombre lógico -> handle).
+    - Los contenidos de la ejecución actual se mantienen en memoria, por lo que leer un
+      handle recién creado no toca el disco.
+    """
+
+    def __init__(self, base_directory: str = None, compression: str = None):
+        """
+        Inicializa el almacén.
+
+        Args:
+            base_directory: Directorio raíz del almacén. Por defecto OUTPUT_DIR/artifacts
+            compression: 'zstd' o 'none'. Por defecto settings.ARTIFACT_STORE_COMPRESSION
+        """
+        self.base_directory = base_directory or os.path.join(settings.OUTPUT_DIR, "artifacts")
+        compression = (compression or settings.ARTIFACT_STORE_COMPRESSION or "none").lower()
+        if compression == "zstd" and not ZSTD_AVAILABLE:
+            logger.warning("⚠️ zstandard no está instalado, artefactos sin comprimir")
+            compression = "none"
+        self.compression = compression
+        self._lock = threading.Lock()
+        self._memory: Dict[str, str] = {}
+        self._index: List[Dict[str, Any]] = []
+        self.run_id: Optional[str] = None
+        self.dedup_hits = 0
+
+    @property
+    def objects_directory(self) -> str:
+        return os.path.join(self.base_directory, "objects")
+
+    @staticmethod
+    def compute_handle(content: str) -> str:
+        """Calcula el handle (dirección de contenido) de un texto."""
+        digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        return f"{HANDLE_PREFIX}{digest}"
+
+    def _object_path(self, handle: str, compressed: bool) -> str:
+        digest = handle[len(HANDLE_PREFIX):] if handle.startswith(HANDLE_PREFIX) else handle
+        suffix = ".zst" if compressed else ""
+        return os.path.join(self.objects_directory, digest[:2], f"{digest}{suffix}")
+
+    def _find_object(self, handle: str) -> Optional[str]:
+        for compressed in (False, True):
+            path = self._object_path(handle, compressed)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def start_run(self, run_id: str = None) -> str:
+        """
+        Inicia el índice de una nueva ejecución. Los objetos en disco se conservan
+        para deduplicar entre ejecuciones; la caché en memoria se reinicia.
+
+        Returns:
+            Identificador de la ejecución
+        """
+        with self._lock:
+            self.run_id = run_id or datetime.now().strftime("%Y%m%d_%H%M%S")
+            self._index = []
+            self._memory = {}
+            self.dedup_hits = 0
+        logger.debug(f"📦 Artifact store: ejecución {self.run_id} iniciada en {self.base_directory}")
+        return self.run_id
+
+    def put(self, name: str, content: str, kind: str = "text") -> str:
+        """
+        Registra un artefacto y devuelve su handle.
+
+        Args:
+            name: Nombre lógico (ej: "2_developer_req1_debug0_sq0.ts")
+            content: Contenido textual del artefacto
+            kind: Tipo de artefacto ("code", "tests", "report", ...)
+
+        Returns:
+            Handle del artefacto ("sha256:<digest>")
+        """
+        if content is None:
+            content = ""
+        if not isinstance(content, str):
+            content = str(content)
+
+        handle = self.compute_handle(content)
+        data = content.encode("utf-8")
+
+        with self._lock:
+            if self.run_id is None:
+                self.run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+            existing_path = self._find_object(handle)
+            deduplicated = existing_path is not None or handle in self._memory
+            if existing_path is None:
+                compressed = self.compression == "zstd"
+                path = self._object_path(handle, compressed)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                payload = zstandard.ZstdCompressor().compress(data) if compressed else data
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(payload)
+                os.replace(tmp_path, path)
+                stored_size = len(payload)
+            else:
+                stored_size = os.path.getsize(existing_path)
+                self.dedup_hits += 1
+
+            self._memory[handle] = content
+            self._index.append({
+                "name": name,
+                "handle": handle,
+                "kind": kind,
+                "size": len(data),
+                "stored_size": stored_size,
+                "deduplicated": deduplicated,
+                "created_at": datetime.now().isoformat(timespec="seconds")
+            })
+
+        if deduplicated:
+            logger.debug(f"📦 Artefacto deduplicado: {name} -> {handle[:19]}")
+        else:
+            logger.debug(f"📦 Artefacto guardado: {name} -> {handle[:19]}")
+        return handle
+
+    def get(self, handle: str) -> str:
+        """
+        Recupera el contenido de un artefacto.
+
+        Raises:
+            KeyError: Si el handle no existe en memoria ni en disco
+        """
+        with self._lock:
+            cached = self._memory.get(handle)
+        if cached is not None:
+            return cached
+
+        path = self._find_object(handle)
+        if path is None:
+            raise KeyError(f"Artefacto no encontrado: {handle}")
+
+        with open(path, "rb") as f:
+            payload = f.read()
+        if path.endswith(".zst"):
+            if not ZSTD_AVAILABLE:
+                raise RuntimeError("zstandard no está instalado; no se puede leer el artefacto comprimido")
+            payload = zstandard.ZstdDecompressor().decompress(payload)
+        content = payload.decode("utf-8")
+
+        with self._lock:
+            self._memory[handle] = content
+        return content
+
+    def exists(self, handle: str) -> bool:
+        """Indica si el handle está disponible en memoria o en disco."""
+        with self._lock:
+            if handle in self._memory:
+                return True
+        return self._find_object(handle) is not None
+
+    def materialize(self, handle: str, path: str) -> str:
+        """
+        Escribe el contenido de un artefacto en una ruta concreta (solo cuando un
+        consumidor externo necesita un fichero, ej: adjuntos de Azure DevOps).
+
+        Returns:
+            Ruta escrita
+        """
+        content = self.get(handle)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        return path
+
+    def list_artifacts(self, kind: str = None) -> List[Dict[str, Any]]:
+        """Devuelve las entradas del índice de la ejecución actual (filtradas por tipo)."""
+        with self._lock:
+            entries = list(self._index)
+        if kind:
+            entries = [e for e in entries if e["kind"] == kind]
+        return entries
+
+    def latest(self, name: str) -> Optional[str]:
+        """Devuelve el handle más reciente registrado con un nombre lógico."""
+        with self._lock:
+            for entry in reversed(self._index):
+                if entry["name"] == name:
+                    return entry["handle"]
+        return None
+
+    def save_index(self) -> Optional[str]:
+        """
+        Persiste el índice de la ejecución actual en artifacts/index_<run_id>.json.
+
+        Returns:
+            Ruta del índice o None si no hay ejecución activa
+        """
+        with self._lock:
+            if self.run_id is None:
+                return None
+            index = {
+                "run_id": self.run_id,
+                "compression": self.compression,
+                "dedup_hits": self.dedup_hits,
+                "artifacts": list(self._index)
+            }
+            run_id = self.run_id
+
+        os.makedirs(self.base_directory, exist_ok=True)
+        index_path = os.path.join(self.base_directory, f"index_{run_id}.json")
+        with open(index_path, "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=2, ensure_ascii=False)
+        logger.info(f"📦 Índice de artefactos guardado: {index_path} ({len(index['artifacts'])} artefactos, {index['dedup_hits']} deduplicados)")
+        return index_path
+
+
+_artifact_store: Optional[ArtifactStore] = None
+_artifact_store_lock = threading.Lock()
+
+
+def get_artifact_store() -> ArtifactStore:
+    """Obtiene la instancia global del almacén de artefactos (lazy loading)."""
+    global _artifact_store
+    with _artifact_store_lock:
+        if _artifact_store is None:
+            _artifact_store = ArtifactStore()
+        return _artifact_store
@@ -3,7 +3,191 @@ Utilidades para validación de código generado.
 Proporciona funciones reutilizables para verificar que el código esté completo y bien formado.
 """
 
-from typing import Tuple
+import re
+from typing import Dict, List, Optional, Tuple
+
+
+# Tokens relevantes del modo "código" de TypeScript/JavaScript. Todo lo que no encaja
+# (identificadores, operadores, espacios) lo salta el motor de regex sin pasar por Python.
+_TS_CODE_TOKEN_RE = re.compile(r"""
+      (?P<line_comment>//[^\n]*)
+    | (?P<block_comment>/\*.*?(?:\*/|\Z))
+    | (?P<string>"(?:[^"\\\n]|\\.)*"?|'(?:[^'\\\n]|\\.)*'?)
+    | (?P<template>`)
+    | (?P<open>[{(\[])
+    | (?P<close>[})\]])
+    | (?P<slash>/)
+    | (?P<export>\bexport\b)
+""", re.VERBOSE | re.DOTALL)
+
+# Dentro de un template literal: texto hasta el cierre ` o hasta una sustitución ${
+_TS_TEMPLATE_CHUNK_RE = re.compile(r"(?:[^`\\$]|\\.|\$(?!\{))*(`|\$\{)?", re.DOTALL)
+
+# Literal de expresión regular (una línea, con clases de caracteres y escapes)
+_TS_REGEX_LITERAL_RE = re.compile(r"/(?![*/])(?:[^/\\\[\n]|\\.|\[(?:[^\]\\\n]|\\.)*\])+/[A-Za-z]*")
+
+# Caracteres tras los que una '/' abre un literal regex (y no es una división)
+_TS_REGEX_PRECEDERS = frozenset("(,=:[!&|?{};+-*%<>~^")
+_TS_REGEX_KEYWORDS = ("return", "typeof", "case", "do", "else", "in", "of", "void", "yield", "await")
+
+_TS_EXPORT_DECL_RE = re.compile(
+    r"export\s+(?:default\s+)?(?:declare\s+)?(?:async\s+)?(?:abstract\s+)?"
+    r"(?:function\s*\*?|class|const|let|var|interface|type|enum|namespace)\s+([A-Za-z_$][\w$]*)"
+)
+_TS_EXPORT_DEFAULT_RE = re.compile(r"export\s+default\b")
+_TS_EXPORT_LIST_RE = re.compile(r"export\s+(?:type\s+)?\{([^}]*)\}")
+
+# import [type] [porDefecto,] [{ a, b as c }] from './modulo'
+_TS_IMPORT_RE = re.compile(
+    r"""import\s+(?:type\s+)?(?:([A-Za-z_$][\w$]*)\s*,?\s*)?(?:\{([^}]*)\}\s*)?from\s*['"]([^'"]+)['"]"""
+)
+
+_TS_CLOSING_PAIRS = {'}': '{', ')': '(', ']': '['}
+
+
+class TsScanResult:
+    """Resultado del análisis en una pasada de código TypeScript/JavaScript"""
+    
+    def __init__(self):
+        self.abiertos: Dict[str, int] = {'{': 0, '(': 0, '[': 0}
+        self.cerrados: Dict[str, int] = {'}': 0, ')': 0, ']': 0}
+        self.error_anidamiento: Optional[str] = None  # Primer cierre que no corresponde a su apertura
+        self.error_anidamiento_linea: Optional[int] = None
+        self.sin_cerrar: Optional[str] = None  # 'template' o 'comentario' abierto al final del código
+        self.exports: List[str] = []  # Nombres exportados a nivel superior
+        self.codigo_sin_strings: Optional[str] = None  # Solo si se pidió con collect_code=True
+
+
+def _ts_regex_permitida(codigo: str, pos: int) -> bool:
+    """Indica si una '/' en pos abre un literal regex según el último token significativo"""
+    i = pos - 1
+    while i >= 0 and codigo[i] in ' \t\r\n':
+        i -= 1
+    if i < 0 or codigo[i] in _TS_REGEX_PRECEDERS:
+        return True
+    if codigo[i].isalpha():
+        inicio = i
+        while inicio > 0 and (codigo[inicio - 1].isalnum() or codigo[inicio - 1] in '_$'):
+            inicio -= 1
+        return codigo[inicio:i + 1] in _TS_REGEX_KEYWORDS
+    return False
+
+
+def _ts_nombres_exportados(codigo: str, pos: int) -> List[str]:
+    """Nombres declarados por la sentencia export que empieza en pos"""
+    decl = _TS_EXPORT_DECL_RE.match(codigo, pos)
+    if decl:
+        return [decl.group(1)]
+    lista = _TS_EXPORT_LIST_RE.match(codigo, pos)
+    if lista:
+        nombres = []
+        for parte in lista.group(1).split(','):
+            parte = parte.strip()
+            if parte:
+                nombres.append(parte.split(' as ')[-1].strip())
+        return nombres
+    if _TS_EXPORT_DEFAULT_RE.match(codigo, pos):
+        return ['default']
+    return []
+
+
+def scan_typescript(codigo: str, collect_code: bool = False) -> TsScanResult:
+    """
+    Recorre código TypeScript/JavaScript una sola vez con un tokenizador basado en
+    expresiones regulares compiladas. En la misma pasada:
+    
+    - Salta comentarios, strings (con escapes), literales regex y template literals,
+      incluidas las sustituciones ${...} anidadas (su contenido se analiza como código).
+    - Cuenta llaves, paréntesis y corchetes y comprueba su anidamiento con una pila.
+    - Detecta las sentencias export de nivel superior.
+    
+    Args:
+        codigo: Código TypeScript/JavaScript
+        collect_code: Si True, guarda en el resultado el código sin strings ni comentarios
+        
+    Returns:
+        TsScanResult con contadores, primer error de anidamiento y exports
+    """
+    resultado = TsScanResult()
+    pila: List[str] = []  # '{', '(', '[' o '${' (sustitución de template)
+    segmentos: Optional[List[str]] = [] if collect_code else None
+    pos = 0
+    n = len(codigo)
+    en_template = False
+    
+    while pos < n:
+        if en_template:
+            chunk = _TS_TEMPLATE_CHUNK_RE.match(codigo, pos)
+            fin = chunk.group(1)
+            pos = chunk.end()
+            if fin is None:
+                resultado.sin_cerrar = 'template'
+                break
+            if fin == '${':
+                pila.append('${')
+            en_template = False
+            continue
+        
+        m = _TS_CODE_TOKEN_RE.search(codigo, pos)
+        if m is None:
+            if segmentos is not None:
+                segmentos.append(codigo[pos:])
+            break
+        
+        tipo = m.lastgroup
+        token = m.group()
+        inicio = m.start()
+        if segmentos is not None:
+            segmentos.append(codigo[pos:inicio])
+        pos = m.end()
+        
+        if tipo == 'open':
+            resultado.abiertos[token] += 1
+            pila.append(token)
+        elif tipo == 'close':
+            if token == '}' and pila and pila[-1] == '${':
+                # Fin de la sustitución: se vuelve al texto del template
+                pila.pop()
+                en_template = True
+                continue
+            resultado.cerrados[token] += 1
+            esperado = _TS_CLOSING_PAIRS[token]
+            if pila and pila[-1] == esperado:
+                pila.pop()
+            else:
+                if resultado.error_anidamiento is None:
+                    linea = codigo.count('\n', 0, inicio) + 1
+                    resultado.error_anidamiento = f"Cierre inesperado '{token}' en línea {linea}"
+                    resultado.error_anidamiento_linea = linea
+                if esperado in pila:
+                    # Recuperación: se descartan las aperturas intermedias sin cerrar
+                    del pila[len(pila) - 1 - pila[::-1].index(esperado):]
+        elif tipo == 'template':
+            en_template = True
+            continue
+        elif tipo == 'block_comment':
+            if not token.endswith('*/') or len(token) < 4:
+                resultado.sin_cerrar = 'comentario'
+            continue
+        elif tipo == 'slash':
+            if _ts_regex_permitida(codigo, inicio):
+                literal = _TS_REGEX_LITERAL_RE.match(codigo, inicio)
+                if literal:
+                    pos = literal.end()
+                    continue
+        elif tipo == 'export':
+            if not pila and (inicio == 0 or codigo[inicio - 1] != '.'):
+                resultado.exports.extend(_ts_nombres_exportados(codigo, inicio))
+        else:
+            # Comentarios de línea y strings no aportan código
+            continue
+        
+        if segmentos is not None:
+            segmentos.append(token)
+    
+    if segmentos is not None:
+        resultado.codigo_sin_strings = ''.join(segmentos)
+    return resultado
 
 
 def validate_code_completeness(
@@ -51,30 +235,40 @@ def _validate_typescript_code(codigo: str, require_test_functions: bool) -> Tupl
     Returns:
         Tuple (es_valido, mensaje_error)
     """
-    # Eliminar strings y comentarios para análisis preciso
-    codigo_sin_strings = _strip_ts_strings_and_comments(codigo)
+    # Una sola pasada: strings, comentarios, balance/anidamiento y exports
+    scan = scan_typescript(codigo)
     
     # Verificar balance de llaves
-    llaves_abiertas = codigo_sin_strings.count('{')
-    llaves_cerradas = codigo_sin_strings.count('}')
+    llaves_abiertas = scan.abiertos['{']
+    llaves_cerradas = scan.cerrados['}']
     
     if llaves_abiertas != llaves_cerradas:
         return False, f"Llaves desbalanceadas: {llaves_abiertas} abiertas, {llaves_cerradas} cerradas"
     
     # Verificar balance de paréntesis
-    parentesis_abiertos = codigo_sin_strings.count('(')
-    parentesis_cerrados = codigo_sin_strings.count(')')
+    parentesis_abiertos = scan.abiertos['(']
+    parentesis_cerrados = scan.cerrados[')']
     
     if parentesis_abiertos != parentesis_cerrados:
         return False, f"Paréntesis desbalanceados: {parentesis_abiertos} abiertos, {parentesis_cerrados} cerrados"
     
     # Verificar balance de corchetes
-    corchetes_abiertos = codigo_sin_strings.count('[')
-    corchetes_cerrados = codigo_sin_strings.count(']')
+    corchetes_abiertos = scan.abiertos['[']
+    corchetes_cerrados = scan.cerrados[']']
     
     if corchetes_abiertos != corchetes_cerrados:
         return False, f"Corchetes desbalanceados: {corchetes_abiertos} abiertos, {corchetes_cerrados} cerrados"
     
+    # Template literal o comentario abierto al final: el código se cortó
+    if scan.sin_cerrar == 'template':
+        return False, "Template literal sin cerrar (posible código truncado)"
+    if scan.sin_cerrar == 'comentario':
+        return False, "Comentario multilínea sin cerrar (posible código truncado)"
+    
+    # Mismo número de aperturas y cierres pero en orden incorrecto, ej: ( { ) }
+    if scan.error_anidamiento:
+        return False, scan.error_anidamiento
+    
     # Verificar que termina correctamente
     codigo_limpio = codigo.rstrip()
     if not codigo_limpio:
@@ -145,6 +339,7 @@ def _validate_generic_code(codigo: str) -> Tuple[bool, str]:
 def _strip_ts_strings_and_comments(codigo: str) -> str:
     """
     Elimina strings y comentarios de código TypeScript/JavaScript para análisis sintáctico.
+    El código de las sustituciones ${...} de los template literals se conserva.
     
     Args:
         codigo: Código TypeScript/JavaScript
@@ -152,62 +347,7 @@ def _strip_ts_strings_and_comments(codigo: str) -> str:
     Returns:
         Código sin strings ni comentarios
     """
-    resultado = []
-    i = 0
-    in_string = False
-    string_char = None
-    in_comment = False
-    in_multiline_comment = False
-    
-    while i < len(codigo):
-        char = codigo[i]
-        
-        # Manejo de comentarios multilínea
-        if not in_string and not in_comment and i < len(codigo) - 1:
-            if codigo[i:i+2] == '/*':
-                in_multiline_comment = True
-                i += 2
-                continue
-        
-        if in_multiline_comment:
-            if i < len(codigo) - 1 and codigo[i:i+2] == '*/':
-                in_multiline_comment = False
-                i += 2
-                continue
-            i += 1
-            continue
-        
-        # Manejo de comentarios de línea
-        if not in_string and not in_comment and i < len(codigo) - 1:
-            if codigo[i:i+2] == '//':
-                in_comment = True
-                i += 2
-                continue
-        
-        if in_comment:
-            if char == '\n':
-                in_comment = False
-                resultado.append(char)
-            i += 1
-            continue
-        
-        # Manejo de strings
-        if char in ('"', "'", '`') and (i == 0 or codigo[i-1] != '\\'):
-            if not in_string:
-                in_string = True
-                string_char = char
-            elif char == string_char:
-                in_string = False
-                string_char = None
-            i += 1
-            continue
-        
-        if not in_string:
-            resultado.append(char)
-        
-        i += 1
-    
-    return ''.join(resultado)
+    return scan_typescript(codigo, collect_code=True).codigo_sin_strings
 
 
 def validate_test_code_completeness(codigo: str, lenguaje: str) -> Tuple[bool, str]:
@@ -228,3 +368,44 @@ def validate_test_code_completeness(codigo: str, lenguaje: str) -> Tuple[bool, s
         min_length=50,
         require_test_functions=True
     )
+
+
+def check_ts_imports_exported(tests: str, codigo: str, modulo: str) -> Tuple[bool, str]:
+    """
+    Comprueba que lo que los tests importan del módulo bajo prueba está entre los exports
+    de nivel superior del código (evita lanzar vitest para obtener
+    "does not provide an export named ...").
+    
+    Args:
+        tests: Código de los tests TypeScript/JavaScript
+        codigo: Código bajo prueba
+        modulo: Nombre del fichero de código sin extensión (p. ej. 'calculadora')
+        
+    Returns:
+        Tuple (es_valido, mensaje_error)
+    """
+    # Las comprobaciones de texto, sobre el código sin strings ni comentarios
+    escaneo = scan_typescript(codigo, collect_code=True)
+    codigo_sin_strings = escaneo.codigo_sin_strings
+    if 'module.exports' in codigo_sin_strings or re.search(r"\bexport\s*\*", codigo_sin_strings):
+        # CommonJS o reexportaciones: los nombres no se conocen sin resolver otros módulos
+        return True, ""
+    exports = set(escaneo.exports)
+    if _TS_EXPORT_DEFAULT_RE.search(codigo_sin_strings):
+        # 'export default class X' se registra como X
+        exports.add('default')
+    faltan: List[str] = []
+    for m in _TS_IMPORT_RE.finditer(tests):
+        por_defecto, nombrados, ruta = m.groups()
+        destino = ruta.rsplit('/', 1)[-1]
+        if not ruta.startswith('.') or re.sub(r"\.(?:[cm]?[jt]s)$", "", destino) != modulo:
+            continue
+        nombres = ['default'] if por_defecto else []
+        for parte in (nombrados or '').split(','):
+            parte = re.sub(r"^type\s+", "", parte.strip())
+            if parte:
+                nombres.append(parte.split(' as ')[0].strip())
+        faltan.extend(n for n in nombres if n not in exports and n not in faltan)
+    if faltan:
+        return False, f"Los tests importan nombres que {modulo} no exporta: {', '.join(faltan)}"
+    return True, ""
@@ -0,0 +1,133 @@
+"""
+Monitor de convergencia de los bucles de corrección (debug, sonar, revisor).
+
+Los bucles solo terminan al agotar max_*_attempts, aunque cada iteración repita el
+mismo código y el mismo error. El monitor guarda en el estado la huella normalizada
+del código y del feedback (traceback, issues o comentario del revisor) de cada
+iteración y clasifica la actual:
+
+- 'progreso': algo cambió.
+- 'estancado': mismo feedback que la iteración anterior y código prácticamente igual.
+- 'ciclo': la combinación código + feedback ya se vio en una iteración anterior no consecutiva.
+
+Con 'estancado' o 'ciclo' el Developer-Code escala (más contexto y, si está configurado,
+otro modelo/temperatura). Si tras escalar el bucle sigue sin converger, se deja un
+único intento más en lugar de consumir todo el presupuesto.
+"""
+
+import difflib
+import hashlib
+import re
+from typing import Any, Dict, Optional, Tuple
+
+from config.settings import settings
+
+PROGRESO = "progreso"
+ESTANCADO = "estancado"
+CICLO = "ciclo"
+
+# Contadores de intentos de cada bucle: (contador, máximo)
+CONTADORES_BUCLE = {
+    "debug": ("debug_attempt_count", "max_debug_attempts"),
+    "sonar": ("sonarqube_attempt_count", "max_sonarqube_attempts"),
+    "revisor": ("revisor_attempt_count", "max_revisor_attempts"),
+}
+
+_ESPACIOS_RE = re.compile(r'\s+')
+# Números, direcciones y duraciones cambian entre ejecuciones sin que cambie el error
+_VOLATIL_RE = re.compile(r'0x[0-9a-fA-F]+|\d+(?:\.\d+)?')
+
+_LONGITUD_HUELLA = 16
+
+
+def _hash(texto: str) -> str:
+    return hashlib.sha1(texto.encode('utf-8')).hexdigest()[:_LONGITUD_HUELLA]
+
+
+def normalizar_codigo(codigo: str) -> str:
+    """Elimina fences markdown y colapsa espacios (reindentar no es un cambio)"""
+    lineas = [
+        _ESPACIOS_RE.sub(' ', linea).strip()
+        for linea in (codigo or '').splitlines()
+        if not linea.lstrip().startswith('```')
+    ]
+    return '\n'.join(linea for linea in lineas if linea)
+
+
+def normalizar_feedback(texto: str) -> str:
+    """Sustituye números (líneas, columnas, tiempos, direcciones) y colapsa espacios"""
+    return _ESPACIOS_RE.sub(' ', _VOLATIL_RE.sub('N', texto or '')).strip()
+
+
+def similitud(a: str, b: str) -> float:
+    """Similitud [0, 1] entre dos códigos normalizados, comparando por líneas"""
+    if a == b:
+        return 1.0
+    return difflib.SequenceMatcher(None, a.splitlines(), b.splitlines(), autojunk=False).ratio()
+
+
+def detectar_bucle(state: Dict[str, Any]) -> Tuple[Optional[str], str]:
+    """
+    Identifica qué bucle de corrección llevó al Developer-Code y su feedback.
+
+    Returns:
+        (bucle o None si es una generación inicial, feedback)
+    """
+    if state.get('traceback'):
+        return "debug", state['traceback']
+    if state.get('sonarqube_issues'):
+        return "sonar", state['sonarqube_issues']
+    if state.get('revisor_attempt_count', 0) > 0 and not state.get('codigo_revisado', False):
+        return "revisor", state.get('revision_comentario', '')
+    return None, ""
+
+
+def registrar_iteracion(state: Dict[str, Any], bucle: str, codigo: str, feedback: str) -> str:
+    """
+    Registra una iteración del bucle en state['convergencia'] y la clasifica.
+
+    Args:
+        state: Estado del grafo (se modifica)
+        bucle: 'debug', 'sonar' o 'revisor'
+        codigo: Código de la iteración anterior (el que produjo el feedback)
+        feedback: Traceback, issues o comentario del revisor
+
+    Returns:
+        PROGRESO, ESTANCADO o CICLO
+    """
+    convergencia = state.get('convergencia') or {}
+    datos = convergencia.get(bucle) or {"historial": [], "ultimo_codigo": "", "recuperacion": False}
+
+    codigo_normalizado = normalizar_codigo(codigo)
+    huella = [_hash(codigo_normalizado), _hash(normalizar_feedback(feedback))]
+    historial = datos["historial"]
+
+    veredicto = PROGRESO
+    if historial:
+        anterior = historial[-1]
+        if huella in historial[:-1]:
+            veredicto = CICLO
+        elif huella[1] == anterior[1] and similitud(codigo_normalizado, datos["ultimo_codigo"]) >= settings.CONVERGENCE_SIMILARITY_THRESHOLD:
+            veredicto = ESTANCADO
+
+    historial.append(huella)
+    datos["ultimo_codigo"] = codigo_normalizado
+    convergencia[bucle] = datos
+    state['convergencia'] = convergencia
+    return veredicto
+
+
+def en_recuperacion(state: Dict[str, Any], bucle: str) -> bool:
+    """Indica si el bucle ya se escaló en una iteración anterior"""
+    return bool(((state.get('convergencia') or {}).get(bucle) or {}).get("recuperacion"))
+
+
+def marcar_recuperacion(state: Dict[str, Any], bucle: str) -> None:
+    """Marca el bucle como escalado"""
+    state['convergencia'][bucle]["recuperacion"] = True
+
+
+def agotar_bucle(state: Dict[str, Any], bucle: str) -> None:
+    """Deja el bucle en su último intento: el siguiente fallo termina el flujo"""
+    contador, maximo = CONTADORES_BUCLE[bucle]
+    state[contador] = max(state.get(contador, 0), state.get(maximo, 0) - 1)
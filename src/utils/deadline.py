@@ -0,0 +1,89 @@
+"""
+Plazo (deadline) de una ejecución del flujo.
+
+Con un presupuesto de tiempo (RUN_DEADLINE_SECONDS, RetryConfig(deadline_seconds=...)
+o run_development_workflow(deadline_seconds=...)), el instante límite se guarda en
+state['deadline_at'] y en un contextvar, para que lo lean tanto los nodos como el
+código que no recibe el estado (reintentos del cliente LLM, timeouts de subprocesos).
+
+Los nodos se degradan a medida que el presupuesto se agota:
+- Sonar no espera a SonarCloud si no queda tiempo para su timeout: análisis local.
+- Los tests y la espera de SonarCloud recortan su timeout al tiempo restante.
+- Los reintentos por 503 y las pausas del nodo LLM-Error se omiten si no caben.
+- Al vencer el plazo, el flujo termina tras el nodo en curso con el resultado parcial.
+
+Sin plazo configurado todas las funciones devuelven el valor original.
+"""
+
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+from config.settings import settings
+
+# Instante límite (time.time()) de la ejecución en curso
+_deadline_at: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("deadline_at", default=None)
+
+
+def deadline_from_budget(seconds: Optional[float]) -> Optional[float]:
+    """Instante límite para un presupuesto en segundos (None o <= 0: sin límite)"""
+    if not seconds or seconds <= 0:
+        return None
+    return time.time() + seconds
+
+
+@contextmanager
+def deadline_scope(deadline_at: Optional[float]):
+    """Fija el plazo de la ejecución para el código del bloque (también en los nodos del grafo)"""
+    token = _deadline_at.set(deadline_at)
+    try:
+        yield
+    finally:
+        _deadline_at.reset(token)
+
+
+def remaining_seconds(state: Optional[Dict[str, Any]] = None) -> Optional[float]:
+    """
+    Segundos que quedan hasta el plazo (nunca negativo).
+
+    Args:
+        state: Estado del grafo; si no tiene plazo se usa el de deadline_scope
+
+    Returns:
+        Segundos restantes o None si no hay plazo
+    """
+    deadline_at = (state or {}).get('deadline_at') or _deadline_at.get()
+    if deadline_at is None:
+        return None
+    return max(0.0, deadline_at - time.time())
+
+
+def deadline_expired(state: Optional[Dict[str, Any]] = None) -> bool:
+    """True si hay plazo y ya ha vencido"""
+    restante = remaining_seconds(state)
+    return restante is not None and restante <= 0
+
+
+def fits_in_budget(seconds: float, state: Optional[Dict[str, Any]] = None) -> bool:
+    """True si una espera de `seconds` cabe en el plazo, dejando DEADLINE_RESERVE_SECONDS de margen"""
+    restante = remaining_seconds(state)
+    return restante is None or seconds + settings.DEADLINE_RESERVE_SECONDS <= restante
+
+
+def cap_timeout(timeout: float, state: Optional[Dict[str, Any]] = None, minimum: float = 1.0) -> float:
+    """
+    Recorta un timeout al tiempo restante (menos el margen de DEADLINE_RESERVE_SECONDS).
+
+    Args:
+        timeout: Timeout configurado en segundos
+        state: Estado del grafo (opcional)
+        minimum: Timeout mínimo, para que la operación tenga alguna oportunidad
+
+    Returns:
+        El timeout original si no hay plazo o cabe; si no, el tiempo disponible
+    """
+    restante = remaining_seconds(state)
+    if restante is None:
+        return timeout
+    return max(minimum, min(timeout, restante - settings.DEADLINE_RESERVE_SECONDS))
@@ -58,6 +58,8 @@ class FileManager:
                 self._ensure_directory_exists(directory)
             else:
                 directory = self.base_directory
+                # El gestor se reutiliza entre ejecuciones y OUTPUT_DIR se limpia al empezar cada una
+                self._ensure_directory_exists(directory)
             
             full_path = os.path.join(directory, filename)
             
@@ -177,11 +179,28 @@ class FileManager:
             >>> FileManager.detect_language_from_requirements('{"lenguaje": "TypeScript"}')
             ("typescript", ".ts")
         """
+        try:
+            requisitos = json.loads(requisitos_formales or '{}')
+        except json.JSONDecodeError as e:
+            logger.warning(f"Error al detectar lenguaje: {e}. Usando Python por defecto.")
+            return "python", ".py"
+        return FileManager.detect_language_from_dict(requisitos)
+    
+    @staticmethod
+    def detect_language_from_dict(requisitos: dict) -> Tuple[str, str]:
+        """
+        Detecta el lenguaje desde los requisitos formales ya parseados.
+        
+        Args:
+            requisitos: Requisitos formales como diccionario
+            
+        Returns:
+            Tuple (lenguaje, extension)
+        """
         lenguaje = "python"
         extension = ".py"
         
         try:
-            requisitos = json.loads(requisitos_formales or '{}')
             lenguaje_version = requisitos.get('lenguaje_version', '').lower()
             lenguaje_campo = requisitos.get('lenguaje', '').lower()
             lenguaje_detectado = lenguaje_version or lenguaje_campo
@@ -194,7 +213,7 @@ class FileManager:
                 extension = ".js"
             
             logger.debug(f"Lenguaje detectado: {lenguaje}, extensión: {extension}")
-        except (json.JSONDecodeError, AttributeError) as e:
+        except AttributeError as e:
             logger.warning(f"Error al detectar lenguaje: {e}. Usando Python por defecto.")
         
         return lenguaje, extension
@@ -259,13 +278,29 @@ class FileManager:
             >>> FileManager.extract_filename_from_requirements('{"nombre_funcion": "CalcularFactorial"}')
             "calcular_factorial"
         """
+        try:
+            requisitos = json.loads(requisitos_formales or '{}')
+        except json.JSONDecodeError as e:
+            logger.warning(f"Error al extraer nombre de archivo: {e}. Usando nombre por defecto.")
+            return "codigo_generado"
+        return FileManager.extract_filename_from_dict(requisitos)
+    
+    @staticmethod
+    def extract_filename_from_dict(requisitos: dict) -> str:
+        """
+        Extrae el nombre base del archivo desde los requisitos formales ya parseados.
+        
+        Args:
+            requisitos: Requisitos formales como diccionario
+            
+        Returns:
+            Nombre base del archivo en snake_case (sin extensión)
+        """
         import re
         
         nombre_base = "codigo_generado"
         
         try:
-            requisitos = json.loads(requisitos_formales or '{}')
-            
             # Buscar nombre en orden de prioridad
             nombre_candidato = (
                 requisitos.get('nombre_funcion') or
@@ -285,7 +320,7 @@ class FileManager:
                     nombre_base = nombre_limpio
             
             logger.debug(f"Nombre de archivo extraído: {nombre_base}")
-        except (json.JSONDecodeError, AttributeError) as e:
+        except AttributeError as e:
             logger.warning(f"Error al extraer nombre de archivo: {e}. Usando nombre por defecto.")
         
         return nombre_base
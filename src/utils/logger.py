@@ -3,8 +3,14 @@ Sistema de logging centralizado para el proyecto.
 Proporciona loggers configurados para cada módulo con diferentes niveles y handlers.
 """
 
+import atexit
+import copy
+import json
 import logging
+import logging.handlers
+import queue
 import sys
+import threading
 from pathlib import Path
 from typing import Optional
 from datetime import datetime
@@ -13,6 +19,21 @@ from datetime import datetime
 # Variable global para almacenar el archivo de log de la sesión
 _SESSION_LOG_FILE = None
 
+# Pipeline asíncrono: una única cola y un único hilo escritor para todos los loggers
+_LOG_QUEUE = None
+_QUEUE_LISTENER = None
+_QUEUE_LOCK = threading.Lock()
+
+
+def _get_logging_options() -> tuple[bool, bool]:
+    """Devuelve (LOG_ASYNC, LOG_JSON) desde settings"""
+    # Importar aquí para evitar importación circular
+    from config.settings import settings
+    return (
+        bool(getattr(settings, 'LOG_ASYNC', False)),
+        bool(getattr(settings, 'LOG_JSON', False))
+    )
+
 
 def get_session_log_file():
     """Obtiene o crea el archivo de log para la sesión actual"""
@@ -24,7 +45,8 @@ def get_session_log_file():
         log_dir = Path(settings.OUTPUT_DIR) / 'logs'
         log_dir.mkdir(parents=True, exist_ok=True)
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        _SESSION_LOG_FILE = log_dir / f'workflow_{timestamp}.log'
+        extension = 'jsonl' if getattr(settings, 'LOG_JSON', False) else 'log'
+        _SESSION_LOG_FILE = log_dir / f'workflow_{timestamp}.{extension}'
     return _SESSION_LOG_FILE
 
 
@@ -42,8 +64,10 @@ class ColoredFormatter(logging.Formatter):
     }
     
     def format(self, record):
-        # Añadir color solo si es un terminal interactivo
+        # Añadir color solo si es un terminal interactivo (sobre una copia: el registro
+        # lo comparten el resto de handlers, p. ej. el fichero JSON)
         if sys.stdout.isatty():
+            record = copy.copy(record)
             color = self.COLORS.get(record.levelname, self.COLORS['RESET'])
             record.levelname = f"{color}{record.levelname}{self.COLORS['RESET']}"
         return super().format(record)
@@ -74,6 +98,9 @@ class AgentFormatter(logging.Formatter):
     }
     
     def format(self, record):
+        # Trabajar sobre una copia: el registro lo comparten el resto de handlers
+        record = copy.copy(record)
+        
         # Añadir color al nivel de log si es un terminal interactivo
         if sys.stdout.isatty():
             color = self.COLORS.get(record.levelname, self.COLORS['RESET'])
@@ -98,6 +125,172 @@ class AgentFormatter(logging.Formatter):
         return super().format(record)
 
 
+class JsonLinesFormatter(logging.Formatter):
+    """Formatter que emite cada registro como una línea JSON (structured logging)"""
+    
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': logging.getLevelName(record.levelno),
+            'logger': record.name,
+            'func': record.funcName,
+            'line': record.lineno,
+            'thread': record.threadName,
+            'msg': record.getMessage()
+        }
+        if hasattr(record, 'agent_context'):
+            entry['agent'] = record.agent_context
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class ModeAwareConsoleFormatter(logging.Formatter):
+    """
+    Formatter de consola para el modo asíncrono.
+    Todos los loggers comparten el mismo handler de consola en el hilo escritor,
+    así que el formato (agente o estándar) se decide por registro.
+    """
+    
+    def __init__(self):
+        super().__init__()
+        self._agent_formatter = _build_console_formatter(agent_mode=True)
+        self._default_formatter = _build_console_formatter(agent_mode=False)
+    
+    def format(self, record):
+        if getattr(record, 'log_agent_mode', False):
+            return self._agent_formatter.format(record)
+        return self._default_formatter.format(record)
+
+
+class _LoggerOptionsFilter(logging.Filter):
+    """Marca los registros con las opciones del logger que los emite (formato y fichero)"""
+    
+    def __init__(self, agent_mode: bool, log_to_file: bool):
+        super().__init__()
+        self.agent_mode = agent_mode
+        self.log_to_file = log_to_file
+    
+    def filter(self, record):
+        record.log_agent_mode = self.agent_mode
+        record.log_to_file = self.log_to_file
+        return True
+
+
+class _FileEnabledFilter(logging.Filter):
+    """En el handler de fichero compartido, descarta los registros de loggers con log_to_file=False"""
+    
+    def filter(self, record):
+        return getattr(record, 'log_to_file', True)
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler que NO formatea en el hilo del agente.
+    El QueueHandler estándar llama a format() en prepare(); aquí solo se resuelven
+    los args (si los hay, para no depender de objetos mutables) y el formato
+    completo se hace en el hilo escritor del QueueListener.
+    """
+    
+    def prepare(self, record):
+        record = copy.copy(record)
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+
+def _build_console_formatter(agent_mode: bool) -> logging.Formatter:
+    """Crea el formatter de consola según el modo"""
+    if agent_mode:
+        return AgentFormatter(
+            '%(asctime)s | %(levelname)-8s | %(message)s',
+            datefmt='%H:%M:%S'
+        )
+    return ColoredFormatter(
+        '%(asctime)s | %(levelname)-8s | %(name)s | %(message)s',
+        datefmt='%H:%M:%S'
+    )
+
+
+def _build_file_formatter(json_lines: bool) -> logging.Formatter:
+    """Crea el formatter del fichero de log (texto o JSON lines)"""
+    if json_lines:
+        return JsonLinesFormatter()
+    return logging.Formatter(
+        '%(asctime)s | %(levelname)-8s | %(name)s | %(funcName)s:%(lineno)d | %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+
+
+def _get_log_queue(log_to_file: bool, json_lines: bool) -> queue.SimpleQueue:
+    """
+    Obtiene la cola global de logging, arrancando el QueueListener (hilo escritor único)
+    la primera vez. Si más tarde un logger pide fichero y el listener no lo tenía, se añade.
+    """
+    global _LOG_QUEUE, _QUEUE_LISTENER
+    with _QUEUE_LOCK:
+        if _LOG_QUEUE is None:
+            _LOG_QUEUE = queue.SimpleQueue()
+            console_handler = logging.StreamHandler(sys.stdout)
+            console_handler.setFormatter(ModeAwareConsoleFormatter())
+            _QUEUE_LISTENER = logging.handlers.QueueListener(
+                _LOG_QUEUE, console_handler, respect_handler_level=True
+            )
+            _QUEUE_LISTENER.start()
+            atexit.register(shutdown_logging)
+
+        if log_to_file and not any(isinstance(h, logging.FileHandler) for h in _QUEUE_LISTENER.handlers):
+            file_handler = logging.FileHandler(get_session_log_file(), encoding='utf-8')
+            file_handler.setLevel(logging.DEBUG)
+            file_handler.setFormatter(_build_file_formatter(json_lines))
+            file_handler.addFilter(_FileEnabledFilter())
+            # Los handlers del listener solo se leen desde el hilo escritor
+            _QUEUE_LISTENER.handlers = _QUEUE_LISTENER.handlers + (file_handler,)
+
+        return _LOG_QUEUE
+
+
+def shutdown_logging() -> None:
+    """
+    Detiene el hilo escritor del modo asíncrono vaciando antes la cola.
+    Se registra con atexit; puede llamarse manualmente para forzar el volcado.
+    """
+    global _LOG_QUEUE, _QUEUE_LISTENER
+    with _QUEUE_LOCK:
+        listener = _QUEUE_LISTENER
+        _QUEUE_LISTENER = None
+        _LOG_QUEUE = None
+    if listener is not None:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+
+def _setup_async_logger(logger: logging.Logger, log_to_file: bool, agent_mode: bool, json_lines: bool) -> logging.Logger:
+    """Configura un logger para que solo encole registros (modo LOG_ASYNC)"""
+    log_queue = _get_log_queue(log_to_file, json_lines)
+    
+    queue_handler = None
+    for h in list(logger.handlers):
+        if isinstance(h, DeferredQueueHandler) and h.queue is log_queue:
+            queue_handler = h
+        else:
+            # Handlers síncronos previos o de un listener ya detenido
+            logger.removeHandler(h)
+    
+    if queue_handler is None:
+        queue_handler = DeferredQueueHandler(log_queue)
+        logger.addHandler(queue_handler)
+    
+    for f in list(queue_handler.filters):
+        queue_handler.removeFilter(f)
+    queue_handler.addFilter(_LoggerOptionsFilter(agent_mode, log_to_file))
+    return logger
+
+
 def setup_logger(
     name: str,
     level: int = logging.INFO,
@@ -113,6 +306,10 @@ def setup_logger(
         log_to_file: Si True, también guarda logs en archivo
         agent_mode: Si True, usa formato especializado para agentes
         
+    Con LOG_ASYNC=true el logger solo encola los registros (QueueHandler) y un único
+    hilo escritor (QueueListener) los formatea y escribe en consola/fichero.
+    Con LOG_JSON=true el fichero de log se escribe como JSON lines.
+        
     Returns:
         Logger configurado
         
@@ -122,19 +319,15 @@ def setup_logger(
     """
     logger = logging.getLogger(name)
 
+    # El nivel del logger descarta los registros antes de crearlos/formatearlos
     logger.setLevel(level)
     logger.propagate = False
 
-    if agent_mode:
-        console_format = AgentFormatter(
-            '%(asctime)s | %(levelname)-8s | %(message)s',
-            datefmt='%H:%M:%S'
-        )
-    else:
-        console_format = ColoredFormatter(
-            '%(asctime)s | %(levelname)-8s | %(name)s | %(message)s',
-            datefmt='%H:%M:%S'
-        )
+    async_mode, json_lines = _get_logging_options()
+    if async_mode:
+        return _setup_async_logger(logger, log_to_file, agent_mode, json_lines)
+
+    console_format = _build_console_formatter(agent_mode)
 
     existing_console_handler = None
     for h in logger.handlers:
@@ -162,12 +355,7 @@ def setup_logger(
         if existing_file_handler is None:
             file_handler = logging.FileHandler(log_file, encoding='utf-8')
             file_handler.setLevel(logging.DEBUG)  # En archivo guardamos todo
-
-            file_format = logging.Formatter(
-                '%(asctime)s | %(levelname)-8s | %(name)s | %(funcName)s:%(lineno)d | %(message)s',
-                datefmt='%Y-%m-%d %H:%M:%S'
-            )
-            file_handler.setFormatter(file_format)
+            file_handler.setFormatter(_build_file_formatter(json_lines))
             logger.addHandler(file_handler)
 
     return logger
@@ -0,0 +1,171 @@
+"""
+Comprobación de sintaxis TypeScript en proceso, sin lanzar vitest ni tsc.
+
+Con tree-sitter y la gramática de TypeScript instalados (pip install tree-sitter
+tree-sitter-typescript) el código se parsea por completo y se reportan los nodos
+ERROR y los tokens que faltan con su línea y columna exactas. Sin tree-sitter se
+usa el tokenizador de utils.code_validator, que detecta llaves/paréntesis mal
+anidados y template literals o comentarios sin cerrar.
+"""
+
+import threading
+from typing import Any, Dict, List, Tuple
+
+from utils.code_validator import scan_typescript
+
+# Parser TypeScript de tree-sitter (opcional)
+try:
+    import tree_sitter
+    import tree_sitter_typescript
+    TREE_SITTER_AVAILABLE = True
+except ImportError:
+    tree_sitter = None
+    tree_sitter_typescript = None
+    TREE_SITTER_AVAILABLE = False
+
+# Máximo de errores incluidos en el mensaje (el primero suele ser la causa)
+MAX_ERRORES_REPORTADOS = 5
+
+_CIERRES = {'}': '{', ')': '(', ']': '['}
+
+# Los objetos Parser de tree-sitter no son seguros entre hilos: uno por hilo
+_parsers = threading.local()
+
+
+def _crear_parser(tsx: bool):
+    """Crea un parser de tree-sitter compatible con las APIs antigua (set_language) y nueva"""
+    raw_language = (
+        tree_sitter_typescript.language_tsx() if tsx else tree_sitter_typescript.language_typescript()
+    )
+    language = tree_sitter.Language(raw_language)
+    try:
+        return tree_sitter.Parser(language)
+    except TypeError:
+        parser = tree_sitter.Parser()
+        parser.set_language(language)
+        return parser
+
+
+def _get_parser(tsx: bool = False):
+    """Obtiene el parser del hilo actual (lazy loading)."""
+    attr = "tsx" if tsx else "typescript"
+    parser = getattr(_parsers, attr, None)
+    if parser is None:
+        parser = _crear_parser(tsx)
+        setattr(_parsers, attr, parser)
+    return parser
+
+
+def _apertura_sin_cerrar(error_node):
+    """Última llave/paréntesis/corchete hijo directo de un nodo ERROR que no tiene cierre"""
+    pila = []
+    for child in error_node.children:
+        if child.type in ('{', '(', '['):
+            pila.append(child)
+        elif child.type in _CIERRES and pila and pila[-1].type == _CIERRES[child.type]:
+            pila.pop()
+    return pila[-1] if pila else None
+
+
+def _errores_tree_sitter(codigo: str, tsx: bool) -> List[Dict[str, Any]]:
+    """Recorre el árbol y devuelve los nodos ERROR y MISSING con su posición"""
+    source = codigo.encode("utf-8")
+    tree = _get_parser(tsx).parse(source)
+    root = tree.root_node
+    if not root.has_error:
+        return []
+
+    errores: List[Dict[str, Any]] = []
+    pendientes = [root]
+    while pendientes and len(errores) < MAX_ERRORES_REPORTADOS:
+        node = pendientes.pop()
+        if node.is_missing:
+            mensaje = f"Falta '{node.type}'"
+        elif node.type == "ERROR":
+            abierto = _apertura_sin_cerrar(node)
+            if abierto is not None:
+                # Bloque truncado: el nodo ERROR se extiende hasta la apertura que nunca se cerró
+                node = abierto
+                mensaje = f"'{abierto.type}' sin cerrar"
+            else:
+                fragmento = source[node.start_byte:node.end_byte].decode("utf-8", errors="replace").strip()
+                fragmento = fragmento.splitlines()[0][:60] if fragmento else ""
+                mensaje = f"Sintaxis inválida cerca de '{fragmento}'" if fragmento else "Sintaxis inválida"
+        else:
+            # Solo se desciende por subárboles que contienen errores
+            pendientes.extend(child for child in reversed(node.children) if child.has_error or child.is_missing)
+            continue
+
+        row, column = node.start_point
+        errores.append({"line": row + 1, "column": column + 1, "message": mensaje})
+
+    errores.sort(key=lambda e: (e["line"], e["column"]))
+    return errores
+
+
+def _errores_tokenizador(codigo: str) -> List[Dict[str, Any]]:
+    """Errores detectables sin parser completo (anidamiento y bloques sin cerrar)"""
+    scan = scan_typescript(codigo)
+    errores: List[Dict[str, Any]] = []
+    if scan.error_anidamiento:
+        errores.append({"line": scan.error_anidamiento_linea, "column": None, "message": scan.error_anidamiento})
+    for apertura, cierre, nombre, sufijo in (('{', '}', 'Llaves', 'as'), ('(', ')', 'Paréntesis', 'os'), ('[', ']', 'Corchetes', 'os')):
+        if scan.abiertos[apertura] != scan.cerrados[cierre]:
+            errores.append({
+                "line": None,
+                "column": None,
+                "message": (
+                    f"{nombre} desbalancead{sufijo}: {scan.abiertos[apertura]} abiert{sufijo}, "
+                    f"{scan.cerrados[cierre]} cerrad{sufijo}"
+                )
+            })
+    if scan.sin_cerrar:
+        tipo = "Template literal" if scan.sin_cerrar == 'template' else "Comentario multilínea"
+        errores.append({"line": None, "column": None, "message": f"{tipo} sin cerrar al final del fichero"})
+    return errores
+
+
+def find_typescript_syntax_errors(codigo: str, filename: str = "") -> List[Dict[str, Any]]:
+    """
+    Busca errores de sintaxis en código TypeScript.
+
+    Args:
+        codigo: Código TypeScript (producción o tests)
+        filename: Nombre del fichero (solo para elegir la gramática TSX si acaba en .tsx)
+
+    Returns:
+        Lista de errores con 'line', 'column' (1-based, None si no se conocen) y 'message'
+    """
+    if TREE_SITTER_AVAILABLE:
+        return _errores_tree_sitter(codigo, tsx=filename.endswith(".tsx"))
+    return _errores_tokenizador(codigo)
+
+
+def format_syntax_errors(errores: List[Dict[str, Any]], filename: str = "") -> str:
+    """Formatea los errores como 'fichero:línea:columna: mensaje', uno por línea"""
+    lineas = []
+    for error in errores[:MAX_ERRORES_REPORTADOS]:
+        posicion = ""
+        if error.get("line") is not None:
+            posicion = f"{error['line']}:" + (f"{error['column']}:" if error.get("column") is not None else "")
+        prefijo = f"{filename}:" if filename else ""
+        lineas.append(f"{prefijo}{posicion} {error['message']}".strip())
+    return "\n".join(lineas)
+
+
+def check_typescript_syntax(codigo: str, filename: str = "") -> Tuple[bool, str]:
+    """
+    Comprueba la sintaxis de código TypeScript en proceso.
+
+    Args:
+        codigo: Código TypeScript
+        filename: Nombre del fichero (para el mensaje y la gramática TSX)
+
+    Returns:
+        Tuple (es_valido, mensaje_error)
+        - mensaje_error: errores con su ubicación, "" si es válido
+    """
+    errores = find_typescript_syntax_errors(codigo, filename)
+    if not errores:
+        return True, ""
+    return False, "Errores de sintaxis TypeScript:\n" + format_syntax_errors(errores, filename)
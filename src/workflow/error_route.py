@@ -0,0 +1,109 @@
+"""
+Ruta de errores del LLM en el grafo (LLM_ERROR_ROUTE_ENABLED).
+
+Cuando un nodo recibe un fallo de call_gemini en lugar de contenido, lo registra en
+state['llm_error'] (ver llm/errors.py) y el grafo lo desvía al nodo LLM-Error en vez
+de seguir con Sonar, tests o revisión sobre un mensaje de error. Este nodo:
+
+- Si el error es reintentable y quedan reintentos (LLM_ERROR_MAX_RETRIES), pausa con
+  espera exponencial (LLM_ERROR_PAUSE_SECONDS) y vuelve a ejecutar el nodo que falló.
+- Si no (o si la pausa no cabe en el plazo de la ejecución), aborta el flujo.
+
+Lleva la cuenta de los errores desviados y una estimación de las ejecuciones de nodo
+que se evitaron (no se miden: se suman las que habría seguido el flujo sin la ruta).
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict
+
+from langgraph.graph import END
+
+from config.settings import settings
+from models.state import AgentState
+from utils.logger import setup_logger
+from utils.deadline import fits_in_budget
+
+logger = setup_logger(__name__, level=settings.get_log_level())
+
+LLM_ERROR_NODE = "LLM-Error"
+ABORT = "ABORT"
+
+# Nodos que registran errores del LLM y a los que se puede volver a entrar
+NODOS_REINTENTABLES = ("ProductOwner", "Developer-Code", "Developer-UnitTests")
+
+# Estimación (no medida) de las ejecuciones que habría consumido el error sin la ruta,
+# según el nodo que falló, en el camino más corto del flujo estándar:
+# - ProductOwner: Developer-Code y Sonar sobre requisitos ERROR_PARSING
+# - Developer-Code: Sonar analiza el mensaje de error y devuelve a Developer-Code
+# - Developer-UnitTests: ejecución de tests inválidos y vuelta a Developer-Code
+NODOS_EVITADOS_ESTIMADOS = {"ProductOwner": 2, "Developer-Code": 2, "Developer-UnitTests": 1}
+
+_stats_lock = threading.Lock()
+_stats: Dict[str, int] = {"errores": 0, "reintentos": 0, "abortos": 0, "nodos_evitados_estimados": 0}
+
+
+def get_error_route_stats() -> Dict[str, int]:
+    """Errores desviados, reintentos, abortos y ejecuciones de nodo evitadas (estimación)"""
+    with _stats_lock:
+        return dict(_stats)
+
+
+def reset_error_route_stats() -> None:
+    with _stats_lock:
+        for clave in _stats:
+            _stats[clave] = 0
+
+
+def llm_error_node(state: AgentState) -> AgentState:
+    """
+    Nodo LLM-Error.
+    Decide si reintentar el nodo que falló (tras una pausa) o abortar el flujo.
+    """
+    error = dict(state.get('llm_error') or {})
+    nodo = error.get('node')
+    reintentos = state.get('llm_error_retries', 0) + 1
+    state['llm_error_retries'] = reintentos
+
+    with _stats_lock:
+        _stats["errores"] += 1
+        _stats["nodos_evitados_estimados"] += NODOS_EVITADOS_ESTIMADOS.get(nodo, 1)
+
+    pausa = settings.LLM_ERROR_PAUSE_SECONDS * (2 ** (reintentos - 1))
+    puede_reintentar = (
+        error.get('retryable', False)
+        and nodo in NODOS_REINTENTABLES
+        and reintentos <= settings.LLM_ERROR_MAX_RETRIES
+        and fits_in_budget(pausa, state)  # Sin plazo para la pausa: abortar con el resultado parcial
+    )
+    if puede_reintentar:
+        logger.warning(
+            f"⏸️ Fallo del LLM en {nodo} ({error.get('kind')}): pausa de {pausa:.0f}s y reintento "
+            f"{reintentos}/{settings.LLM_ERROR_MAX_RETRIES}"
+        )
+        time.sleep(pausa)
+        error['action'] = nodo
+        with _stats_lock:
+            _stats["reintentos"] += 1
+    else:
+        logger.error(f"🛑 Fallo del LLM en {nodo} ({error.get('kind')}): {error.get('detail', '')}. Abortando el flujo")
+        error['action'] = ABORT
+        with _stats_lock:
+            _stats["abortos"] += 1
+
+    state['llm_error'] = error
+    return state
+
+
+def siguiente_o_error(siguiente: str) -> Callable[[Dict[str, Any]], str]:
+    """Ruta tras un nodo con salida lineal: al nodo LLM-Error si registró un fallo"""
+    return lambda x: LLM_ERROR_NODE if x.get('llm_error') else siguiente
+
+
+def ruta_tras_error(x: Dict[str, Any]) -> str:
+    """Ruta del nodo LLM-Error: el nodo a reintentar o ABORT"""
+    return (x.get('llm_error') or {}).get('action', ABORT)
+
+
+# Destinos del nodo LLM-Error
+DESTINOS_ERROR = {**{nodo: nodo for nodo in NODOS_REINTENTABLES}, ABORT: END}
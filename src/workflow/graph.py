@@ -3,9 +3,13 @@ Configuración y compilación del grafo LangGraph.
 Define el flujo de trabajo entre agentes y las transiciones condicionales.
 """
 
+import threading
+from typing import Any, Dict, Tuple
+
 from langgraph.graph import StateGraph, END, START
 from models.state import AgentState
 from config.settings import settings
+from config.pipeline_profiles import PipelineProfile, get_profile
 from utils.logger import setup_logger
 from agents.product_owner import product_owner_node
 from agents.developer_code import developer_code_node
@@ -13,32 +17,59 @@ from agents.sonar import sonar_node
 from agents.developer_unit_tests import developer_unit_tests_node, developer_complete_pr_node
 from agents.developer2_reviewer import developer2_reviewer_node
 from agents.stakeholder import stakeholder_node
+from workflow.node_cache import memoize_node, enabled_nodes
+from workflow.error_route import LLM_ERROR_NODE, DESTINOS_ERROR, llm_error_node, siguiente_o_error, ruta_tras_error
 
 logger = setup_logger(__name__, level=settings.get_log_level())
 
 
-def create_workflow() -> StateGraph:
+def create_workflow(profile: PipelineProfile = None) -> StateGraph:
     """
     Crea y configura el grafo de trabajo con todos los agentes y transiciones.
     
+    Args:
+        profile: Perfil del pipeline. Por defecto PIPELINE_PROFILE. Sin flujo de PR
+                 (fast) no hay Developer2-Reviewer ni Developer-CompletePR: los tests
+                 superados van directamente al Stakeholder
+    
     Returns:
         StateGraph: El grafo compilado listo para ejecución
     """
+    profile = profile or get_profile()
     workflow = StateGraph(AgentState)
 
     # 1. Añadir Nodos (Agentes)
     workflow.add_node("ProductOwner", product_owner_node)
     workflow.add_node("Developer-Code", developer_code_node)
-    workflow.add_node("Sonar", sonar_node)
-    workflow.add_node("Developer-UnitTests", developer_unit_tests_node)
-    workflow.add_node("Developer2-Reviewer", developer2_reviewer_node)
-    workflow.add_node("Stakeholder", stakeholder_node)
-    workflow.add_node("Developer-CompletePR", developer_complete_pr_node)
+    # Sonar, Developer-UnitTests y Stakeholder reutilizan su resultado con entradas sin cambios (NODE_CACHE_ENABLED)
+    workflow.add_node("Sonar", memoize_node("Sonar", sonar_node))
+    workflow.add_node("Developer-UnitTests", memoize_node("Developer-UnitTests", developer_unit_tests_node))
+    workflow.add_node("Stakeholder", memoize_node("Stakeholder", stakeholder_node))
+    if profile.pr_flow:
+        workflow.add_node("Developer2-Reviewer", developer2_reviewer_node)
+        workflow.add_node("Developer-CompletePR", developer_complete_pr_node)
+    error_route = settings.LLM_ERROR_ROUTE_ENABLED
+    if error_route:
+        workflow.add_node(LLM_ERROR_NODE, llm_error_node)
 
     # 2. Definir Transiciones Iniciales y Lineales
     workflow.add_edge(START, "ProductOwner")
-    workflow.add_edge("ProductOwner", "Developer-Code")
-    workflow.add_edge("Developer-Code", "Sonar")
+    if error_route:
+        # Un fallo del LLM no continúa como requisitos/código: pasa por LLM-Error (reintento o fin)
+        workflow.add_conditional_edges(
+            "ProductOwner",
+            siguiente_o_error("Developer-Code"),
+            {"Developer-Code": "Developer-Code", LLM_ERROR_NODE: LLM_ERROR_NODE}
+        )
+        workflow.add_conditional_edges(
+            "Developer-Code",
+            siguiente_o_error("Sonar"),
+            {"Sonar": "Sonar", LLM_ERROR_NODE: LLM_ERROR_NODE}
+        )
+        workflow.add_conditional_edges(LLM_ERROR_NODE, ruta_tras_error, DESTINOS_ERROR)
+    else:
+        workflow.add_edge("ProductOwner", "Developer-Code")
+        workflow.add_edge("Developer-Code", "Sonar")
 
     # 3. Transiciones Condicionales
 
@@ -63,37 +94,43 @@ def create_workflow() -> StateGraph:
     # Si los tests fallan por estar mal construidos, vuelve a Developer-UnitTests para regenerarlos
     # Si los tests fallan por el código de producción, vuelve a Developer-Code
     # Cuando pasa los tests siempre va a Developer2-Reviewer (que decide si va a Stakeholder o vuelve a Developer-Code)
+    destinos_tests = {
+        "FAILED": "Developer-Code",  # Problema en código de producción
+        "TEST_REGENERATION": "Developer-UnitTests",  # Problema en tests, regenerar
+        # Sin flujo de PR, el Stakeholder revisa y valida a la vez
+        "PASSED": "Developer2-Reviewer" if profile.pr_flow else "Stakeholder",
+        "DEBUG_LIMIT_EXCEEDED": END
+    }
+    if error_route:
+        destinos_tests[LLM_ERROR_NODE] = LLM_ERROR_NODE
     workflow.add_conditional_edges(
         "Developer-UnitTests",
         lambda x: (
-            "PASSED" if x['pruebas_superadas']
+            LLM_ERROR_NODE if error_route and x.get('llm_error')
+            else "PASSED" if x['pruebas_superadas']
             else ("DEBUG_LIMIT_EXCEEDED" if x['debug_attempt_count'] >= x['max_debug_attempts']
                   else ("TEST_REGENERATION" if x.get('test_regeneration_needed', False)
                         else "FAILED"))
         ),
-        {
-            "FAILED": "Developer-Code",  # Problema en código de producción
-            "TEST_REGENERATION": "Developer-UnitTests",  # Problema en tests, regenerar
-            "PASSED": "Developer2-Reviewer",
-            "DEBUG_LIMIT_EXCEEDED": END
-        }
+        destinos_tests
     )
     
-    # C. Transición condicional del Developer2-Reviewer
-    # Si aprueba el código va a Stakeholder, si no vuelve a Developer-Code (con límite de intentos)
-    workflow.add_conditional_edges(
-        "Developer2-Reviewer",
-        lambda x: (
-            "CODE_APPROVED" if x.get('codigo_revisado', False)
-            else ("REVISOR_LIMIT_EXCEEDED" if x.get('revisor_attempt_count', 0) >= x.get('max_revisor_attempts', 2)
-                  else "CODE_REJECTED")
-        ),
-        {
-            "CODE_APPROVED": "Developer-CompletePR",
-            "CODE_REJECTED": "Developer-Code",
-            "REVISOR_LIMIT_EXCEEDED": END
-        }
-    )
+    if profile.pr_flow:
+        # C. Transición condicional del Developer2-Reviewer
+        # Si aprueba el código va a Stakeholder, si no vuelve a Developer-Code (con límite de intentos)
+        workflow.add_conditional_edges(
+            "Developer2-Reviewer",
+            lambda x: (
+                "CODE_APPROVED" if x.get('codigo_revisado', False)
+                else ("REVISOR_LIMIT_EXCEEDED" if x.get('revisor_attempt_count', 0) >= x.get('max_revisor_attempts', 2)
+                      else "CODE_REJECTED")
+            ),
+            {
+                "CODE_APPROVED": "Developer-CompletePR",
+                "CODE_REJECTED": "Developer-Code",
+                "REVISOR_LIMIT_EXCEEDED": END
+            }
+        )
 
     # D. Bucle de Validación (Externo: Reingeniería de Requisitos / Fallo Final)
     workflow.add_conditional_edges(
@@ -110,90 +147,193 @@ def create_workflow() -> StateGraph:
         }
     )
 
-    workflow.add_conditional_edges(
-        "Developer-CompletePR",
-        lambda x: (
-            "MERGED" if x.get('pr_mergeada', False) else "MERGE_FAILED"
-        ),
-        {
-            "MERGED": "Stakeholder",
-            "MERGE_FAILED": END,
-        }
-    )
+    if profile.pr_flow:
+        workflow.add_conditional_edges(
+            "Developer-CompletePR",
+            lambda x: (
+                "MERGED" if x.get('pr_mergeada', False) else "MERGE_FAILED"
+            ),
+            {
+                "MERGED": "Stakeholder",
+                "MERGE_FAILED": END,
+            }
+        )
 
     # 4. Compilar el Grafo
     return workflow.compile()
 
 
-def visualize_graph(app):
+# Grafos compilados por configuración (COMPILED_WORKFLOW_CACHE_ENABLED)
+_compiled_workflows: Dict[Tuple[Any, ...], Any] = {}
+_compiled_workflows_lock = threading.Lock()
+
+
+def _workflow_key(profile: PipelineProfile) -> Tuple[Any, ...]:
+    """
+    Lo que determina la estructura del grafo compilado: la topología del perfil, las
+    opciones que añaden nodos o aristas, los nodos memoizados y las funciones de los
+    nodos. Los límites de reintentos viajan en el estado (RetryConfig.to_state_dict) y
+    no obligan a recompilar.
+    """
+    return (
+        profile.pr_flow,
+        settings.LLM_ERROR_ROUTE_ENABLED,
+        enabled_nodes(),
+        product_owner_node, developer_code_node, sonar_node, developer_unit_tests_node,
+        developer_complete_pr_node, developer2_reviewer_node, stakeholder_node,
+    )
+
+
+def get_compiled_workflow(profile: PipelineProfile = None):
+    """
+    Obtiene el grafo compilado compartido por las ejecuciones del proceso.
+    
+    Se compila una vez por configuración que afecta al grafo; sin checkpointer, el grafo
+    compilado no guarda estado entre invocaciones y se puede reutilizar (también desde
+    varios hilos).
+    
+    Args:
+        profile: Perfil del pipeline. Por defecto PIPELINE_PROFILE
+    
+    Returns:
+        El grafo compilado
+    """
+    profile = profile or get_profile()
+    key = _workflow_key(profile)
+    app = _compiled_workflows.get(key)
+    if app is None:
+        with _compiled_workflows_lock:
+            app = _compiled_workflows.get(key)
+            if app is None:
+                app = create_workflow(profile)
+                _compiled_workflows[key] = app
+                logger.debug(f"Grafo compilado y guardado en caché ({len(_compiled_workflows)} configuraciones)")
+    return app
+
+
+def clear_workflow_cache() -> None:
+    """Descarta los grafos compilados (p. ej. tras cambiar la configuración en tests)"""
+    with _compiled_workflows_lock:
+        _compiled_workflows.clear()
+
+
+GRAPH_CACHE_DIRNAME = "graph_cache"
+
+
+def _render_png(app):
+    """
+    Renderiza el grafo como PNG con la API remota de Mermaid y, si falla, con PYPPETEER.
+    
+    Returns:
+        bytes del PNG o None si no se pudo renderizar
+    """
+    import os
+
+    # Usar más reintentos y mayor delay para evitar errores 204 de la API de Mermaid
+    try:
+        return app.get_graph().draw_mermaid_png(max_retries=5, retry_delay=2.0)
+    except Exception as e:
+        logger.warning(f"⚠️ Falló el render Mermaid remoto, reintentando con PYPPETEER: {e}")
+        download_host = os.environ.get("PYPPETEER_DOWNLOAD_HOST")
+        if download_host and download_host.startswith("httpss://"):
+            os.environ["PYPPETEER_DOWNLOAD_HOST"] = "https://" + download_host[len("httpss://"):]
+
+        local_browser = os.environ.get("PYPPETEER_EXECUTABLE_PATH")
+        if (not local_browser) or (not os.path.exists(local_browser)):
+            candidates = [
+                r"C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe",
+                r"C:\\Program Files (x86)\\Google\\Chrome\\Application\\chrome.exe",
+                r"C:\\Program Files\\Microsoft\\Edge\\Application\\msedge.exe",
+                r"C:\\Program Files (x86)\\Microsoft\\Edge\\Application\\msedge.exe",
+            ]
+            for candidate in candidates:
+                if os.path.exists(candidate):
+                    os.environ["PYPPETEER_EXECUTABLE_PATH"] = candidate
+                    break
+
+        local_browser = os.environ.get("PYPPETEER_EXECUTABLE_PATH")
+        if local_browser and os.path.exists(local_browser):
+            from langchain_core.runnables.graph import MermaidDrawMethod
+            try:
+                return app.get_graph().draw_mermaid_png(draw_method=MermaidDrawMethod.PYPPETEER)
+            except Exception as e2:
+                logger.warning(f"⚠️ Falló el render Mermaid local (PYPPETEER) con navegador local: {e2}")
+                return None
+        logger.info("ℹ️ No se encontró Chrome/Edge local para render Mermaid con PYPPETEER; guardando fuente Mermaid (.mmd) y continuando")
+        return None
+
+
+def _copiar_desde_cache(cache_dir: str, graph_hash: str, output_dir: str) -> bool:
+    """
+    Copia a output/ el render guardado para esta estructura del grafo.
+    Un .mmd en caché indica que el PNG ya falló para este hash: no se reintenta la red.
+    """
+    import os
+    import shutil
+
+    for extension in ("png", "mmd"):
+        cached = os.path.join(cache_dir, f"{graph_hash}.{extension}")
+        if os.path.exists(cached):
+            destino = os.path.join(output_dir, f"workflow_graph.{extension}")
+            shutil.copyfile(cached, destino)
+            logger.info(f"♻️ Grafo sin cambios, reutilizando render en caché: {destino}")
+            return True
+    return False
+
+
+def visualize_graph(app, mode: str = None):
     """
     Visualiza el grafo en formato Mermaid y lo guarda como imagen PNG.
     
+    Con GRAPH_RENDER_CACHE_ENABLED el render se guarda en output/graph_cache por hash
+    de la fuente Mermaid (estructura del grafo) y las ejecuciones siguientes lo copian
+    sin volver a llamar a la API ni al navegador.
+    
     Args:
         app: El grafo compilado
+        mode: png | mmd | off. Por defecto GRAPH_RENDER_MODE
     """
-    # try:
-    #     # Intentar usar IPython.display (para notebooks)
-    #     from IPython.display import Image, display
-    #     display(Image(app.get_graph().draw_mermaid_png()))
-    #     print("✅ Grafo visualizado en notebook.")
-    # except ImportError:
-        # Si no está en notebook, guardar como archivo PNG
+    mode = (mode or settings.GRAPH_RENDER_MODE).lower()
+    if mode == "off":
+        logger.debug("Visualización del grafo deshabilitada (GRAPH_RENDER_MODE=off)")
+        return
     try:
+        import hashlib
         import os
-        from config.settings import settings
-        
+
         output_path = os.path.join(settings.OUTPUT_DIR, "workflow_graph.png")
         mermaid_path = os.path.join(settings.OUTPUT_DIR, "workflow_graph.mmd")
-        # Usar más reintentos y mayor delay para evitar errores 204 de la API de Mermaid
-        try:
-            png_data = app.get_graph().draw_mermaid_png(max_retries=5, retry_delay=2.0)
-        except Exception as e:
-            logger.warning(f"⚠️ Falló el render Mermaid remoto, reintentando con PYPPETEER: {e}")
-            download_host = os.environ.get("PYPPETEER_DOWNLOAD_HOST")
-            if download_host and download_host.startswith("httpss://"):
-                os.environ["PYPPETEER_DOWNLOAD_HOST"] = "https://" + download_host[len("httpss://"):]
-
-            local_browser = os.environ.get("PYPPETEER_EXECUTABLE_PATH")
-            if (not local_browser) or (not os.path.exists(local_browser)):
-                candidates = [
-                    r"C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe",
-                    r"C:\\Program Files (x86)\\Google\\Chrome\\Application\\chrome.exe",
-                    r"C:\\Program Files\\Microsoft\\Edge\\Application\\msedge.exe",
-                    r"C:\\Program Files (x86)\\Microsoft\\Edge\\Application\\msedge.exe",
-                ]
-                for candidate in candidates:
-                    if os.path.exists(candidate):
-                        os.environ["PYPPETEER_EXECUTABLE_PATH"] = candidate
-                        break
-
-            local_browser = os.environ.get("PYPPETEER_EXECUTABLE_PATH")
-            if local_browser and os.path.exists(local_browser):
-                from langchain_core.runnables.graph import MermaidDrawMethod
-                try:
-                    png_data = app.get_graph().draw_mermaid_png(draw_method=MermaidDrawMethod.PYPPETEER)
-                except Exception as e2:
-                    logger.warning(f"⚠️ Falló el render Mermaid local (PYPPETEER) con navegador local: {e2}")
-                    png_data = None
-            else:
-                logger.info("ℹ️ No se encontró Chrome/Edge local para render Mermaid con PYPPETEER; guardando fuente Mermaid (.mmd) y continuando")
-                png_data = None
+        mermaid_src = app.get_graph().draw_mermaid()
+
+        # La fuente Mermaid se genera en local; solo el PNG (red/navegador) se cachea
+        cache_dir = None
+        if mode == "png" and settings.GRAPH_RENDER_CACHE_ENABLED:
+            cache_dir = os.path.join(settings.OUTPUT_DIR, GRAPH_CACHE_DIRNAME)
+            os.makedirs(cache_dir, exist_ok=True)
+            graph_hash = hashlib.sha256(mermaid_src.encode("utf-8")).hexdigest()[:16]
+            if _copiar_desde_cache(cache_dir, graph_hash, settings.OUTPUT_DIR):
+                return
+
+        png_data = _render_png(app) if mode == "png" else None
 
         if png_data:
             with open(output_path, "wb") as f:
                 f.write(png_data)
+            if cache_dir:
+                with open(os.path.join(cache_dir, f"{graph_hash}.png"), "wb") as f:
+                    f.write(png_data)
             logger.info(f"✅ Grafo guardado en: {output_path}")
             logger.info(f"   Abre el archivo para visualizar el flujo de trabajo.")
         else:
             try:
-                mermaid_src = app.get_graph().draw_mermaid()
                 with open(mermaid_path, "w", encoding="utf-8") as f:
                     f.write(mermaid_src)
+                if cache_dir:
+                    with open(os.path.join(cache_dir, f"{graph_hash}.mmd"), "w", encoding="utf-8") as f:
+                        f.write(mermaid_src)
                 logger.info(f"✅ Fuente Mermaid del grafo guardada en: {mermaid_path}")
             except Exception as e3:
                 logger.warning(f"⚠️ No se pudo guardar el grafo como imagen ni como Mermaid: {e3}")
     except Exception as e:
         logger.warning(f"⚠️ No se pudo guardar el grafo como imagen: {e}")
         logger.debug("   Tip: Verifica tu conexión a internet o usa MermaidDrawMethod.PYPPETEER para renderizado local")
-    # except Exception as e:
-    #     print(f"⚠️ No se pudo visualizar el grafo: {e}")
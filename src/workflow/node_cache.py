@@ -0,0 +1,250 @@
+"""
+Memoización de nodos del grafo por huella de sus entradas (NODE_CACHE_ENABLED).
+
+Algunos nodos se vuelven a ejecutar con las mismas entradas: Sonar analiza un código
+idéntico a una versión que ya aprobó, Developer-UnitTests repite la ejecución de un
+código ya probado y Stakeholder revalida el mismo código. Con la caché, cada nodo
+habilitado en NODE_CACHE_NODES calcula una huella de los campos del estado que lee y,
+si coincide con una ejecución anterior, reproduce la actualización parcial del estado
+(los campos que escribe) sin ejecutar el nodo.
+
+Reglas de invalidación (NodeCacheSpec):
+- reads: campos de la huella; cualquier cambio en ellos es un fallo de caché.
+- cacheable: solo se guardan los resultados estables (p. ej. Sonar aprobado). Los
+  resultados que hacen avanzar contadores de reintento o dependen de un fallo del LLM
+  no se guardan, para no bloquear los bucles de corrección.
+- skip: entradas con las que el nodo siempre se ejecuta (p. ej. límite de intentos).
+- Los resultados son de cada ejecución (state['run_id']): una ejecución no reutiliza
+  los de otra, porque output/ se limpia al empezar y los ficheros que escribió el nodo
+  ya no existen. Al terminar, la ejecución descarta los suyos (discard_node_cache_run)
+  sin tocar los de las ejecuciones concurrentes.
+
+Al reproducir un resultado no se repiten los efectos externos del nodo (ficheros,
+comentarios en Azure DevOps, push a GitHub): ya se hicieron en la ejecución guardada.
+Por eso las entradas de la huella incluyen el destino de esos efectos cuando puede
+cambiar (p. ej. el branch de GitHub de Developer-UnitTests: Developer-Code abre uno
+nuevo en cada vuelta del bucle de calidad).
+"""
+
+import copy
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from config.settings import settings
+from models.state import AgentState
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__, level=settings.get_log_level())
+
+
+class NodeCacheSpec:
+    """Campos que lee y escribe un nodo y cuándo se puede guardar o usar su resultado"""
+
+    __slots__ = ("reads", "writes", "cacheable", "skip")
+
+    def __init__(
+        self,
+        reads: Tuple[str, ...],
+        writes: Tuple[str, ...],
+        cacheable: Callable[[Dict[str, Any], Dict[str, Any]], bool],
+        skip: Optional[Callable[[Dict[str, Any]], bool]] = None
+    ):
+        """
+        Args:
+            reads: Campos del estado que forman la huella de entrada
+            writes: Campos del estado que se guardan y reproducen
+            cacheable: (antes, después) -> si el resultado se puede guardar
+            skip: estado -> True si el nodo debe ejecutarse sin consultar la caché
+        """
+        self.reads = reads
+        self.writes = writes
+        self.cacheable = cacheable
+        self.skip = skip
+
+
+# Especificación de los nodos memoizables
+NODE_CACHE_SPECS: Dict[str, NodeCacheSpec] = {
+    # Solo el código aprobado: un análisis con issues incrementa el intento de calidad
+    "Sonar": NodeCacheSpec(
+        reads=("codigo_generado", "requisitos_meta"),
+        writes=("sonarqube_passed", "sonarqube_issues", "sonarqube_attempt_count", "sonar_issue_index"),
+        cacheable=lambda antes, despues: bool(despues.get("sonarqube_passed")),
+    ),
+    # Solo tests superados: si fallan, el bucle de depuración debe regenerarlos o corregir el código
+    "Developer-UnitTests": NodeCacheSpec(
+        reads=("codigo_generado", "requisitos_formales", "requisitos_meta", "github_branch_name"),
+        writes=(
+            "tests_unitarios_generados", "pruebas_superadas", "traceback", "debug_attempt_count",
+            "test_regeneration_needed", "github_local_test_path", "github_test_filename",
+            "github_branch_name", "github_pr_number", "github_pr_url",
+        ),
+        cacheable=lambda antes, despues: bool(despues.get("pruebas_superadas")),
+    ),
+    # Veredicto con motivo nuevo (un rechazo sin motivo puede ser un fallo del LLM)
+    "Stakeholder": NodeCacheSpec(
+        reads=("codigo_generado", "requisitos_formales", "resultado_tests"),
+        writes=("validado", "feedback_stakeholder"),
+        cacheable=lambda antes, despues: bool(despues.get("validado")) or (
+            despues.get("feedback_stakeholder") != antes.get("feedback_stakeholder")
+        ),
+        skip=lambda state: state.get("attempt_count", 0) > state.get("max_attempts", 0),
+    ),
+}
+
+
+def fingerprint(state: Dict[str, Any], campos: Tuple[str, ...]) -> str:
+    """Huella de los campos del estado que lee un nodo"""
+    payload = json.dumps({campo: state.get(campo) for campo in campos}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class NodeCache:
+    """
+    Resultados de nodos por huella de entrada (LRU por ejecución y nodo).
+
+    Uso:
+        >>> workflow.add_node("Sonar", get_node_cache().wrap("Sonar", sonar_node))
+    """
+
+    def __init__(self, max_entries: int = None):
+        """
+        Args:
+            max_entries: Resultados guardados por nodo. Por defecto NODE_CACHE_MAX_ENTRIES
+        """
+        self.max_entries = max_entries if max_entries is not None else settings.NODE_CACHE_MAX_ENTRIES
+        # Clave (run_id, nodo)
+        self._entries: Dict[Tuple[str, str], "OrderedDict[str, Dict[str, Any]]"] = {}
+        self._stats: Dict[Tuple[str, str], Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def _count(self, clave_nodo: Tuple[str, str], clave: str) -> None:
+        stats = self._stats.setdefault(clave_nodo, {"hits": 0, "misses": 0, "stored": 0})
+        stats[clave] += 1
+
+    def get(self, node: str, huella: str, run_id: str = "") -> Optional[Dict[str, Any]]:
+        clave_nodo = (run_id, node)
+        with self._lock:
+            entradas = self._entries.get(clave_nodo)
+            resultado = entradas.get(huella) if entradas else None
+            if resultado is None:
+                self._count(clave_nodo, "misses")
+                return None
+            entradas.move_to_end(huella)
+            self._count(clave_nodo, "hits")
+            return copy.deepcopy(resultado)
+
+    def put(self, node: str, huella: str, resultado: Dict[str, Any], run_id: str = "") -> None:
+        clave_nodo = (run_id, node)
+        with self._lock:
+            entradas = self._entries.setdefault(clave_nodo, OrderedDict())
+            entradas[huella] = copy.deepcopy(resultado)
+            entradas.move_to_end(huella)
+            while len(entradas) > self.max_entries:
+                entradas.popitem(last=False)
+            self._count(clave_nodo, "stored")
+
+    def wrap(self, node: str, fn: Callable[[AgentState], AgentState], spec: NodeCacheSpec = None):
+        """
+        Envuelve un nodo con la caché.
+
+        Args:
+            node: Nombre del nodo en el grafo
+            fn: Función del nodo
+            spec: Especificación. Por defecto NODE_CACHE_SPECS[node]
+
+        Returns:
+            Función del nodo memoizada
+        """
+        spec = spec or NODE_CACHE_SPECS[node]
+
+        def _nodo_memoizado(state: AgentState) -> AgentState:
+            if spec.skip and spec.skip(state):
+                return fn(state)
+            run_id = state.get("run_id") or ""
+            huella = fingerprint(state, spec.reads)
+            resultado = self.get(node, huella, run_id)
+            if resultado is not None:
+                logger.info(f"♻️ {node}: entradas sin cambios, reutilizando el resultado anterior")
+                state.update(resultado)
+                return state
+
+            antes = {campo: copy.deepcopy(state.get(campo)) for campo in spec.writes}
+            state = fn(state)
+            despues = {campo: state.get(campo) for campo in spec.writes}
+            if not state.get("llm_error") and spec.cacheable(antes, despues):
+                self.put(node, huella, despues, run_id)
+            return state
+
+        _nodo_memoizado.__name__ = getattr(fn, "__name__", node)
+        return _nodo_memoizado
+
+    def discard_run(self, run_id: str) -> None:
+        """Descarta los resultados y las métricas de una ejecución"""
+        with self._lock:
+            for clave_nodo in [c for c in self._entries if c[0] == run_id]:
+                del self._entries[clave_nodo]
+            for clave_nodo in [c for c in self._stats if c[0] == run_id]:
+                del self._stats[clave_nodo]
+
+    def clear(self) -> None:
+        """Descarta los resultados y las métricas de todas las ejecuciones"""
+        with self._lock:
+            self._entries.clear()
+            self._stats.clear()
+
+    def stats(self, run_id: Optional[str] = None) -> Dict[str, Dict[str, int]]:
+        """
+        Aciertos, fallos y resultados guardados por nodo.
+
+        Args:
+            run_id: Solo los de esta ejecución. Por defecto, la suma de todas
+        """
+        totales: Dict[str, Dict[str, int]] = {}
+        with self._lock:
+            for (run, node), s in self._stats.items():
+                if run_id is not None and run != run_id:
+                    continue
+                acumulado = totales.setdefault(node, {"hits": 0, "misses": 0, "stored": 0})
+                for clave, valor in s.items():
+                    acumulado[clave] += valor
+        return dict(sorted(totales.items()))
+
+
+def enabled_nodes() -> Tuple[str, ...]:
+    """Nodos con caché habilitada (NODE_CACHE_ENABLED y NODE_CACHE_NODES)"""
+    if not settings.NODE_CACHE_ENABLED:
+        return ()
+    nodos = tuple(n.strip() for n in settings.NODE_CACHE_NODES.split(",") if n.strip())
+    desconocidos = [n for n in nodos if n not in NODE_CACHE_SPECS]
+    if desconocidos:
+        logger.warning(f"⚠️ NODE_CACHE_NODES: nodos sin memoización disponible, se ignoran: {desconocidos}")
+    return tuple(n for n in nodos if n in NODE_CACHE_SPECS)
+
+
+def memoize_node(node: str, fn: Callable[[AgentState], AgentState]) -> Callable[[AgentState], AgentState]:
+    """Envuelve el nodo con la caché si está habilitado para él; si no, lo devuelve tal cual"""
+    if node not in enabled_nodes():
+        return fn
+    return get_node_cache().wrap(node, fn)
+
+
+def discard_node_cache_run(run_id: str) -> None:
+    """Descarta los resultados de una ejecución (al terminarla)"""
+    if _node_cache is not None:
+        _node_cache.discard_run(run_id)
+
+
+_node_cache: Optional[NodeCache] = None
+_node_cache_lock = threading.Lock()
+
+
+def get_node_cache() -> NodeCache:
+    """Obtiene la instancia global de la caché de nodos (lazy loading)."""
+    global _node_cache
+    with _node_cache_lock:
+        if _node_cache is None:
+            _node_cache = NodeCache()
+        return _node_cache